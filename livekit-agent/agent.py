@@ -5,14 +5,15 @@ Supports multiple AI service providers with graceful fallbacks
 """
 
 import asyncio
+import functools
+import hashlib
 import logging
 import os
 import sys
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-import json
-import re
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 # Fix Windows console encoding for emoji and unicode characters
 if sys.platform == 'win32':
@@ -27,37 +28,76 @@ if sys.platform == 'win32':
 
 from livekit import rtc
 from livekit.agents import (
+    AgentServer,
     AutoSubscribe,
     JobContext,
+    JobExecutorType,
+    JobProcess,
+    JobRequest,
     WorkerOptions,
     WorkerType,
     cli,
-    llm,
     stt,
     tts,
 )
 from livekit.agents.voice import Agent
-from livekit.plugins import deepgram, openai, elevenlabs
 
-# Try to import Google Gemini plugin for voice
-try:
-    from livekit.plugins import google
-    GEMINI_LIVE_AVAILABLE = True
-except ImportError:
-    GEMINI_LIVE_AVAILABLE = False
-    google = None
+from audio_buffer import AudioBudget
+from audio_cache import AudioCache, cache_key
+from context_budget import ContextBudget, ContextStats, ConversationContext
+from data_publisher import PublisherStats
+from emotion_classifier import classifier as emotion_classifier
+from endpointing import EndOfTurn, EndpointingStats, create_endpointer
+from interruption import InterruptionStats
+from lipsync_tts import FrameTapTTS, LipSyncTTS
+from llm_context import apply_budget, llm_summarizer
+from load_monitor import LoadMonitor
+from metrics_export import MetricsExporter
+from personality_config import PersonalityRegistry, personality_from_metadata
+from pipeline_plan import plan_for_keys
+from provider_plugins import plugins
+from provider_pool import ProviderPool, SessionProviders, SharedConnectionPool
+from provider_router import ProviderRouter
+from session import VoiceSession
+from session_journal import JournalHandler, journal, parse_level, parse_levels
+from speculation import SpeculationStats
+from turn_metrics import LatencyMetrics
+
+# Modules behind opt-in features (fake providers, failover, recording, speculation,
+# segmenting) are imported where they are first used, so workers without them skip them
+if TYPE_CHECKING:
+    from session_recording import SessionRecorder
+
+# Provider plugins (deepgram, openai, elevenlabs, google) are imported only when
+# the configured API keys select them - see VoiceAIAgent.required_plugins
+GEMINI_LIVE_AVAILABLE = plugins.available("google")
 
 # Load environment variables from root directory
 root_dir = Path(__file__).parent.parent
 env_path = root_dir / '.env'
 load_dotenv(dotenv_path=env_path)
 
-# Configure logging with UTF-8 handler
+# Session journal: typed JSON session events (speech, transcripts, emotions) and the log
+# lines, written to stdout (or JOURNAL_FILE) in batches by a background thread, so a slow
+# stdout never blocks the event loop. Events below JOURNAL_LEVEL are never formatted;
+# JOURNAL_LEVELS overrides single events ("user_transcript=INFO,user_speech=DEBUG").
+# Interim transcripts are kept to JOURNAL_SAMPLE_PER_SECOND per session (0 = all).
+JOURNAL_LEVEL = os.getenv("JOURNAL_LEVEL", "INFO").upper()
+JOURNAL_LEVELS = os.getenv("JOURNAL_LEVELS", "")
+JOURNAL_FILE = os.getenv("JOURNAL_FILE")
+JOURNAL_SAMPLE_PER_SECOND = float(os.getenv("JOURNAL_SAMPLE_PER_SECOND", "2"))
+
+# Configure logging through the journal's writer thread. JOURNAL_FILE is opened by the
+# processes that run the worker or its jobs (main, prewarm), not by importing this module
+journal.configure(
+    level=parse_level(JOURNAL_LEVEL),
+    levels=parse_levels(JOURNAL_LEVELS),
+    sample_per_second=JOURNAL_SAMPLE_PER_SECOND,
+)
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=journal.level,
     handlers=[
-        logging.StreamHandler(stream=sys.stdout)
+        JournalHandler(journal)
     ]
 )
 logger = logging.getLogger(__name__)
@@ -77,6 +117,97 @@ ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 DEFAULT_AGENT_NAME = os.getenv("AGENT_NAME", "AI Assistant")
 DEFAULT_ROOM_NAME = os.getenv("ROOM_NAME")  # None = join any room
 
+# Pre-synthesized phrase cache (greetings are identical for every room)
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", str(Path(__file__).parent / "audio_cache"))
+AUDIO_CACHE_MAX_MB = float(os.getenv("AUDIO_CACHE_MAX_MB", "64"))
+
+# Keep-alive HTTP connections shared by all sessions in a worker process
+CONNECTION_POOL_SIZE = int(os.getenv("CONNECTION_POOL_SIZE", "32"))
+CONNECTION_POOL_PER_HOST = int(os.getenv("CONNECTION_POOL_PER_HOST", "8"))
+
+# Capacity per worker: rooms across all job processes (or threads), host memory in use
+JOB_EXECUTOR = os.getenv("JOB_EXECUTOR", "process")
+MAX_SESSIONS_PER_PROCESS = int(os.getenv("MAX_SESSIONS_PER_PROCESS", "8"))
+MAX_LOOP_LAG_MS = float(os.getenv("MAX_LOOP_LAG_MS", "100"))
+LOAD_THRESHOLD = float(os.getenv("LOAD_THRESHOLD", "0.75"))
+MAX_MEMORY_USED = float(os.getenv("MAX_MEMORY_USED", "0.9"))
+
+# Buffered user speech (the VAD's speech buffer) per session and for the whole worker,
+# across its job processes. Sessions get less than MAX_BUFFERED_SPEECH_SECONDS once the
+# budget runs low, never less than MIN_BUFFERED_SPEECH_SECONDS; below that the worker
+# declines new rooms.
+AUDIO_BUFFER_BUDGET_MB = float(os.getenv("AUDIO_BUFFER_BUDGET_MB", "32"))
+MAX_BUFFERED_SPEECH_SECONDS = float(os.getenv("MAX_BUFFERED_SPEECH_SECONDS", "30"))
+MIN_BUFFERED_SPEECH_SECONDS = float(os.getenv("MIN_BUFFERED_SPEECH_SECONDS", "10"))
+
+# One worker pool serves every personality; rooms pick theirs via metadata
+PERSONALITIES_FILE = os.getenv("PERSONALITIES_FILE")  # Optional JSON, hot-reloaded
+PROVIDER_CACHE_SIZE = int(os.getenv("PROVIDER_CACHE_SIZE", "8"))
+PERSONALITY_WAIT_SECONDS = float(os.getenv("PERSONALITY_WAIT_SECONDS", "3"))
+
+# "auto" uses Gemini Live when available, "cascaded" forces STT -> LLM -> TTS
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "auto")
+
+# Per-turn latency metrics (Prometheus text on http://METRICS_HOST:METRICS_PORT/metrics)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 = endpoint disabled
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_SUMMARY_SECONDS = float(os.getenv("METRICS_SUMMARY_SECONDS", "0"))  # 0 = no data-channel summary
+METRICS_EXPORT_SECONDS = float(os.getenv("METRICS_EXPORT_SECONDS", "5"))  # Job process -> worker stats interval
+
+# Speculative LLM: start replying to a stable interim transcript (costs extra tokens on misses)
+SPECULATIVE_LLM = os.getenv("SPECULATIVE_LLM", "").lower() in ("1", "true", "yes")
+SPECULATION_STABLE_MS = float(os.getenv("SPECULATION_STABLE_MS", "250"))
+SPECULATION_MIN_WORDS = int(os.getenv("SPECULATION_MIN_WORDS", "2"))
+
+# Sentence-segmented TTS: cut LLM text at sentence/clause boundaries and synthesize ahead
+TTS_SEGMENTER = os.getenv("TTS_SEGMENTER", "1").lower() in ("1", "true", "yes")
+TTS_PREFETCH_SEGMENTS = int(os.getenv("TTS_PREFETCH_SEGMENTS", "2"))  # Synthesis requests in flight per session
+TTS_MAX_SEGMENT_LATENCY_MS = float(os.getenv("TTS_MAX_SEGMENT_LATENCY_MS", "600"))
+TTS_FIRST_SEGMENT_LATENCY_MS = float(os.getenv("TTS_FIRST_SEGMENT_LATENCY_MS", "150"))  # Nothing is playing yet
+
+# Data channel to the client: "json", or "binary" for compact frames (JSON for anything without one)
+DATA_ENCODING = os.getenv("DATA_ENCODING", "json").lower()
+DATA_QUEUE_SIZE = int(os.getenv("DATA_QUEUE_SIZE", "32"))  # Queued messages per session before dropping
+
+# Server-side lip-sync: viseme/level frames at this rate on the data channel (0 = off)
+LIPSYNC_FPS = int(os.getenv("LIPSYNC_FPS", "0"))
+
+# Prompt budget: system prompt + rolling summary + recent turns (0 = send the full history).
+# Personalities can set their own with "context_tokens".
+CONTEXT_BUDGET_TOKENS = int(os.getenv("CONTEXT_BUDGET_TOKENS", "3000"))
+
+# Provider failover: with more than one LLM/TTS configured, route each request by rolling
+# health and circuit breakers instead of a fixed priority. Off by default: routed TTS is
+# request/response, so a streaming provider (ElevenLabs) loses its streaming
+PROVIDER_FAILOVER = os.getenv("PROVIDER_FAILOVER", "").lower() in ("1", "true", "yes")
+CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "30"))
+# Hedged TTS: also start the next provider when the first hasn't sent audio by its p95
+TTS_HEDGE = os.getenv("TTS_HEDGE", "").lower() in ("1", "true", "yes")
+
+# Barge-in: pause playout on VAD onset, cancel the reply once the transcript has
+# INTERRUPT_MIN_WORDS words, resume if the user stops short of that.
+# FAST_INTERRUPT=0 leaves interruptions to the framework and only measures them.
+FAST_INTERRUPT = os.getenv("FAST_INTERRUPT", "1").lower() in ("1", "true", "yes")
+INTERRUPT_MIN_WORDS = int(os.getenv("INTERRUPT_MIN_WORDS", "2"))
+INTERRUPT_RESUME_MS = float(os.getenv("INTERRUPT_RESUME_MS", "800"))
+
+# End of turn: trailing silence before the agent answers. "adaptive" shortens it when the
+# transcript sounds finished and extends it after "and"/"um"/"the"; "fixed" always waits
+# ENDPOINT_SILENCE_MS (the old VAD setting). "module:Class" plugs in another Endpointer.
+ENDPOINTER = os.getenv("ENDPOINTER", "adaptive")
+ENDPOINT_MIN_SILENCE_MS = float(os.getenv("ENDPOINT_MIN_SILENCE_MS", "250"))
+ENDPOINT_SILENCE_MS = float(os.getenv("ENDPOINT_SILENCE_MS", "500"))
+ENDPOINT_MAX_SILENCE_MS = float(os.getenv("ENDPOINT_MAX_SILENCE_MS", "1500"))
+
+# Session recording for offline replay (benchmarks/replay_session.py): one file per
+# session in SESSION_RECORD_DIR (unset = off). SESSION_RECORD_AUDIO=0 leaves out user audio.
+SESSION_RECORD_DIR = os.getenv("SESSION_RECORD_DIR")
+SESSION_RECORD_AUDIO = os.getenv("SESSION_RECORD_AUDIO", "1").lower() in ("1", "true", "yes")
+SESSION_RECORD_SAMPLE_RATE = 16000  # User audio is recorded at the STT rate, mono
+
+# Offline load testing: deterministic local providers instead of the APIs (see load_profile.py)
+FAKE_PROVIDERS = os.getenv("FAKE_PROVIDERS", "").lower() in ("1", "true", "yes")
+
 # Personality configurations with Gemini voice mappings
 # Gemini voices: "Puck" (neutral), "Charon" (deep male), "Kore" (soft female), "Fenrir" (strong), "Aoede" (musical)
 PERSONALITIES = {
@@ -160,6 +291,10 @@ def validate_environment():
     if missing:
         raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
     
+    if FAKE_PROVIDERS:
+        logger.warning("⚠️ FAKE_PROVIDERS is set - using local fake STT/LLM/TTS, no API calls")
+        return
+    
     # Check at least one service for each component
     if not DEEPGRAM_API_KEY:
         logger.warning("⚠️ DEEPGRAM_API_KEY not set - STT will not work")
@@ -171,6 +306,17 @@ def validate_environment():
         logger.warning("⚠️ No TTS configured - Set OPENAI_API_KEY or ELEVENLABS_API_KEY")
 
 
+_audio_cache: Optional[AudioCache] = None
+
+
+def get_audio_cache() -> AudioCache:
+    """Process-wide phrase cache, opened on first use"""
+    global _audio_cache
+    if _audio_cache is None:
+        _audio_cache = AudioCache(AUDIO_CACHE_DIR, max_bytes=int(AUDIO_CACHE_MAX_MB * 1024 * 1024))
+    return _audio_cache
+
+
 class VoiceAIAgent:
     """Voice AI Agent orchestrator with personality support"""
     
@@ -181,23 +327,225 @@ class VoiceAIAgent:
         Args:
             personality: One of 'gf', 'bf', 'jarvis', 'lachu', or 'default'
         """
-        self.personality = personality if personality in PERSONALITIES else "default"
-        self.config = PERSONALITIES[self.personality]
-        self.assistant: Optional[Agent] = None
+        # Built-in table plus PERSONALITIES_FILE, reloaded when the file changes
+        self.personalities = PersonalityRegistry(PERSONALITIES, path=PERSONALITIES_FILE)
+        # Default personality; rooms may pick another one (see select_personality)
+        self.personality, self.config = self.personalities.resolve(personality)
+        # Realtime models do their own speech in/out - only build what the mode uses
+        self.plan = plan_for_keys(
+            OPENAI_API_KEY, GEMINI_API_KEY, DEEPGRAM_API_KEY, ELEVENLABS_API_KEY,
+            realtime_installed=GEMINI_LIVE_AVAILABLE, fake=FAKE_PROVIDERS, preferred=PIPELINE_MODE,
+        )
+        self.fake_profile = None
+        if FAKE_PROVIDERS:
+            from load_profile import FakeProviderProfile
+            self.fake_profile = FakeProviderProfile.from_env()
+        # Import the selected plugins now, on the main thread: LiveKit plugins must
+        # register there, and the forkserver preloads what is registered into job processes
+        plugins.load_all(self.required_plugins())
+        # Provider clients are built once per job event loop and cached per
+        # personality/voice/temperature; each loop gets its own connection pool
+        self.provider_pool = ProviderPool(
+            self.build_providers,
+            functools.partial(SharedConnectionPool, limit=CONNECTION_POOL_SIZE, limit_per_host=CONNECTION_POOL_PER_HOST),
+            warm_urls=self.provider_endpoints(),
+            max_entries=PROVIDER_CACHE_SIZE,
+        )
+        self.load_monitor = LoadMonitor(
+            max_sessions=MAX_SESSIONS_PER_PROCESS,
+            lag_budget=MAX_LOOP_LAG_MS / 1000,
+            threshold=LOAD_THRESHOLD,
+            memory_limit=MAX_MEMORY_USED,
+        )
+        self.connect_options = {"auto_subscribe": AutoSubscribe.AUDIO_ONLY}
+        self.audio_budget = AudioBudget(
+            int(AUDIO_BUFFER_BUDGET_MB * 1024 * 1024),
+            session_seconds=MAX_BUFFERED_SPEECH_SECONDS,
+            min_seconds=MIN_BUFFERED_SPEECH_SECONDS,
+        )
+        self.metrics = LatencyMetrics()
+        self.metrics_summary_interval = METRICS_SUMMARY_SECONDS
+        # Served from the main process; job processes send their stats to it
+        self.metrics_exporter = MetricsExporter(METRICS_HOST, METRICS_PORT, interval=METRICS_EXPORT_SECONDS)
+        # Speculation needs interim transcripts, so only the cascaded pipeline uses it
+        self.speculation = SpeculationStats()
+        self.speculation_window = SPECULATION_STABLE_MS / 1000 if SPECULATIVE_LLM and self.plan.needs_stt else 0
+        self.speculation_min_words = SPECULATION_MIN_WORDS
+        self.data_stats = PublisherStats()
+        self.data_binary = DATA_ENCODING == "binary"
+        self.data_queue_size = DATA_QUEUE_SIZE
+        self.lipsync_fps = LIPSYNC_FPS
+        self.context_stats = ContextStats()
+        self.context_tokens = CONTEXT_BUDGET_TOKENS
+        # Provider health is shared by every session and personality in the process
+        self.llm_router = ProviderRouter("llm", slow_after=3.0, cooldown=CIRCUIT_COOLDOWN_SECONDS)
+        self.tts_router = ProviderRouter("tts", slow_after=1.5, cooldown=CIRCUIT_COOLDOWN_SECONDS)
+        self.interruption = InterruptionStats()
+        self.fast_interrupt = FAST_INTERRUPT
+        self.interrupt_min_words = INTERRUPT_MIN_WORDS
+        self.interrupt_resume_after = INTERRUPT_RESUME_MS / 1000
+        self.endpointing = EndpointingStats()
+        self.endpointer = create_endpointer(
+            ENDPOINTER,
+            min_silence=ENDPOINT_MIN_SILENCE_MS / 1000,
+            default=ENDPOINT_SILENCE_MS / 1000,
+            max_silence=ENDPOINT_MAX_SILENCE_MS / 1000,
+        )
+        self.journal = journal
+        self.recording_dir = Path(SESSION_RECORD_DIR) if SESSION_RECORD_DIR else None
+        self.record_audio = SESSION_RECORD_AUDIO
         
         logger.info(f"🤖 Initialized agent with personality: {self.config['name']}")
+        logger.info(f"🔀 Pipeline mode: {self.plan.mode} ({self.plan.reason})")
+        
+    def required_plugins(self) -> list:
+        """Provider plugins the configured keys and pipeline mode will use"""
+        if FAKE_PROVIDERS:
+            return []
+        if self.plan.realtime:
+            return ["google"]
+        names = []
+        if DEEPGRAM_API_KEY:
+            names.append("deepgram")
+        if OPENAI_API_KEY:
+            names.append("openai")
+        if GEMINI_LIVE_AVAILABLE and GEMINI_API_KEY and (PROVIDER_FAILOVER or not OPENAI_API_KEY):
+            names.append("google")
+        if ELEVENLABS_API_KEY and (PROVIDER_FAILOVER or not OPENAI_API_KEY):
+            names.append("elevenlabs")
+        return names
+    
+    def provider_endpoints(self) -> list:
+        """API hosts of the configured providers, used to pre-open connections"""
+        urls = []
+        if self.plan.realtime or FAKE_PROVIDERS:
+            return urls
+        if DEEPGRAM_API_KEY:
+            urls.append("https://api.deepgram.com")
+        if OPENAI_API_KEY:
+            urls.append("https://api.openai.com/v1/models")
+        elif ELEVENLABS_API_KEY:
+            urls.append("https://api.elevenlabs.io")
+        return urls
+    
+    def provider_key(self, personality: str, config: dict) -> tuple:
+        """Cache key for provider clients - anything baked into the clients"""
+        voice = self.tts_profile(config)[1] or config.get('gemini_voice', '')
+        prompt = hashlib.sha1(config['system_prompt'].encode('utf-8')).hexdigest()[:12]
+        return (personality, voice, config['temperature'], prompt)
+    
+    def build_providers(self, connections: SharedConnectionPool, config: dict) -> SessionProviders:
+        """Build the clients the pipeline mode needs on the process-wide connection pool"""
+        plan = self.plan
+        http_session = connections.http_session() if plan.needs_stt or plan.needs_tts else None
+        openai_client = None
+        if OPENAI_API_KEY and not plan.realtime:
+            openai_client = connections.openai_client(OPENAI_API_KEY)
+        
+        tts_provider = None
+        if plan.needs_tts:
+            tts_provider = self.create_tts_provider(config, http_session=http_session, openai_client=openai_client)
+            # Request/response TTS gets sentence segments with the next one prefetched
+            if TTS_SEGMENTER and not tts_provider.capabilities.streaming:
+                from segmented_tts import SegmentedTTS
+                tts_provider = SegmentedTTS(
+                    tts_provider,
+                    max_in_flight=TTS_PREFETCH_SEGMENTS,
+                    max_latency=TTS_MAX_SEGMENT_LATENCY_MS / 1000,
+                    first_latency=TTS_FIRST_SEGMENT_LATENCY_MS / 1000,
+                )
+        
+        return SessionProviders(
+            stt=self.create_stt_provider(http_session=http_session) if plan.needs_stt else None,
+            llm=self.create_llm_provider(config, openai_client=openai_client, realtime=plan.realtime),
+            tts=tts_provider,
+            tts_profile=self.tts_profile(config) if plan.needs_tts else None,
+            mode=plan.mode,
+            label=self.provider_label(config),
+        )
+    
+    def provider_label(self, config: dict) -> str:
+        """Short provider description used as a metrics label"""
+        if FAKE_PROVIDERS:
+            return "fake"
+        if self.plan.realtime:
+            return "gemini-live"
+        llm_name = "openai" if OPENAI_API_KEY else "gemini"
+        return f"deepgram/{llm_name}/{self.tts_profile(config)[0]}"
+    
+    def export_job_metrics(self) -> Optional[asyncio.Task]:
+        """In a job process: send this process's stats to the worker's /metrics until cancelled"""
+        if not self.metrics_exporter.remote:
+            return None
+        return asyncio.create_task(self.metrics_exporter.publish_every(self.render_stats))
+    
+    def render_stats(self) -> str:
+        """This process's turn latency histograms and pipeline counters"""
+        return self.metrics.render() + self.speculation.render() + self.data_stats.render() + self.context_stats.render() + (
+            self.llm_router.render() + self.tts_router.render() + self.interruption.render() + self.audio_budget.render()
+            + self.endpointing.render() + self.journal.render()
+            # This process's loops; the worker's /metrics keeps the worst process
+            + "# TYPE voice_event_loop_lag_seconds gauge\n"
+            f"voice_event_loop_lag_seconds {self.load_monitor.local_lag:.4f}\n"
+        )
+    
+    def render_metrics(self) -> str:
+        """Stats plus the load figures reported to LiveKit (main worker process)"""
+        load = self.load_monitor.snapshot()
+        return self.render_stats() + (
+            "# TYPE voice_active_sessions gauge\n"
+            f"voice_active_sessions {load['sessions']}\n"
+            "# TYPE voice_worker_load gauge\n"
+            f"voice_worker_load {load['load']}\n"
+        )
+    
+    def prewarm(self, proc: JobProcess):
+        """Worker prewarm hook - runs once per process before any job"""
+        if JOURNAL_FILE:
+            journal.open(JOURNAL_FILE)
+        self.provider_pool.prewarm(self.provider_key(self.personality, self.config), self.config)
+    
+    async def select_personality(self, ctx: JobContext) -> tuple:
+        """
+        Pick the personality for a room: room metadata first, then the
+        "personality" attribute (or metadata) of the first participant,
+        then the worker default. Returns (name, config).
+        """
+        name = personality_from_metadata(ctx.room.metadata)
+        
+        if not name:
+            participant = next(iter(ctx.room.remote_participants.values()), None)
+            if participant is None and PERSONALITY_WAIT_SECONDS > 0:
+                try:
+                    participant = await asyncio.wait_for(ctx.wait_for_participant(), PERSONALITY_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    participant = None
+            if participant is not None:
+                name = (
+                    personality_from_metadata(participant.attributes.get("personality"))
+                    or personality_from_metadata(participant.metadata)
+                )
         
-    def create_stt_provider(self) -> stt.STT:
+        return self.personalities.resolve(name, fallback=self.personality)
+    
+    def create_stt_provider(self, http_session=None) -> stt.STT:
         """Create Speech-to-Text provider"""
+        if FAKE_PROVIDERS:
+            logger.info("🎤 Using fake STT (FAKE_PROVIDERS)")
+            from fake_providers import FakeSTT
+            return FakeSTT(self.fake_profile)
+        
         if DEEPGRAM_API_KEY:
             # Deepgram free tier: 200 hours/month (very generous!)
             logger.info("🎤 Using Deepgram for STT")
+            deepgram = plugins.load("deepgram")
             return deepgram.STT(
                 api_key=DEEPGRAM_API_KEY,
                 model="nova-2-general",  # Latest, most accurate model
                 language="en-US",
                 smart_format=True,  # Better punctuation and formatting
                 interim_results=True,  # Faster response
+                http_session=http_session,
             )
         
         # FREE ALTERNATIVES (100% local, no API keys):
@@ -211,35 +559,65 @@ class VoiceAIAgent:
         
         raise ValueError("No STT provider configured. Set DEEPGRAM_API_KEY (200 free hours/month) or use local Whisper.")
     
-    def create_llm_provider(self):
+    def create_llm_provider(self, config: Optional[dict] = None, openai_client=None, realtime: bool = True):
         """Create Language Model provider with personality - uses Gemini Live for voice"""
+        config = config or self.config
+        
+        # Offline load tests: deterministic local model, no network
+        if FAKE_PROVIDERS:
+            logger.info(f"🧠 Using fake LLM for {config['name']} (FAKE_PROVIDERS)")
+            from fake_providers import FakeLLM
+            return FakeLLM(self.fake_profile)
         
         # Priority 1: Gemini Live RealtimeModel (FREE - includes LLM + TTS!)
-        if GEMINI_LIVE_AVAILABLE and GEMINI_API_KEY:
-            logger.info(f"🧠 Using Google Gemini Live for voice ({self.config['name']})")
-            logger.info(f"🎤 Voice: {self.config.get('gemini_voice', 'Puck')}")
+        if realtime and GEMINI_LIVE_AVAILABLE and GEMINI_API_KEY:
+            logger.info(f"🧠 Using Google Gemini Live for voice ({config['name']})")
+            logger.info(f"🎤 Voice: {config.get('gemini_voice', 'Puck')}")
             
             # Set the API key for the Google plugin
             import os
             os.environ['GOOGLE_API_KEY'] = GEMINI_API_KEY
             
             # Return the RealtimeModel which handles both LLM and TTS
+            google = plugins.load("google")
             return google.realtime.RealtimeModel(
                 model="gemini-2.0-flash-exp",
-                voice=self.config.get('gemini_voice', 'Puck'),
-                temperature=self.config['temperature'],
-                instructions=self.config['system_prompt'],
+                voice=config.get('gemini_voice', 'Puck'),
+                temperature=config['temperature'],
+                instructions=config['system_prompt'],
             )
         
+        # Cascaded pipeline: every configured text model, routed when there is more than one
+        llm_providers = {}
+        
         # Priority 2: OpenAI (if available as fallback)
         if OPENAI_API_KEY:
-            logger.info(f"🧠 Using OpenAI GPT-3.5-turbo for LLM ({self.config['name']})")
-            return openai.LLM(
+            logger.info(f"🧠 Using OpenAI GPT-3.5-turbo for LLM ({config['name']})")
+            openai = plugins.load("openai")
+            llm_providers["openai"] = openai.LLM(
                 model="gpt-3.5-turbo",
-                system_prompt=self.config['system_prompt'],
-                temperature=self.config['temperature'],
+                client=openai_client,
+                system_prompt=config['system_prompt'],
+                temperature=config['temperature'],
             )
         
+        # Priority 3: Gemini text model for the cascaded pipeline (STT/TTS do the speech)
+        if GEMINI_LIVE_AVAILABLE and GEMINI_API_KEY and (PROVIDER_FAILOVER or not llm_providers):
+            logger.info(f"🧠 Using Google Gemini for LLM ({config['name']})")
+            google = plugins.load("google")
+            llm_providers["gemini"] = google.LLM(
+                model="gemini-2.0-flash",
+                api_key=GEMINI_API_KEY,
+                temperature=config['temperature'],
+            )
+        
+        if len(llm_providers) > 1:
+            logger.info(f"🔀 Routing LLM requests between {', '.join(llm_providers)}")
+            from routed_providers import RoutedLLM
+            return RoutedLLM(llm_providers, self.llm_router)
+        if llm_providers:
+            return next(iter(llm_providers.values()))
+        
         # Gemini key exists but plugin not available
         if GEMINI_API_KEY and not GEMINI_LIVE_AVAILABLE:
             error_msg = """
@@ -264,28 +642,59 @@ Alternative: OPENAI_API_KEY (requires payment)
 """
         raise ValueError(error_msg)
     
-    def create_tts_provider(self) -> tts.TTS:
+    def tts_profile(self, config: Optional[dict] = None) -> tuple:
+        """(provider, voice, model) create_tts_provider will use - identifies cached audio"""
+        config = config or self.config
+        if FAKE_PROVIDERS:
+            return ("fake", "tone", "fake")
+        if OPENAI_API_KEY:
+            return ("openai", config['openai_voice'], "tts-1")
+        if ELEVENLABS_API_KEY:
+            return ("elevenlabs", config['voice_id'], "eleven_turbo_v2")
+        return ("none", "", "")
+    
+    def create_tts_provider(self, config: Optional[dict] = None, http_session=None, openai_client=None) -> tts.TTS:
         """Create Text-to-Speech provider with personality voice"""
+        config = config or self.config
+        
+        if FAKE_PROVIDERS:
+            logger.info(f"🔊 Using fake TTS for {config['name']} (FAKE_PROVIDERS)")
+            from fake_providers import FakeTTS
+            return FakeTTS(self.fake_profile)
+        
+        tts_providers = {}
         
         # Priority 1: OpenAI TTS (included with OpenAI API, no extra cost)
         if OPENAI_API_KEY:
-            logger.info(f"🔊 Using OpenAI TTS ({self.config['name']} voice)")
-            return openai.TTS(
+            logger.info(f"🔊 Using OpenAI TTS ({config['name']} voice)")
+            openai = plugins.load("openai")
+            tts_providers["openai"] = openai.TTS(
                 model="tts-1",  # Fast model, good quality
-                voice=self.config['openai_voice'],
+                voice=config['openai_voice'],
                 speed=1.0,
+                client=openai_client,
             )
         
         # Priority 2: ElevenLabs (premium quality, optional)
-        if ELEVENLABS_API_KEY:
-            logger.info(f"🔊 Using ElevenLabs TTS ({self.config['name']} voice)")
-            return elevenlabs.TTS(
+        if ELEVENLABS_API_KEY and (PROVIDER_FAILOVER or not tts_providers):
+            logger.info(f"🔊 Using ElevenLabs TTS ({config['name']} voice)")
+            elevenlabs = plugins.load("elevenlabs")
+            tts_providers["elevenlabs"] = elevenlabs.TTS(
                 api_key=ELEVENLABS_API_KEY,
                 model_id="eleven_turbo_v2",
-                voice_id=self.config['voice_id'],
+                voice_id=config['voice_id'],
                 optimize_streaming_latency=4,
+                http_session=http_session,
             )
         
+        if len(tts_providers) > 1:
+            hedging = " (hedged at p95)" if TTS_HEDGE else ""
+            logger.info(f"🔀 Routing TTS requests between {', '.join(tts_providers)}{hedging}")
+            from routed_providers import RoutedTTS
+            return RoutedTTS(tts_providers, self.tts_router, hedge=TTS_HEDGE)
+        if tts_providers:
+            return next(iter(tts_providers.values()))
+        
         # FREE ALTERNATIVES (100% local, no API keys):
         # 1. Coqui TTS (local, high quality)
         #    pip install TTS
@@ -297,193 +706,214 @@ Alternative: OPENAI_API_KEY (requires payment)
         
         raise ValueError("No TTS provider configured. Set OPENAI_API_KEY for included TTS, or use local options (Coqui/Piper).")
     
+    def speculative_reply(self, providers: SessionProviders, chat_ctx, text: str):
+        """Start an LLM reply to an interim transcript (see speculation.Speculator)"""
+        from speculative_llm import speculative_stream
+        return speculative_stream(providers.llm, chat_ctx, text)
+    
+    def committed_llm_stream(self, providers: SessionProviders, chat_ctx, speculator):
+        """The speculative reply as an LLMStream if it matches the committed turn, else None"""
+        from speculative_llm import CommittedLLMStream, last_user_text
+        speculation = speculator.commit(last_user_text(chat_ctx))
+        if speculation is None:
+            return None
+        return CommittedLLMStream(providers.llm, chat_ctx=chat_ctx, speculation=speculation)
+    
+    def conversation_context(self, providers: SessionProviders, config: dict) -> Optional[ConversationContext]:
+        """Prompt budget for one session (None sends the full history, as realtime models need)"""
+        if not self.context_tokens or providers.mode == "realtime":
+            return None
+        budget = ContextBudget.for_personality(config, self.context_tokens)
+        return ConversationContext(budget, llm_summarizer(providers.llm), self.context_stats)
+    
+    def apply_context_budget(self, chat_ctx, context: ConversationContext):
+        """Trim a request's chat context to the session's budget (in place)"""
+        return apply_budget(chat_ctx, context)
+    
+    def tap_tts(self, tts_provider: tts.TTS, on_frame) -> tts.TTS:
+        """A session's view of a shared TTS that also feeds its lip-sync and barge-in accounting"""
+        if self.lipsync_fps > 0:
+            return LipSyncTTS(tts_provider, on_frame)
+        # Barge-in only counts the audio; the provider's own stream passes through
+        return FrameTapTTS(tts_provider, on_frame)
+    
+    def open_recording(self, session) -> Optional["SessionRecorder"]:
+        """Start recording a session if SESSION_RECORD_DIR is set"""
+        if self.recording_dir is None:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        room = "".join(c if c.isalnum() or c in "-_" else "_" for c in session.room_name)
+        path = self.recording_dir / f"{room}-{stamp}-{os.getpid()}.nzrec"
+        logger.info(f"📼 Recording session to {path}")
+        from session_recording import SessionRecorder
+        return SessionRecorder(path, {
+            "room": session.room_name,
+            "personality": session.personality,
+            "providers": session.providers.label,
+            "mode": session.providers.mode,
+            "fast_interrupt": self.fast_interrupt,
+            "interrupt_min_words": self.interrupt_min_words,
+            "lipsync_fps": self.lipsync_fps,
+            "endpointer": self.endpointer.name,
+            "vad_silence": self.vad_silence(session.providers.stt is not None),
+        }, audio=self.record_audio)
+    
+    def record_input_audio(self, ctx: JobContext, recorder: "SessionRecorder") -> set:
+        """Copy the user's audio into the recording - a second reader on each subscribed audio track"""
+        tasks = set()
+        if not recorder.audio:
+            return tasks
+        
+        async def read(track):
+            stream = rtc.AudioStream(track, sample_rate=SESSION_RECORD_SAMPLE_RATE, num_channels=1)
+            try:
+                async for event in stream:
+                    frame = event.frame
+                    recorder.audio_in(frame.data, frame.sample_rate, frame.num_channels)
+            finally:
+                await stream.aclose()
+        
+        def on_track_subscribed(track, publication, participant):
+            if track.kind != rtc.TrackKind.KIND_AUDIO:
+                return
+            task = asyncio.create_task(read(track))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        
+        for participant in ctx.room.remote_participants.values():
+            for publication in participant.track_publications.values():
+                if publication.track is not None:
+                    on_track_subscribed(publication.track, publication, participant)
+        ctx.room.on("track_subscribed", on_track_subscribed)
+        return tasks
+    
+    def pause_playout(self, assistant) -> bool:
+        """Pause the agent's audio output mid-sentence; False if the output can't pause"""
+        audio = assistant.output.audio
+        if audio is None or not audio.can_pause:
+            return False
+        audio.pause()
+        return True
+    
+    def resume_playout(self, assistant):
+        audio = assistant.output.audio
+        if audio is not None and audio.can_pause:
+            audio.resume()
+    
+    def interrupt_reply(self, assistant):
+        """Stop the current reply: its TTS request and whatever is queued for playout"""
+        assistant.interrupt()
+    
+    def vad_silence(self, adaptive: bool) -> float:
+        """Silence before the VAD ends speech: the endpointer's shortest window when it decides the rest"""
+        return self.endpointer.min_silence if adaptive else self.endpointer.default
+    
+    def create_assistant(
+        self, providers: SessionProviders, config: dict, before_tts_cb, before_llm_cb=None,
+        max_buffered_speech: float = MAX_BUFFERED_SPEECH_SECONDS, turn_detection: Optional[EndOfTurn] = None,
+    ) -> Agent:
+        """Create a voice assistant for one session using shared provider handles"""
+        vad_silence = self.vad_silence(turn_detection is not None)
+        return Agent(
+            instructions=config['system_prompt'],
+            stt=providers.stt,
+            llm=providers.llm,
+            tts=providers.tts,
+            # Voice activity detection (VAD) settings
+            vad=rtc.VAD.create(
+                min_speech_duration=0.1,  # Minimum speech duration (seconds)
+                min_silence_duration=vad_silence,  # Silence to end speech (seconds); turn_detection may wait longer
+                prefix_padding_duration=0.3,  # Audio before speech starts
+                max_buffered_speech=max_buffered_speech,  # Max speech buffer (seconds), from the audio budget
+            ),
+            # End of turn: the session's endpointer waits out each utterance's own window
+            turn_detection=turn_detection,
+            min_endpointing_delay=vad_silence,
+            # Interruption handling
+            allow_interruptions=True,
+            interrupt_min_words=INTERRUPT_MIN_WORDS,  # Min words before allowing interruption
+            # Tag stripping only applies when we run our own TTS
+            before_tts_cb=before_tts_cb if providers.tts is not None else None,
+            # Returns a speculative reply when one matches, None for the normal LLM call
+            before_llm_cb=before_llm_cb,
+        )
+    
     async def entrypoint(self, ctx: JobContext):
         """Main agent entry point - called when agent joins a room"""
-        logger.info(f"🚀 Agent starting in room: {ctx.room.name}")
-        
+        # Each room gets its own session; nothing per-room is stored on self
+        session = VoiceSession(self, ctx)
         try:
-            # Initialize AI providers
-            stt_provider = self.create_stt_provider()
-            llm_provider = self.create_llm_provider()
-            tts_provider = self.create_tts_provider()
-            
-            # Create voice assistant using the modern Agent API
-            self.assistant = Agent(
-                instructions=self.config['system_prompt'],
-                stt=stt_provider,
-                llm=llm_provider,
-                tts=tts_provider,
-                # Voice activity detection (VAD) settings
-                vad=rtc.VAD.create(
-                    min_speech_duration=0.1,  # Minimum speech duration (seconds)
-                    min_silence_duration=0.5,  # Silence to end utterance (seconds)
-                    prefix_padding_duration=0.3,  # Audio before speech starts
-                    max_buffered_speech=60.0,  # Max speech buffer (seconds)
-                ),
-                # Interruption handling
-                allow_interruptions=True,
-                interrupt_min_words=2,  # Min words before allowing interruption
-                before_tts_cb=self._before_tts_cb,
-            )
-            
-            # Setup event listeners
-            self.setup_event_listeners()
-            
-            # Connect to room
-            await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
-            logger.info("✅ Agent connected to room")
-            
-            # Start the voice assistant
-            self.assistant.start(ctx.room)
-            logger.info("✅ Voice assistant started - ready for conversation!")
-            
-            # Initial greeting (optional)
-            await self.assistant.say(
-                f"Hello! I'm {self.config['name']}. How can I help you today?",
-                allow_interruptions=True
-            )
-            
+            await session.start()
         except Exception as e:
             logger.error(f"❌ Agent error: {e}", exc_info=True)
+            await session.aclose()
             raise
     
-    async def publish_emotion(self, text: str):
-        """Detect and publish emotion data to the room"""
-        try:
-            emotion = self.detect_emotion(text)
-            if self.assistant and self.assistant.room:
-                payload = json.dumps({
-                    "type": "emotion",
-                    "emotion": emotion,
-                    "timestamp": asyncio.get_event_loop().time()
-                }).encode('utf-8')
-                
-                await self.assistant.room.local_participant.publish_data(
-                    payload,
-                    reliable=True
-                )
-                logger.info(f"📡 Published emotion: {emotion}")
-        except Exception as e:
-            logger.error(f"Failed to publish emotion: {e}")
-
-    def detect_emotion(self, text: str) -> str:
-        """Simple keyword-based emotion detection (matching frontend logic)"""
-        text = text.lower()
-        keywords = {
-            "happy": ["happy", "joy", "glad", "excited", "great", "awesome", "wonderful", "love", "perfect", "amazing", "haha", "yay"],
-            "sad": ["sad", "unhappy", "depressed", "sorry", "down", "miserable", "terrible", "bad", "hurt", "crying"],
-            "angry": ["angry", "mad", "furious", "annoyed", "frustrated", "pissed", "hate", "stupid"],
-            "stressed": ["stressed", "anxious", "worried", "nervous", "busy", "deadline", "scared"],
-            "calm": ["calm", "chill", "relax", "peace", "fine", "okay", "alright"],
-            "love": ["love", "adore", "miss you", "hug", "kiss", "babe", "honey", "darling"],
-            "concerned": ["careful", "watch out", "worried about", "are you okay", "safe"],
-            "thoughtful": ["hmm", "interesting", "maybe", "think", "consider", "let's see"]
-        }
-        
-        # Check for matches
-        for emotion, words in keywords.items():
-            if any(word in text for word in words):
-                return emotion
-                
-        return "neutral"
-
-    async def _before_tts_cb(self, agent: Agent, text_stream: any):
+    def end_job(self, ctx: JobContext, reason: str):
+        """Leave a room the session can't serve after all"""
+        ctx.shutdown(reason=reason)
+    
+    async def request(self, req: JobRequest):
+        """Admission control (main worker process) - decline rooms once the worker is saturated"""
+        if not self.audio_budget.can_admit():
+            logger.warning(f"⏸️ Rejecting job, audio buffer budget spent ({self.audio_budget.used / 2**20:.1f} MB held)")
+            await req.reject()
+            return
+        if not self.load_monitor.admit(req.id):
+            logger.warning(f"⏸️ Rejecting job, worker overloaded: {self.load_monitor.snapshot()}")
+            await req.reject()
+            return
+        await req.accept()
+    
+    def load(self, worker) -> float:
+        """Report the worker's load to the LiveKit dispatcher (runs on a thread pool)"""
+        return self.load_monitor.load()
+    
+    def greeting_text(self, config: Optional[dict] = None) -> str:
+        """Opening line spoken when the agent joins a room"""
+        config = config or self.config
+        return f"Hello! I'm {config['name']}. How can I help you today?"
+    
+    def cached_audio(self, text: str, providers: SessionProviders):
         """
-        Callback to process text before TTS.
-        Used to strip emotion tags and publish them as data.
+        Audio for a fixed phrase, streamed from the phrase cache if present.
+        On a miss the phrase is synthesized once and stored for later rooms.
         """
-        buffer = ""
-        emotion_published = False
+        key = cache_key(*providers.tts_profile, text)
+        frames = get_audio_cache().frames(key)
+        if frames is not None:
+            logger.info("⚡ Playing cached audio")
+            return self._cached_audio_frames(frames)
+        return self._synthesize_to_cache(key, text, providers.tts)
+    
+    async def _cached_audio_frames(self, frames):
+        for frame in frames:
+            yield rtc.AudioFrame(
+                data=frame.data,
+                sample_rate=frame.sample_rate,
+                num_channels=frame.num_channels,
+                samples_per_channel=frame.samples_per_channel,
+            )
+    
+    async def _synthesize_to_cache(self, key: str, text: str, tts_provider: tts.TTS):
+        """Stream TTS audio while recording it; only complete phrases are stored"""
+        writer = None
+        stream = tts_provider.synthesize(text)
+        async for audio in stream:
+            frame = audio.frame
+            if writer is None:
+                writer = get_audio_cache().writer(key, frame.sample_rate, frame.num_channels)
+            writer.append(frame.data)
+            yield frame
         
-        async for chunk in text_stream:
-            buffer += chunk
-            
-            # Check if we have a complete tag [emotion]
-            # Only check at the start of the stream (first 50 chars)
-            if not emotion_published and "[" in buffer and "]" in buffer:
-                try:
-                    # Find tag using regex
-                    match = re.search(r'^\[(.*?)\]', buffer)
-                    if match:
-                        emotion = match.group(1).lower()
-                        # Publish emotion
-                        logger.info(f"🎭 LLM Emotion Detected: {emotion}")
-                        if agent.room:
-                            payload = json.dumps({
-                                "type": "emotion", 
-                                "emotion": emotion,
-                                "timestamp": asyncio.get_event_loop().time()
-                            }).encode('utf-8')
-                            asyncio.create_task(agent.room.local_participant.publish_data(payload, reliable=True))
-                        
-                        emotion_published = True
-                        
-                        # Strip tag from buffer
-                        buffer = buffer[match.end():].lstrip()
-                except Exception as e:
-                    logger.error(f"Error parsing emotion tag: {e}")
-            
-            # If buffer gets too long without a tag, give up on finding one
-            if not emotion_published and len(buffer) > 50:
-                emotion_published = True # Stop checking
-            
-            # Yield content if we are safe to do so
-            # We need to be careful not to hold too much text, but enough to strip the tag
-            if emotion_published:
-                if buffer:
-                    yield buffer
-                    buffer = ""
-            # If not published yet, we keep buffering until we find tag or timeout
-        
-        # Yield remaining buffer
-        if buffer:
-            yield buffer
-
-
-    def setup_event_listeners(self):
-        """Setup event listeners for the voice assistant"""
-        
-        @self.assistant.on("user_started_speaking")
-        def on_user_started_speaking():
-            logger.info("🗣️ User started speaking")
-        
-        @self.assistant.on("user_stopped_speaking")
-        def on_user_stopped_speaking():
-            logger.info("🤫 User stopped speaking")
-        
-        @self.assistant.on("agent_started_speaking")
-        def on_agent_started_speaking():
-            logger.info("🤖 Agent started speaking")
-            # Publish speaking state
-            if self.assistant.room:
-                asyncio.create_task(self.assistant.room.local_participant.publish_data(
-                    json.dumps({"type": "state", "isSpeaking": True}).encode('utf-8'),
-                    reliable=True
-                ))
-        
-        @self.assistant.on("agent_stopped_speaking")
-        def on_agent_stopped_speaking():
-            logger.info("🤖 Agent stopped speaking")
-            # Publish speaking state
-            if self.assistant.room:
-                asyncio.create_task(self.assistant.room.local_participant.publish_data(
-                    json.dumps({"type": "state", "isSpeaking": False}).encode('utf-8'),
-                    reliable=True
-                ))
-        
-        # NOTE: We now handle emotion in _before_tts_cb, so we don't need to double-publish here
-        # unless it was missed. But simplicity is better.
-        @self.assistant.on("user_speech_committed")
-        def on_user_speech_committed(msg: llm.ChatMessage):
-            logger.info(f"💬 User: {msg.content}")
-        
-        @self.assistant.on("agent_speech_committed")
-        def on_agent_speech_committed(msg: llm.ChatMessage):
-            logger.info(f"🤖 Agent: {msg.content}")
-        
-        @self.assistant.on("error")
-        def on_error(error: Exception):
-            logger.error(f"❌ Assistant error: {error}", exc_info=True)
+        # A fallback provider's voice must not be cached as the primary's
+        served_by = getattr(stream, "served_by", None)
+        if writer is not None and served_by in (None, self.tts_profile()[0]):
+            await asyncio.to_thread(writer.commit)
+    
+    def detect_emotion(self, text: str) -> str:
+        """Keyword-based emotion detection (same labels as the frontend)"""
+        return emotion_classifier.classify(text)
 
 
 def main(personality: str = None):
@@ -494,6 +924,9 @@ def main(personality: str = None):
         personality: Personality to use ('gf', 'bf', 'jarvis', 'lachu')
                     If None, uses PERSONALITY env var or 'default'
     """
+    if JOURNAL_FILE:
+        # Closed by the journal at exit, after the queued lines are written
+        journal.open(JOURNAL_FILE)
     try:
         # Validate environment
         validate_environment()
@@ -504,27 +937,46 @@ def main(personality: str = None):
             os.getenv("PERSONALITY", "default")
         )
         
+        # Create agent instance; the personality is the default for rooms
+        # that don't request one in their metadata
+        agent = VoiceAIAgent(personality=selected_personality)
+        
         logger.info("=" * 50)
         logger.info("🎙️ LiveKit Voice AI Agent")
         logger.info(f"🏠 LiveKit URL: {LIVEKIT_URL}")
-        logger.info(f"🎭 Personality: {PERSONALITIES[selected_personality]['name']}")
+        logger.info(f"🎭 Default personality: {agent.config['name']}")
+        logger.info(f"🎭 Available: {', '.join(agent.personalities.names())}")
         if DEFAULT_ROOM_NAME:
             logger.info(f"🚪 Room: {DEFAULT_ROOM_NAME}")
         logger.info("=" * 50)
         
-        # Create agent instance with personality
-        agent = VoiceAIAgent(personality=selected_personality)
-        
         # Start worker
-        cli.run_app(
+        server = AgentServer.from_server_options(
             WorkerOptions(
                 entrypoint_fnc=agent.entrypoint,
-                # Worker will automatically join rooms or wait for assignments
-                request_fnc=None,
+                # Build provider clients and open connections before jobs arrive
+                prewarm_fnc=agent.prewarm,
+                # Worker will automatically join rooms unless overloaded
+                request_fnc=agent.request,
+                # Report sessions / loop lag / CPU so rooms are packed safely
+                load_fnc=agent.load,
+                load_threshold=LOAD_THRESHOLD,
                 # Worker configuration
                 worker_type=WorkerType.ROOM,
+                job_executor_type=(
+                    JobExecutorType.THREAD if JOB_EXECUTOR == "thread" else JobExecutorType.PROCESS
+                ),
             )
         )
+        # Job processes only see their own room: admit against every job the worker runs
+        agent.load_monitor.count_jobs(lambda: [info.job.id for info in server.active_jobs])
+        # A job process that dies keeps its audio lease: hand it back once the job is gone
+        agent.audio_budget.track_jobs(agent.load_monitor.jobs)
+        # Job event loops run in job processes: load() counts the lag they report
+        agent.load_monitor.count_lag(lambda: agent.metrics_exporter.jobs.gauge("voice_event_loop_lag_seconds"))
+        # One /metrics for the worker, independent of any job's event loop
+        agent.metrics_exporter.start(agent.render_metrics)
+        cli.run_app(server)
         
     except KeyboardInterrupt:
         logger.info("\n👋 Agent shutting down...")
@@ -533,6 +985,49 @@ def main(personality: str = None):
         raise
 
 
+async def warm_audio_cache():
+    """Pre-render the greeting for every personality into the audio cache"""
+    cache = get_audio_cache()
+    agent = VoiceAIAgent()
+    for personality in agent.personalities.names():
+        _, config = agent.personalities.resolve(personality)
+        try:
+            tts_provider = agent.create_tts_provider(config)
+        except ValueError as e:
+            logger.error(f"❌ Cannot warm audio cache: {e}")
+            return
+        
+        text = agent.greeting_text(config)
+        key = cache_key(*agent.tts_profile(config), text)
+        if key in cache:
+            logger.info(f"✅ Greeting already cached: {config['name']}")
+            continue
+        
+        async for _ in agent._synthesize_to_cache(key, text, tts_provider):
+            pass
+        logger.info(f"💾 Cached greeting: {config['name']}")
+    
+    logger.info(f"📦 Audio cache size: {cache.total_bytes / 1024:.0f} KiB")
+
+
+def check_startup(all_plugins: bool = False):
+    """Print what starting a worker loads: plugins selected by the keys, their import time and memory"""
+    agent = VoiceAIAgent()
+    if all_plugins:
+        # What importing every installed plugin (the old eager imports) would add
+        plugins.load_all([name for name in plugins.modules if plugins.available(name)])
+    print(f"Pipeline: {agent.plan.mode} ({agent.plan.reason})")
+    print(f"Selected plugins: {', '.join(agent.required_plugins()) or 'none'}")
+    print(plugins.report())
+
+
 if __name__ == "__main__":
-    # Run the agent
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "warm-cache":
+        # Pre-render greetings: python agent.py warm-cache
+        asyncio.run(warm_audio_cache())
+    elif len(sys.argv) > 1 and sys.argv[1] in ("check", "--check"):
+        # Startup report: python agent.py --check [--all]
+        check_startup(all_plugins="--all" in sys.argv[2:])
+    else:
+        # Run the agent
+        main()
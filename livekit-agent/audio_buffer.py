@@ -0,0 +1,289 @@
+"""
+Bounded session audio memory
+Fixed-size ring buffers for session audio, and a worker-wide budget that
+decides how much buffered speech each session may hold, so a worker's
+audio memory is known up front instead of growing with whoever talks
+longest
+"""
+
+import hashlib
+import multiprocessing
+from typing import TYPE_CHECKING, Callable, Collection, Dict, Optional
+
+from process_local import ProcessLocal
+
+if TYPE_CHECKING:
+    # Only AudioRing needs NumPy, and imports it when one is built
+    import numpy as np
+
+# The VAD buffers speech as 16 kHz mono int16
+SPEECH_BYTES_PER_SECOND = 16000 * 2
+
+
+class AudioRing:
+    """
+    FIFO of samples in one preallocated array.
+
+    write() copies into the ring (converting and scaling in place), and
+    read_into() copies the oldest samples into a caller-owned frame, so
+    steady-state buffering allocates nothing. When a write doesn't fit,
+    the oldest samples are overwritten and counted in `dropped`.
+    """
+
+    def __init__(self, capacity: int, dtype="float32"):
+        import numpy as np
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._start = 0
+        self._size = 0
+        self.dropped = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def free(self) -> int:
+        return len(self._data) - self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def write(self, samples: "np.ndarray", scale: Optional[float] = None) -> int:
+        """Append samples (overwriting the oldest if full); returns how many were written"""
+        capacity = len(self._data)
+        if len(samples) > capacity:
+            self.dropped += len(samples) - capacity
+            samples = samples[-capacity:]
+        overflow = len(samples) - self.free
+        if overflow > 0:
+            self._start = (self._start + overflow) % capacity
+            self._size -= overflow
+            self.dropped += overflow
+        end = (self._start + self._size) % capacity
+        first = min(len(samples), capacity - end)
+        self._copy(end, samples[:first], scale)
+        if first < len(samples):
+            self._copy(0, samples[first:], scale)
+        self._size += len(samples)
+        return len(samples)
+
+    def _copy(self, at: int, samples: "np.ndarray", scale: Optional[float]):
+        target = self._data[at:at + len(samples)]
+        target[:] = samples   # Converts like np.copyto(casting="unsafe")
+        if scale is not None:
+            target *= scale
+
+    def read_into(self, out: "np.ndarray") -> bool:
+        """Move the oldest len(out) samples into `out`; False (nothing moved) if there aren't enough"""
+        count = len(out)
+        if count > self._size:
+            return False
+        capacity = len(self._data)
+        first = min(count, capacity - self._start)
+        out[:first] = self._data[self._start:self._start + first]
+        if first < count:
+            out[first:] = self._data[:count - first]
+        self._size -= count
+        # Rewind when drained, so untouched pages of the array stay unmapped
+        self._start = (self._start + count) % capacity if self._size else 0
+        return True
+
+
+class AudioLease:
+    """One session's share of the audio budget, and what its buffers use"""
+
+    __slots__ = ("budget", "name", "job", "slot", "speech_bytes", "buffers")
+
+    def __init__(self, budget: "AudioBudget", name: str, job: int, slot: int, speech_bytes: int):
+        self.budget = budget
+        self.name = name
+        self.job = job                           # Key of the job holding it (see job_key)
+        self.slot = slot                         # Its entry in the budget's shared lease table
+        self.speech_bytes = speech_bytes         # Reserved for the VAD's speech buffer
+        self.buffers: Dict[str, int] = {}       # Ring buffers owned by the session, by component
+
+    @property
+    def speech_seconds(self) -> float:
+        return self.speech_bytes / SPEECH_BYTES_PER_SECOND
+
+    @property
+    def nbytes(self) -> int:
+        return self.speech_bytes + sum(self.buffers.values())
+
+    def set(self, component: str, nbytes: int):
+        """Account a buffer the session allocated (replaces the component's previous size)"""
+        self.budget._resize(self, component, nbytes)
+
+    def release(self):
+        self.budget._release(self)
+
+
+def job_key(job_id: str) -> int:
+    """Nonzero 64-bit key for a job id, as stored in the shared lease table"""
+    digest = hashlib.blake2b(job_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True) or 1
+
+
+class AudioBudget(ProcessLocal):
+    """
+    Worker-wide cap on buffered session audio.
+
+    Each session leases up to session_seconds of speech buffer; once the
+    budget runs low, new sessions get what is left, down to min_seconds.
+    Below that, lease() refuses and the worker stops accepting rooms
+    (can_admit). Ring buffers a session allocates are accounted against
+    its lease too.
+
+    The bytes in use, and a table of (job, bytes) per lease, are kept in
+    shared memory that job processes inherit with the worker, so
+    admission in the main process and leases in every job process draw on
+    the same budget. A job process that dies never releases its lease;
+    the main process hands it back with reclaim() once the job is gone.
+    """
+
+    _init_args = ("total_bytes", "session_seconds", "min_seconds", "max_leases", "shared", "table")
+
+    def __init__(
+        self,
+        total_bytes: int,
+        session_seconds: float = 60.0,
+        min_seconds: float = 10.0,
+        max_leases: int = 256,
+        shared=None,
+        table=None,
+    ):
+        self.total_bytes = total_bytes
+        self.session_seconds = session_seconds
+        self.min_seconds = min_seconds
+        self.max_leases = max_leases
+        # Created with the spawn context so forkserver and spawn job processes can inherit them
+        context = multiprocessing.get_context("spawn")
+        self.shared = shared if shared is not None else context.Value("q", 0)
+        # Slot i is (job key, bytes) at [2i, 2i + 1]; key 0 is a free slot. Guarded by shared's lock
+        self.table = table if table is not None else context.Array("q", 2 * max_leases, lock=False)
+        self._leases: Dict[int, AudioLease] = {}
+        self._jobs: Optional[Callable[[], Collection[str]]] = None
+        self.clamped = 0
+        self.rejected = 0
+        self.reclaimed = 0
+
+    @property
+    def used(self) -> int:
+        """Bytes held by sessions in every process of the worker"""
+        return self.shared.value
+
+    @property
+    def _floor(self) -> int:
+        return int(self.min_seconds * SPEECH_BYTES_PER_SECOND)
+
+    def track_jobs(self, jobs: Callable[[], Collection[str]]):
+        """Reclaim leases of jobs no longer in jobs() on every admission check (main process)"""
+        self._jobs = jobs
+
+    def can_admit(self) -> bool:
+        """Whether another session can get at least min_seconds of speech buffer"""
+        if self._jobs is not None:
+            self.reclaim(self._jobs())
+        with self.shared.get_lock():
+            if self.total_bytes - self.shared.value >= self._floor:
+                return True
+            self.rejected += 1
+            return False
+
+    def lease(self, name: str, job_id: str) -> Optional[AudioLease]:
+        """Reserve a new session's speech buffer; None if less than min_seconds is left"""
+        wanted = int(self.session_seconds * SPEECH_BYTES_PER_SECOND)
+        job = job_key(job_id)
+        table = self.table
+        with self.shared.get_lock():
+            granted = min(wanted, self.total_bytes - self.shared.value)
+            slot = next((i for i in range(self.max_leases) if not table[2 * i]), None)
+            if granted < self._floor or slot is None:
+                self.rejected += 1
+                return None
+            if granted < wanted:
+                self.clamped += 1
+            lease = AudioLease(self, name, job, slot, granted)
+            self._leases[id(lease)] = lease
+            table[2 * slot], table[2 * slot + 1] = job, granted
+            self.shared.value += granted
+        return lease
+
+    def _held(self, lease: AudioLease) -> bool:
+        # False once released, or reclaimed after its job was taken for dead
+        return id(lease) in self._leases and self.table[2 * lease.slot] == lease.job
+
+    def _resize(self, lease: AudioLease, component: str, nbytes: int):
+        with self.shared.get_lock():
+            if self._held(lease):
+                delta = nbytes - lease.buffers.get(component, 0)
+                self.table[2 * lease.slot + 1] += delta
+                self.shared.value += delta
+            lease.buffers[component] = nbytes
+
+    def _release(self, lease: AudioLease):
+        with self.shared.get_lock():
+            if self._held(lease):
+                self.shared.value -= self.table[2 * lease.slot + 1]
+                self.table[2 * lease.slot] = self.table[2 * lease.slot + 1] = 0
+            self._leases.pop(id(lease), None)
+
+    def reclaim(self, jobs: Collection[str]) -> int:
+        """Hand back the leases of jobs not in `jobs` (ids of the worker's live jobs); returns bytes freed"""
+        live = {job_key(job_id) for job_id in jobs}
+        table = self.table
+        freed = 0
+        with self.shared.get_lock():
+            for i in range(self.max_leases):
+                job = table[2 * i]
+                if job and job not in live:
+                    freed += table[2 * i + 1]
+                    table[2 * i] = table[2 * i + 1] = 0
+                    self.reclaimed += 1
+            self.shared.value -= freed
+            for key, lease in list(self._leases.items()):
+                if table[2 * lease.slot] != lease.job:
+                    del self._leases[key]
+        return freed
+
+    def sessions(self) -> Dict[str, int]:
+        """Bytes held per active session in this process"""
+        with self.shared.get_lock():
+            return {lease.name: lease.nbytes for lease in self._leases.values()}
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        sessions = self.sessions()
+        lines = [
+            "# HELP voice_audio_buffer_budget_bytes Worker-wide cap on buffered session audio",
+            "# TYPE voice_audio_buffer_budget_bytes gauge",
+            f"voice_audio_buffer_budget_bytes {self.total_bytes}",
+            # This process's sessions only: /metrics sums the gauge over the worker's processes
+            "# HELP voice_audio_buffer_bytes Audio buffer bytes reserved by active sessions",
+            "# TYPE voice_audio_buffer_bytes gauge",
+            f"voice_audio_buffer_bytes {sum(sessions.values())}",
+            "# HELP voice_audio_buffer_session_bytes Audio buffer bytes per active session",
+            "# TYPE voice_audio_buffer_session_bytes gauge",
+        ]
+        for name, nbytes in sorted(sessions.items()):
+            lines.append(f'voice_audio_buffer_session_bytes{{room="{name}"}} {nbytes}')
+        lines += [
+            "# HELP voice_audio_buffer_clamped_total Sessions given less speech buffer than configured",
+            "# TYPE voice_audio_buffer_clamped_total counter",
+            f"voice_audio_buffer_clamped_total {self.clamped}",
+            "# HELP voice_audio_buffer_rejected_total Jobs and sessions declined because the audio budget was spent",
+            "# TYPE voice_audio_buffer_rejected_total counter",
+            f"voice_audio_buffer_rejected_total {self.rejected}",
+            "# HELP voice_audio_buffer_reclaimed_total Leases handed back after their job ended without releasing them",
+            "# TYPE voice_audio_buffer_reclaimed_total counter",
+            f"voice_audio_buffer_reclaimed_total {self.reclaimed}",
+        ]
+        return "\n".join(lines) + "\n"
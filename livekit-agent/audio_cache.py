@@ -0,0 +1,220 @@
+"""
+Persistent TTS audio cache
+Stores pre-synthesized phrases (greetings, fillers) as raw PCM on disk so
+repeated phrases can be played without a TTS round trip
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# File layout: header followed by interleaved little-endian int16 samples
+_MAGIC = b"NZAC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")  # magic, version, channels, sample_rate, total samples per channel
+_SAMPLE_WIDTH = 2  # int16
+_SUFFIX = ".pcm"
+
+# Playback frame length when streaming a cached entry
+FRAME_MS = 20
+
+# Temp files older than this are leftovers from a writer that died mid-commit
+STALE_TMP_SECONDS = 60
+
+
+class CachedFrame(NamedTuple):
+    """One fixed-length chunk of cached PCM audio"""
+    data: bytes
+    sample_rate: int
+    num_channels: int
+    samples_per_channel: int
+
+
+def cache_key(provider: str, voice: str, model: str, text: str) -> str:
+    """Stable key for a synthesized phrase"""
+    raw = "\x1f".join((provider, voice or "", model or "", text.strip()))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Disk-backed phrase cache with size-bounded LRU eviction.
+
+    Each entry is a single file read through mmap. The directory is the
+    index: every job process sharing it sees entries the others wrote, and
+    eviction rescans it, so sizes and recency (the file's mtime, touched on
+    each hit) are right across processes and survive restarts.
+    """
+
+    def __init__(self, directory: os.PathLike, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sweep()
+        self._evict()
+
+    def _sweep(self):
+        """Remove temp files left by writers that died mid-commit"""
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for path in self.directory.glob("*.tmp"):
+            try:
+                # Recent ones may belong to another process that is still writing
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def _scan(self) -> List[Tuple[float, Path, int]]:
+        """(mtime, path, size) of every entry on disk, least recently used first"""
+        files = []
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue   # Evicted by another process
+            files.append((stat.st_mtime, path, stat.st_size))
+        files.sort()
+        return files
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            return self._path(key).stat().st_size > _HEADER.size
+        except OSError:
+            return False
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, _, size in self._scan())
+
+    def frames(self, key: str, frame_ms: int = FRAME_MS) -> Optional[Iterator[CachedFrame]]:
+        """
+        Stream a cached entry as fixed-length frames.
+
+        Returns None on a miss. Empty, truncated or corrupt entries are
+        deleted and count as misses, so playback never starts on one.
+        """
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            mapped = self._map(f)
+        except (OSError, ValueError):
+            mapped = None
+        if mapped is None:
+            f.close()
+            logger.warning(f"Discarding corrupt audio cache entry {key}")
+            self._discard(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return self._iter_frames(f, *mapped, frame_ms)
+
+    def _map(self, f) -> Optional[tuple]:
+        """(mmap, channels, sample_rate, total samples per channel), or None if the entry is unusable"""
+        size = os.fstat(f.fileno()).st_size
+        if size <= _HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, channels, sample_rate, total = _HEADER.unpack_from(mm, 0)
+        if (
+            magic != _MAGIC or version != _VERSION or not channels or not sample_rate or not total
+            or size < _HEADER.size + total * channels * _SAMPLE_WIDTH
+        ):
+            mm.close()
+            return None
+        return mm, channels, sample_rate, total
+
+    def _iter_frames(self, f, mm, channels: int, sample_rate: int, total: int, frame_ms: int) -> Iterator[CachedFrame]:
+        with f, mm:
+            samples_per_frame = max(1, sample_rate * frame_ms // 1000)
+            stride = samples_per_frame * channels * _SAMPLE_WIDTH
+            end = _HEADER.size + total * channels * _SAMPLE_WIDTH
+            offset = _HEADER.size
+            while offset < end:
+                chunk = mm[offset:min(offset + stride, end)]
+                offset += len(chunk)
+                yield CachedFrame(
+                    data=chunk,
+                    sample_rate=sample_rate,
+                    num_channels=channels,
+                    samples_per_channel=len(chunk) // (channels * _SAMPLE_WIDTH),
+                )
+
+    def writer(self, key: str, sample_rate: int, num_channels: int) -> "AudioCacheWriter":
+        """Start recording a new entry; call commit() when synthesis completes"""
+        return AudioCacheWriter(self, key, sample_rate, num_channels)
+
+    def _store(self, key: str, tmp_path: str):
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _discard(self, path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Delete least recently used entries - whichever process wrote them - until under max_bytes"""
+        files = self._scan()
+        total = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if total <= self.max_bytes:
+                break
+            self._discard(path)
+            total -= size
+            logger.debug(f"Evicted audio cache entry {path.stem}")
+
+
+class AudioCacheWriter:
+    """Accumulates PCM frames for one entry and writes it atomically"""
+
+    def __init__(self, cache: AudioCache, key: str, sample_rate: int, num_channels: int):
+        self.cache = cache
+        self.key = key
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self._chunks = []
+        self._bytes = 0
+
+    def append(self, data: bytes):
+        """Add interleaved int16 PCM"""
+        self._chunks.append(bytes(data))
+        self._bytes += len(data)
+
+    def commit(self):
+        """Write the entry to disk (blocking - run off the event loop)"""
+        if not self._bytes:
+            return
+        total = self._bytes // (self.num_channels * _SAMPLE_WIDTH)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, self.num_channels, self.sample_rate, total))
+                for chunk in self._chunks:
+                    f.write(chunk)
+            self.cache._store(self.key, tmp_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        finally:
+            self._chunks.clear()
@@ -0,0 +1,157 @@
+"""
+Benchmark: process RSS against concurrent sessions, unbounded vs budgeted speech buffers
+Each session receives user speech as 20 ms frames of 16 kHz int16 audio.
+Most utterances are a few seconds long, but --long-share of them run on
+for 20-90 s (a monologue, or background noise holding VAD open); raise it
+to model a burst of noisy rooms. Each utterance is
+buffered until it ends, then handed on as one contiguous block (to STT).
+
+    unbounded  frames kept as a growing list per session up to 60 s, joined
+               into a new block at the end of the utterance
+    budgeted   one preallocated AudioRing per session, sized by AudioBudget
+               leases, copied into a shared block at the end of the utterance;
+               rooms beyond what the budget admits are declined
+
+Every configuration runs in a fresh process. Reports rooms admitted, the
+peak RSS above the post-import baseline, bytes buffered at the worst
+moment, bytes reserved by leases and how much speech the caps cut off.
+
+Usage:
+    python benchmarks/bench_audio_memory.py [--sessions 8,16,32,64] [--seconds 120] [--budget-mb 32] [--long-share 0.03]
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from audio_buffer import SPEECH_BYTES_PER_SECOND, AudioBudget, AudioRing  # noqa: E402
+from provider_plugins import rss_bytes  # noqa: E402
+
+FRAME = 0.02
+FRAME_BYTES = int(SPEECH_BYTES_PER_SECOND * FRAME)
+UNBOUNDED_SECONDS = 60.0   # The VAD setting before the budget
+
+
+def peak_rss() -> int:
+    try:
+        import resource
+    except ImportError:
+        return rss_bytes()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def utterances(rng, seconds, long_share):
+    """(start, length) of one session's utterances over the run"""
+    t = rng.uniform(0, 3)
+    while t < seconds:
+        length = rng.uniform(20, 90) if rng.random() < long_share else rng.lognormvariate(1.3, 0.5)
+        yield t, length
+        t += length + rng.uniform(2, 8)   # The agent replies
+
+
+def child(mode, sessions, seconds, budget_mb, session_seconds, long_share, seed):
+    baseline = rss_bytes()
+    budget = AudioBudget(int(budget_mb * 2**20), session_seconds=session_seconds)
+    if mode == "budgeted":
+        leases = []
+        while len(leases) < sessions and budget.can_admit():
+            leases.append(budget.lease(f"room-{len(leases)}", f"job-{len(leases)}"))
+        sessions = len(leases)
+        rings = [AudioRing(lease.speech_bytes // 2, dtype=np.int16) for lease in leases]
+        block = np.empty(max(ring.capacity for ring in rings), dtype=np.int16)   # Shared hand-off block
+    else:
+        buffers = [[] for _ in range(sessions)]
+    plans = [list(utterances(random.Random(f"{seed}:{i}"), seconds, long_share)) for i in range(sessions)]
+    cursor = [0] * sessions
+    buffered = worst = 0
+    spoken = clipped = 0.0
+    noise = bytearray(np.random.default_rng(seed).integers(-3000, 3000, FRAME_BYTES // 2, dtype=np.int16).tobytes())
+
+    for step in range(int(seconds / FRAME)):
+        t = step * FRAME
+        for i, plan in enumerate(plans):
+            if cursor[i] >= len(plan):
+                continue
+            start, length = plan[cursor[i]]
+            if t < start:
+                continue
+            if t < start + length:
+                frame = bytes(noise)   # A fresh frame from the network, as rtc delivers them
+                spoken += FRAME
+                if mode == "budgeted":
+                    ring = rings[i]
+                    if not ring.free:
+                        clipped += FRAME
+                    else:
+                        buffered += FRAME_BYTES
+                    ring.write(np.frombuffer(frame, dtype=np.int16))
+                else:
+                    if len(buffers[i]) * FRAME < UNBOUNDED_SECONDS:
+                        buffers[i].append(frame)
+                        buffered += FRAME_BYTES
+                    else:
+                        clipped += FRAME
+                continue
+            # End of the utterance: hand the speech on as one block
+            if mode == "budgeted":
+                ring = rings[i]
+                buffered -= len(ring) * 2
+                ring.read_into(block[:len(ring)])
+            else:
+                speech = b"".join(buffers[i])
+                buffered -= len(speech)
+                buffers[i] = []
+                del speech
+            cursor[i] += 1
+        worst = max(worst, buffered)
+
+    return {
+        "admitted": sessions,
+        "peak": peak_rss() - baseline,
+        "worst": worst,
+        "reserved": budget.used if mode == "budgeted" else 0,
+        "clipped": clipped / max(spoken, 1e-9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", default="8,16,32,64")
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--budget-mb", type=float, default=32)
+    parser.add_argument("--session-seconds", type=float, default=30, help="speech buffer a session asks for")
+    parser.add_argument("--long-share", type=float, default=0.03, help="share of 20-90 s utterances")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SESSIONS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, sessions = args.child
+        print(json.dumps(child(mode, int(sessions), args.seconds, args.budget_mb, args.session_seconds, args.long_share, args.seed)))
+        return
+
+    print(f"{'sessions':>8s} {'mode':9s} {'admitted':>8s} {'peak rss':>9s} {'buffered':>9s} {'reserved':>9s} {'clipped':>8s}")
+    for sessions in (int(n) for n in args.sessions.split(",")):
+        for mode in ("unbounded", "budgeted"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(sessions), "--seconds", str(args.seconds),
+                 "--budget-mb", str(args.budget_mb), "--session-seconds", str(args.session_seconds),
+                 "--long-share", str(args.long_share), "--seed", str(args.seed)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            r = json.loads(out)
+            reserved = f"{r['reserved'] / 2**20:7.1f}MB" if mode == "budgeted" else f"{'-':>9s}"
+            print(f"{sessions:8d} {mode:9s} {r['admitted']:8d} {r['peak'] / 2**20:7.1f}MB {r['worst'] / 2**20:7.1f}MB "
+                  f"{reserved} {r['clipped']:7.1%}")
+
+
+if __name__ == "__main__":
+    main()
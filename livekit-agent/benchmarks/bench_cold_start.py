@@ -0,0 +1,100 @@
+"""
+Benchmark: worker time-to-ready, lazy vs eager provider plugins
+Starts fresh Python processes that import agent.py and build the
+VoiceAIAgent - what every worker and forkserver pays before it can take
+a job - for several API-key setups. "lazy" imports only the plugins the
+keys select (the agent's behaviour); "eager" also imports every installed
+plugin, as the old module-level imports did.
+
+Reports spawn-to-ready time (median and max over --runs), process RSS when
+ready, how many of the agent's own modules were imported and which plugins
+were loaded. With --max-ready-ms the run fails
+(exit 1) if a lazy median goes over budget, for use as a regression check.
+
+Needs the agent's real dependencies (livekit-agents and its plugins).
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--modes lazy,eager] [--max-ready-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# API keys per setup; every other key is set empty so a local .env can't add providers
+KEYS = ("DEEPGRAM_API_KEY", "OPENAI_API_KEY", "ELEVENLABS_API_KEY", "GEMINI_API_KEY")
+SETUPS = {
+    "fake": {"FAKE_PROVIDERS": "1"},
+    "openai": {"DEEPGRAM_API_KEY": "x", "OPENAI_API_KEY": "x"},
+    "failover": {"DEEPGRAM_API_KEY": "x", "OPENAI_API_KEY": "x", "ELEVENLABS_API_KEY": "x", "PROVIDER_FAILOVER": "1"},
+    "gemini-live": {"GEMINI_API_KEY": "x"},
+}
+
+PROBE = """
+import json, sys
+sys.path.insert(0, {root!r})
+import agent
+from provider_plugins import plugins, rss_bytes
+worker = agent.VoiceAIAgent()
+if {eager}:
+    plugins.load_all([name for name in plugins.modules if plugins.available(name)])
+own = sorted(name for name, module in list(sys.modules.items())
+             if (getattr(module, "__file__", None) or "").startswith({root!r}))
+print("READY " + json.dumps({{"rss": rss_bytes(), "plugins": plugins.loaded(), "modules": own}}), flush=True)
+"""
+
+
+def start_worker(setup, eager):
+    env = dict(os.environ, FAKE_PROVIDERS="", PIPELINE_MODE="auto", METRICS_PORT="0")
+    env.update({key: "" for key in KEYS})
+    env.update(SETUPS[setup])
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", PROBE.format(root=str(ROOT), eager=eager)],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    for line in proc.stdout:
+        if line.startswith("READY "):
+            ready = time.perf_counter() - started
+            proc.wait()
+            # The journal's writer thread shares stdout and may finish the line
+            return ready, json.JSONDecoder().raw_decode(line[6:])[0]
+    proc.wait()
+    raise RuntimeError(f"{setup}: worker never became ready\n{proc.stderr.read()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--setups", default=",".join(SETUPS))
+    parser.add_argument("--modes", default="lazy,eager")
+    parser.add_argument("--max-ready-ms", type=float, default=0, help="fail if a lazy median is slower (0 = report only)")
+    args = parser.parse_args()
+
+    start_worker("fake", False)   # Warm the OS file cache so the first setup isn't penalized
+    over = []
+    print(f"{'setup':12s} {'mode':5s} {'ready p50':>9s} {'max':>7s} {'rss':>8s} {'modules':>7s}  plugins")
+    for setup in args.setups.split(","):
+        for mode in args.modes.split(","):
+            runs = [start_worker(setup, mode == "eager") for _ in range(args.runs)]
+            times = [ready for ready, _ in runs]
+            info = runs[-1][1]
+            median = statistics.median(times) * 1000
+            print(f"{setup:12s} {mode:5s} {median:7.0f}ms {max(times) * 1000:5.0f}ms "
+                  f"{info['rss'] / 2**20:6.1f}MB {len(info['modules']):7d}  {', '.join(info['plugins']) or '-'}")
+            if mode == "lazy" and args.max_ready_ms and median > args.max_ready_ms:
+                over.append(f"{setup} {median:.0f}ms")
+    if over:
+        print(f"✗ time-to-ready over {args.max_ready_ms:.0f}ms: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: per-turn prompt size and LLM latency, full history vs token budget
+Plays a long synthetic companion session (user lines and replies from the
+fake provider profile) and, every turn, builds the prompt both ways:
+
+    full history   system prompt + every message so far (what the agent sent)
+    budgeted       ConversationContext: system prompt + rolling summary +
+                   recent turns, summaries written in the background by a
+                   fake summarizer with LLM-like latency
+
+Time to first token is modelled as the profile's TTFT plus a prefill cost
+per 1k prompt tokens. Also reports the CPU spent selecting the context on
+the turn's critical path and the tokens the summaries themselves cost.
+
+Usage:
+    python benchmarks/bench_context_budget.py [--turns 200] [--budget 3000]
+        [--prefill-ms-per-1k 50] [--time-scale 0.01]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from context_budget import ContextBudget, ContextStats, ConversationContext, Turn, count_tokens  # noqa: E402
+from load_profile import Distribution, FakeProviderProfile  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+CHECKPOINTS = (1, 10, 25, 50, 100, 150, 200)
+
+
+def fake_summarizer(profile, args, spent):
+    """Keeps the opening words of each turn - the size and timing of a summary, not its quality"""
+    latency = Distribution(900, 200, 300)
+    rng = profile.rng("summarizer")
+
+    async def summarize(previous, turns, max_tokens):
+        prompt = count_tokens(previous) + sum(count_tokens(t.text) for t in turns) + 80
+        spent.append(prompt)
+        await asyncio.sleep((latency.sample(rng) + args.prefill_ms_per_1k * prompt / 1e6 * 1000) * args.time_scale)
+        notes = [" ".join(t.text.split()[:6]) for t in turns]
+        return " ".join([previous] + notes)[-max_tokens * 4:]
+
+    return summarize
+
+
+async def session(args):
+    profile = FakeProviderProfile(seed=args.seed, user_words=(6, 25), reply_words=(20, 60))
+    rng = profile.rng("session")
+    system = Turn("system", "system", " ".join(profile.utterance(rng) for _ in range(args.system_words // 10)))
+    spent = []
+    stats = ContextStats()
+    context = ConversationContext(
+        ContextBudget.for_personality({}, args.budget), fake_summarizer(profile, args, spent), stats
+    )
+
+    items = [system]
+    rows = []
+    for turn in range(1, args.turns + 1):
+        user = profile.utterance(rng)
+        items.append(Turn(f"user-{turn}", "user", user))
+
+        full = sum(context.tokens(t) for t in items)
+        started = time.perf_counter()
+        pinned, summary, recent = context.select(items)
+        select_us = (time.perf_counter() - started) * 1e6
+        budgeted = sum(context.tokens(t) for t in pinned + recent) + (count_tokens(summary) + 4 if summary else 0)
+
+        ttft = profile.llm_ttft.sample(rng) * 1000
+        rows.append({
+            "turn": turn,
+            "full": full,
+            "budgeted": budgeted,
+            "full_ttft": ttft + args.prefill_ms_per_1k * full / 1000,
+            "budgeted_ttft": ttft + args.prefill_ms_per_1k * budgeted / 1000,
+            "select_us": select_us,
+            "dropped": sum(1 for t in items[1:] if t not in recent and t.id not in context._summarized),
+        })
+
+        reply = "".join(profile.reply_tokens(rng))
+        items.append(Turn(f"agent-{turn}", "assistant", reply))
+        # The user listens to the reply and answers; background summaries run meanwhile
+        await asyncio.sleep((profile.speech_seconds(reply) + profile.speech_seconds(user)) * args.time_scale)
+
+    context.aclose()
+    return rows, spent, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=3000, help="prompt budget in tokens")
+    parser.add_argument("--system-words", type=int, default=250, help="length of the system prompt")
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=50, help="TTFT added per 1k prompt tokens")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="speed up conversation time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, spent, stats = asyncio.run(session(args))
+
+    print(f"{'turn':>5s} {'full tokens':>12s} {'budgeted':>9s} {'full TTFT':>10s} {'budgeted TTFT':>14s}")
+    for row in rows:
+        if row["turn"] in CHECKPOINTS or row["turn"] == len(rows):
+            print(f"{row['turn']:5d} {row['full']:12d} {row['budgeted']:9d} "
+                  f"{row['full_ttft']:8.0f}ms {row['budgeted_ttft']:12.0f}ms")
+
+    for name in ("full", "budgeted"):
+        ttfts = sorted(row[f"{name}_ttft"] for row in rows)
+        total = sum(row[name] for row in rows)
+        extra = sum(spent) if name == "budgeted" else 0
+        print(f"{name:9s} prompt tokens total={total + extra:8d} (summaries {extra}) | "
+              f"TTFT p50={statistics.median(ttfts):5.0f}ms p95={quantile(ttfts, 0.95):5.0f}ms max={ttfts[-1]:5.0f}ms")
+    selects = sorted(row["select_us"] for row in rows)
+    print(f"summaries={stats.summaries} failed={stats.summary_failures} | select() on the critical path "
+          f"p50={statistics.median(selects):.0f}µs p95={quantile(selects, 0.95):.0f}µs | "
+          f"turns missing from a prompt (summary not ready) max={max(row['dropped'] for row in rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: per-session DataPublisher vs fire-and-forget publish tasks
+Drives bursts of speaking-state flips and emotion updates (barge-ins, tag
+plus classifier emotions) at a participant whose publish_data takes a
+round trip, and reports messages and bytes on the wire, peak in-flight
+publishes and how long after the burst the client holds the final state.
+
+Usage:
+    python benchmarks/bench_data_publisher.py [--sessions 50] [--bursts 20] [--rtt-ms 30]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_publisher import DataPublisher, PublisherStats, decode, encode_json  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+
+class SlowParticipant:
+    """Reliable publishes complete one round trip later, in order"""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.received = []
+        self.bytes = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def publish_data(self, payload, reliable=True):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.rtt)
+        self.in_flight -= 1
+        self.bytes += len(payload)
+        self.received.append((asyncio.get_running_loop().time(), decode(payload)))
+
+
+def burst(rng):
+    """One turn's worth of updates, with a barge-in flap now and then"""
+    events = [("state", {"isSpeaking": True})]
+    events += [("emotion", {"emotion": rng.choice(["happy", "calm", "thoughtful"]), "timestamp": 0.0})
+               for _ in range(rng.randint(1, 3))]
+    for _ in range(rng.choice([0, 0, 1, 2])):
+        events += [("state", {"isSpeaking": False}), ("state", {"isSpeaking": True})]
+    events.append(("state", {"isSpeaking": False}))
+    return events
+
+
+async def session(strategy, rng, args):
+    participant = SlowParticipant(args.rtt_ms / 1000)
+    publisher = None
+    if strategy != "fire-and-forget":
+        publisher = DataPublisher(lambda: participant, PublisherStats(), binary=strategy == "binary")
+    loop = asyncio.get_running_loop()
+    staleness = []
+    for _ in range(args.bursts):
+        for kind, fields in burst(rng):
+            if publisher is None:
+                # The old pattern: an unreferenced task per message
+                asyncio.create_task(participant.publish_data(encode_json(kind, fields), reliable=True))
+            else:
+                publisher.publish(kind, **fields)
+            await asyncio.sleep(rng.uniform(0, 0.01))
+        done = loop.time()
+        while participant.in_flight or (publisher and publisher.depth):
+            await asyncio.sleep(0.005)
+        last_state = max(t for t, m in participant.received if m["type"] == "state")
+        staleness.append(max(0.0, last_state - done))
+        await asyncio.sleep(rng.uniform(0.05, 0.2))
+    if publisher is not None:
+        await publisher.aclose()
+    return participant, staleness
+
+
+async def run(strategy, args):
+    rng = random.Random(args.seed)
+    seeds = [rng.random() for _ in range(args.sessions)]
+    return await asyncio.gather(*(session(strategy, random.Random(s), args) for s in seeds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for strategy in ("fire-and-forget", "json", "binary"):
+        results = asyncio.run(run(strategy, args))
+        messages = sum(len(p.received) for p, _ in results) / len(results)
+        size = sum(p.bytes for p, _ in results) / max(1, sum(len(p.received) for p, _ in results))
+        peak = max(p.peak for p, _ in results)
+        stale = sorted(s * 1000 for _, staleness in results for s in staleness)
+        print(
+            f"{strategy:16s} messages/session={messages:6.1f} bytes/message={size:5.1f} "
+            f"peak in flight={peak:3d} | final state after burst p50={statistics.median(stale):5.0f}ms "
+            f"p95={quantile(stale, 0.95):5.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
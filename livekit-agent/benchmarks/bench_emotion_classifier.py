@@ -0,0 +1,101 @@
+"""
+Benchmark: compiled emotion classifier vs the old per-call keyword scan
+Classifies long agent responses (several paragraphs built from the fake
+reply generator plus emotion words), long responses without any keyword
+and short sentences with both implementations, and reports microseconds
+per call plus whole-transcript batch and rolling-window throughput of the
+new classifier. The old scan returns at the first substring hit, so it is
+cheap whenever an early-table keyword (or a word containing one, like
+"lovely") appears, and scans all ~60 keywords otherwise; the classifier
+always scores every emotion.
+
+Usage:
+    python benchmarks/bench_emotion_classifier.py [--responses 500] [--words 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emotion_classifier import EMOTION_KEYWORDS, classifier  # noqa: E402
+from load_profile import FakeProviderProfile  # noqa: E402
+
+
+def legacy_detect_emotion(text: str) -> str:
+    """VoiceAIAgent.detect_emotion before the compiled classifier"""
+    text = text.lower()
+    keywords = {
+        "happy": ["happy", "joy", "glad", "excited", "great", "awesome", "wonderful", "love", "perfect", "amazing", "haha", "yay"],
+        "sad": ["sad", "unhappy", "depressed", "sorry", "down", "miserable", "terrible", "bad", "hurt", "crying"],
+        "angry": ["angry", "mad", "furious", "annoyed", "frustrated", "pissed", "hate", "stupid"],
+        "stressed": ["stressed", "anxious", "worried", "nervous", "busy", "deadline", "scared"],
+        "calm": ["calm", "chill", "relax", "peace", "fine", "okay", "alright"],
+        "love": ["love", "adore", "miss you", "hug", "kiss", "babe", "honey", "darling"],
+        "concerned": ["careful", "watch out", "worried about", "are you okay", "safe"],
+        "thoughtful": ["hmm", "interesting", "maybe", "think", "consider", "let's see"]
+    }
+
+    for emotion, words in keywords.items():
+        if any(word in text for word in words):
+            return emotion
+
+    return "neutral"
+
+
+def responses(count, words, seed=0):
+    """Long replies: filler sentences with a few emotion words sprinkled in"""
+    profile = FakeProviderProfile(seed=seed, reply_words=(words, words))
+    rng = random.Random(seed)
+    keywords = [word for group in EMOTION_KEYWORDS.values() for word in group]
+    result = []
+    for i in range(count):
+        text = "".join(profile.reply_tokens(profile.rng(f"bench:{i}")))
+        # Emotion words late in the text are the legacy scan's worst case
+        extra = " ".join(rng.choice(keywords) for _ in range(rng.randint(0, 3)))
+        result.append(f"{text} {extra}")
+    return result
+
+
+def time_per_call(fn, texts, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--responses", type=int, default=500)
+    parser.add_argument("--words", type=int, default=300, help="words per response")
+    args = parser.parse_args()
+
+    texts = responses(args.responses, args.words)
+    plain = ["The quarterly report covers revenue, logistics and staffing in the northern region. " * (args.words // 12)]
+    short = ["That sounds lovely, tell me more about it!", "I'm a bit worried about tomorrow.", "Okay."]
+    for label, sample in (("long replies", texts), ("long, no keyword", plain * 50), ("short sentences", short * 500)):
+        chars = sum(map(len, sample)) / len(sample)
+        legacy = time_per_call(legacy_detect_emotion, sample)
+        compiled = time_per_call(classifier.classify, sample)
+        agree = sum(legacy_detect_emotion(t) == classifier.classify(t) for t in sample) / len(sample)
+        print(f"{label:17s} ({chars:5.0f} chars)  legacy {legacy:6.1f} µs  classifier {compiled:6.1f} µs  "
+              f"({legacy / compiled:4.1f}x)  same label {agree:4.0%}")
+
+    start = time.perf_counter()
+    classifier.classify_batch(texts)
+    batch = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in classifier.rolling(texts, window=5):
+        pass
+    rolling = time.perf_counter() - start
+    print(f"batch of {len(texts)} replies: {batch * 1000:.1f} ms, rolling window of 5: {rolling * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Benchmark: barge-in latency and wasted work, framework-only vs fast path
+Plays agent replies (fake LLM tokens -> TTS faster than realtime -> paced
+playout with a small output queue) and has the user talk over each one at
+a random point. Most barge-ins are real (interim transcript words arrive
+at the speaking rate after an STT lag); the rest are a single "mm-hm"
+that should not stop the agent.
+
+    framework  BargeIn(fast=False): the agent keeps talking until the
+               transcript has min_words, then everything is cancelled
+    fast       BargeIn(fast=True): playout pauses at VAD onset, the LLM/
+               text/TTS work is cancelled on min_words, a lone "mm-hm"
+               resumes after the resume delay
+
+Reports user speech start -> agent silent (VAD detection and the output
+queue included), the same from VAD onset as the worker's metric sees it,
+LLM tokens and TTS audio-seconds wasted per interruption, and what false
+alarms cost (time the agent was paused for nothing).
+
+Usage:
+    python benchmarks/bench_interruption.py [--trials 300] [--false-alarms 0.25] [--resume-ms 800]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from interruption import BargeIn, InterruptionStats  # noqa: E402
+from load_profile import FakeProviderProfile  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+TICK = 0.02
+VAD_ONSET = 0.1        # Speech -> VAD onset (min_speech_duration in create_assistant)
+VAD_SILENCE = 0.5      # Speech end -> VAD end (min_silence_duration)
+STT_LAG = 0.3          # Audio -> interim transcript containing it
+OUTPUT_QUEUE = 0.06    # Audio already handed to the room when playout pauses or stops
+CHARS_PER_WORD = 6     # Reply tokens are a few characters each
+
+
+class Playout:
+    """Agent audio output: a buffer filled by TTS and drained in real time"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.buffered = 0.0
+        self.paused = False
+        self.paused_for = 0.0
+        self.stopped = False
+        self.silent_at = None     # When the last audible sample left after a barge-in
+
+    def pause(self):
+        self.paused = True
+        self.silent_at = self.loop.time() + OUTPUT_QUEUE
+        return True
+
+    def resume(self):
+        self.paused = False
+        self.silent_at = None
+
+
+async def trial(index, fast, profile, args, stats, results):
+    loop = asyncio.get_running_loop()
+    rng = profile.rng(f"trial:{index}")
+    await asyncio.sleep(rng.uniform(0, 2))
+    out = Playout(loop)
+    tasks = []
+    generated = [0]
+
+    def interrupt():
+        out.stopped = True
+        if out.silent_at is None:
+            out.silent_at = loop.time() + OUTPUT_QUEUE
+        for task in tasks:
+            task.cancel()
+
+    barge_in = BargeIn(out.pause, out.resume, interrupt, stats, fast=fast, resume_after=args.resume_ms / 1000)
+    speaking = asyncio.Event()
+    done = asyncio.Event()
+
+    reply = barge_in.reply()
+    tokens = profile.reply_tokens(rng)
+    ttft = profile.llm_ttft.sample(rng)
+
+    async def llm():
+        await asyncio.sleep(ttft)
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(1 / profile.llm_tokens_per_sec)
+            generated[0] += 1
+            yield token
+
+    async def speak():
+        # TTS turns received text into audio at tts_realtime_factor; playout drains it
+        unsynthesized = [0.0]
+        text_done = asyncio.Event()
+
+        async def read_text():
+            async for token in barge_in.guard(reply, llm()):
+                unsynthesized[0] += len(token) / CHARS_PER_WORD / profile.words_per_second
+            text_done.set()
+
+        reader = asyncio.create_task(read_text())
+        tasks.append(reader)
+        try:
+            await asyncio.sleep(ttft + profile.tts_first_audio.sample(rng))
+            while True:
+                made = min(unsynthesized[0], TICK * profile.tts_realtime_factor)
+                unsynthesized[0] -= made
+                barge_in.audio(made)
+                out.buffered += made
+                if out.buffered > 0 and not out.paused:
+                    if not speaking.is_set():
+                        speaking.set()
+                        barge_in.speaking_started()
+                    out.buffered = max(0.0, out.buffered - TICK)
+                elif out.paused:
+                    out.paused_for += TICK
+                if text_done.is_set() and unsynthesized[0] <= 0 and out.buffered <= 0:
+                    break
+                await asyncio.sleep(TICK)
+        finally:
+            reader.cancel()
+            barge_in.speaking_stopped()
+            done.set()
+
+    async def user():
+        await speaking.wait()
+        await asyncio.sleep(rng.uniform(0.3, 2.5))
+        if done.is_set():
+            return None
+        start = loop.time()
+        real = rng.random() >= args.false_alarms
+        words = rng.randint(3, 8) if real else 1
+        speech = words / profile.words_per_second
+        await asyncio.sleep(VAD_ONSET)
+        barge_in.vad_start()
+        for k in range(1, words + 1):
+            await asyncio.sleep(max(0.0, start + STT_LAG + k / profile.words_per_second - loop.time()))
+            transcript = " ".join(["word"] * k)
+            barge_in.transcript(transcript)
+            if not fast and k >= barge_in.min_words and not out.stopped:
+                interrupt()   # The framework's own min_words interruption
+        await asyncio.sleep(max(0.0, start + speech + VAD_SILENCE - loop.time()))
+        barge_in.vad_end()
+        return start, real
+
+    speaker = asyncio.create_task(speak())
+    tasks.append(speaker)
+    barged = await user()
+    if barged is not None and not barged[1]:
+        # A false alarm: once playout has resumed, the rest of the reply is of no interest
+        await asyncio.sleep(barge_in.resume_after + 0.1)
+        speaker.cancel()
+    await asyncio.gather(speaker, return_exceptions=True)
+    if barged is None:
+        return
+    start, real = barged
+    if real:
+        results["silence"].append(out.silent_at - start)
+        results["generated"].append(generated[0])
+    else:
+        results["false_paused"].append(out.paused_for)
+        results["false_cut"] += out.stopped
+
+
+async def run(fast, args):
+    profile = FakeProviderProfile(seed=args.seed)
+    stats = InterruptionStats()
+    results = {"silence": [], "generated": [], "false_paused": [], "false_cut": 0}
+    await asyncio.gather(*(trial(i, fast, profile, args, stats, results) for i in range(args.trials)))
+    return stats, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=300)
+    parser.add_argument("--false-alarms", type=float, default=0.25, help="share of barge-ins that are one word")
+    parser.add_argument("--resume-ms", type=float, default=800)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, fast in (("framework", False), ("fast", True)):
+        stats, results = asyncio.run(run(fast, args))
+        silence = sorted(results["silence"])
+        onset = stats.quantiles()
+        interrupted = max(1, stats.outcomes["interrupted"])
+        false_paused = results["false_paused"]
+        print(f"{name:9s} speech->silent p50={statistics.median(silence) * 1000:4.0f}ms "
+              f"p95={quantile(silence, 0.95) * 1000:4.0f}ms | VAD onset->silent p50={onset[0.5] * 1000:4.0f}ms | "
+              f"wasted per interruption: {stats.wasted_tokens / interrupted:4.1f} tokens, "
+              f"{stats.wasted_audio / interrupted:4.2f}s audio")
+        print(f"{'':9s} {stats.outcomes['interrupted']} interruptions, {len(false_paused)} false alarms: "
+              f"{results['false_cut']} cut the reply, paused {statistics.mean(false_paused) if false_paused else 0:.2f}s each")
+
+
+if __name__ == "__main__":
+    main()
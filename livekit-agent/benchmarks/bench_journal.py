@@ -0,0 +1,233 @@
+"""
+Benchmark: event-loop lag under heavy session logging, stdout logging vs journal
+Runs --sessions simulated conversations in one event loop. Each logs what
+a session logs per turn: speech start/stop, the user's and agent's text and
+the emotion tags, plus interim transcripts (10/s while the user talks) at
+DEBUG. Meanwhile a probe task measures how late the loop wakes it up.
+
+    logging   logger.info(f"...") through logging.StreamHandler(sys.stdout),
+              as the session did before the journal
+    journal   SessionJournal events and JournalHandler log lines, written by
+              the journal's thread
+
+Each mode runs in a child process whose stdout is a pipe the parent drains
+at --drain-kbps, standing in for a slow terminal, container log driver or
+shipper. Once the pipe is full, a write blocks whoever makes it: the event
+loop with logging, the journal thread with the journal.
+
+Usage:
+    python benchmarks/bench_journal.py [--sessions 200] [--seconds 10] [--drain-kbps 16] [--level DEBUG]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_journal import (  # noqa: E402
+    AGENT_SPEECH, AGENT_STARTED_SPEAKING, AGENT_STOPPED_SPEAKING, EMOTION, USER_SPEECH,
+    USER_STARTED_SPEAKING, USER_STOPPED_SPEAKING, USER_TRANSCRIPT, Journal, JournalHandler,
+)
+from turn_metrics import quantile  # noqa: E402
+
+PROBE_INTERVAL = 0.005
+INTERIM_INTERVAL = 0.1
+STALL = 0.05
+
+_WORDS = "so I was thinking we could go out later and grab some coffee if you are free tonight".split()
+
+
+class LoggingSession:
+    """The per-event logger calls the session made before the journal"""
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def user_started(self):
+        self.logger.info("🗣️ User started speaking")
+
+    def transcript(self, text, final):
+        self.logger.debug(f"📝 Transcript ({'final' if final else 'interim'}): {text}")
+
+    def user_stopped(self):
+        self.logger.info("🤫 User stopped speaking")
+
+    def user_speech(self, text):
+        self.logger.info(f"💬 User: {text}")
+
+    def emotion(self, emotion):
+        self.logger.info(f"🎭 LLM Emotion Detected: {emotion}")
+
+    def agent_started(self):
+        self.logger.info("🤖 Agent started speaking")
+
+    def agent_stopped(self):
+        self.logger.info("🤖 Agent stopped speaking")
+
+    def agent_speech(self, text):
+        self.logger.info(f"🤖 Agent: {text}")
+
+
+class JournalSession:
+    def __init__(self, journal, room):
+        self.journal = journal.session(room)
+
+    def user_started(self):
+        self.journal.emit(USER_STARTED_SPEAKING)
+
+    def transcript(self, text, final):
+        self.journal.emit(USER_TRANSCRIPT, text, final)
+
+    def user_stopped(self):
+        self.journal.emit(USER_STOPPED_SPEAKING)
+
+    def user_speech(self, text):
+        self.journal.emit(USER_SPEECH, text)
+
+    def emotion(self, emotion):
+        self.journal.emit(EMOTION, emotion, "llm_tag")
+
+    def agent_started(self):
+        self.journal.emit(AGENT_STARTED_SPEAKING)
+
+    def agent_stopped(self):
+        self.journal.emit(AGENT_STOPPED_SPEAKING)
+
+    def agent_speech(self, text):
+        self.journal.emit(AGENT_SPEECH, text)
+
+
+async def conversation(log, rng, until, counts):
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(rng.uniform(0, 2))
+    while loop.time() < until:
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(4, 16))]
+        log.user_started()
+        heard = 0
+        while heard < len(words):
+            await asyncio.sleep(INTERIM_INTERVAL)
+            heard += 1
+            log.transcript(" ".join(words[:heard]), False)
+            counts["interim"] += 1
+        log.user_stopped()
+        await asyncio.sleep(rng.uniform(0.2, 0.4))
+        log.user_speech(" ".join(words))
+        await asyncio.sleep(rng.uniform(0.3, 0.6))
+        log.emotion(rng.choice(("happy", "thoughtful", "excited")))
+        log.agent_started()
+        reply = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(10, 40)))
+        await asyncio.sleep(len(reply.split()) / 2.7)
+        log.agent_stopped()
+        log.agent_speech(reply)
+        counts["turns"] += 1
+        await asyncio.sleep(rng.uniform(0.5, 1.5))
+
+
+async def probe(until, lags):
+    loop = asyncio.get_running_loop()
+    while loop.time() < until:
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - start - PROBE_INTERVAL))
+
+
+async def run(mode, sessions, seconds, level):
+    loop = asyncio.get_running_loop()
+    journal = None
+    if mode == "journal":
+        journal = Journal(level=level)
+        handler = JournalHandler(journal)
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    logging.basicConfig(level=level, handlers=[handler])
+    logger = logging.getLogger("session")
+    counts = {"turns": 0, "interim": 0}
+    lags = []
+    until = loop.time() + seconds
+    logs = [
+        JournalSession(journal, f"room-{i}") if journal is not None else LoggingSession(logger)
+        for i in range(sessions)
+    ]
+    await asyncio.gather(
+        probe(until, lags),
+        *(conversation(log, random.Random(i), until, counts) for i, log in enumerate(logs)),
+    )
+    lags.sort()
+    result = {
+        "lag_p50": quantile(lags, 0.5),
+        "lag_p99": quantile(lags, 0.99),
+        "lag_max": lags[-1] if lags else 0.0,
+        "stalls": sum(lag > STALL for lag in lags),
+        **counts,
+    }
+    if journal is not None:
+        result.update(journal.outcomes, queued=journal._queue.qsize())
+        journal.close(timeout=0.5)
+    return result
+
+
+def drain(proc, kbps):
+    """Read the child's stdout at most kbps KiB/s"""
+    chunk = 4096
+    total = 0
+    started = time.perf_counter()
+    while True:
+        data = proc.stdout.read1(chunk) if hasattr(proc.stdout, "read1") else proc.stdout.read(chunk)
+        if not data:
+            return total
+        total += len(data)
+        if kbps:
+            ahead = total / (kbps * 1024) - (time.perf_counter() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--drain-kbps", type=float, default=16, help="stdout reader speed (0 = unthrottled)")
+    parser.add_argument("--level", default="DEBUG", help="DEBUG logs interim transcripts, INFO only turns")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    level = logging.getLevelName(args.level.upper())
+
+    if args.child:
+        result = asyncio.run(run(args.child, args.sessions, args.seconds, level))
+        print("RESULT " + json.dumps(result), file=sys.stderr, flush=True)
+        return
+
+    print(f"{args.sessions} sessions, {args.seconds:.0f}s, level {args.level.upper()}, "
+          f"stdout drained at {f'{args.drain_kbps:.0f} KiB/s' if args.drain_kbps else 'full speed'}")
+    print(f"{'mode':8s} {'lag p50':>8s} {'p99':>7s} {'max':>7s} {'stalls':>7s} {'turns':>6s} "
+          f"{'stdout':>9s} {'written':>8s} {'sampled':>8s} {'dropped':>8s}")
+    for mode in ("logging", "journal"):
+        proc = subprocess.Popen(
+            [sys.executable, __file__, "--child", mode, "--sessions", str(args.sessions),
+             "--seconds", str(args.seconds), "--level", args.level],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        read = drain(proc, args.drain_kbps)
+        proc.wait()
+        lines = [line for line in proc.stderr.read().decode().splitlines() if line.startswith("RESULT ")]
+        if not lines:
+            raise RuntimeError(f"{mode}: child failed (exit {proc.returncode})")
+        r = json.loads(lines[-1][7:])
+        if mode == "journal":
+            journal = f"{r['written']:8d} {r['sampled']:8d} {r['dropped']:8d}"
+        else:
+            journal = f"{'-':>8s} {'-':>8s} {'-':>8s}"
+        print(f"{mode:8s} {r['lag_p50'] * 1000:6.1f}ms {r['lag_p99'] * 1000:5.0f}ms {r['lag_max'] * 1000:5.0f}ms "
+              f"{r['stalls']:7d} {r['turns']:6d} {read / 1024:7.0f}KB {journal}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark: CPU cost of server-side lip-sync per concurrent session
+Analyzes synthetic voiced speech (harmonics shaped by vowel formants, with
+a syllable envelope) three ways:
+
+    vowels     which viseme wins for steady /a/ /i/ /u/ /o/ /e/ (sanity check)
+    analyzer   CPU per second of audio, batched vs one frame per call, for
+               20 ms chunks and the 200 ms frames livekit's TTS emits
+    sessions   N LipSyncStreams fed faster than realtime and paced out
+               through DataPublisher, as in a worker: CPU share per session
+               and frames delivered vs the nominal rate
+
+Usage:
+    python benchmarks/bench_lipsync.py [--sessions 50] [--seconds 5] [--fps 30]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_publisher import DataPublisher, PublisherStats  # noqa: E402
+from lipsync import VISEMES, LipSyncStream, VisemeAnalyzer  # noqa: E402
+
+SAMPLE_RATE = 24000
+FORMANTS = {"a": (800, 1200), "i": (300, 2300), "u": (300, 800), "o": (500, 900), "e": (450, 1900)}
+
+
+def vowel(name, seconds, f0=140.0, rng=None):
+    """Glottal harmonics weighted by two formant resonances, as int16 samples"""
+    f1, f2 = FORMANTS[name]
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    jitter = 0.0 if rng is None else rng.uniform(-10, 10)
+    signal = np.zeros_like(t)
+    for k in range(1, int(4000 / f0)):
+        f = k * (f0 + jitter)
+        gain = 1 / (1 + ((f - f1) / 120) ** 2) + 0.7 / (1 + ((f - f2) / 150) ** 2)
+        signal += gain / k ** 0.5 * np.sin(2 * np.pi * f * t)
+    return (signal / np.abs(signal).max() * 12000).astype(np.int16)
+
+
+def speech(seconds, seed=0):
+    """Syllables of random vowels at ~4 Hz with short pauses"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    while sum(map(len, parts)) < seconds * SAMPLE_RATE:
+        syllable = vowel(rng.choice(list(FORMANTS)), rng.uniform(0.15, 0.3), rng=rng).astype(np.float32)
+        syllable *= np.hanning(len(syllable))
+        parts += [syllable.astype(np.int16), np.zeros(int(rng.uniform(0.02, 0.1) * SAMPLE_RATE), np.int16)]
+    return np.concatenate(parts)[:int(seconds * SAMPLE_RATE)]
+
+
+def chunks(samples, chunk_ms):
+    size = SAMPLE_RATE * chunk_ms // 1000
+    return [samples[i:i + size].tobytes() for i in range(0, len(samples), size)]
+
+
+def check_vowels(fps):
+    print("vowel  top viseme  level  weights " + " ".join(f"{v:>5s}" for v in VISEMES))
+    for name in FORMANTS:
+        rows = VisemeAnalyzer(SAMPLE_RATE, fps).push(vowel(name, 0.5).tobytes())
+        mean = rows.mean(axis=0)
+        top = VISEMES[int(np.argmax(mean[1:]))]
+        print(f"/{name}/   {top:>10s}  {mean[0]:5.2f}         " + " ".join(f"{w:5.2f}" for w in mean[1:]))
+
+
+def bench_analyzer(samples, fps):
+    seconds = len(samples) / SAMPLE_RATE
+    for chunk_ms in (20, 200):
+        parts = chunks(samples, chunk_ms)
+        analyzer = VisemeAnalyzer(SAMPLE_RATE, fps)
+        start = time.process_time()
+        frames = sum(len(analyzer.push(part)) for part in parts)
+        batched = (time.process_time() - start) / seconds
+
+        # The same work one frame per call, as a per-frame audio callback would do it
+        analyzer = VisemeAnalyzer(SAMPLE_RATE, fps)
+        window = samples.astype(np.float32)[:frames * analyzer.window] / 32768.0
+        start = time.process_time()
+        for row in window.reshape(frames, analyzer.window):
+            analyzer.analyze(row[None, :])
+        single = (time.process_time() - start) / seconds
+        print(f"analyzer {chunk_ms:3d} ms chunks: {frames / seconds:4.1f} frames/s, "
+              f"batched {batched * 1e6:6.0f} µs CPU per audio second "
+              f"({1 / batched:6.0f} sessions/core), one frame per call {single * 1e6:6.0f} µs")
+
+
+class CountingParticipant:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def publish_data(self, payload, reliable=True):
+        self.frames += 1
+        self.bytes += len(payload)
+
+
+async def session(samples, fps, realtime_factor):
+    participant = CountingParticipant()
+    publisher = DataPublisher(lambda: participant, PublisherStats(), binary=True, max_queue=64)
+    lipsync = LipSyncStream(
+        lambda seq, offset_ms, levels: publisher.publish("viseme", seq=seq, offset_ms=offset_ms, levels=levels),
+        frame_rate=fps,
+    )
+    # TTS delivers 200 ms frames faster than realtime; playout paces the visemes
+    for part in chunks(samples, 200):
+        lipsync.push(part, SAMPLE_RATE)
+        await asyncio.sleep(0.2 / realtime_factor)
+    await asyncio.sleep(len(samples) / SAMPLE_RATE + 0.2)
+    lipsync.aclose()
+    await publisher.aclose()
+    return participant
+
+
+async def bench_sessions(samples, args):
+    seconds = len(samples) / SAMPLE_RATE
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    results = await asyncio.gather(*(session(samples, args.fps, 4.0) for _ in range(args.sessions)))
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    expected = int(seconds * args.fps)
+    delivered = sum(p.frames for p in results) / len(results)
+    rate = sum(p.bytes for p in results) / len(results) / seconds
+    print(f"{args.sessions} sessions x {args.seconds:.0f} s: {cpu / wall:5.1%} of a core in total, "
+          f"{cpu / wall / args.sessions:6.2%} per session | frames {delivered:.0f}/{expected} per session, "
+          f"{rate:.0f} B/s on the data channel")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--fps", type=int, default=30)
+    args = parser.parse_args()
+
+    check_vowels(args.fps)
+    bench_analyzer(speech(60), args.fps)
+    asyncio.run(bench_sessions(speech(args.seconds, seed=1), args))
+
+
+if __name__ == "__main__":
+    main()
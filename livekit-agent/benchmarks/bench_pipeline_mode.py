@@ -0,0 +1,151 @@
+"""
+Benchmark: realtime vs cascaded pipeline, turn latency and per-session memory
+Builds sessions with local fake providers according to plan_pipeline() and
+runs simulated turns. Fake latencies and buffer sizes are parameters so they
+can be matched to measured numbers for the real providers.
+
+Usage:
+    python benchmarks/bench_pipeline_mode.py [--sessions 50] [--turns 200]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline_plan import plan_pipeline  # noqa: E402
+
+
+class FakeSTT:
+    """Streaming STT: keeps an input audio buffer and a socket receive buffer"""
+
+    def __init__(self, final_ms, buffer_kb):
+        self.final_ms = final_ms
+        self.audio = bytearray(buffer_kb * 1024)
+        self.socket = bytearray(64 * 1024)
+
+    async def final_transcript(self):
+        await asyncio.sleep(random.gauss(self.final_ms, self.final_ms * 0.15) / 1000)
+        return "what's the weather like today"
+
+
+class FakeLLM:
+    def __init__(self, ttft_ms):
+        self.ttft_ms = ttft_ms
+
+    async def first_token(self):
+        await asyncio.sleep(random.gauss(self.ttft_ms, self.ttft_ms * 0.2) / 1000)
+        return "It"
+
+
+class FakeTTS:
+    """Streaming TTS: keeps an output audio buffer and a socket receive buffer"""
+
+    def __init__(self, first_audio_ms, buffer_kb):
+        self.first_audio_ms = first_audio_ms
+        self.audio = bytearray(buffer_kb * 1024)
+        self.socket = bytearray(64 * 1024)
+
+    async def first_audio(self, text):
+        await asyncio.sleep(random.gauss(self.first_audio_ms, self.first_audio_ms * 0.2) / 1000)
+
+
+class FakeRealtime:
+    """Speech-to-speech model: one socket, audio buffers in both directions"""
+
+    def __init__(self, first_audio_ms, buffer_kb):
+        self.first_audio_ms = first_audio_ms
+        self.audio_in = bytearray(buffer_kb * 1024)
+        self.audio_out = bytearray(buffer_kb * 1024)
+        self.socket = bytearray(64 * 1024)
+
+    async def first_audio(self):
+        await asyncio.sleep(random.gauss(self.first_audio_ms, self.first_audio_ms * 0.2) / 1000)
+
+
+def build_session(plan, args, legacy=False):
+    """What build_providers would construct for this plan"""
+    if plan.realtime and legacy:
+        # Before the planner: STT and TTS were built even though unused
+        return {
+            "stt": FakeSTT(args.stt_ms, args.buffer_kb),
+            "llm": FakeRealtime(args.realtime_ms, args.buffer_kb),
+            "tts": FakeTTS(args.tts_ms, args.buffer_kb),
+        }
+    if plan.realtime:
+        return {"llm": FakeRealtime(args.realtime_ms, args.buffer_kb)}
+    return {
+        "stt": FakeSTT(args.stt_ms, args.buffer_kb) if plan.needs_stt else None,
+        "llm": FakeLLM(args.llm_ms),
+        "tts": FakeTTS(args.tts_ms, args.buffer_kb) if plan.needs_tts else None,
+    }
+
+
+async def turn(session) -> float:
+    """End of user speech -> first agent audio"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    llm = session["llm"]
+    if isinstance(llm, FakeRealtime):
+        await llm.first_audio()
+    else:
+        await session["stt"].final_transcript()
+        token = await llm.first_token()
+        await session["tts"].first_audio(token)
+    return (loop.time() - start) * 1000
+
+
+def measure_memory(plan, args, legacy=False) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build_session(plan, args, legacy) for _ in range(args.sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / args.sessions / 1024
+
+
+async def measure_latency(plan, args):
+    sessions = [build_session(plan, args) for _ in range(args.sessions)]
+    per_session = max(1, args.turns // args.sessions)
+    results = await asyncio.gather(*(
+        turn(sessions[i % len(sessions)]) for i in range(per_session * len(sessions))
+    ))
+    return sorted(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--stt-ms", type=float, default=250, help="end of speech -> final transcript")
+    parser.add_argument("--llm-ms", type=float, default=350, help="LLM time to first token")
+    parser.add_argument("--tts-ms", type=float, default=200, help="TTS time to first audio")
+    parser.add_argument("--realtime-ms", type=float, default=550, help="realtime model first audio")
+    parser.add_argument("--buffer-kb", type=int, default=256, help="audio buffer per streaming client")
+    args = parser.parse_args()
+
+    for preferred, legacy in (("realtime", True), ("realtime", False), ("cascaded", False)):
+        plan = plan_pipeline(
+            realtime_available=True, stt_available=True, tts_available=True,
+            llm_available=True, preferred=preferred,
+        )
+        built = [name for name, value in build_session(plan, args, legacy).items() if value is not None]
+        memory = measure_memory(plan, args, legacy)
+        latencies = asyncio.run(measure_latency(plan, args))
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        label = f"{plan.mode}{' (old)' if legacy else ''}"
+        print(
+            f"{label:15s} builds {'+'.join(built):12s} "
+            f"turn p50={statistics.median(latencies):6.0f}ms p95={p95:6.0f}ms | "
+            f"memory/session={memory:7.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
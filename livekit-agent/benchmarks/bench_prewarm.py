@@ -0,0 +1,178 @@
+"""
+Benchmark: time from job dispatch to first greeting audio, cold vs prewarmed
+Runs local TLS stand-ins for the STT/LLM/TTS APIs. "Cold" builds clients
+and opens fresh connections for every job (the old entrypoint); "prewarm"
+builds them once per process and reuses keep-alive connections.
+
+Usage:
+    python benchmarks/bench_prewarm.py [--jobs 50] [--rtt-ms 40]
+
+--rtt-ms emulates the network round trip to the real API region: each new
+connection pays 2 RTTs (TCP + TLS) and each request pays 1.
+"""
+
+import argparse
+import asyncio
+import os
+import ssl
+import statistics
+import subprocess
+import tempfile
+import time
+
+PROVIDERS = ("stt", "llm", "tts")
+
+
+def make_certificate(directory: str):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-keyout", key, "-out", cert],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+class StandInServer:
+    """Minimal keep-alive HTTP/1.1 server that answers every request with audio bytes"""
+
+    def __init__(self, name: str, rtt: float, ssl_context):
+        self.name = name
+        self.rtt = rtt
+        self.ssl_context = ssl_context
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, ssl=self.ssl_context)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.rtt)
+                body = b"\x00" * 960  # one 20ms frame of 24kHz mono PCM
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+class Client:
+    """One provider client: an SSL context plus a keep-alive connection"""
+
+    def __init__(self, port: int, cafile: str, rtt: float):
+        self.port = port
+        self.rtt = rtt
+        # Building the context (loading CA roots) is part of client construction
+        self.ssl_context = ssl.create_default_context(cafile=cafile)
+        self._conn = None
+
+    async def connect(self):
+        if self._conn is None:
+            await asyncio.sleep(2 * self.rtt)
+            self._conn = await asyncio.open_connection(
+                "127.0.0.1", self.port, ssl=self.ssl_context, server_hostname="localhost"
+            )
+        return self._conn
+
+    async def request(self, body: bytes = b"hello") -> bytes:
+        reader, writer = await self.connect()
+        writer.write(b"POST / HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        headers = await reader.readuntil(b"\r\n\r\n")
+        length = int(headers.split(b"Content-Length:")[1].split(b"\r\n")[0])
+        return await reader.readexactly(length)
+
+    async def aclose(self):
+        if self._conn is not None:
+            writer = self._conn[1]
+            self._conn = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+
+async def cold_job(ports, cafile, rtt) -> float:
+    """Old entrypoint: build all clients, STT stream and greeting TTS on fresh connections"""
+    start = time.perf_counter()
+    clients = {name: Client(ports[name], cafile, rtt) for name in PROVIDERS}
+    stt_open = asyncio.create_task(clients["stt"].connect())
+    await clients["tts"].request(b"Hello! How can I help you today?")
+    elapsed = time.perf_counter() - start
+    await stt_open
+    for client in clients.values():
+        await client.aclose()
+    return elapsed
+
+
+async def prewarmed_job(clients) -> float:
+    """New entrypoint: handles come from the prewarmed pool"""
+    start = time.perf_counter()
+    await clients["tts"].request(b"Hello! How can I help you today?")
+    return time.perf_counter() - start
+
+
+def report(name: str, samples):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(0.95 * (len(ms) - 1) + 0.5))]
+    print(f"{name:9s} dispatch->greeting p50={statistics.median(ms):7.1f}ms p95={p95:7.1f}ms")
+
+
+async def run(jobs: int, rtt: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(tmp)
+        server_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_ctx.load_cert_chain(cert, key)
+
+        servers = {name: StandInServer(name, rtt, server_ctx) for name in PROVIDERS}
+        for server in servers.values():
+            await server.start()
+        ports = {name: server.port for name, server in servers.items()}
+
+        cold = [await cold_job(ports, cert, rtt) for _ in range(jobs)]
+
+        # Prewarm: clients built and connections opened once per process
+        prewarm_start = time.perf_counter()
+        pool = {name: Client(ports[name], cert, rtt) for name in PROVIDERS}
+        await asyncio.gather(*(client.connect() for client in pool.values()))
+        prewarm_cost = time.perf_counter() - prewarm_start
+        warm = [await prewarmed_job(pool) for _ in range(jobs)]
+        for client in pool.values():
+            await client.aclose()
+
+        for server in servers.values():
+            await server.stop()
+
+    print(f"{jobs} jobs, emulated RTT {rtt * 1000:.0f}ms")
+    report("cold", cold)
+    report("prewarm", warm)
+    print(f"one-time prewarm cost: {prewarm_cost * 1000:.1f}ms per process")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.jobs, args.rtt_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
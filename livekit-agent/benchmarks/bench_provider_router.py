@@ -0,0 +1,161 @@
+"""
+Benchmark: provider routing under degraded and failing TTS providers
+Concurrent sessions request TTS segments from two local stand-in providers
+(lognormal time to first audio with a slow tail) while the primary goes
+through a scripted incident. Each scenario is run three ways:
+
+    fixed      today's behaviour - the primary, chosen once per session,
+               serves every request; its errors are failed segments
+    failover   ProviderRouter: rolling health, circuit breakers, next
+               provider on error or when the primary's p95 is over budget
+    hedged     failover, plus a second provider started whenever the
+               first hasn't sent audio by its p95
+
+Reports time to first audio (p50/p95/p99), failed segments, the share
+served by the fallback and how many extra provider requests hedging cost.
+Simulated time runs `--time-scale` times faster than real time; all
+figures are in simulated time.
+
+Usage:
+    python benchmarks/bench_provider_router.py [--sessions 20] [--seconds 300] [--time-scale 0.02]
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from provider_router import ProviderRouter, route  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+# (from, to) as a share of the run, first-audio latency multiplier, error rate
+SCENARIOS = {
+    "healthy": [],
+    "degraded": [(0.3, 0.7, 4.0, 0.05)],
+    "outage": [(0.3, 0.5, 1.0, 1.0)],
+    "flapping": [(0.2, 0.3, 1.0, 0.5), (0.5, 0.6, 3.0, 0.3), (0.8, 0.85, 1.0, 1.0)],
+}
+
+
+class ProviderError(Exception):
+    pass
+
+
+class StandInTTS:
+    """Time to first audio from a lognormal with an occasional slow tail; errors arrive after a delay"""
+
+    def __init__(self, name, median_ms, incidents, clock, scale, seed):
+        self.name = name
+        self.median = median_ms / 1000
+        self.incidents = incidents
+        self.clock = clock
+        self.scale = scale
+        self.rng = random.Random(f"{seed}:{name}")
+        self.requests = 0
+
+    def condition(self):
+        elapsed = self.clock()
+        for start, end, slowdown, error_rate in self.incidents:
+            if start <= elapsed < end:
+                return slowdown, error_rate
+        return 1.0, 0.0
+
+    async def synthesize(self, seconds_of_audio):
+        self.requests += 1
+        slowdown, error_rate = self.condition()
+        latency = self.median * math.exp(self.rng.gauss(0, 0.3)) * slowdown
+        if self.rng.random() < 0.04:
+            latency *= 3   # Cold backend, queueing
+        if self.rng.random() < error_rate:
+            await asyncio.sleep(min(latency, 0.5) * self.scale)
+            raise ProviderError(f"{self.name}: 503")
+        await asyncio.sleep(latency * self.scale)
+        for _ in range(int(seconds_of_audio / 0.2)):
+            yield b"\0" * 9600
+            await asyncio.sleep(0.05 * self.scale)
+
+
+async def run(scenario, strategy, args):
+    scale = args.time_scale
+    started = time.monotonic()
+
+    def progress():
+        return (time.monotonic() - started) / (args.seconds * scale)
+
+    incidents = SCENARIOS[scenario]
+    providers = {
+        "primary": StandInTTS("primary", 350, incidents, progress, scale, args.seed),
+        "fallback": StandInTTS("fallback", 450, [], progress, scale, args.seed),
+    }
+    # Router timings in real (scaled) seconds
+    router = ProviderRouter("tts", slow_after=1.5 * scale, cooldown=30 * scale, max_age=60 * scale)
+    names = ["primary"] if strategy == "fixed" else list(providers)
+    latencies, failed, served = [], 0, {name: 0 for name in providers}
+
+    async def segment(rng):
+        nonlocal failed
+        begin = time.monotonic()
+        try:
+            first = True
+            async for name, _ in route(
+                router, names, lambda name: providers[name].synthesize(rng.uniform(1, 4)), hedge=strategy == "hedged"
+            ):
+                if first:
+                    latencies.append((time.monotonic() - begin) / scale)
+                    served[name] += 1
+                    first = False
+        except ProviderError:
+            failed += 1
+
+    async def session(index):
+        rng = random.Random(f"{args.seed}:session:{index}")
+        await asyncio.sleep(rng.uniform(0, 3) * scale)
+        while progress() < 1:
+            await segment(rng)
+            await asyncio.sleep(rng.uniform(2, 4) * scale)   # Playout, then the next segment
+
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    latencies.sort()
+    requests = sum(provider.requests for provider in providers.values())
+    total = len(latencies) + failed
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": quantile(latencies, 0.95) * 1000,
+        "p99": quantile(latencies, 0.99) * 1000,
+        "failed": failed,
+        "segments": total,
+        "fallback": served["fallback"] / max(1, len(latencies)),
+        "extra": requests / max(1, total) - 1,
+        "hedges": router.hedges,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=300, help="simulated length of each scenario")
+    parser.add_argument("--time-scale", type=float, default=0.02, help="real seconds per simulated second")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.getLogger("provider_router").setLevel(logging.ERROR)
+
+    print(f"{'scenario':9s} {'strategy':9s} {'p50':>6s} {'p95':>6s} {'p99':>6s} "
+          f"{'failed':>11s} {'fallback':>9s} {'extra req':>9s}  hedges won/lost")
+    for scenario in args.scenarios.split(","):
+        for strategy in ("fixed", "failover", "hedged"):
+            r = asyncio.run(run(scenario, strategy, args))
+            print(f"{scenario:9s} {strategy:9s} {r['p50']:4.0f}ms {r['p95']:4.0f}ms {r['p99']:4.0f}ms "
+                  f"{r['failed']:4d}/{r['segments']:<6d} {r['fallback']:8.1%} {r['extra']:9.1%}  "
+                  f"{r['hedges']['won']}/{r['hedges']['lost']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: speculative LLM generation from stable interim transcripts
+Plays simulated user turns (interim transcripts word by word, then a final
+transcript) through speculation.Speculator with a fake LLM using the
+load_profile timings, and compares time-to-first-token after end of speech
+against waiting for the final transcript. Also reports hit rate, LLM
+requests per turn, and the requests, prompt tokens and output tokens
+thrown away by cancelled speculations.
+
+Usage:
+    python benchmarks/bench_speculation.py [--turns 300] [--stable-ms 150,250,400]
+        [--revise 0.1] [--pause 0.1] [--prompt-tokens 1500]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_profile import FakeProviderProfile  # noqa: E402
+from speculation import SpeculationStats, Speculator  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+MIN_SILENCE = 0.5    # VAD min_silence_duration in create_assistant
+INTERIM_LAG = 0.1    # Audio -> interim transcript
+
+
+class FakeReply:
+    """fake_llm with the prompt size attached, like speculative_llm.SpeculativeReply"""
+
+    def __init__(self, chunks, prompt_tokens):
+        self.prompt_tokens = prompt_tokens
+        self._chunks = chunks
+
+    def __aiter__(self):
+        return self._chunks
+
+    async def aclose(self):
+        await self._chunks.aclose()
+
+
+async def fake_llm(profile, rng, counter):
+    tokens = profile.reply_tokens(rng)
+    await asyncio.sleep(profile.llm_ttft.sample(rng))
+    for i, token in enumerate(tokens):
+        if i:
+            await asyncio.sleep(1 / profile.llm_tokens_per_sec)
+        counter[0] += 1
+        yield token
+
+
+async def turn(index, profile, args, stats, stable, generated):
+    """Seconds from end of user speech to the first reply token"""
+    loop = asyncio.get_running_loop()
+    rng = profile.rng(f"turn:{index}")
+    words = profile.utterance(rng).split()
+    revise = rng.random() < args.revise       # Final transcript corrects the last word
+    pause_at = rng.randrange(1, len(words)) if rng.random() < args.pause and len(words) > 2 else None
+    stt_final = profile.stt_final.sample(rng)
+
+    speculator = Speculator(
+        lambda text: FakeReply(fake_llm(profile, profile.rng(f"llm:{index}:{text}"), generated), args.prompt_tokens),
+        stats,
+        stable_window=stable,
+    ) if stable else None
+
+    word_time = 1 / profile.words_per_second
+    for n in range(1, len(words) + 1):
+        await asyncio.sleep(word_time)
+        if n == pause_at:
+            # Mid-sentence pause: long enough to speculate, too short to end the turn
+            await asyncio.sleep(MIN_SILENCE * 0.8)
+        if speculator is not None:
+            loop.call_later(INTERIM_LAG, speculator.on_transcript, " ".join(words[:n]), False)
+    speech_end = loop.time()
+
+    final = list(words)
+    if revise:
+        final[-1] = final[-1] + "s"
+    # The pipeline commits once VAD silence and the final transcript are both in
+    await asyncio.sleep(max(MIN_SILENCE, stt_final))
+    final_text = " ".join(final).capitalize() + "."
+
+    speculation = speculator.commit(final_text) if speculator is not None else None
+    if speculation is not None:
+        stream = speculation.replay()
+    else:
+        stream = fake_llm(profile, profile.rng(f"llm:{index}:{final_text}"), generated)
+    async for _ in stream:
+        first = loop.time() - speech_end
+        break
+    await stream.aclose()
+    if speculator is not None:
+        speculator.aclose()
+    return first
+
+
+async def run(profile, args, stable):
+    stats = SpeculationStats()
+    generated = [0]
+    results = await asyncio.gather(*(
+        turn(i, profile, args, stats, stable, generated) for i in range(args.turns)
+    ))
+    await asyncio.sleep(0.05)  # let cancelled streams unwind
+    return sorted(results), stats, generated[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--stable-ms", default="150,250,400", help="interim stability windows to compare")
+    parser.add_argument("--revise", type=float, default=0.1, help="share of finals that differ from the last interim")
+    parser.add_argument("--pause", type=float, default=0.1, help="share of turns with a mid-sentence pause")
+    parser.add_argument("--prompt-tokens", type=int, default=1500, help="prompt size of each LLM request")
+    args = parser.parse_args()
+
+    profile = FakeProviderProfile.from_env()
+    windows = [0.0] + [float(ms) / 1000 for ms in args.stable_ms.split(",")]
+    for stable in windows:
+        latencies, stats, generated = asyncio.run(run(profile, args, stable))
+        label = f"stable {stable * 1000:.0f}ms" if stable else "final only"
+        line = (
+            f"{label:13s} first token after speech end: "
+            f"p50={statistics.median(latencies) * 1000:5.0f}ms p95={quantile(latencies, 0.95) * 1000:5.0f}ms | "
+            f"LLM requests={args.turns + stats.wasted_requests:5d} ({stats.request_multiplier(args.turns) or 1:.1f}x) "
+            f"tokens={generated:6d}"
+        )
+        if stable:
+            line += (
+                f" | hit rate={stats.hit_rate:4.0%} abandoned={stats.outcomes['abandoned']:5d} "
+                f"wasted prompt tokens={stats.wasted_prompt_tokens} output tokens={stats.wasted_tokens}"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
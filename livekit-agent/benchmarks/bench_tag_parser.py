@@ -0,0 +1,139 @@
+"""
+Micro-benchmark: emotion-tag stripping in _before_tts_cb
+Compares the legacy regex/50-char buffer against EmotionTagParser on replayed
+LLM token streams. Reports time-to-first-yield and CPU per turn.
+
+Usage:
+    python benchmarks/bench_tag_parser.py [--streams streams.jsonl] [--turns 2000]
+
+A streams file holds one JSON list of token strings per line (one reply each).
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tag_parser import EmotionTagParser  # noqa: E402
+
+# Simulated gap between LLM tokens (seconds) used for time-to-first-yield
+TOKEN_INTERVAL = 0.025
+
+SAMPLE_REPLIES = [
+    "[excited] Oh really? That's amazing news, babe! Tell me everything.",
+    "[neutral] Systems are green, sir. Shall I run the diagnostics again?",
+    "[happy] Aiyyo! That is so wonderful! Let's celebrate with some payasam.",
+    "Sure, here is what I found about the weather in Kochi today.",
+    "I think you should take a break. [concerned] You've been working all day.",
+    "[thoughtful] Hmm, that's an interesting question. [playful] Want a hint?",
+    "Honestly, I'm not sure. Let me think about it for a second.",
+]
+
+
+def tokenize(text: str, size: int = 4):
+    """Split text into BPE-sized pieces, roughly what an LLM streams"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+async def legacy_strip(text_stream):
+    """The original _before_tts_cb buffering logic, without publishing"""
+    buffer = ""
+    emotion_published = False
+    async for chunk in text_stream:
+        buffer += chunk
+        if not emotion_published and "[" in buffer and "]" in buffer:
+            match = re.search(r'^\[(.*?)\]', buffer)
+            if match:
+                emotion_published = True
+                buffer = buffer[match.end():].lstrip()
+        if not emotion_published and len(buffer) > 50:
+            emotion_published = True
+        if emotion_published:
+            if buffer:
+                yield buffer
+                buffer = ""
+    if buffer:
+        yield buffer
+
+
+async def parser_strip(text_stream):
+    """EmotionTagParser as used by _before_tts_cb, without publishing"""
+    parser = EmotionTagParser()
+    async for chunk in text_stream:
+        text, _tags = parser.feed(chunk)
+        if text:
+            yield text
+    remaining = parser.flush()
+    if remaining:
+        yield remaining
+
+
+async def replay(tokens, consumed):
+    for token in tokens:
+        consumed.append(token)
+        yield token
+
+
+async def run_turn(strip, tokens):
+    """Returns (tokens consumed before first yield, CPU seconds, output text)"""
+    consumed = []
+    first = None
+    out = []
+    cpu_start = time.process_time()
+    async for text in strip(replay(tokens, consumed)):
+        if first is None:
+            first = len(consumed)
+        out.append(text)
+    cpu = time.process_time() - cpu_start
+    return first or len(tokens), cpu, "".join(out)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def bench(name, strip, streams, turns):
+    ttfy = []
+    cpu = []
+    for i in range(turns):
+        tokens = streams[i % len(streams)]
+        first, seconds, _ = await run_turn(strip, tokens)
+        ttfy.append(first * TOKEN_INTERVAL * 1000)
+        cpu.append(seconds * 1e6)
+    print(
+        f"{name:8s} first-yield p50={statistics.median(ttfy):6.1f}ms "
+        f"p95={percentile(ttfy, 95):6.1f}ms | "
+        f"cpu/turn p50={statistics.median(cpu):6.1f}us p95={percentile(cpu, 95):6.1f}us"
+    )
+
+
+def load_streams(path):
+    if not path:
+        return [tokenize(text) for text in SAMPLE_REPLIES]
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--streams", help="JSONL file of recorded token streams")
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    streams = load_streams(args.streams)
+    print(f"Replaying {len(streams)} streams x {args.turns} turns "
+          f"({TOKEN_INTERVAL * 1000:.0f}ms/token)")
+    asyncio.run(bench("legacy", legacy_strip, streams, args.turns))
+    asyncio.run(bench("parser", parser_strip, streams, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: sentence-segmented TTS with prefetch vs LLM-chunk pass-through
+Streams fake LLM replies (load_profile timings) into a fake request/response
+TTS three ways and plays the audio out on a simulated realtime clock:
+
+    pass-through  every LLM chunk is its own TTS request, one at a time
+    sentences     whole sentences, one request at a time (like livekit's
+                  StreamAdapter for non-streaming TTS)
+    segmented     tts_segmenter: early first clause (or first words after
+                  --first-latency-ms), max-latency flush and the next
+                  segment prefetched
+
+Reports time from first LLM token to first audio, total playout gaps per
+reply, TTS requests per reply and how many segments are tiny fragments.
+
+Usage:
+    python benchmarks/bench_tts_segmenter.py [--replies 200] [--prefetch 2]
+        [--max-latency-ms 600] [--first-latency-ms 150] [--request-ms 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_profile import Distribution, FakeProviderProfile  # noqa: E402
+from tag_parser import EmotionTagParser  # noqa: E402
+from tts_segmenter import SentenceSegmenter, prefetch_audio, segment_stream  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+CHARS_PER_SECOND = 14.0   # Speaking rate of the synthesized audio
+CHUNK_SECONDS = 0.1       # Audio per chunk delivered by the TTS
+FRAGMENT_CHARS = 12       # Segments shorter than this sound clipped
+
+
+async def llm_reply(profile, rng):
+    """Tag-stripped text of one reply, starting immediately (TTFT is not under test)"""
+    parser = EmotionTagParser()
+    for i, token in enumerate(profile.reply_tokens(rng)):
+        if i:
+            await asyncio.sleep(1 / profile.llm_tokens_per_sec)
+        text, _ = parser.feed(token)
+        if text:
+            yield text
+    remaining = parser.flush()
+    if remaining:
+        yield remaining
+
+
+def fake_tts(profile, rng, request_latency):
+    async def synthesize(text):
+        await asyncio.sleep(request_latency.sample(rng))
+        remaining = max(CHUNK_SECONDS, len(text) / CHARS_PER_SECOND)
+        while remaining > 0:
+            chunk = min(CHUNK_SECONDS, remaining)
+            remaining -= chunk
+            yield chunk
+            await asyncio.sleep(chunk / profile.tts_realtime_factor)
+    return synthesize
+
+
+async def passthrough_segments(chunks):
+    async for chunk in chunks:
+        if chunk.strip():
+            yield chunk
+
+
+async def reply(index, strategy, profile, args, request_latency):
+    loop = asyncio.get_running_loop()
+    rng = profile.rng(f"reply:{index}")
+    tokens = llm_reply(profile, rng)
+    if strategy == "pass-through":
+        segments, in_flight = passthrough_segments(tokens), 1
+    elif strategy == "sentences":
+        segmenter = SentenceSegmenter(eager_first=False)
+        segments, in_flight = segment_stream(tokens, segmenter, max_latency=3600), 1
+    else:
+        segments = segment_stream(
+            tokens, SentenceSegmenter(),
+            max_latency=args.max_latency_ms / 1000, first_latency=args.first_latency_ms / 1000,
+        )
+        in_flight = args.prefetch
+
+    start = loop.time()
+    first_audio = None
+    cursor = 0.0      # When the player runs out of audio
+    gaps = 0.0
+    sizes = []
+    async for text, audio in prefetch_audio(segments, fake_tts(profile, rng, request_latency), in_flight):
+        sizes.append(len(text))
+        async for seconds in audio:
+            now = loop.time()
+            if first_audio is None:
+                first_audio = now - start
+                cursor = now
+            elif now > cursor:
+                gaps += now - cursor
+                cursor = now
+            cursor += seconds
+    return first_audio, gaps, sizes
+
+
+async def run(strategy, profile, args, request_latency):
+    return await asyncio.gather(*(
+        reply(i, strategy, profile, args, request_latency) for i in range(args.replies)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--replies", type=int, default=200)
+    parser.add_argument("--prefetch", type=int, default=2, help="synthesis requests in flight")
+    parser.add_argument("--max-latency-ms", type=float, default=600)
+    parser.add_argument("--first-latency-ms", type=float, default=150)
+    parser.add_argument("--request-ms", default="200,40,40", help="TTS request latency: mean,jitter,min")
+    args = parser.parse_args()
+
+    profile = FakeProviderProfile.from_env()
+    request_latency = Distribution.parse(args.request_ms)
+    for strategy in ("pass-through", "sentences", "segmented"):
+        results = asyncio.run(run(strategy, profile, args, request_latency))
+        first = sorted(r[0] * 1000 for r in results)
+        gaps = sorted(r[1] * 1000 for r in results)
+        sizes = [size for r in results for size in r[2]]
+        fragments = sum(1 for size in sizes if size < FRAGMENT_CHARS) / len(sizes)
+        print(
+            f"{strategy:12s} first audio p50={statistics.median(first):5.0f}ms p95={quantile(first, 0.95):5.0f}ms | "
+            f"gaps/reply p50={statistics.median(gaps):6.0f}ms p95={quantile(gaps, 0.95):6.0f}ms | "
+            f"requests/reply={len(sizes) / len(results):5.1f} fragments={fragments:4.0%} "
+            f"median segment={statistics.median(sizes):4.0f} chars"
+        )
+
+
+if __name__ == "__main__":
+    main()
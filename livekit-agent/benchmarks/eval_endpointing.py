@@ -0,0 +1,250 @@
+"""
+Quality check: end-of-turn latency and false cut-offs per endpointer
+Plays utterances through each endpointer's decision rule: after every
+stretch of speech the turn ends once the transcript has arrived (STT lag)
+and the endpointer's window has passed, counted from the end of speech.
+A pause in the middle of an utterance that outlasts that is a false
+cut-off - the agent answers half a sentence.
+
+Utterances come from the labelled corpus below ("|" marks where the
+speaker pauses, for a lognormal --pause-ms) or from session recordings
+(SESSION_RECORD_DIR): each recorded user turn, with the pauses the VAD saw
+inside it and the transcript as it stood at each one. A turn the user
+continued within endpointing.RESUME_WINDOW of its commit counts as one
+utterance that was cut off when recorded.
+
+Reports, over --trials draws of pauses and provider timings:
+    endpoint     end of speech -> end of turn (median, p95)
+    response     end of speech -> first agent audio, adding LLM and TTS
+                 first-byte times from the fake-provider profile
+    cut-offs     utterances ended early, of all and of those with pauses
+
+Usage:
+    python benchmarks/eval_endpointing.py [--endpointers fixed,adaptive] [--trials 20]
+    python benchmarks/eval_endpointing.py --recording sessions/*.nzrec
+
+Exits non-zero if an endpointer's false cut-off rate is above --max-cutoff.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from endpointing import RESUME_WINDOW, create_endpointer, features  # noqa: E402
+from load_profile import FakeProviderProfile  # noqa: E402
+from session_recording import EVENT, Recording  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+CORPUS = [
+    # Finished questions
+    "What's the weather like today?",
+    "Can you remind me to call my mom tomorrow?",
+    "how was your day",
+    "Where did I leave my keys?",
+    "Do you think I should take the job?",
+    "What time is it in Tokyo right now?",
+    "Are you still there?",
+    "why is the sky blue",
+    "Who won the game last night?",
+    "How do I make pancakes?",
+    # Finished statements
+    "I had a really long day at work.",
+    "That movie was amazing!",
+    "I think I'm going to bed early tonight.",
+    "My sister is visiting next week.",
+    "I finally finished the report.",
+    "i love talking to you",
+    "The train was late again this morning.",
+    "I'm feeling a lot better now.",
+    "Tell me a joke.",
+    "Play some relaxing music.",
+    # Short answers
+    "Yes.",
+    "No.",
+    "Okay.",
+    "Sure!",
+    "Thank you.",
+    "yeah",
+    "Nope.",
+    "Hi!",
+    # Paused mid-sentence
+    "I was thinking we could | go to the beach this weekend.",
+    "So my boss told me that | I have to redo the whole report.",
+    "Can you tell me about the | history of Rome?",
+    "I want to order a pizza and | maybe some wings too.",
+    "Let me think, um | I guess pasta sounds good.",
+    "I went to the | grocery store after work.",
+    "Tell me a story about | a dragon who loves to bake.",
+    "Well | I'm not really sure.",
+    "I need to buy a gift for my | brother's birthday.",
+    "Because | I didn't sleep well last night.",
+    "We could watch a movie or | just go for a walk.",
+    "I'm gonna | try that new recipe tonight.",
+    "It was kind of, | you know, a weird day.",
+    "I was wondering if | you could help me plan a trip.",
+    "The thing is | I don't really like coffee.",
+    "My favorite food is | probably sushi.",
+    "I have been feeling | a little stressed lately.",
+    "Um | what should I cook for dinner?",
+    "and then she said | that she was moving to Paris.",
+    "Can you | set an alarm for seven?",
+    # Paused at a sentence boundary
+    "I went to the store. | And then I realized I forgot my wallet.",
+    "I had a weird dream. | There was a talking cat in it.",
+    "That's a good idea. | But I'm worried about the cost.",
+    "Okay. | Let's do it tomorrow instead.",
+    # Several pauses
+    "I was going to, um, | call you yesterday but | my phone died.",
+    "So | the meeting got moved to | Thursday afternoon.",
+]
+
+
+class Segment(NamedTuple):
+    text: str                # Transcript of the utterance up to the end of this stretch of speech
+    pause: Optional[float]   # Silence before the speaker goes on (None: the utterance is over)
+    lag: Optional[float]     # End of speech -> transcript known (None: sample the profile)
+
+
+def from_corpus(line: str, rng: random.Random, pause_median: float) -> List[Segment]:
+    parts = [part.strip() for part in line.split("|")]
+    segments = []
+    for i in range(len(parts)):
+        last = i == len(parts) - 1
+        pause = None if last else rng.lognormvariate(0, 0.5) * pause_median
+        segments.append(Segment(" ".join(parts[:i + 1]), pause, None))
+    return segments
+
+
+def from_recording(path: Path) -> List[List[Segment]]:
+    """User turns in a session recording, split at the pauses the VAD saw"""
+    recording = Recording(path)
+    vad_silence = recording.meta.get("vad_silence", 0.5)
+    utterances = []
+    stretches = []            # [speech start, speech end, text, transcript time] per stretch of the current turn
+    finals = ""
+    interim = ""
+    started = None
+    committed_at = None
+    for record in recording.records(kinds=(EVENT,)):
+        event = record.json()
+        name = event["event"]
+        if name == "user_started_speaking":
+            if committed_at is not None and record.t - committed_at > RESUME_WINDOW:
+                utterances.append(stretches)
+                stretches, finals, interim = [], "", ""
+            committed_at = None
+            started = record.t
+        elif name == "user_stopped_speaking" and started is not None:
+            stretches.append([started, record.t - vad_silence, (finals + " " + interim).strip(), None])
+            started = None
+        elif name == "user_input_transcribed":
+            text = event.get("transcript") or ""
+            if event.get("is_final"):
+                finals, interim = (finals + " " + text).strip(), ""
+            else:
+                interim = text
+            if stretches:
+                stretches[-1][2:] = [(finals + " " + interim).strip(), record.t]
+        elif name == "user_speech_committed" and stretches:
+            if not stretches[-1][2]:
+                stretches[-1][2:] = [event.get("content") or "", record.t]
+            committed_at = record.t
+        elif name == "agent_started_speaking" and committed_at is not None and stretches:
+            utterances.append(stretches)
+            stretches, finals, interim, committed_at = [], "", "", None
+    if stretches and committed_at is not None:
+        utterances.append(stretches)
+    recording.close()
+
+    turns = []
+    for stretches in utterances:
+        segments = []
+        for i, (_, end, text, heard) in enumerate(stretches):
+            pause = stretches[i + 1][0] - end if i + 1 < len(stretches) else None
+            lag = max(0.0, heard - end) if heard is not None else None
+            segments.append(Segment(text, pause, lag))
+        turns.append(segments)
+    return turns
+
+
+def play(endpointer, segments, profile, rng):
+    """(end of speech -> end of turn, or None if a pause was cut off; the transcript the turn ended on)"""
+    for segment in segments:
+        lag = segment.lag if segment.lag is not None else profile.stt_final.sample(rng)
+        window = endpointer.silence(segment.text)
+        ends_after = max(endpointer.min_silence, lag, window)
+        if segment.pause is None:
+            return ends_after, segment.text
+        if segment.pause > ends_after:
+            return None, segment.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--endpointers", default="fixed,adaptive", help="names or module:Class paths")
+    parser.add_argument("--recording", nargs="*", default=[], help="evaluate recorded user turns instead of the corpus")
+    parser.add_argument("--trials", type=int, default=20, help="draws of pauses and timings per utterance")
+    parser.add_argument("--pause-ms", type=float, default=700, help="median mid-utterance pause (corpus)")
+    parser.add_argument("--min-ms", type=float, default=250)
+    parser.add_argument("--silence-ms", type=float, default=500)
+    parser.add_argument("--max-ms", type=float, default=1500)
+    parser.add_argument("--max-cutoff", type=float, default=0, help="fail above this false cut-off rate (0 = report only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="print the utterances each endpointer cut off")
+    args = parser.parse_args()
+
+    profile = FakeProviderProfile(seed=args.seed)
+    if args.recording:
+        recorded = [turn for path in args.recording for turn in from_recording(Path(path))]
+        print(f"{len(recorded)} recorded user turns from {len(args.recording)} recordings")
+    else:
+        print(f"{len(CORPUS)} corpus utterances, {sum('|' in line for line in CORPUS)} with pauses")
+    windows = dict(min_silence=args.min_ms / 1000, default=args.silence_ms / 1000, max_silence=args.max_ms / 1000)
+
+    failed = []
+    print(f"{'endpointer':12s} {'endpoint p50':>12s} {'p95':>6s} {'response p50':>12s} {'p95':>6s} "
+          f"{'cut-offs':>9s} {'of paused':>9s}")
+    for spec in args.endpointers.split(","):
+        endpointer = create_endpointer(spec, **windows)
+        rng = profile.rng(f"eval:{args.seed}")
+        endpoints, responses, cut = [], [], set()
+        total = paused = paused_cut = 0
+        for trial in range(args.trials):
+            if args.recording:
+                utterances = recorded
+            else:
+                utterances = [from_corpus(line, rng, args.pause_ms / 1000) for line in CORPUS]
+            for i, segments in enumerate(utterances):
+                total += 1
+                has_pause = len(segments) > 1
+                paused += has_pause
+                ends_after, text = play(endpointer, segments, profile, rng)
+                if ends_after is None:
+                    paused_cut += has_pause
+                    cut.add((i, text))
+                    continue
+                endpoints.append(ends_after)
+                responses.append(ends_after + profile.llm_ttft.sample(rng) + profile.tts_first_audio.sample(rng))
+        rate = (total - len(endpoints)) / total if total else 0.0
+        endpoints.sort()
+        responses.sort()
+        print(f"{spec:12s} {statistics.median(endpoints) * 1000:10.0f}ms {quantile(endpoints, 0.95) * 1000:4.0f}ms "
+              f"{statistics.median(responses) * 1000:10.0f}ms {quantile(responses, 0.95) * 1000:4.0f}ms "
+              f"{rate:9.1%} {paused_cut / paused if paused else 0.0:9.1%}")
+        if args.verbose:
+            for _, text in sorted(cut):
+                print(f"    cut after {text!r} {features(text)}")
+        if args.max_cutoff and rate > args.max_cutoff:
+            failed.append(f"{spec} {rate:.1%}")
+    if failed:
+        print(f"✗ false cut-offs over {args.max_cutoff:.1%}: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Load generator: how many simulated rooms one worker process sustains
+Ramps concurrent sessions through VoiceSession with the deterministic fake
+provider timings (load_profile.FakeProviderProfile) and in-memory rooms.
+Each step reports sessions per busy core, response-latency percentiles
+(end of user speech -> first agent audio) and event-loop lag, and the run
+stops at the first step that breaks the latency or lag budget.
+
+Provider timings come from the same FAKE_* variables the worker reads with
+FAKE_PROVIDERS=1, so an offline run and a worker run against a local
+`livekit-server --dev` use one profile. The in-memory rooms skip the SDK's
+native audio path (resampling, Opus, WebRTC), so treat the offline figure
+as the ceiling set by this process's Python work.
+
+Usage:
+    python benchmarks/load_generator.py [--start 8] [--step 8] [--max 256]
+        [--step-seconds 20] [--slo-ms 1500] [--lag-budget-ms 100] [--seed 0]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_profile import FakeProviderProfile  # noqa: E402
+from session import VoiceSession  # noqa: E402
+from standins import FakeContext, FakeWorker  # noqa: E402
+from turn_metrics import quantile  # noqa: E402
+
+FRAME = b"\x00" * 960  # 20ms of 24kHz mono int16
+
+
+async def sample_lag(samples, stop, interval=0.05):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_room(worker, profile, index, stop, think):
+    ctx = FakeContext(f"load-{index}", keep_messages=False)
+    session = VoiceSession(worker, ctx)
+    await session.start()
+    rng = profile.rng(f"room:{index}")
+    try:
+        while not stop.is_set():
+            await session.assistant.timed_turn(profile, rng, FRAME)
+            await asyncio.sleep(rng.uniform(0, think))
+    finally:
+        await ctx.shutdown()
+
+
+async def run_step(sessions, profile, args):
+    worker = FakeWorker(max_sessions=args.max, lag_budget=args.lag_budget_ms / 1000)
+    stop = asyncio.Event()
+    lag = []
+    sampler = asyncio.create_task(sample_lag(lag, stop))
+    rooms = []
+    for i in range(sessions):
+        rooms.append(asyncio.create_task(run_room(worker, profile, i, stop, args.think_seconds)))
+        await asyncio.sleep(args.ramp_seconds / sessions)
+
+    # Measure the steady state only, after every room is up
+    await asyncio.sleep(1.0)
+    turns_before = worker.metrics.turns
+    wall, cpu = time.perf_counter(), time.process_time()
+    await asyncio.sleep(args.step_seconds)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    load = worker.load_monitor.snapshot()
+
+    stop.set()
+    await asyncio.gather(*rooms, sampler)
+    busy = cpu / wall
+    response = worker.metrics.quantiles("response", worker.personality, "fake")
+    ordered = sorted(lag)
+    return {
+        "sessions": sessions,
+        "turns": worker.metrics.turns - turns_before,
+        "busy_cores": busy,
+        "sessions_per_core": sessions / busy if busy else float("inf"),
+        "p50": response.get(0.5, 0.0) * 1000,
+        "p95": response.get(0.95, 0.0) * 1000,
+        "p99": response.get(0.99, 0.0) * 1000,
+        "lag_p95": quantile(ordered, 0.95) * 1000,
+        "lag_max": (ordered[-1] if ordered else 0.0) * 1000,
+        "load": load["load"],
+        "leaked": worker.load_monitor.active_sessions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--start", type=int, default=8)
+    parser.add_argument("--step", type=int, default=8)
+    parser.add_argument("--max", type=int, default=256)
+    parser.add_argument("--step-seconds", type=float, default=20)
+    parser.add_argument("--ramp-seconds", type=float, default=2, help="spread room joins over this long")
+    parser.add_argument("--think-seconds", type=float, default=1.0, help="max pause between turns")
+    parser.add_argument("--slo-ms", type=float, default=None,
+                        help="p95 response budget (default: 1.25x the first step's p95)")
+    parser.add_argument("--lag-budget-ms", type=float, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    profile = FakeProviderProfile.from_env()
+    if args.seed is not None:
+        profile.seed = args.seed
+    random.seed(profile.seed)
+    print(f"profile: {profile}")
+    print(f"{'rooms':>5s} {'turns':>6s} {'cores':>6s} {'rooms/core':>10s} "
+          f"{'p50':>7s} {'p95':>7s} {'p99':>7s} {'lag95':>7s} {'lagmax':>7s} {'load':>5s}")
+
+    slo = args.slo_ms
+    sustained = None
+    sessions = args.start
+    while sessions <= args.max:
+        r = asyncio.run(run_step(sessions, profile, args))
+        print(f"{r['sessions']:5d} {r['turns']:6d} {r['busy_cores']:6.2f} {r['sessions_per_core']:10.1f} "
+              f"{r['p50']:6.0f}ms {r['p95']:6.0f}ms {r['p99']:6.0f}ms "
+              f"{r['lag_p95']:5.1f}ms {r['lag_max']:5.1f}ms {r['load']:5.2f}")
+        if r["leaked"]:
+            print(f"✗ {r['leaked']} sessions still counted after shutdown")
+            sys.exit(1)
+        if slo is None:
+            slo = max(r["p95"] * 1.25, r["p95"] + 100)
+            print(f"      p95 budget: {slo:.0f}ms")
+        if r["p95"] > slo or r["lag_p95"] > args.lag_budget_ms:
+            print(f"✗ {sessions} rooms exceed the budget")
+            break
+        sustained = r
+        sessions += args.step
+
+    if sustained:
+        print(f"\nsustained {sustained['sessions']} rooms per process "
+              f"({sustained['sessions_per_core']:.0f} rooms per busy core, "
+              f"{os.cpu_count()} cores on this host)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Replay a recorded session through the real session code
+Feeds a recording (SESSION_RECORD_DIR, see session_recording.py) back
+through VoiceSession - its event listeners, _before_llm_cb and
+_before_tts_cb - with stand-in providers that reproduce the recorded
+timings:
+
+    user side    speech/VAD/transcript events at their recorded times
+    LLM          tokens at their recorded offsets from each LLM request
+    TTS          first audio at the recorded delay after the first text
+                 _before_tts_cb releases, frames and end of playout at
+                 their recorded offsets after that
+
+Time spent in the session code itself is what changes between runs, so a
+latency fix there shows up as replayed vs recorded stage latencies. The
+emotion and speaking-state messages sent to the client are compared too.
+Recorded user audio is not re-recognized; the recorded transcripts are used.
+
+Usage:
+    python benchmarks/replay_session.py RECORDING.nzrec [--speed 1.0]
+    python benchmarks/replay_session.py --synthesize 10   # record a fake-provider session, then replay it
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_publisher import decode  # noqa: E402
+from load_profile import FakeProviderProfile  # noqa: E402
+from session import VoiceSession  # noqa: E402
+from session_recording import (  # noqa: E402
+    DATA, EVENT, LLM_REQUEST, LLM_TOKEN, TTS_AUDIO, TTS_TEXT, Recording,
+)
+from standins import FakeContext, FakeWorker  # noqa: E402
+from turn_metrics import SEGMENTS, LatencyMetrics, TurnTracer  # noqa: E402
+
+USER_EVENTS = ("user_started_speaking", "user_stopped_speaking", "user_input_transcribed", "user_speech_committed")
+
+# Recorded record -> the TurnTracer stage it marks
+STAGE_EVENTS = {
+    "user_stopped_speaking": "vad_end",
+    "user_speech_committed": "stt_final",
+    "agent_started_speaking": "tts_first_audio",
+    "agent_stopped_speaking": "playout_end",
+}
+
+
+class Reply:
+    """One LLM request and the agent speech that followed it, as offsets"""
+
+    def __init__(self, t):
+        self.t = t
+        self.tokens = []          # (offset from request, text)
+        self.first_text = None    # Offset of the first text released to TTS
+        self.speech = None        # (agent_started_speaking offset from first text, [frames], stop offset, content)
+
+
+def plan(recording):
+    """Split a recording into absolutely-timed user events and replies"""
+    user, replies, unattached = [], [], []
+    reply = None
+    speaking_at = None
+    for record in recording:
+        if record.kind == LLM_REQUEST:
+            reply = Reply(record.t)
+            replies.append(reply)
+        elif record.kind == LLM_TOKEN and reply is not None:
+            reply.tokens.append((record.t - reply.t, record.text()))
+        elif record.kind == TTS_TEXT and reply is not None and reply.first_text is None:
+            reply.first_text = record.t - reply.t
+        elif record.kind == TTS_AUDIO and reply is not None and reply.speech is not None:
+            reply.speech[1].append((record.t - speaking_at, record.tts_audio()))
+        elif record.kind == EVENT:
+            event = record.json()
+            name = event.pop("event")
+            if name in USER_EVENTS:
+                user.append((record.t, name, event))
+            elif name == "agent_started_speaking" and reply is not None and reply.speech is None:
+                anchor = reply.t + (reply.first_text if reply.first_text is not None else 0.0)
+                reply.speech = [record.t - anchor, [], None, ""]
+                speaking_at = record.t
+            elif name == "agent_stopped_speaking" and reply is not None and reply.speech is not None:
+                reply.speech[2] = record.t - speaking_at
+            elif name == "agent_speech_committed" and reply is not None and reply.speech is not None:
+                reply.speech[3] = event.get("content") or ""
+            else:
+                unattached.append((record.t, name, event))   # The greeting, or speech without a reply
+    return user, replies, unattached
+
+
+def recorded_metrics(recording, personality, provider):
+    """Stage latencies as they happened, from the recorded timestamps"""
+    metrics = LatencyMetrics()
+    tracer = TurnTracer(metrics, personality, provider)
+    in_reply = False
+    for record in recording:
+        if record.kind == LLM_REQUEST:
+            in_reply = True
+        elif record.kind == LLM_TOKEN and in_reply:
+            tracer.mark("llm_first_token", at=record.t)
+        elif record.kind == TTS_TEXT and in_reply:
+            tracer.mark("tts_cb_first_yield", at=record.t)
+        elif record.kind == EVENT:
+            stage = STAGE_EVENTS.get(record.json()["event"])
+            if stage is not None:
+                tracer.mark(stage, at=record.t)
+    return metrics
+
+
+def client_messages(messages):
+    """What the avatar reacts to: emotions and speaking state, in order"""
+    return [
+        (m["type"], m.get("emotion", m.get("isSpeaking")))
+        for m in messages if m["type"] in ("emotion", "state")
+    ]
+
+
+def _event_arg(name, fields):
+    if name == "user_input_transcribed":
+        return (SimpleNamespace(transcript=fields.get("transcript") or "", is_final=bool(fields.get("is_final"))),)
+    if name in ("user_speech_committed", "agent_speech_committed"):
+        return (SimpleNamespace(content=fields.get("content") or ""),)
+    return ()
+
+
+async def replay(recording, speed):
+    meta = recording.meta
+    worker = FakeWorker(max_sessions=1)
+    worker.fast_interrupt = meta.get("fast_interrupt", True)
+    worker.interrupt_min_words = meta.get("interrupt_min_words", 2)
+    worker.lipsync_fps = meta.get("lipsync_fps", 0)
+    ctx = FakeContext(meta.get("room", "replay"))
+    session = VoiceSession(worker, ctx)
+    await session.start()
+    assistant = session.assistant
+
+    loop = asyncio.get_running_loop()
+    base = loop.time()
+
+    async def until(t):
+        await asyncio.sleep(max(0.0, base + t / speed - loop.time()))
+
+    async def after(anchor, offset):
+        await asyncio.sleep(max(0.0, anchor + offset / speed - loop.time()))
+
+    async def emit_at(t, name, fields):
+        await until(t)
+        assistant.emit(name, *_event_arg(name, fields))
+
+    async def speak(reply, anchor):
+        started, frames, stopped, content = reply.speech
+        await after(anchor, started)
+        speaking = loop.time()
+        assistant.emit("agent_started_speaking")
+        for offset, (samples, sample_rate) in frames:
+            await after(speaking, offset)
+            session._on_tts_frame(SimpleNamespace(
+                data=bytes(samples * 2), sample_rate=sample_rate, num_channels=1, samples_per_channel=samples,
+            ))
+        if stopped is not None:
+            await after(speaking, stopped)
+            assistant.emit("agent_stopped_speaking")
+            assistant.emit("agent_speech_committed", SimpleNamespace(content=content))
+
+    async def run_reply(reply):
+        await until(reply.t)
+        assistant.before_llm_cb(assistant, None)
+        requested = loop.time()
+
+        async def llm_stream():
+            for offset, text in reply.tokens:
+                await after(requested, offset)
+                yield text
+
+        playout = None
+        async for _ in assistant.before_tts_cb(assistant, llm_stream()):
+            if playout is None and reply.speech is not None:
+                playout = asyncio.create_task(speak(reply, loop.time()))
+        if playout is None and reply.speech is not None:
+            # Nothing reached TTS (cancelled): keep the recorded timing
+            playout = asyncio.create_task(speak(reply, requested))
+        if playout is not None:
+            await playout
+
+    user, replies, unattached = plan(recording)
+    await asyncio.gather(
+        *(emit_at(t, name, fields) for t, name, fields in user + unattached),
+        *(run_reply(reply) for reply in replies),
+    )
+    await asyncio.sleep(0.05)   # Let the publisher drain
+    await ctx.shutdown()
+    return worker, session, ctx
+
+
+async def synthesize(path_dir, turns, seed):
+    """Record a session driven by the fake-provider timing model"""
+    worker = FakeWorker(max_sessions=1)
+    worker.recording_dir = Path(path_dir)
+    ctx = FakeContext("synthetic")
+    session = VoiceSession(worker, ctx)
+    await session.start()
+    profile = FakeProviderProfile(seed=seed)
+    rng = profile.rng("replay")
+    for _ in range(turns):
+        await session.assistant.timed_turn(profile, rng)
+    await asyncio.sleep(0.05)
+    await ctx.shutdown()
+    return session.recorder.path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recording", nargs="?")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay this many times faster (latencies are scaled back)")
+    parser.add_argument("--synthesize", type=int, default=0, metavar="TURNS", help="record a fake session first")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthesize:
+        path = asyncio.run(synthesize(tempfile.mkdtemp(prefix="nzrec-"), args.synthesize, args.seed))
+    elif args.recording:
+        path = Path(args.recording)
+    else:
+        parser.error("give a recording or --synthesize TURNS")
+
+    recording = Recording(path)
+    kinds = {}
+    for record in recording:
+        kinds[record.name] = kinds.get(record.name, 0) + 1
+    size = path.stat().st_size
+    print(f"{path.name}: {recording.duration:.1f}s, {sum(kinds.values())} records in {len(recording.index)} chunks, "
+          f"{size / 1024:.1f} KiB  {kinds}")
+    print(f"recorded on: {recording.meta}")
+
+    recorded = recorded_metrics(recording, "recorded", "trace")
+    worker, session, ctx = asyncio.run(replay(recording, args.speed))
+
+    print(f"\n{'stage':9s} {'recorded p50':>12s} {'p95':>7s}   {'replayed p50':>12s} {'p95':>7s}")
+    for name, _, _ in SEGMENTS:
+        before = recorded.quantiles(name, "recorded", "trace")
+        after = worker.metrics.quantiles(name, session.personality, session.providers.label)
+        if not before and not after:
+            continue
+        cells = []
+        for values, scale in ((before, 1.0), (after, args.speed)):
+            cells.append(f"{values[0.5] * scale * 1000:10.0f}ms {values[0.95] * scale * 1000:5.0f}ms" if values else f"{'-':>12s} {'-':>7s}")
+        print(f"{name:9s} {cells[0]}   {cells[1]}")
+    print(f"turns: recorded {recorded.turns}, replayed {worker.metrics.turns}")
+
+    sent = client_messages(decode(record.payload) for record in recording.records(kinds=(DATA,)))
+    replayed = client_messages(ctx.room.received)
+    match = "✓ identical" if sent == replayed else "✗ differ"
+    print(f"client messages (emotion/state): recorded {len(sent)}, replayed {len(replayed)} - {match}")
+    recording.close()
+    sys.exit(0 if sent == replayed else 1)
+
+
+if __name__ == "__main__":
+    main()
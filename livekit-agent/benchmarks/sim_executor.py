@@ -0,0 +1,152 @@
+"""
+Simulation: admission control through LiveKit's real job executor
+Launches jobs on livekit-agents' ProcPool - one process (or thread) per job,
+as the worker does - and admits them in the main process the way
+VoiceAIAgent.request() does. Each job runs a VoiceSession on an in-memory
+room for a while and then shuts down.
+
+"job-local" is the old admission: the main process counts the sessions it
+started itself, which under JOB_EXECUTOR=process is always none. "worker"
+counts the executor's running jobs plus ones accepted but not yet started.
+
+Usage:
+    python benchmarks/sim_executor.py [--executor process|thread] [--requests 12] [--max-sessions 4]
+
+Exits non-zero if the worker admission ever runs more than --max-sessions jobs.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from livekit.agents import JobExecutorType  # noqa: E402
+from livekit.agents.ipc.proc_pool import ProcPool  # noqa: E402
+from livekit.agents.job import JobAcceptArguments, RunningJobInfo  # noqa: E402
+from livekit.protocol import agent, models  # noqa: E402
+
+from load_monitor import LoadMonitor  # noqa: E402
+from session import VoiceSession  # noqa: E402
+from standins import FakeContext, FakeWorker  # noqa: E402
+
+SESSION_SECONDS = 1.5
+
+
+def initialize(proc):
+    pass
+
+
+async def job_entrypoint(ctx):
+    """One room: start a session, speak one turn, hold the room, hang up"""
+    worker = FakeWorker(max_sessions=1)
+    room = FakeContext(ctx.job.room.name)
+    session = VoiceSession(worker, room)
+    await session.start()
+    await session.assistant.reply(["[happy]", " hello"])
+    await asyncio.sleep(SESSION_SECONDS)
+    await room.shutdown()
+    ctx.shutdown()
+
+
+def job_info(index: int) -> RunningJobInfo:
+    job = agent.Job(
+        id=f"job-{index}",
+        room=models.Room(sid=f"RM_{index}", name=f"room-{index}"),
+        type=agent.JobType.JT_ROOM,
+    )
+    return RunningJobInfo(
+        accept_arguments=JobAcceptArguments(name="", identity=f"agent-{index}", metadata=""),
+        job=job,
+        url="ws://localhost:7880",
+        token="",
+        worker_id="sim",
+        fake_job=True,
+    )
+
+
+async def run(executor: JobExecutorType, requests: int, max_sessions: int, interval: float, worker_counts: bool):
+    pool = ProcPool(
+        initialize_process_fnc=initialize,
+        job_entrypoint_fnc=job_entrypoint,
+        session_end_fnc=None,
+        # Idle processes are ready up front, so admission is all that limits concurrency
+        num_idle_processes=requests,
+        initialize_timeout=30.0,
+        close_timeout=10.0,
+        inference_executor=None,
+        job_executor_type=executor,
+        mp_ctx=multiprocessing.get_context("forkserver"),
+        memory_warn_mb=0,
+        memory_limit_mb=0,
+        http_proxy=None,
+        loop=asyncio.get_running_loop(),
+    )
+    await pool.start()
+
+    # Only job counts decide here; the host's CPU and memory are not under test
+    monitor = LoadMonitor(max_sessions=max_sessions, lag_budget=0, memory_limit=0)
+    monitor.cpu_load = lambda: 0.0
+
+    def running():
+        return [proc.running_job.job.id for proc in pool.processes if proc.running_job]
+
+    if worker_counts:
+        monitor.count_jobs(running)
+
+    peak = 0
+    stop = asyncio.Event()
+
+    async def sample():
+        nonlocal peak
+        while not stop.is_set():
+            peak = max(peak, len(running()))
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample())
+    launches = []
+    admitted = 0
+    start = time.perf_counter()
+    for index in range(requests):
+        if monitor.admit(f"job-{index}"):
+            admitted += 1
+            launches.append(asyncio.create_task(pool.launch_job(job_info(index))))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*launches)
+    while running():
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+    await pool.aclose()
+    return admitted, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--executor", choices=("process", "thread"), default="process")
+    parser.add_argument("--requests", type=int, default=12)
+    parser.add_argument("--max-sessions", type=int, default=4)
+    parser.add_argument("--interval-ms", type=float, default=50)
+    args = parser.parse_args()
+    executor = JobExecutorType.THREAD if args.executor == "thread" else JobExecutorType.PROCESS
+
+    print(f"{args.requests} requests every {args.interval_ms:.0f}ms, max {args.max_sessions} sessions, "
+          f"{args.executor} executor")
+    ok = True
+    for name, worker_counts in (("job-local", False), ("worker", True)):
+        admitted, peak, elapsed = asyncio.run(
+            run(executor, args.requests, args.max_sessions, args.interval_ms / 1000, worker_counts)
+        )
+        print(f"{name:9s} admitted={admitted:3d} peak running={peak:3d} ({elapsed:.1f}s)")
+        if worker_counts and peak > args.max_sessions:
+            ok = False
+    print("✓ admission held" if ok else "✗ worker ran more jobs than max sessions")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
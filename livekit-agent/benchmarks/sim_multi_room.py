@@ -0,0 +1,76 @@
+"""
+Simulation: N concurrent rooms in one worker process
+Drives VoiceSession with in-memory rooms and assistants to check that
+sessions stay isolated (each room only sees its own speech state and
+emotions) and to show what LoadMonitor reports while they run.
+
+Usage:
+    python benchmarks/sim_multi_room.py [--rooms 16] [--turns 5]
+
+Exits non-zero if any room receives another room's data.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session import VoiceSession  # noqa: E402
+from standins import FakeContext, FakeWorker  # noqa: E402
+from tag_parser import EMOTIONS  # noqa: E402
+
+
+async def run_room(worker, index, turns):
+    ctx = FakeContext(f"room-{index}")
+    session = VoiceSession(worker, ctx)
+    await session.start()
+    # Neighbouring rooms always use different emotions
+    emotion = sorted(EMOTIONS)[index % len(EMOTIONS)]
+    for _ in range(turns):
+        spoken = await session.assistant.reply([f"[{emotion}]", f" reply for room {index}"])
+        assert spoken == f"reply for room {index}", spoken
+        await asyncio.sleep(random.uniform(0, 0.005))
+    await asyncio.sleep(0.01)  # let the publisher drain
+    return ctx, emotion
+
+
+async def run(rooms, turns):
+    worker = FakeWorker(max_sessions=rooms)
+    results = await asyncio.gather(*(run_room(worker, i, turns) for i in range(rooms)))
+    print(f"{rooms} rooms active: {worker.load_monitor.snapshot()}")
+    print(f"turns traced: {worker.metrics.turns}")
+    sent = {k: n for k, n in worker.data_stats.messages.items() if n}
+    print(f"data messages: {sent}")
+
+    leaks = 0
+    for ctx, emotion in results:
+        emotions = {m["emotion"] for m in ctx.room.received if m["type"] == "emotion"}
+        states = [m["isSpeaking"] for m in ctx.room.received if m["type"] == "state"]
+        # Flips may coalesce, but what arrives alternates and ends silent
+        alternating = all(a != b for a, b in zip(states, states[1:]))
+        if emotions != {emotion} or not states or states[-1] or not alternating:
+            leaks += 1
+            print(f"✗ {ctx.room.name}: emotions={emotions} states={states}")
+
+    for ctx, _ in results:
+        await ctx.shutdown()
+    print(f"after shutdown: sessions={worker.load_monitor.active_sessions} "
+          f"provider handles={worker.provider_pool.active_sessions} audio buffer bytes={worker.audio_budget.used}")
+    print("✓ all rooms isolated" if not leaks else f"✗ {leaks} rooms saw foreign data")
+    return leaks == 0 and worker.load_monitor.active_sessions == 0 and worker.audio_budget.used == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.rooms, args.turns))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
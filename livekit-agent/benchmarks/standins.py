@@ -0,0 +1,260 @@
+"""
+In-memory stand-ins for LiveKit rooms, jobs and the voice assistant
+Shared by the simulations so VoiceSession can run without a server or
+any provider API.
+"""
+
+import asyncio
+import logging
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio_buffer import AudioBudget  # noqa: E402
+from data_publisher import PublisherStats, decode  # noqa: E402
+from endpointing import AdaptiveEndpointer, EndpointingStats  # noqa: E402
+from interruption import InterruptionStats  # noqa: E402
+from load_monitor import LoadMonitor  # noqa: E402
+from provider_pool import ProviderPool, SessionProviders, SharedConnectionPool  # noqa: E402
+from session_journal import Journal  # noqa: E402
+from session_recording import SessionRecorder  # noqa: E402
+from speculation import SpeculationStats  # noqa: E402
+from turn_metrics import LatencyMetrics  # noqa: E402
+
+FRAME_SECONDS = 0.02
+
+
+class FakeParticipant:
+    def __init__(self, room):
+        self.room = room
+
+    async def publish_data(self, payload, reliable=True):
+        await asyncio.sleep(0)
+        self.room.received.append(decode(payload))
+
+
+class FakeRoom:
+    def __init__(self, name, keep_messages=True):
+        self.name = name
+        self.received = []
+        self.local_participant = FakeParticipant(self) if keep_messages else _DiscardingParticipant()
+
+
+class _DiscardingParticipant:
+    async def publish_data(self, payload, reliable=True):
+        await asyncio.sleep(0)
+
+
+class FakeContext:
+    def __init__(self, name, keep_messages=True):
+        self.room = FakeRoom(name, keep_messages)
+        self.job = SimpleNamespace(id=f"job-{name}")
+        self._shutdown = []
+
+    def add_shutdown_callback(self, callback):
+        self._shutdown.append(callback)
+
+    async def connect(self, **kwargs):
+        await asyncio.sleep(random.uniform(0.001, 0.01))
+
+    async def shutdown(self):
+        for callback in self._shutdown:
+            await callback()
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeAssistant:
+    """Minimal event-emitting stand-in for livekit.agents.voice.Agent"""
+
+    def __init__(self, before_tts_cb, before_llm_cb=None):
+        self.before_tts_cb = before_tts_cb
+        self.before_llm_cb = before_llm_cb
+        self.room = None
+        self._handlers = {}
+
+    def on(self, event):
+        def register(fn):
+            self._handlers.setdefault(event, []).append(fn)
+            return fn
+        return register
+
+    def emit(self, event, *args):
+        for fn in self._handlers.get(event, []):
+            fn(*args)
+
+    def start(self, room):
+        self.room = room
+
+    async def say(self, text, audio=None, allow_interruptions=True):
+        async for _ in audio:
+            pass
+
+    async def reply(self, tokens):
+        """Run an LLM reply through the session's before_tts_cb"""
+        async def stream():
+            for token in tokens:
+                await asyncio.sleep(0)
+                yield token
+
+        self.emit("user_stopped_speaking")
+        self.emit("agent_started_speaking")
+        spoken = [text async for text in self.before_tts_cb(self, stream())]
+        self.emit("agent_stopped_speaking")
+        return "".join(spoken)
+
+    async def stream_audio(self, seconds, frame=b""):
+        """Pace 20ms frames in real time, like the SDK's audio loops"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        for _ in range(max(1, int(seconds / FRAME_SECONDS))):
+            bytes(frame)  # per-frame copy, as when frames cross into/out of rtc
+            deadline += FRAME_SECONDS
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+    async def timed_turn(self, profile, rng, frame=b""):
+        """
+        One full cascaded turn with the profile's timings: user speech,
+        VAD end, final transcript, streamed LLM tokens through before_tts_cb,
+        first TTS audio, playout. Emits the same events as the real Agent.
+        """
+        utterance = profile.utterance(rng)
+        self.emit("user_started_speaking")
+        await self.stream_audio(profile.speech_seconds(utterance), frame)
+        self.emit("user_stopped_speaking")
+        await asyncio.sleep(profile.stt_final.sample(rng))
+        self.emit("user_speech_committed", _Message(utterance))
+        if self.before_llm_cb is not None:
+            self.before_llm_cb(self, None)
+
+        tokens = profile.reply_tokens(rng)
+        ttft = profile.llm_ttft.sample(rng)
+        first_audio = profile.tts_first_audio.sample(rng)
+        interval = 1 / profile.llm_tokens_per_sec
+
+        async def llm_stream():
+            await asyncio.sleep(ttft)
+            for i, token in enumerate(tokens):
+                if i:
+                    await asyncio.sleep(interval)
+                yield token
+
+        spoken = []
+        first_text = asyncio.Event()
+
+        async def consume():
+            async for text in self.before_tts_cb(self, llm_stream()):
+                spoken.append(text)
+                first_text.set()
+            first_text.set()
+
+        consumer = asyncio.create_task(consume())
+        await first_text.wait()
+        await asyncio.sleep(first_audio)
+        self.emit("agent_started_speaking")
+        await consumer
+        text = "".join(spoken)
+        await self.stream_audio(profile.speech_seconds(text), frame)
+        self.emit("agent_stopped_speaking")
+        self.emit("agent_speech_committed", _Message(text))
+        return text
+
+
+class FakeWorker:
+    """Process-wide side of VoiceAIAgent with no network providers"""
+
+    def __init__(self, max_sessions, lag_budget=0.1):
+        self.personality = "default"
+        self.config = {"name": "Sim", "system_prompt": "", "temperature": 0.7}
+        self.connect_options = {}
+        self.metrics = LatencyMetrics()
+        self.metrics_summary_interval = 0
+        self.speculation = SpeculationStats()
+        self.speculation_window = 0
+        self.speculation_min_words = 2
+        self.data_stats = PublisherStats()
+        self.data_binary = True
+        self.data_queue_size = 32
+        self.lipsync_fps = 0
+        self.interruption = InterruptionStats()
+        self.fast_interrupt = True
+        self.interrupt_min_words = 2
+        self.interrupt_resume_after = 0.8
+        self.recording_dir = None
+        self.audio_budget = AudioBudget(32 * 1024 * 1024)
+        self.endpointer = AdaptiveEndpointer()
+        self.endpointing = EndpointingStats()
+        self.journal = Journal(level=logging.WARNING)   # Simulations keep stdout for their report
+        self.load_monitor = LoadMonitor(max_sessions=max_sessions, lag_budget=lag_budget)
+        self.provider_pool = ProviderPool(
+            lambda connections, config: SessionProviders(
+                stt="stt", llm="llm", tts="tts", tts_profile=("fake", "v", "m"), label="fake",
+            ),
+            SharedConnectionPool,
+        )
+
+    def end_job(self, ctx, reason):
+        asyncio.ensure_future(ctx.shutdown())
+
+    def export_job_metrics(self):
+        return None
+
+    async def select_personality(self, ctx):
+        return self.personality, self.config
+
+    def provider_key(self, personality, config):
+        return (personality,)
+
+    def conversation_context(self, providers, config):
+        return None
+
+    def create_assistant(self, providers, config, before_tts_cb, before_llm_cb=None, max_buffered_speech=60.0,
+                         turn_detection=None):
+        return FakeAssistant(before_tts_cb, before_llm_cb)
+
+    def open_recording(self, session):
+        if self.recording_dir is None:
+            return None
+        return SessionRecorder(self.recording_dir / f"{session.room_name}.nzrec", {
+            "room": session.room_name,
+            "personality": session.personality,
+            "providers": session.providers.label,
+            "mode": session.providers.mode,
+            "fast_interrupt": self.fast_interrupt,
+            "interrupt_min_words": self.interrupt_min_words,
+            "lipsync_fps": self.lipsync_fps,
+            "endpointer": self.endpointer.name,
+            "vad_silence": self.endpointer.min_silence,
+        }, audio=False)
+
+    def record_input_audio(self, ctx, recorder):
+        return set()
+
+    def tap_tts(self, tts_provider, on_frame):
+        return tts_provider
+
+    def pause_playout(self, assistant):
+        return False
+
+    def resume_playout(self, assistant):
+        pass
+
+    def interrupt_reply(self, assistant):
+        pass
+
+    def greeting_text(self, config=None):
+        return "Hello!"
+
+    def cached_audio(self, text, providers):
+        async def frames():
+            yield b"\x00" * 960
+        return frames()
+
+    def detect_emotion(self, text):
+        return "neutral"
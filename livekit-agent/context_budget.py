@@ -0,0 +1,220 @@
+"""
+Token-budgeted conversation context
+Keeps what is sent to the LLM within a fixed budget - the system prompt, a
+rolling summary of older turns and as many recent turns verbatim as fit.
+The summary is refreshed by a background task, never on the turn's
+critical path
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+# Roughly one BPE token per short word piece or punctuation mark
+_TOKEN_PIECES = re.compile(r"\w{1,4}|[^\w\s]")
+MESSAGE_OVERHEAD = 4   # Role and separators the chat format adds per message
+RETRY_AFTER = 30.0     # Seconds before retrying a failed summary
+
+PINNED_ROLES = ("system", "developer")
+
+
+def count_tokens(text: str) -> int:
+    """Token estimate for text (close to BPE for English, generous for other scripts)"""
+    return len(_TOKEN_PIECES.findall(text))
+
+
+@dataclass(frozen=True)
+class Turn:
+    """One chat item as the budget sees it"""
+    id: str
+    role: str
+    text: str
+
+
+@dataclass
+class ContextBudget:
+    """
+    Token limits for one personality's prompts.
+
+    max_tokens covers everything sent: pinned system messages, the summary
+    and recent turns. While a summary is being written the prompt may run
+    over by up to overflow_tokens rather than lose turns.
+    """
+    max_tokens: int = 3000
+    summary_tokens: int = 400
+    min_recent: int = 4             # Messages always kept verbatim
+    summarize_after: int = 400      # Evicted-but-unsummarized tokens that trigger a summary
+    overflow_tokens: int = 800
+
+    @classmethod
+    def for_personality(cls, config: dict, max_tokens: int) -> "ContextBudget":
+        """Budget scaled to the personality's "context_tokens" (or the worker default)"""
+        total = int(config.get("context_tokens", max_tokens))
+        return cls(
+            max_tokens=total,
+            summary_tokens=max(100, total // 8),
+            summarize_after=max(100, total // 8),
+            overflow_tokens=max(200, total // 4),
+        )
+
+
+Summarizer = Callable[[str, List[Turn], int], Awaitable[str]]
+
+
+class ContextStats(ProcessLocal):
+    """Process-wide prompt size and summarization counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.prompt_tokens = 0
+        self.history_tokens = 0      # What the full history would have cost
+        self.summaries = 0
+        self.summary_failures = 0
+        self.summary_seconds = 0.0
+
+    def prompt(self, tokens: int, history: int):
+        with self._lock:
+            self.prompts += 1
+            self.prompt_tokens += tokens
+            self.history_tokens += history
+
+    def summary(self, seconds: float, ok: bool):
+        with self._lock:
+            if ok:
+                self.summaries += 1
+                self.summary_seconds += seconds
+            else:
+                self.summary_failures += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        with self._lock:
+            return "\n".join([
+                "# HELP voice_context_prompt_tokens_total Estimated tokens sent to the LLM per turn, summed",
+                "# TYPE voice_context_prompt_tokens_total counter",
+                f"voice_context_prompt_tokens_total {self.prompt_tokens}",
+                "# HELP voice_context_history_tokens_total Tokens the full history would have sent",
+                "# TYPE voice_context_history_tokens_total counter",
+                f"voice_context_history_tokens_total {self.history_tokens}",
+                "# TYPE voice_context_prompts_total counter",
+                f"voice_context_prompts_total {self.prompts}",
+                "# HELP voice_context_summaries_total Background summaries by outcome",
+                "# TYPE voice_context_summaries_total counter",
+                f'voice_context_summaries_total{{outcome="ok"}} {self.summaries}',
+                f'voice_context_summaries_total{{outcome="failed"}} {self.summary_failures}',
+                "# TYPE voice_context_summary_seconds_total counter",
+                f"voice_context_summary_seconds_total {self.summary_seconds:.6f}",
+            ]) + "\n"
+
+
+class ConversationContext:
+    """
+    One session's view of its chat history under a token budget.
+
+    select() is called with the full history before every LLM request and
+    returns what to send. Token counts are cached per message, so a turn
+    only counts the messages added since the last one. Turns that fall out
+    of the verbatim window are folded into the summary by a background
+    task; until it finishes they stay in the prompt (up to the overflow
+    allowance) so nothing is silently lost.
+    """
+
+    def __init__(self, budget: ContextBudget, summarize: Summarizer, stats: Optional[ContextStats] = None):
+        self.budget = budget
+        self._summarize = summarize
+        self.stats = stats
+        self.summary = ""
+        self._summary_tokens = 0
+        self._summarized: set = set()
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+
+    def tokens(self, turn: Turn) -> int:
+        key = (turn.id, len(turn.text))
+        count = self._counts.get(key)
+        if count is None:
+            count = self._counts[key] = count_tokens(turn.text) + MESSAGE_OVERHEAD
+        return count
+
+    def select(self, items: Sequence[Turn]) -> Tuple[List[Turn], str, List[Turn]]:
+        """(pinned, summary, recent) to send, oldest first; may start a summary"""
+        budget = self.budget
+        pinned = [t for t in items if t.role in PINNED_ROLES]
+        history = [t for t in items if t.role not in PINNED_ROLES]
+        used = sum(self.tokens(t) for t in pinned)
+        if self.summary:
+            used += self._summary_tokens + MESSAGE_OVERHEAD
+
+        # Newest turns first, while they fit (and always the last few)
+        start = len(history)
+        for i in range(len(history) - 1, -1, -1):
+            cost = self.tokens(history[i])
+            if used + cost > budget.max_tokens and len(history) - i > budget.min_recent:
+                break
+            used += cost
+            start = i
+        backlog = [t for t in history[:start] if t.id not in self._summarized]
+
+        # Older turns the summary doesn't cover yet ride along in the overflow
+        limit = budget.max_tokens + budget.overflow_tokens
+        while start and history[start - 1].id not in self._summarized:
+            cost = self.tokens(history[start - 1])
+            if used + cost > limit:
+                break
+            used += cost
+            start -= 1
+
+        if backlog and self._task is None and time.monotonic() >= self._retry_at:
+            dropped = start and history[start - 1].id not in self._summarized
+            if dropped or sum(self.tokens(t) for t in backlog) >= budget.summarize_after:
+                self._task = asyncio.create_task(self._refresh(backlog))
+
+        if self.stats is not None:
+            self.stats.prompt(used, sum(self.tokens(t) for t in items))
+        return pinned, self.summary, history[start:]
+
+    async def _refresh(self, turns: List[Turn]):
+        started = time.perf_counter()
+        try:
+            summary = await self._summarize(self.summary, turns, self.budget.summary_tokens)
+        except Exception as e:
+            logger.warning(f"⚠️ Conversation summary failed: {e}")
+            self._retry_at = time.monotonic() + RETRY_AFTER
+            ok = False
+        else:
+            summary = truncate_tokens(summary.strip(), self.budget.summary_tokens)
+            self.summary = summary
+            self._summary_tokens = count_tokens(summary)
+            self._summarized.update(t.id for t in turns)
+            ok = True
+        finally:
+            self._task = None
+        if self.stats is not None:
+            self.stats.summary(time.perf_counter() - started, ok)
+
+    def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at the word where the estimate reaches max_tokens"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    total = 0
+    for i, word in enumerate(words):
+        total += count_tokens(word)
+        if total > max_tokens:
+            return " ".join(words[:i])
+    return text
@@ -0,0 +1,282 @@
+"""
+Data-channel publisher
+One per session: messages go through a bounded queue drained by a single
+tracked task, superseded state (speaking flag, emotion) is coalesced so
+only the latest value is sent, and each message type has its own delivery
+mode and wire encoding
+"""
+
+import asyncio
+import json
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+# Binary frames start with the version byte; JSON always starts with "{"
+WIRE_VERSION = 1
+_HEADER = struct.Struct("<BB")          # version, message code
+_STATE = struct.Struct("<?")            # isSpeaking
+_EMOTION = struct.Struct("<Bd")         # emotion code, timestamp
+_VISEME = struct.Struct("<HI6s")        # utterance, playout ms, level + 5 viseme weights (0-255)
+
+# Wire codes are an append-only list - clients decode by index
+EMOTION_CODES = (
+    "neutral", "happy", "sad", "angry", "stressed", "calm", "love",
+    "concerned", "thoughtful", "excited", "playful",
+)
+_EMOTION_INDEX = {emotion: i for i, emotion in enumerate(EMOTION_CODES)}
+
+OUTCOMES = ("sent", "coalesced", "dropped", "failed")
+ENCODINGS = ("binary", "json")
+
+
+@dataclass(frozen=True)
+class MessageType:
+    """How one kind of data message is delivered"""
+    code: int
+    reliable: bool
+    coalesce: bool   # A newer message replaces a queued one of the same type
+    always_binary: bool = False   # Too frequent for JSON; only sent to clients that decode frames
+
+
+MESSAGE_TYPES: Dict[str, MessageType] = {
+    "state": MessageType(code=1, reliable=True, coalesce=True),
+    "emotion": MessageType(code=2, reliable=True, coalesce=True),
+    "metrics": MessageType(code=3, reliable=False, coalesce=True),
+    "viseme": MessageType(code=4, reliable=False, coalesce=False, always_binary=True),
+}
+
+
+def encode_json(kind: str, fields: dict) -> bytes:
+    return json.dumps({"type": kind, **fields}).encode('utf-8')
+
+
+def encode_binary(kind: str, fields: dict) -> Optional[bytes]:
+    """Compact frame for the message, or None when it has no binary layout"""
+    code = MESSAGE_TYPES[kind].code
+    if kind == "state":
+        return _HEADER.pack(WIRE_VERSION, code) + _STATE.pack(fields["isSpeaking"])
+    if kind == "emotion":
+        index = _EMOTION_INDEX.get(fields["emotion"])
+        if index is None:
+            return None
+        return _HEADER.pack(WIRE_VERSION, code) + _EMOTION.pack(index, fields.get("timestamp", 0.0))
+    if kind == "viseme":
+        return _HEADER.pack(WIRE_VERSION, code) + _VISEME.pack(fields["seq"], fields["offset_ms"], fields["levels"])
+    return None
+
+
+def decode(payload: bytes) -> dict:
+    """Inverse of the encoders (used by the simulations; the client has its own)"""
+    if payload[:1] == b"{":
+        return json.loads(payload)
+    version, code = _HEADER.unpack_from(payload)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported data frame version {version}")
+    body = payload[_HEADER.size:]
+    if code == MESSAGE_TYPES["state"].code:
+        (speaking,) = _STATE.unpack(body)
+        return {"type": "state", "isSpeaking": speaking}
+    if code == MESSAGE_TYPES["emotion"].code:
+        index, timestamp = _EMOTION.unpack(body)
+        return {"type": "emotion", "emotion": EMOTION_CODES[index], "timestamp": timestamp}
+    if code == MESSAGE_TYPES["viseme"].code:
+        seq, offset_ms, levels = _VISEME.unpack(body)
+        return {"type": "viseme", "seq": seq, "offset_ms": offset_ms, "levels": levels}
+    raise ValueError(f"Unknown data frame code {code}")
+
+
+class PublisherStats(ProcessLocal):
+    """Process-wide data-channel counters, summed over every session's publisher"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.messages = {(kind, outcome): 0 for kind in MESSAGE_TYPES for outcome in OUTCOMES}
+        self.bytes = {encoding: 0 for encoding in ENCODINGS}
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def record(self, kind: str, outcome: str):
+        with self._lock:
+            self.messages[(kind, outcome)] += 1
+
+    def sent(self, kind: str, encoding: str, size: int):
+        with self._lock:
+            self.messages[(kind, "sent")] += 1
+            self.bytes[encoding] += size
+
+    def depth_changed(self, delta: int):
+        with self._lock:
+            self.queue_depth += delta
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        with self._lock:
+            lines = [
+                "# HELP voice_data_messages_total Data-channel messages by type and outcome",
+                "# TYPE voice_data_messages_total counter",
+            ]
+            lines += [
+                f'voice_data_messages_total{{type="{kind}",outcome="{outcome}"}} {n}'
+                for (kind, outcome), n in self.messages.items()
+            ]
+            lines += [
+                "# HELP voice_data_bytes_total Data-channel payload bytes by encoding",
+                "# TYPE voice_data_bytes_total counter",
+            ]
+            lines += [f'voice_data_bytes_total{{encoding="{e}"}} {n}' for e, n in self.bytes.items()]
+            lines += [
+                "# HELP voice_data_queue_depth Messages waiting to be published, all sessions",
+                "# TYPE voice_data_queue_depth gauge",
+                f"voice_data_queue_depth {self.queue_depth}",
+                "# HELP voice_data_queue_depth_max Highest queue depth seen",
+                "# TYPE voice_data_queue_depth_max gauge",
+                f"voice_data_queue_depth_max {self.max_queue_depth}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class DataPublisher:
+    """
+    Publishes one session's data messages in order from a single task.
+
+    publish() never blocks and may be called from sync event handlers.
+    Sends are started in queue order with at most max_in_flight
+    outstanding; while they are, new messages wait in the queue.
+    Coalescing types keep one slot each, so a burst of speaking-state flips
+    becomes a single message with the final value. When the queue is full,
+    a queued lossy message is dropped to make room, otherwise the oldest
+    one; a lossy message arriving at a full queue is itself dropped.
+    """
+
+    def __init__(
+        self,
+        participant: Callable[[], Any],
+        stats: PublisherStats,
+        binary: bool = False,
+        max_queue: int = 32,
+        max_in_flight: int = 4,
+        on_sent: Optional[Callable[[bytes], None]] = None,
+    ):
+        """
+        Args:
+            participant: Returns the local participant (or None before the room is joined)
+            stats: Process-wide counters
+            binary: Use the binary frame where the message type has one
+            max_queue: Queued messages beyond which messages are dropped
+            max_in_flight: publish_data calls awaiting completion at once
+            on_sent: Called with each payload the room accepted (session recording)
+        """
+        self._participant = participant
+        self.stats = stats
+        self.binary = binary
+        self.max_queue = max_queue
+        self.max_in_flight = max_in_flight
+        self.on_sent = on_sent
+        self._sending: set = set()
+        self._queue: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def publish(self, kind: str, **fields):
+        """Queue a message; coalesced or dropped according to its type"""
+        if self._closed:
+            return
+        spec = MESSAGE_TYPES[kind]
+        if spec.coalesce and kind in self._queue:
+            # Keep the original position so ordering against other types holds
+            self._queue[kind] = (kind, fields)
+            self.stats.record(kind, "coalesced")
+            return
+        if len(self._queue) >= self.max_queue and not self._make_room(spec):
+            self.stats.record(kind, "dropped")
+            return
+
+        self._seq += 1
+        self._queue[kind if spec.coalesce else (kind, self._seq)] = (kind, fields)
+        self.stats.depth_changed(1)
+        self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(self._task_done)
+
+    def _make_room(self, spec: MessageType) -> bool:
+        """Drop a queued message for an incoming one; False drops the incoming one"""
+        victim = next((key for key, (kind, _) in self._queue.items() if not MESSAGE_TYPES[kind].reliable), None)
+        if victim is None:
+            if not spec.reliable:
+                return False
+            victim = next(iter(self._queue))
+        kind, _ = self._queue.pop(victim)
+        self.stats.record(kind, "dropped")
+        self.stats.depth_changed(-1)
+        return True
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                if len(self._sending) >= self.max_in_flight:
+                    await asyncio.wait(self._sending, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                _, (kind, fields) = self._queue.popitem(last=False)
+                self.stats.depth_changed(-1)
+                send = asyncio.create_task(self._send(kind, fields))
+                self._sending.add(send)
+                send.add_done_callback(self._sending.discard)
+
+    async def _send(self, kind: str, fields: dict):
+        spec = MESSAGE_TYPES[kind]
+        payload = encode_binary(kind, fields) if self.binary or spec.always_binary else None
+        encoding = "binary"
+        if payload is None:
+            payload, encoding = encode_json(kind, fields), "json"
+        participant = self._participant()
+        if participant is None:
+            self.stats.record(kind, "dropped")
+            return
+        try:
+            await participant.publish_data(payload, reliable=spec.reliable)
+        except Exception as e:
+            self.stats.record(kind, "failed")
+            logger.debug(f"Data message {kind} not sent: {e}")
+        else:
+            self.stats.sent(kind, encoding, len(payload))
+            if self.on_sent is not None:
+                self.on_sent(payload)
+
+    def _task_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Data publisher stopped", exc_info=task.exception())
+
+    async def aclose(self, timeout: float = 1.0):
+        """Send what is queued (up to timeout), then stop"""
+        self._closed = True
+        if self._task is None:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (self._queue or self._sending) and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+        self._task.cancel()
+        for send in list(self._sending):
+            send.cancel()
+        for kind, _ in self._queue.values():
+            self.stats.record(kind, "dropped")
+        self.stats.depth_changed(-len(self._queue))
+        self._queue.clear()
@@ -0,0 +1,133 @@
+"""
+Keyword emotion classifier
+The keyword table (matching the frontend's labels) is precomputed once into
+a word -> emotions lookup, and every emotion is scored in one pass
+"""
+
+import string
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List
+
+NEUTRAL = "neutral"
+
+# Emotion -> keywords. Order is the tie-break: earlier emotions win ties.
+EMOTION_KEYWORDS = {
+    "happy": ["happy", "joy", "glad", "excited", "great", "awesome", "wonderful", "love", "perfect", "amazing", "haha", "yay"],
+    "sad": ["sad", "unhappy", "depressed", "sorry", "down", "miserable", "terrible", "bad", "hurt", "crying"],
+    "angry": ["angry", "mad", "furious", "annoyed", "frustrated", "pissed", "hate", "stupid"],
+    "stressed": ["stressed", "anxious", "worried", "nervous", "busy", "deadline", "scared"],
+    "calm": ["calm", "chill", "relax", "peace", "fine", "okay", "alright"],
+    "love": ["love", "adore", "miss you", "hug", "kiss", "babe", "honey", "darling"],
+    "concerned": ["careful", "watch out", "worried about", "are you okay", "safe"],
+    "thoughtful": ["hmm", "interesting", "maybe", "think", "consider", "let's see"],
+}
+
+# Punctuation becomes a word break; apostrophes stay ("let's", "you're")
+_SEPARATORS = str.maketrans({
+    **{ch: " " for ch in string.punctuation.replace("'", "") + "—–…“”"},
+    "’": "'",
+    "‘": "'",
+})
+
+
+def _inflections(word: str) -> List[str]:
+    """A keyword plus the forms it commonly takes ("relaxed", "hugging", "joyful")"""
+    forms = [word, word + "s", word + "es", word + "ed", word + "ing", word + "ly", word + "ful"]
+    if word.endswith("e"):
+        forms += [word + "d", word[:-1] + "ing"]
+    elif len(word) <= 4 and word[-1] not in "aeiouwy" and word[-2] in "aeiou":
+        # hug -> hugged, hugging; mad -> madder
+        forms += [word + word[-1] + "ed", word + word[-1] + "ing", word + word[-1] + "er"]
+    return forms
+
+
+class EmotionClassifier:
+    """
+    Scores text against a keyword table.
+
+    Text is split into words once and intersected with a precomputed table
+    of keyword forms, so keywords only match whole words ("bad" no longer
+    fires on "badge") and the cost is one pass however many keywords there
+    are. An emotion's score is the number of distinct keywords present.
+    Multi-word phrases are matched on word boundaries too, and a phrase
+    claims its words: "worried about" counts for concerned, not stressed.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]] = EMOTION_KEYWORDS):
+        self.emotions = list(keywords)
+        self._rank = {emotion: i for i, emotion in enumerate(self.emotions)}
+        self._words: Dict[str, tuple] = {}      # word form -> (keyword, emotions)
+        self._phrases: Dict[str, tuple] = {}    # phrase -> (words, emotions)
+        labels: Dict[str, tuple] = {}
+        for emotion, words in keywords.items():
+            for word in words:
+                word = word.lower()
+                labels[word] = labels.get(word, ()) + (emotion,)
+        for keyword, emotions in labels.items():
+            if " " in keyword:
+                self._phrases[keyword] = (frozenset(keyword.split()), emotions)
+                continue
+            for form in _inflections(keyword):
+                self._words.setdefault(form, (keyword, emotions))
+        self._keys = frozenset(self._words)
+
+    def scores(self, text: str) -> Counter:
+        """Distinct keyword hits per emotion"""
+        tokens = text.lower().translate(_SEPARATORS).split()
+        present = set(tokens)
+        keywords = {self._words[form] for form in present & self._keys}
+        counts: Counter = Counter()
+
+        joined = None
+        for phrase, (words, emotions) in self._phrases.items():
+            if words <= present:
+                if joined is None:
+                    joined = f" {' '.join(tokens)} "
+                found = joined.count(f" {phrase} ")
+                if not found:
+                    continue
+                for emotion in emotions:
+                    counts[emotion] += 1
+                # Words only seen inside the phrase don't count on their own
+                for keyword, word_emotions in list(keywords):
+                    if f" {keyword} " in f" {phrase} " and joined.count(f" {keyword} ") == found:
+                        keywords.discard((keyword, word_emotions))
+
+        for _, emotions in keywords:
+            for emotion in emotions:
+                counts[emotion] += 1
+        return counts
+
+    def best(self, counts: Counter) -> str:
+        """Highest-scoring emotion, earlier table entries winning ties"""
+        if not counts:
+            return NEUTRAL
+        rank = self._rank
+        return min(counts, key=lambda emotion: (-counts[emotion], rank[emotion]))
+
+    def classify(self, text: str) -> str:
+        return self.best(self.scores(text))
+
+    def classify_batch(self, texts: Iterable[str]) -> List[str]:
+        """One label per text (e.g. every turn of a transcript)"""
+        return [self.classify(text) for text in texts]
+
+    def rolling(self, texts: Iterable[str], window: int = 3) -> Iterator[str]:
+        """
+        Label of the last `window` texts after each new one - a smoothed
+        mood for a conversation, updated incrementally.
+        """
+        history = []
+        total: Counter = Counter()
+        for text in texts:
+            counts = self.scores(text)
+            history.append(counts)
+            total.update(counts)
+            if len(history) > window:
+                total.subtract(history.pop(0))
+                total = +total   # Drop zero counts
+            yield self.best(total)
+
+
+# Shared instance - building the tables is the expensive part
+classifier = EmotionClassifier()
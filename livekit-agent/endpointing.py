@@ -0,0 +1,275 @@
+"""
+Adaptive end-of-turn detection
+Decides per utterance how much trailing silence ends the user's turn, from
+cheap features of the transcript so far: a finished question or a "yes"
+ends early, a trailing "and", "um" or "the" waits longer. Plain string
+checks - no model, microseconds per decision
+"""
+
+import asyncio
+import importlib
+import logging
+import re
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+from process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+DECISIONS = ("early", "default", "extended")
+
+# The user starting again this soon after their turn was ended counts as a cut-off
+RESUME_WINDOW = 1.0
+
+_WORDS = re.compile(r"[\w']+")
+
+# First words that make an utterance a question even without a "?"
+_QUESTION_STARTS = frozenset("""
+    what what's whats where where's when when's why who who's whom whose which how how's
+    is isn't are aren't am was wasn't were weren't do don't does doesn't did didn't
+    can can't could couldn't will won't would wouldn't should shouldn't shall may might
+    have haven't has hasn't had hadn't
+""".split())
+
+# Last words that leave a sentence hanging: conjunctions, fillers, articles,
+# possessives, prepositions, auxiliaries and dangling subject contractions.
+# Only checked without terminal punctuation ("I wish I could." is finished).
+_TRAILING = frozenset("""
+    and but or nor so because cause cuz if then when while although though unless until since than that
+    um umm uh uhh uhm er erm hmm like well
+    the a an my your his her its our their this these those some any every no
+    to of in on at for with about from into onto by as via
+    is are was were am be been being could would should can will might must
+    i'm i'll i've i'd we're we'll they're you're he's she's it's there's gonna wanna
+""".split())
+
+# Whole answers that are complete on their own
+_SHORT_ANSWERS = frozenset("""
+    yes yeah yep yup no nope nah ok okay sure thanks thank alright right fine cool great hi hello hey bye goodbye
+""".split())
+
+
+class Features(NamedTuple):
+    words: int
+    terminal: bool        # Ends in . ! or ? (not an ellipsis)
+    question: bool        # Ends in ? or starts like a question
+    trailing: bool        # Ends on a word, comma or ellipsis that leaves the sentence open
+    short_answer: bool    # One or two words that answer on their own ("yes", "thank you")
+
+
+def features(text: str) -> Features:
+    """End-of-turn cues in a (partial) transcript"""
+    text = text.strip()
+    words = _WORDS.findall(text.lower())
+    if not words:
+        return Features(0, False, False, False, False)
+    ellipsis = text.endswith("...") or text.endswith("…")
+    terminal = not ellipsis and text[-1] in ".!?"
+    trailing = ellipsis or text[-1] in ",-" or (not terminal and words[-1] in _TRAILING)
+    question = text.endswith("?") or (words[0] in _QUESTION_STARTS and not trailing)
+    short_answer = len(words) <= 2 and words[0] in _SHORT_ANSWERS
+    return Features(len(words), terminal, question, trailing, short_answer)
+
+
+class Endpointer:
+    """
+    Trailing-silence policy: silence(text) is how long the user must be
+    quiet, counted from the end of their speech, before the turn ends.
+
+    min_silence is the shortest window the policy ever returns - the VAD is
+    set to it - and max_silence the longest. Subclasses (or any class with
+    these attributes, see create_endpointer) override silence().
+    """
+
+    name = "fixed"
+
+    def __init__(self, min_silence: float = 0.5, default: float = 0.5, max_silence: float = 0.5):
+        self.min_silence = min_silence
+        self.default = default
+        self.max_silence = max_silence
+
+    def silence(self, text: str) -> float:
+        return self.default
+
+    def decision(self, window: float) -> str:
+        if window < self.default:
+            return "early"
+        return "extended" if window > self.default else "default"
+
+
+class FixedEndpointer(Endpointer):
+    """The same window for every utterance (the VAD setting before adaptive endpointing)"""
+
+    def __init__(self, min_silence: float = 0.5, default: float = 0.5, max_silence: float = 0.5):
+        super().__init__(default, default, default)
+
+
+class AdaptiveEndpointer(Endpointer):
+    """
+    Shortens the window for utterances that sound finished and extends it
+    for ones left hanging:
+
+        trailing word, comma or ellipsis      max_silence
+        question, or a lone "yes"/"thanks"    min_silence
+        ends in . or !                        halfway between min and default
+        anything else                         default
+    """
+
+    name = "adaptive"
+
+    def __init__(self, min_silence: float = 0.25, default: float = 0.5, max_silence: float = 1.5):
+        super().__init__(min_silence, default, max_silence)
+
+    def silence(self, text: str) -> float:
+        cues = features(text)
+        if not cues.words:
+            return self.default
+        if cues.trailing:
+            return self.max_silence
+        if cues.question or cues.short_answer:
+            return self.min_silence
+        if cues.terminal:
+            return (self.min_silence + self.default) / 2
+        return self.default
+
+
+ENDPOINTERS: Dict[str, Callable[..., Endpointer]] = {
+    "fixed": FixedEndpointer,
+    "adaptive": AdaptiveEndpointer,
+}
+
+
+def create_endpointer(spec: str, **windows) -> Endpointer:
+    """
+    Build an endpointer by name ("fixed", "adaptive") or import path
+    ("package.module:ClassName"); windows are passed to its constructor
+    """
+    factory = ENDPOINTERS.get(spec)
+    if factory is None:
+        module, _, attr = spec.partition(":")
+        if not attr:
+            raise ValueError(f"Unknown endpointer {spec!r} (expected one of {', '.join(ENDPOINTERS)} or module:Class)")
+        factory = getattr(importlib.import_module(module), attr)
+    return factory(**windows)
+
+
+class EndpointingStats(ProcessLocal):
+    """
+    Process-wide end-of-turn counters.
+
+    Decisions are early/default/extended relative to the default window;
+    resumed counts turns where the user spoke again within RESUME_WINDOW of
+    the turn being ended - most likely cut off mid-thought.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.decisions = {decision: 0 for decision in DECISIONS}
+        self.silence_seconds = 0.0
+        self.resumed = 0
+
+    def record(self, decision: str, window: float):
+        with self._lock:
+            self.decisions[decision] += 1
+            self.silence_seconds += window
+
+    def record_resumed(self):
+        with self._lock:
+            self.resumed += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        with self._lock:
+            turns = sum(self.decisions.values())
+            lines = [
+                "# HELP voice_endpoint_decisions_total End-of-turn windows relative to the default",
+                "# TYPE voice_endpoint_decisions_total counter",
+            ]
+            lines += [f'voice_endpoint_decisions_total{{decision="{d}"}} {n}' for d, n in self.decisions.items()]
+            lines += [
+                "# HELP voice_endpoint_silence_seconds Trailing silence required to end a turn",
+                "# TYPE voice_endpoint_silence_seconds summary",
+                f"voice_endpoint_silence_seconds_sum {self.silence_seconds:.6f}",
+                f"voice_endpoint_silence_seconds_count {turns}",
+                "# HELP voice_endpoint_resumed_total Turns the user continued right after they were ended",
+                "# TYPE voice_endpoint_resumed_total counter",
+                f"voice_endpoint_resumed_total {self.resumed}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _user_text(chat_ctx) -> str:
+    for item in reversed(getattr(chat_ctx, "items", ())):
+        if getattr(item, "role", None) == "user":
+            return item.text_content or ""
+    return ""
+
+
+class EndOfTurn:
+    """
+    One session's end-of-turn detector, given to the framework as its
+    turn_detection.
+
+    The VAD ends speech after the endpointer's min_silence; the framework
+    then asks predict_end_of_turn() about the transcript, which waits out
+    the rest of the utterance's window (counted from the end of speech)
+    and answers "done". If the user speaks again first, the framework
+    cancels the wait and the turn goes on.
+    """
+
+    def __init__(self, endpointer: Endpointer, stats: EndpointingStats, clock: Callable[[], float] = time.monotonic):
+        self.endpointer = endpointer
+        self.stats = stats
+        self.clock = clock
+        self._text = ""
+        self._speech_end: Optional[float] = None
+        self._ended_at: Optional[float] = None
+
+    # The framework's turn detector interface
+
+    @property
+    def model(self) -> str:
+        return self.endpointer.name
+
+    @property
+    def provider(self) -> str:
+        return "local"
+
+    async def supports_language(self, language: Optional[str]) -> bool:
+        return True
+
+    async def unlikely_threshold(self, language: Optional[str]) -> Optional[float]:
+        return None   # The wait happens in predict_end_of_turn, never the framework's max delay
+
+    async def predict_end_of_turn(self, chat_ctx, *, timeout: Optional[float] = None) -> float:
+        text = _user_text(chat_ctx) or self._text
+        window = self.endpointer.silence(text)
+        speech_end = self._speech_end
+        if speech_end is None:
+            speech_end = self.clock() - self.endpointer.min_silence
+        wait = speech_end + window - self.clock()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        decision = self.endpointer.decision(window)
+        self.stats.record(decision, window)
+        logger.debug(f"⏱️ End of turn after {window * 1000:.0f}ms of silence ({decision}): {text!r}")
+        self._ended_at = self.clock()
+        self._text = ""
+        return 1.0
+
+    # Session events
+
+    def vad_start(self):
+        if self._ended_at is not None and self.clock() - self._ended_at < RESUME_WINDOW:
+            self.stats.record_resumed()
+        self._ended_at = None
+        self._speech_end = None
+
+    def vad_end(self):
+        # The VAD reports the end of speech min_silence after it happened
+        self._speech_end = self.clock() - self.endpointer.min_silence
+
+    def transcript(self, text: str, is_final: bool = False):
+        self._text = text
@@ -0,0 +1,211 @@
+"""
+Fake STT / LLM / TTS providers
+Deterministic, network-free stand-ins for the real plugins, driven by a
+FakeProviderProfile. Selected with FAKE_PROVIDERS=1 for offline load tests.
+"""
+
+import asyncio
+import itertools
+import math
+from array import array
+
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    NOT_GIVEN,
+    APIConnectOptions,
+    NotGivenOr,
+    llm,
+    stt,
+    tts,
+    utils,
+)
+
+from context_budget import count_tokens
+from load_profile import FakeProviderProfile
+
+FRAME_MS = 20
+
+
+def _speech_event(kind: stt.SpeechEventType, text: str) -> stt.SpeechEvent:
+    return stt.SpeechEvent(
+        type=kind,
+        request_id=utils.shortuuid(),
+        alternatives=[stt.SpeechData(language="en", text=text, confidence=1.0)],
+    )
+
+
+def _voice_frames(sample_rate: int, count: int = 8) -> list:
+    """A few 20ms frames of a 180 Hz tone at different loudness (syllable-ish)"""
+    samples = sample_rate * FRAME_MS // 1000
+    frames = []
+    for i in range(count):
+        level = 6000 * (0.25 + 0.75 * abs(math.sin(i * math.pi / count)))
+        pcm = array("h", (int(level * math.sin(2 * math.pi * 180 * n / sample_rate)) for n in range(samples)))
+        frames.append(pcm.tobytes())
+    return frames
+
+
+class FakeSTT(stt.STT):
+    """Streaming STT: interim transcripts while audio arrives, a final one on flush"""
+
+    def __init__(self, profile: FakeProviderProfile, name: str = "stt"):
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=True))
+        self.profile = profile
+        self._name = name
+        self._streams = itertools.count()
+
+    @property
+    def provider(self) -> str:
+        return "fake"
+
+    def _rng(self):
+        return self.profile.rng(f"{self._name}:{next(self._streams)}")
+
+    async def _recognize_impl(
+        self,
+        buffer,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.SpeechEvent:
+        rng = self._rng()
+        await asyncio.sleep(self.profile.stt_final.sample(rng))
+        return _speech_event(stt.SpeechEventType.FINAL_TRANSCRIPT, self.profile.utterance(rng))
+
+    def stream(
+        self,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> "FakeSpeechStream":
+        return FakeSpeechStream(stt=self, conn_options=conn_options)
+
+
+class FakeSpeechStream(stt.RecognizeStream):
+    def __init__(self, *, stt: FakeSTT, conn_options: APIConnectOptions):
+        super().__init__(stt=stt, conn_options=conn_options)
+        self._fake = stt
+        self._rng = stt._rng()
+
+    async def _run(self) -> None:
+        profile = self._fake.profile
+        interim_every = max(1, profile.interim_every_ms // FRAME_MS)
+        words = profile.utterance(self._rng).split()
+        frames = 0
+        async for data in self._input_ch:
+            if isinstance(data, self._FlushSentinel):
+                if frames:
+                    await asyncio.sleep(profile.stt_final.sample(self._rng))
+                    self._event_ch.send_nowait(
+                        _speech_event(stt.SpeechEventType.FINAL_TRANSCRIPT, " ".join(words))
+                    )
+                    words = profile.utterance(self._rng).split()
+                    frames = 0
+                continue
+            frames += 1
+            if frames % interim_every == 0:
+                shown = words[:min(len(words), frames // interim_every)]
+                self._event_ch.send_nowait(
+                    _speech_event(stt.SpeechEventType.INTERIM_TRANSCRIPT, " ".join(shown))
+                )
+
+
+class FakeLLM(llm.LLM):
+    """Streams a tagged reply after time-to-first-token, at a fixed token rate"""
+
+    def __init__(self, profile: FakeProviderProfile, name: str = "llm"):
+        super().__init__()
+        self.profile = profile
+        self._name = name
+        self._streams = itertools.count()
+
+    @property
+    def model(self) -> str:
+        return "fake"
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools=None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        **kwargs,
+    ) -> "FakeLLMStream":
+        return FakeLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class FakeLLMStream(llm.LLMStream):
+    def __init__(self, fake_llm: FakeLLM, *, chat_ctx, tools, conn_options):
+        super().__init__(fake_llm, chat_ctx=chat_ctx, tools=tools, conn_options=conn_options)
+        self._fake = fake_llm
+        self._rng = fake_llm.profile.rng(f"{fake_llm._name}:{next(fake_llm._streams)}")
+
+    async def _run(self) -> None:
+        profile = self._fake.profile
+        request_id = utils.shortuuid()
+        interval = 1 / profile.llm_tokens_per_sec
+        ttft = profile.llm_ttft.sample(self._rng)
+        if profile.llm_prefill_ms_per_1k_tokens:
+            # Longer prompts take longer to prefill
+            prompt = sum(
+                count_tokens(item.text_content or "") for item in self.chat_ctx.items if item.type == "message"
+            )
+            ttft += profile.llm_prefill_ms_per_1k_tokens * prompt / 1e6
+        await asyncio.sleep(ttft)
+        for i, token in enumerate(profile.reply_tokens(self._rng)):
+            if i:
+                await asyncio.sleep(interval)
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", content=token))
+            )
+
+
+class FakeTTS(tts.TTS):
+    """Synthesizes a tone as long as the text would take to speak"""
+
+    def __init__(self, profile: FakeProviderProfile, name: str = "tts"):
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=profile.sample_rate,
+            num_channels=1,
+        )
+        self.profile = profile
+        self._name = name
+        self._streams = itertools.count()
+        self._frames = _voice_frames(profile.sample_rate)
+
+    @property
+    def model(self) -> str:
+        return "fake"
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "FakeChunkedStream":
+        return FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class FakeChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: FakeTTS, input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._fake = tts
+        self._rng = tts.profile.rng(f"{tts._name}:{next(tts._streams)}")
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        profile = self._fake.profile
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=profile.sample_rate,
+            num_channels=1,
+            mime_type="audio/pcm",
+            frame_size_ms=FRAME_MS,
+        )
+        await asyncio.sleep(profile.tts_first_audio.sample(self._rng))
+        frames = self._fake._frames
+        count = int(profile.speech_seconds(self.input_text) * 1000 / FRAME_MS)
+        # Deliver in 100ms bursts, faster than realtime like a streaming HTTP response
+        burst = 100 // FRAME_MS
+        for i in range(count):
+            output_emitter.push(frames[i % len(frames)])
+            if i % burst == burst - 1:
+                await asyncio.sleep(burst * FRAME_MS / 1000 / profile.tts_realtime_factor)
+        output_emitter.flush()
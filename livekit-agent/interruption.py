@@ -0,0 +1,292 @@
+"""
+Barge-in handling
+Pauses the agent's playout the moment VAD hears the user, stops the
+reply's LLM request, text stream and TTS once the transcript confirms a
+real interruption, and resumes playout when it was only a cough or a
+backchannel. Also measures how long the agent kept talking over the user
+and how much generated work was thrown away
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Callable, Optional
+
+from context_budget import count_tokens
+from process_local import ProcessLocal
+from turn_metrics import BUCKETS, QUANTILES, quantile
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ("interrupted", "resumed")
+
+
+class InterruptionStats(ProcessLocal):
+    """
+    Process-wide barge-in counters.
+
+    interrupted: the user really took the turn; the reply was cancelled.
+    resumed: a VAD onset during a reply never became words; playout (if
+    it was paused) carried on.
+    Latency is from VAD onset to the agent going silent; wasted tokens are
+    LLM text generated after the onset, wasted audio is synthesized speech
+    the user didn't get to hear before they started talking.
+    """
+
+    _init_args = ("window",)
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self.outcomes = {outcome: 0 for outcome in OUTCOMES}
+        self.buckets = [0] * len(BUCKETS)
+        self.silenced = 0
+        self.silence_seconds = 0.0
+        self.wasted_tokens = 0
+        self.wasted_audio = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, outcome: str, silence: Optional[float] = None, tokens: int = 0, audio: float = 0.0):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.wasted_tokens += tokens
+            self.wasted_audio += audio
+            if silence is None:
+                return
+            for i, bound in enumerate(BUCKETS):
+                if silence <= bound:
+                    self.buckets[i] += 1
+            self.silenced += 1
+            self.silence_seconds += silence
+            self._recent.append(silence)
+
+    def quantiles(self) -> dict:
+        with self._lock:
+            ordered = sorted(self._recent)
+        return {q: quantile(ordered, q) for q in QUANTILES}
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        quantiles = self.quantiles()
+        with self._lock:
+            lines = [
+                "# HELP voice_interrupt_to_silence_seconds VAD onset of a barge-in to the agent going quiet",
+                "# TYPE voice_interrupt_to_silence_seconds histogram",
+            ]
+            for bound, count in zip(BUCKETS, self.buckets):
+                lines.append(f'voice_interrupt_to_silence_seconds_bucket{{le="{bound}"}} {count}')
+            lines += [
+                f'voice_interrupt_to_silence_seconds_bucket{{le="+Inf"}} {self.silenced}',
+                f"voice_interrupt_to_silence_seconds_sum {self.silence_seconds:.6f}",
+                f"voice_interrupt_to_silence_seconds_count {self.silenced}",
+                "# TYPE voice_interrupt_to_silence_quantile_seconds gauge",
+            ]
+            for q, value in quantiles.items():
+                lines.append(f'voice_interrupt_to_silence_quantile_seconds{{quantile="{q}"}} {value:.6f}')
+            lines += [
+                "# HELP voice_interruptions_total Barge-ins by outcome",
+                "# TYPE voice_interruptions_total counter",
+            ]
+            for outcome, count in self.outcomes.items():
+                lines.append(f'voice_interruptions_total{{outcome="{outcome}"}} {count}')
+            lines += [
+                "# HELP voice_interrupt_wasted_tokens_total LLM tokens generated after the user started talking",
+                "# TYPE voice_interrupt_wasted_tokens_total counter",
+                f"voice_interrupt_wasted_tokens_total {self.wasted_tokens}",
+                "# HELP voice_interrupt_wasted_audio_seconds_total Synthesized speech the user talked over or never heard",
+                "# TYPE voice_interrupt_wasted_audio_seconds_total counter",
+                f"voice_interrupt_wasted_audio_seconds_total {self.wasted_audio:.3f}",
+            ]
+            return "\n".join(lines) + "\n"
+
+
+class Reply:
+    """One agent reply's in-flight work, cancelled together"""
+
+    __slots__ = ("cancelled", "tokens", "audio")
+
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+        self.tokens = 0      # LLM tokens (count_tokens) that arrived after a barge-in onset
+        self.audio = 0.0     # Seconds of speech synthesized for this reply
+
+
+class BargeIn:
+    """
+    One session's barge-in state machine.
+
+    A VAD onset while the agent is replying pauses playout (pause() returns
+    False if the output can't pause). Once the user's transcript reaches
+    min_words the reply is cancelled - its guarded text stream closes,
+    which closes the LLM request behind it - and interrupt() stops the
+    TTS and playout. If the user stops talking short of min_words,
+    playout resumes after resume_after seconds.
+
+    With fast=False nothing is paused or cancelled early: the framework's
+    own min_words interruption silences the agent, and only the metrics
+    are recorded - the baseline the fast path is compared against.
+    """
+
+    def __init__(
+        self,
+        pause: Callable[[], bool],
+        resume: Callable[[], None],
+        interrupt: Callable[[], None],
+        stats: InterruptionStats,
+        fast: bool = True,
+        min_words: int = 2,
+        resume_after: float = 0.8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._pause = pause
+        self._resume = resume
+        self._interrupt = interrupt
+        self.stats = stats
+        self.fast = fast
+        self.min_words = min_words
+        self.resume_after = resume_after
+        self.clock = clock
+        self._reply: Optional[Reply] = None
+        self._speaking_since: Optional[float] = None
+        self._onset: Optional[float] = None      # VAD onset of a barge-in in progress
+        self._silenced: Optional[float] = None
+        self._paused = False
+        self._committed = False
+        self._resume_timer: Optional[asyncio.TimerHandle] = None
+
+    # Agent side
+
+    def reply(self) -> Reply:
+        """Start tracking a new reply (the previous one is over)"""
+        self._reply = Reply()
+        return self._reply
+
+    async def guard(self, reply: Reply, stream: AsyncIterable) -> AsyncIterator:
+        """Pass `stream` through until `reply` is cancelled, then close it"""
+        iterator = stream.__aiter__()
+        cancelled = asyncio.ensure_future(reply.cancelled.wait())
+        step = None
+        try:
+            while True:
+                step = asyncio.ensure_future(iterator.__anext__())
+                await asyncio.wait((step, cancelled), return_when=asyncio.FIRST_COMPLETED)
+                if reply.cancelled.is_set():
+                    # Even if the next chunk arrived alongside: nothing more after a confirmed barge-in
+                    step.cancel()
+                    await asyncio.gather(step, return_exceptions=True)
+                    return
+                try:
+                    item = step.result()
+                except StopAsyncIteration:
+                    return
+                if self._onset is not None:
+                    reply.tokens += count_tokens(item) if isinstance(item, str) else 1
+                yield item
+        finally:
+            cancelled.cancel()
+            if step is not None and not step.done():
+                # The consumer went away mid-wait (the framework interrupted first)
+                step.cancel()
+                await asyncio.gather(step, return_exceptions=True)
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def audio(self, seconds: float):
+        """Synthesized speech for the current reply"""
+        if self._reply is not None:
+            self._reply.audio += seconds
+
+    def speaking_started(self):
+        self._speaking_since = self.clock()
+
+    def speaking_stopped(self):
+        if self._onset is not None:
+            if self._silenced is None:
+                self._silenced = self.clock()
+            if self._committed:
+                self._finish("interrupted")
+            else:
+                # The reply ran out while the user was making noise
+                self._clear()
+        self._speaking_since = None
+        self._reply = None
+
+    # User side
+
+    def vad_start(self):
+        if self._resume_timer is not None:
+            self._resume_timer.cancel()
+            self._resume_timer = None
+        busy = self._speaking_since is not None or (self._reply is not None and not self._reply.cancelled.is_set())
+        if self._onset is not None or not busy:
+            return
+        self._onset = self.clock()
+        self._committed = False
+        self._silenced = None
+        if self.fast and self._speaking_since is not None:
+            self._paused = self._pause()
+            if self._paused:
+                self._silenced = self._onset
+
+    def vad_end(self):
+        if self._onset is None or self._committed:
+            return
+        if self._resume_timer is not None:
+            self._resume_timer.cancel()
+        self._resume_timer = asyncio.get_running_loop().call_later(self.resume_after, self._false_alarm)
+
+    def transcript(self, text: str, is_final: bool = False):
+        if self._onset is None or self._committed or len(text.split()) < self.min_words:
+            return
+        self._committed = True
+        if not self.fast:
+            return   # The framework interrupts on its own word count
+        if self._resume_timer is not None:
+            self._resume_timer.cancel()
+            self._resume_timer = None
+        logger.info(f"✋ Barge-in confirmed {(self.clock() - self._onset) * 1000:.0f}ms after onset, reply cancelled")
+        if self._reply is not None:
+            self._reply.cancelled.set()
+        self._interrupt()
+        if self._speaking_since is None:
+            # Still thinking: nothing was playing, the cancelled LLM was all the work
+            self._silenced = self._onset
+            self._finish("interrupted")
+            self._reply = None
+
+    def _false_alarm(self):
+        self._resume_timer = None
+        if self._onset is None or self._committed:
+            return
+        if self._paused:
+            logger.info("↩️ Barge-in was only noise, resuming playout")
+            self._resume()
+        self._finish("resumed")
+
+    def _finish(self, outcome: str):
+        reply = self._reply
+        tokens, audio = 0, 0.0
+        if outcome == "interrupted" and reply is not None:
+            played = self._onset - self._speaking_since if self._speaking_since is not None else 0.0
+            tokens, audio = reply.tokens, max(0.0, reply.audio - played)
+        silence = None
+        if outcome == "interrupted" and self._silenced is not None:
+            silence = max(0.0, self._silenced - self._onset)
+        self.stats.record(outcome, silence, tokens, audio)
+        if reply is not None:
+            reply.tokens = 0
+        self._clear()
+
+    def _clear(self):
+        self._onset = None
+        self._silenced = None
+        self._paused = False
+        self._committed = False
+
+    def aclose(self):
+        if self._resume_timer is not None:
+            self._resume_timer.cancel()
+            self._resume_timer = None
@@ -0,0 +1,228 @@
+"""
+Lip-sync from TTS audio
+Turns the agent's outgoing PCM into a fixed-rate stream of mouth shapes:
+an RMS envelope plus weights for the five VRM mouth expressions, computed
+for a whole batch of frames at once, and released against the playout
+clock so clients can apply them without analyzing audio themselves
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+import numpy as np
+
+from audio_buffer import AudioLease, AudioRing
+
+logger = logging.getLogger(__name__)
+
+# VRM 1.0 mouth expressions (the vowels a, i, u, e, o), in wire order
+VISEMES = ("aa", "ih", "ou", "ee", "oh")
+
+# Formant bands (Hz), and the share of spectral amplitude each vowel puts
+# in them (two-formant vowels: a 800/1200 Hz, i 300/2300, u 300/800,
+# e 450/1900, o 500/900). A frame leans towards the vowels it is closest
+# to - a formant heuristic, not phoneme recognition.
+BANDS = ((100, 400), (400, 800), (800, 1200), (1200, 2000), (2000, 3500))
+VISEME_PROFILES = np.array([
+    # 100-  400-  800- 1200- 2000 Hz
+    [0.06, 0.28, 0.44, 0.21, 0.01],   # aa
+    [0.59, 0.20, 0.02, 0.03, 0.16],   # ih
+    [0.52, 0.26, 0.19, 0.02, 0.00],   # ou
+    [0.30, 0.42, 0.04, 0.18, 0.06],   # ee
+    [0.23, 0.45, 0.27, 0.04, 0.01],   # oh
+], dtype=np.float32)
+SHARPNESS = 50.0     # Softmax scale on squared distance: higher picks one viseme
+
+SILENCE_DB = -60.0   # Level mapped to a closed mouth; 0 dBFS is fully open
+
+RING_FRAMES = 8   # Analysis frames a VisemeAnalyzer buffers and analyzes per batch
+_NO_FRAMES = np.zeros((0, 1 + len(VISEMES)), dtype=np.float32)
+
+
+class VisemeAnalyzer:
+    """
+    Fixed-rate RMS and viseme weights for a mono or interleaved int16 stream.
+
+    Each output frame covers sample_rate / frame_rate samples; samples that
+    don't fill a frame yet are kept for the next push, in a ring sized for
+    RING_FRAMES frames so steady-state pushes don't allocate. push() returns an
+    (n, 1 + len(VISEMES)) float32 array: level in [0, 1], then weights that
+    sum to the level.
+    """
+
+    def __init__(self, sample_rate: int, frame_rate: int = 30):
+        self.sample_rate = sample_rate
+        self.frame_rate = frame_rate
+        self.window = int(round(sample_rate / frame_rate))
+        self._nfft = 1 << (self.window - 1).bit_length()
+        self._taper = np.hanning(self.window).astype(np.float32)
+        freqs = np.fft.rfftfreq(self._nfft, 1 / sample_rate)
+        # rfft power -> band energies as one matrix product
+        self._bins_to_bands = np.stack(
+            [(freqs >= lo) & (freqs < hi) for lo, hi in BANDS], axis=1
+        ).astype(np.float32)
+        # -|x - p|^2 = 2 x.p - |p|^2 - |x|^2, and the last term cancels in the softmax
+        self._similarity = 2 * SHARPNESS * VISEME_PROFILES.T
+        self._offset = SHARPNESS * (VISEME_PROFILES ** 2).sum(axis=1)
+        self._ring = AudioRing(self.window * RING_FRAMES)
+        self._frames = np.empty((RING_FRAMES, self.window), dtype=np.float32)
+        self._flat = self._frames.reshape(-1)
+
+    @property
+    def nbytes(self) -> int:
+        """Preallocated sample buffers"""
+        return self._ring.nbytes + self._frames.nbytes
+
+    def reset(self):
+        """Drop buffered samples (the utterance was interrupted)"""
+        self._ring.clear()
+
+    def push(self, pcm, num_channels: int = 1) -> np.ndarray:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if num_channels > 1:
+            samples = samples.reshape(-1, num_channels).mean(axis=1)
+        rows = []
+        while len(samples):
+            # After draining, less than one window is left, so a slice always fits
+            written = self._ring.write(samples[:self._ring.free], scale=1 / 32768.0)
+            samples = samples[written:]
+            count = min(len(self._ring) // self.window, RING_FRAMES)
+            if count:
+                self._ring.read_into(self._flat[:count * self.window])
+                rows.append(self.analyze(self._frames[:count]))
+        if not rows:
+            return _NO_FRAMES
+        return rows[0] if len(rows) == 1 else np.concatenate(rows)
+
+    def analyze(self, frames: np.ndarray) -> np.ndarray:
+        """Level and weights for an (n, window) array of normalized samples"""
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        level = np.clip(1.0 - 20.0 * np.log10(np.maximum(rms, 1e-6)) / SILENCE_DB, 0.0, 1.0)
+
+        spectrum = np.fft.rfft(frames * self._taper, n=self._nfft, axis=1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        bands = np.sqrt(power @ self._bins_to_bands)
+        bands /= np.maximum(bands.sum(axis=1, keepdims=True), 1e-12)
+        scores = bands @ self._similarity - self._offset
+        weights = np.exp(scores - scores.max(axis=1, keepdims=True))
+        weights *= (level / weights.sum(axis=1))[:, None]
+
+        out = np.empty((len(frames), 1 + len(VISEMES)), dtype=np.float32)
+        out[:, 0] = level
+        out[:, 1:] = weights
+        return out
+
+
+def quantize(rows: np.ndarray) -> np.ndarray:
+    """Level and weights as bytes (0-255), the wire resolution"""
+    return np.rint(np.clip(rows, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+class LipSyncStream:
+    """
+    One session's viseme frames, released at playout time.
+
+    push() is fed every TTS audio frame as it is produced - usually faster
+    than realtime - and end() when the agent stops speaking. Playout is
+    assumed to start with the first audio of an utterance and to stall
+    whenever audio arrives after what was already pushed has played out.
+    Frames are handed to publish(seq, offset_ms, levels) `lead` seconds
+    before they play, where offset_ms is playout time since the utterance
+    started and seq identifies the utterance.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[int, int, bytes], None],
+        frame_rate: int = 30,
+        lead: float = 0.1,
+        lease: Optional[AudioLease] = None,
+    ):
+        self.publish = publish
+        self.frame_rate = frame_rate
+        self.lead = lead
+        self.lease = lease   # The session's audio budget; the analyzer's buffers count against it
+        self.frames_sent = 0
+        self._analyzer: Optional[VisemeAnalyzer] = None
+        self._seq = 0
+        self._start: Optional[float] = None
+        self._gaps = 0.0            # Playout stalls so far in this utterance
+        self._frames = 0            # Frames analyzed in this utterance
+        self._paused_at: Optional[float] = None
+        self._queue: Deque[Tuple[float, int, bytes]] = deque()   # (due, offset_ms, levels)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def push(self, pcm, sample_rate: int, num_channels: int = 1):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._analyzer is None or self._analyzer.sample_rate != sample_rate:
+            self._analyzer = VisemeAnalyzer(sample_rate, self.frame_rate)
+            if self.lease is not None:
+                self.lease.set("lipsync", self._analyzer.nbytes)
+        if self._start is None:
+            self._seq = (self._seq + 1) & 0xFFFF
+            self._start = now
+            self._gaps = 0.0
+            self._frames = 0
+        elif self._paused_at is None:
+            # Nothing left to play: the player stalled until this audio arrived
+            played_out = self._start + self._gaps + self._frames / self.frame_rate
+            if now > played_out:
+                self._gaps += now - played_out
+
+        rows = quantize(self._analyzer.push(pcm, num_channels))
+        for levels in rows:
+            playout = self._gaps + self._frames / self.frame_rate
+            self._queue.append((self._start + playout - self.lead, int(playout * 1000), levels.tobytes()))
+            self._frames += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def end(self):
+        """The agent stopped speaking (finished or interrupted): drop what hasn't played"""
+        self._queue.clear()
+        self._start = None
+        self._paused_at = None
+        if self._analyzer is not None:
+            self._analyzer.reset()
+
+    def pause(self):
+        """Playout paused (the user may be interrupting): hold frames until resume()"""
+        if self._start is not None and self._paused_at is None:
+            self._paused_at = asyncio.get_running_loop().time()
+
+    def resume(self):
+        """Playout carries on where it stopped; frames move later by the pause"""
+        if self._paused_at is None:
+            return
+        stalled = asyncio.get_running_loop().time() - self._paused_at
+        self._paused_at = None
+        self._gaps += stalled
+        shift = int(stalled * 1000)
+        self._queue = deque((due + stalled, offset_ms + shift, levels) for due, offset_ms, levels in self._queue)
+        self._wakeup.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._queue or self._paused_at is not None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            due, offset_ms, levels = self._queue[0]
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue   # end() or pause() may have happened meanwhile
+            self._queue.popleft()
+            self.publish(self._seq, offset_ms, levels)
+            self.frames_sent += 1
+
+    def aclose(self):
+        self.end()
+        if self._task is not None:
+            self._task.cancel()
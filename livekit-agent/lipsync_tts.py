@@ -0,0 +1,181 @@
+"""
+TTS audio taps
+Per-session views of a shared TTS that hand every synthesized frame to
+the session on its way to the room. FrameTapTTS only looks at the frames
+(barge-in and recording accounting); LipSyncTTS re-emits them through
+its own stream, as lip-sync needs
+"""
+
+import asyncio
+from typing import Callable
+
+from livekit import rtc
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, tts, utils
+
+# The wrapped TTS retries its own requests; the tap must not
+_TAP_CONNECT_OPTIONS = APIConnectOptions(max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout)
+
+FrameTap = Callable[[rtc.AudioFrame], None]
+
+
+class FrameTapTTS(tts.TTS):
+    """Calls on_frame for each frame of the wrapped TTS's own streams, which pass through unchanged"""
+
+    def __init__(self, wrapped: tts.TTS, on_frame: FrameTap):
+        super().__init__(
+            capabilities=wrapped.capabilities,
+            sample_rate=wrapped.sample_rate,
+            num_channels=wrapped.num_channels,
+        )
+        self.wrapped = wrapped
+        self.on_frame = on_frame
+
+    @property
+    def model(self) -> str:
+        return self.wrapped.model
+
+    @property
+    def provider(self) -> str:
+        return self.wrapped.provider
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.ChunkedStream:
+        return _TappedStream(self.wrapped.synthesize(text, conn_options=conn_options), self.on_frame)
+
+    def stream(self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> tts.SynthesizeStream:
+        return _TappedStream(self.wrapped.stream(conn_options=conn_options), self.on_frame)
+
+    def prewarm(self) -> None:
+        self.wrapped.prewarm()
+
+    async def aclose(self) -> None:
+        # The wrapped TTS belongs to the provider pool, not to this session
+        pass
+
+
+class _TappedStream:
+    """A wrapped ChunkedStream or SynthesizeStream whose frames also go to on_frame"""
+
+    def __init__(self, stream, on_frame: FrameTap):
+        self._stream = stream
+        self._on_frame = on_frame
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    async def __aenter__(self):
+        await self._stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._stream.__aexit__(*exc)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> tts.SynthesizedAudio:
+        audio = await self._stream.__anext__()
+        self._on_frame(audio.frame)
+        return audio
+
+
+class LipSyncTTS(tts.TTS):
+    """Calls on_frame for each frame of the wrapped TTS and re-emits it through a stream of its own (lip-sync on)"""
+
+    def __init__(self, wrapped: tts.TTS, on_frame: FrameTap):
+        super().__init__(
+            capabilities=wrapped.capabilities,
+            sample_rate=wrapped.sample_rate,
+            num_channels=wrapped.num_channels,
+        )
+        self.wrapped = wrapped
+        self.on_frame = on_frame
+
+    @property
+    def model(self) -> str:
+        return self.wrapped.model
+
+    @property
+    def provider(self) -> str:
+        return self.wrapped.provider
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.ChunkedStream:
+        return LipSyncChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "LipSyncSynthesizeStream":
+        return LipSyncSynthesizeStream(tts=self, conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        self.wrapped.prewarm()
+
+    async def aclose(self) -> None:
+        # The wrapped TTS belongs to the provider pool, not to this session
+        pass
+
+
+class LipSyncChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: LipSyncTTS, input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=_TAP_CONNECT_OPTIONS)
+        self._tap = tts
+        self._wrapped_conn_options = conn_options
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        owner = self._tap
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=owner.sample_rate,
+            num_channels=owner.num_channels,
+            mime_type="audio/pcm",
+        )
+        async with owner.wrapped.synthesize(self.input_text, conn_options=self._wrapped_conn_options) as stream:
+            async for audio in stream:
+                owner.on_frame(audio.frame)
+                output_emitter.push(audio.frame.data.tobytes())
+        output_emitter.flush()
+
+
+class LipSyncSynthesizeStream(tts.SynthesizeStream):
+    def __init__(self, *, tts: LipSyncTTS, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, conn_options=_TAP_CONNECT_OPTIONS)
+        self._tap = tts
+        self._wrapped_conn_options = conn_options
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        owner = self._tap
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=owner.sample_rate,
+            num_channels=owner.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        async with owner.wrapped.stream(conn_options=self._wrapped_conn_options) as stream:
+
+            async def forward_text():
+                async for data in self._input_ch:
+                    if isinstance(data, self._FlushSentinel):
+                        stream.flush()
+                    else:
+                        stream.push_text(data)
+                stream.end_input()
+
+            forward = asyncio.create_task(forward_text())
+            try:
+                segment = None
+                async for audio in stream:
+                    if audio.segment_id != segment:
+                        if segment is not None:
+                            output_emitter.end_segment()
+                        segment = audio.segment_id
+                        output_emitter.start_segment(segment_id=segment)
+                    owner.on_frame(audio.frame)
+                    output_emitter.push(audio.frame.data.tobytes())
+                if segment is not None:
+                    output_emitter.end_segment()
+            finally:
+                await utils.aio.cancel_and_wait(forward)
@@ -0,0 +1,64 @@
+"""
+LiveKit side of the context budget
+Trims a ChatContext to what ConversationContext selects and writes the
+rolling summary with the session's own LLM
+"""
+
+from typing import List
+
+from livekit.agents import llm
+
+from context_budget import ConversationContext, Turn
+
+SUMMARY_PREFIX = "Summary of the conversation so far:"
+
+SUMMARIZE_INSTRUCTIONS = (
+    "You maintain a running memory of a voice conversation between a user and an assistant. "
+    "Update the summary with the new lines: keep names, facts about the user, preferences, "
+    "plans, promises and the emotional tone; drop small talk. Write plain sentences in the "
+    "conversation's language, no lists, no emotion tags, at most {words} words."
+)
+
+
+def turns_from_chat_ctx(chat_ctx: llm.ChatContext) -> List[Turn]:
+    turns = []
+    for item in chat_ctx.items:
+        role = getattr(item, "role", None)
+        if role is None:
+            # Tool calls and outputs travel with the conversation
+            turns.append(Turn(item.id, "tool", str(getattr(item, "output", "") or getattr(item, "arguments", ""))))
+        else:
+            turns.append(Turn(item.id, role, item.text_content or ""))
+    return turns
+
+
+def apply_budget(chat_ctx: llm.ChatContext, context: ConversationContext) -> llm.ChatContext:
+    """Trim chat_ctx in place to the pinned messages, summary and recent turns"""
+    pinned, summary, recent = context.select(turns_from_chat_ctx(chat_ctx))
+    if len(pinned) + len(recent) == len(chat_ctx.items) and not summary:
+        return chat_ctx
+    keep = {turn.id for turn in pinned} | {turn.id for turn in recent}
+    items = [item for item in chat_ctx.items if item.id in keep]
+    if summary:
+        message = llm.ChatMessage(role="system", content=[f"{SUMMARY_PREFIX} {summary}"])
+        items.insert(len(pinned), message)
+    chat_ctx.items = items
+    return chat_ctx
+
+
+def llm_summarizer(model: llm.LLM):
+    """Summarizer for ConversationContext that asks `model` to fold turns into the summary"""
+
+    async def summarize(previous: str, turns: List[Turn], max_tokens: int) -> str:
+        chat_ctx = llm.ChatContext.empty()
+        chat_ctx.add_message(role="system", content=SUMMARIZE_INSTRUCTIONS.format(words=int(max_tokens * 0.7)))
+        lines = "\n".join(f"{turn.role.capitalize()}: {turn.text}" for turn in turns if turn.text)
+        chat_ctx.add_message(role="user", content=f"Current summary:\n{previous or '(none)'}\n\nNew lines:\n{lines}")
+        parts = []
+        async with model.chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    parts.append(chunk.delta.content)
+        return "".join(parts)
+
+    return summarize
@@ -0,0 +1,213 @@
+"""
+Worker load reporting and admission for the LiveKit dispatcher
+Combines running jobs, event-loop lag, CPU and memory into a single 0..1 load
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Collection, Dict, Optional
+
+from process_local import ProcessLocal
+
+try:
+    import psutil
+except ImportError:  # Installed with livekit-agents; the load average is the fallback
+    psutil = None
+
+# How long an accepted job counts as running before the dispatcher assigns it
+ACCEPT_WINDOW = 10.0
+
+
+class LoadMonitor(ProcessLocal):
+    """
+    Tracks how busy this worker is.
+
+    load() is what WorkerOptions.load_fnc reports: the worst of session
+    occupancy, event-loop lag against its budget, CPU and host memory.
+    A Python process runs on roughly one core, so process CPU is measured
+    against one core; host CPU and memory catch job processes the main
+    process can't see. Session occupancy is scaled so that max_sessions
+    lands exactly on the threshold, and memory so that memory_limit does.
+
+    Job processes only see their own sessions, so admission runs in the
+    main worker process: count_jobs() points the monitor at the worker's
+    running jobs and admit() adds the ones accepted but not yet started.
+    Their event loops are probed there too; count_lag() feeds the lag
+    they report back into the main process's load().
+    """
+
+    _init_args = ("max_sessions", "lag_budget", "probe_interval", "threshold", "memory_limit")
+
+    def __init__(
+        self,
+        max_sessions: int = 8,
+        lag_budget: float = 0.1,
+        probe_interval: float = 0.5,
+        threshold: float = 0.75,
+        memory_limit: float = 0.9,
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.lag_budget = lag_budget
+        self.probe_interval = probe_interval
+        self.threshold = threshold
+        self.memory_limit = memory_limit
+
+        self._lock = threading.Lock()
+        self._sessions = 0
+        self._running_jobs: Optional[Callable[[], Collection[str]]] = None
+        self._accepted: Dict[str, float] = {}   # job id -> when it was accepted
+        self._lag: Dict[int, float] = {}   # id(loop) -> smoothed lag in seconds
+        self._job_lag: Optional[Callable[[], float]] = None
+        self._probes: Dict[int, asyncio.Task] = {}
+        self._cpu_sample = (time.monotonic(), time.process_time())
+        self._cpu = 0.0
+
+    # Sessions ---------------------------------------------------------------
+
+    def session_started(self):
+        with self._lock:
+            self._sessions += 1
+
+    def session_ended(self):
+        with self._lock:
+            self._sessions = max(0, self._sessions - 1)
+
+    @property
+    def active_sessions(self) -> int:
+        """Sessions running in the worker when counting jobs, else in this process"""
+        if self._running_jobs is None:
+            return self._sessions
+        with self._lock:
+            return len(self._jobs())
+
+    def count_jobs(self, running_jobs: Callable[[], Collection[str]]):
+        """
+        Count sessions as the worker's running jobs (their ids) instead of
+        sessions started in this process. Set in the main worker process.
+        """
+        self._running_jobs = running_jobs
+
+    def jobs(self) -> set:
+        """Ids of the worker's running jobs and those admitted but not yet running"""
+        with self._lock:
+            return self._jobs()
+
+    def _jobs(self) -> set:
+        # Accepted jobs stop counting once they run, or if never assigned
+        running = set(self._running_jobs())
+        now = time.monotonic()
+        self._accepted = {
+            job: at for job, at in self._accepted.items() if job not in running and now - at < ACCEPT_WINDOW
+        }
+        return running | set(self._accepted)
+
+    def admit(self, job_id: str) -> bool:
+        """
+        Admission control: take this job if the worker has room for it.
+        An admitted job counts against max_sessions until it is running,
+        so a burst of requests can't all be admitted on the same count.
+        """
+        with self._lock:
+            sessions = len(self._jobs()) if self._running_jobs is not None else self._sessions
+            if self.load(sessions) >= self.threshold:
+                return False
+            self._accepted[job_id] = time.monotonic()
+            return True
+
+    # Event-loop lag ---------------------------------------------------------
+
+    def track_loop(self):
+        """Start a lag probe on the running loop (once per loop)"""
+        loop = asyncio.get_running_loop()
+        key = id(loop)
+        with self._lock:
+            probe = self._probes.get(key)
+            if probe is not None and not probe.done():
+                return
+            self._probes[key] = loop.create_task(self._probe(key))
+
+    async def _probe(self, key: int):
+        try:
+            while True:
+                start = time.monotonic()
+                await asyncio.sleep(self.probe_interval)
+                lag = max(0.0, time.monotonic() - start - self.probe_interval)
+                previous = self._lag.get(key, lag)
+                # Rise fast, decay slowly so short stalls still register
+                self._lag[key] = lag if lag > previous else previous * 0.8 + lag * 0.2
+        finally:
+            with self._lock:
+                self._lag.pop(key, None)
+                self._probes.pop(key, None)
+
+    def count_lag(self, job_lag: Callable[[], float]):
+        """
+        Also count the worst lag job processes last reported, whose loops
+        this process can't probe. Set in the main worker process.
+        """
+        self._job_lag = job_lag
+
+    @property
+    def local_lag(self) -> float:
+        """Worst lag of the loops probed in this process"""
+        return max(self._lag.values(), default=0.0)
+
+    @property
+    def loop_lag(self) -> float:
+        lag = self.local_lag
+        if self._job_lag is not None:
+            lag = max(lag, self._job_lag())
+        return lag
+
+    # CPU and memory ---------------------------------------------------------
+
+    def cpu_load(self) -> float:
+        """Process CPU over one core, or host CPU if higher"""
+        now, cpu = time.monotonic(), time.process_time()
+        last_wall, last_cpu = self._cpu_sample
+        if now - last_wall >= 1.0:
+            self._cpu = min(1.0, (cpu - last_cpu) / (now - last_wall))
+            self._cpu_sample = (now, cpu)
+
+        system = 0.0
+        if psutil is not None:
+            # Since the previous call; never blocks
+            system = psutil.cpu_percent(interval=None) / 100
+        elif hasattr(os, "getloadavg"):
+            system = min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+        return max(self._cpu, system)
+
+    def memory_load(self) -> float:
+        """Host memory in use, scaled so memory_limit lands on the threshold"""
+        if psutil is None or not self.memory_limit:
+            return 0.0
+        used = psutil.virtual_memory().percent / 100
+        return used / self.memory_limit * self.threshold
+
+    # Aggregate --------------------------------------------------------------
+
+    def load(self, active_sessions: Optional[int] = None) -> float:
+        """Current load in 0..1 (sessions may be overridden by the worker's job count)"""
+        sessions = self.active_sessions if active_sessions is None else active_sessions
+        load = max(
+            sessions / self.max_sessions * self.threshold,
+            self.loop_lag / self.lag_budget if self.lag_budget else 0.0,
+            self.cpu_load(),
+            self.memory_load(),
+        )
+        return min(1.0, load)
+
+    def accepting(self, active_sessions: Optional[int] = None) -> bool:
+        """Is there room for another session?"""
+        return self.load(active_sessions) < self.threshold
+
+    def snapshot(self) -> dict:
+        return {
+            "sessions": self.active_sessions,
+            "loop_lag_ms": round(self.loop_lag * 1000, 1),
+            "cpu": round(self.cpu_load(), 3),
+            "memory": round(self.memory_load(), 3),
+            "load": round(self.load(), 3),
+        }
@@ -0,0 +1,151 @@
+"""
+Fake provider timing profile
+Deterministic latency distributions, token rates and audio lengths shared by
+the fake STT/LLM/TTS providers and the offline load generator
+"""
+
+import os
+import random
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+_VOCABULARY = (
+    "sure that sounds really good let me think about it for a second you know "
+    "I was just wondering how your day went today honestly the weather here is "
+    "lovely we should totally go out later and grab some coffee or maybe tea "
+    "tell me more about what happened at work because I want to hear everything"
+).split()
+
+_EMOTIONS = ("happy", "excited", "thoughtful", "neutral", "playful", "concerned")
+
+
+@dataclass
+class Distribution:
+    """Normal latency distribution in milliseconds, clipped at a floor"""
+    mean_ms: float
+    jitter_ms: float = 0.0
+    min_ms: float = 0.0
+
+    @classmethod
+    def parse(cls, text: str) -> "Distribution":
+        """Parse "mean", "mean,jitter" or "mean,jitter,min" (milliseconds)"""
+        parts = [float(p) for p in text.split(",") if p.strip()]
+        if not 1 <= len(parts) <= 3 or min(parts) < 0:
+            raise ValueError("expected mean[,jitter[,min]] in non-negative milliseconds")
+        return cls(*parts)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency, in seconds"""
+        value = rng.gauss(self.mean_ms, self.jitter_ms) if self.jitter_ms else self.mean_ms
+        return max(self.min_ms, value) / 1000
+
+
+def _positive(text: str) -> float:
+    value = float(text)
+    if not value > 0:
+        raise ValueError("must be positive")
+    return value
+
+
+def _non_negative(text: str) -> float:
+    value = float(text)
+    if not value >= 0:
+        raise ValueError("must not be negative")
+    return value
+
+
+def _word_range(text: str) -> Tuple[int, int]:
+    # "low,high", or a single count for both
+    low, _, high = text.partition(",")
+    low, high = int(low), int(high or low)
+    if not 0 < low <= high:
+        raise ValueError("expected low,high with 0 < low <= high")
+    return low, high
+
+
+@dataclass
+class FakeProviderProfile:
+    """
+    Timing model for the fake providers.
+
+    Every random draw comes from an RNG seeded with (seed, stream name), so
+    the same seed replays the same sequence of latencies and replies.
+    """
+    stt_final: Distribution = field(default_factory=lambda: Distribution(250, 50, 50))
+    llm_ttft: Distribution = field(default_factory=lambda: Distribution(350, 80, 80))
+    llm_tokens_per_sec: float = 40.0
+    llm_prefill_ms_per_1k_tokens: float = 0.0   # Extra time to first token per 1k prompt tokens
+    tts_first_audio: Distribution = field(default_factory=lambda: Distribution(200, 40, 40))
+    tts_realtime_factor: float = 4.0        # Synthesis speed relative to playout
+    user_words: Tuple[int, int] = (4, 14)
+    reply_words: Tuple[int, int] = (12, 40)
+    words_per_second: float = 2.7           # Speaking rate of user and agent audio
+    interim_every_ms: int = 300             # Interim transcript cadence
+    sample_rate: int = 24000
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls, prefix: str = "FAKE_") -> "FakeProviderProfile":
+        """Build a profile from FAKE_* environment variables (ValueError naming the variable if one is invalid)"""
+        profile = cls()
+        env = os.environ
+
+        def parse(var: str, convert):
+            try:
+                return convert(env[var])
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"Invalid {var}={env[var]!r}: {e}") from None
+
+        for name in ("stt_final", "llm_ttft", "tts_first_audio"):
+            var = f"{prefix}{name.upper()}_MS"
+            if env.get(var):
+                setattr(profile, name, parse(var, Distribution.parse))
+        numbers = {
+            "llm_tokens_per_sec": _positive,
+            "llm_prefill_ms_per_1k_tokens": _non_negative,
+            "tts_realtime_factor": _positive,
+            "words_per_second": _positive,
+        }
+        for name, convert in numbers.items():
+            var = f"{prefix}{name.upper()}"
+            if env.get(var):
+                setattr(profile, name, parse(var, convert))
+        for name in ("user_words", "reply_words"):
+            var = f"{prefix}{name.upper()}"
+            if env.get(var):
+                setattr(profile, name, parse(var, _word_range))
+        if env.get(f"{prefix}SEED"):
+            profile.seed = parse(f"{prefix}SEED", int)
+        return profile
+
+    def rng(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+    def utterance(self, rng: random.Random) -> str:
+        """What the simulated user says"""
+        count = rng.randint(*self.user_words)
+        return " ".join(rng.choice(_VOCABULARY) for _ in range(count))
+
+    def reply_tokens(self, rng: random.Random) -> List[str]:
+        """An LLM reply, tagged like the personalities ask for, split into tokens"""
+        count = rng.randint(*self.reply_words)
+        sentences = []
+        while count > 0:
+            length = min(count, rng.randint(5, 14))
+            count -= length
+            words = [rng.choice(_VOCABULARY) for _ in range(length)]
+            if length > 8 and rng.random() < 0.5:
+                words[length // 2] += ","
+            sentences.append(" ".join(words).capitalize() + rng.choice(".!?."))
+        text = f"[{rng.choice(_EMOTIONS)}] " + " ".join(sentences)
+        tokens = []
+        i = 0
+        while i < len(text):
+            size = rng.randint(2, 6)
+            tokens.append(text[i:i + size])
+            i += size
+        return tokens
+
+    def speech_seconds(self, text: str) -> float:
+        """Audio duration for text spoken at words_per_second"""
+        return max(0.3, len(text.split()) / self.words_per_second)
@@ -0,0 +1,220 @@
+"""
+Worker-wide /metrics endpoint
+Serves Prometheus text from the main worker process on a thread of its
+own, merging in the stats that job processes send over a pipe
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from turn_metrics import MetricsServer
+
+# Gauges that are a worst case or a setting rather than an amount: merged with max, not summed
+MAX_GAUGES = frozenset((
+    "voice_audio_buffer_budget_bytes",
+    "voice_data_queue_depth_max",
+    "voice_event_loop_lag_seconds",
+    "voice_interrupt_to_silence_quantile_seconds",
+    "voice_provider_circuit_open",
+    "voice_provider_error_rate",
+    "voice_provider_first_output_p95_seconds",
+    "voice_worker_load",
+))
+
+_Sample = Tuple[str, str]   # (family, "name{labels}")
+
+
+class MetricsAggregator:
+    """
+    Merges Prometheus text rendered by several processes.
+
+    Counters and histograms are summed; so are gauges, except MAX_GAUGES
+    and summary quantiles, which take the worst process. Each source's
+    latest text is kept until it is final (or goes quiet for `stale_after`
+    seconds); its counters are then folded into a running total so they
+    never go backwards, and its gauges are dropped.
+    """
+
+    def __init__(self, stale_after: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.stale_after = stale_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}        # family -> counter / gauge / histogram / summary
+        self._live: Dict[str, Tuple[float, Dict[_Sample, float]]] = {}
+        self._retired: Dict[_Sample, float] = {}
+
+    def update(self, source: str, text: str, final: bool = False):
+        types, samples = self._parse(text)
+        with self._lock:
+            for family, kind in types.items():
+                self._types.setdefault(family, kind)
+            if final:
+                self._live.pop(source, None)
+                self._retire(samples)
+            else:
+                self._live[source] = (self._clock(), samples)
+
+    def gauge(self, family: str) -> float:
+        """Highest value of a gauge across the sources still reporting (0 if none do)"""
+        with self._lock:
+            now = self._clock()
+            return max(
+                (
+                    value
+                    for seen, samples in self._live.values() if now - seen <= self.stale_after
+                    for (name, _), value in samples.items() if name == family
+                ),
+                default=0.0,
+            )
+
+    def render(self, *texts: str) -> str:
+        """Merged text of every source plus `texts` (rendered by the caller's process)"""
+        local = [self._parse(text) for text in texts]
+        families: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for types, _ in local:
+                for family, kind in types.items():
+                    self._types.setdefault(family, kind)
+            now = self._clock()
+            for source, (seen, samples) in list(self._live.items()):
+                if now - seen > self.stale_after:
+                    # A job process that exited without a final report
+                    del self._live[source]
+                    self._retire(samples)
+            sources = [self._retired] + [samples for _, samples in self._live.values()]
+            sources += [samples for _, samples in local]
+            for samples in sources:
+                for (family, sample), value in samples.items():
+                    merged = families.setdefault(family, {})
+                    current = merged.get(sample)
+                    merged[sample] = value if current is None else self._merge((family, sample), current, value)
+            types = dict(self._types)
+
+        lines: List[str] = []
+        for family, samples in families.items():
+            lines.append(f"# TYPE {family} {types.get(family, 'untyped')}")
+            lines.extend(f"{sample} {_number(value)}" for sample, value in samples.items())
+        return "\n".join(lines) + "\n" if lines else ""
+
+    @staticmethod
+    def _parse(text: str) -> Tuple[Dict[str, str], Dict[_Sample, float]]:
+        types: Dict[str, str] = {}
+        samples: Dict[_Sample, float] = {}
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# TYPE "):
+                _, _, family, kind = line.split(" ", 3)
+                types[family] = kind
+                continue
+            if not line or line.startswith("#"):
+                continue
+            sample, _, value = line.rpartition(" ")
+            try:
+                samples[(family or sample.split("{", 1)[0], sample)] = float(value)
+            except ValueError:
+                continue
+        return types, samples
+
+    def _cumulative(self, key: _Sample) -> bool:
+        family, sample = key
+        kind = self._types.get(family)
+        if kind in ("counter", "histogram"):
+            return True
+        # A summary's _sum and _count add up; its quantiles don't
+        return kind == "summary" and 'quantile="' not in sample
+
+    def _merge(self, key: _Sample, current: float, value: float) -> float:
+        family, _ = key
+        if self._cumulative(key) or (self._types.get(family) == "gauge" and family not in MAX_GAUGES):
+            return current + value
+        return max(current, value)
+
+    def _retire(self, samples: Dict[_Sample, float]):
+        for key, value in samples.items():
+            if self._cumulative(key):
+                self._retired[key] = self._retired.get(key, 0.0) + value
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class MetricsExporter:
+    """
+    /metrics for the whole worker, served from the main process.
+
+    start() runs the HTTP server on a dedicated thread with its own event
+    loop, so it doesn't live or die with any job's loop. Job threads share
+    the worker's stats objects and need nothing else. Job processes each
+    have their own copies; they publish() their rendered stats over a pipe
+    while running and once more when they end. The pipe is there even
+    without an endpoint: the worker's load() needs the loop lag that job
+    processes report (jobs.gauge).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, interval: float = 5.0):
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self._owner = os.getpid()
+        # Created with the spawn context so forkserver and spawn job processes can inherit it
+        self._pipe = multiprocessing.get_context("spawn").SimpleQueue()
+        self.jobs = MetricsAggregator(stale_after=max(30.0, interval * 6))
+        self._thread: Optional[threading.Thread] = None
+
+    def __getstate__(self):
+        # Job processes get the pipe's sending end, not the server
+        return {"host": self.host, "port": self.port, "interval": self.interval,
+                "_owner": self._owner, "_pipe": self._pipe}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.jobs = MetricsAggregator()
+        self._thread = None
+
+    @property
+    def remote(self) -> bool:
+        """True in a job process, whose stats the worker process can't see directly"""
+        return os.getpid() != self._owner
+
+    def start(self, render: Callable[[], str]):
+        """Collect job process stats, and serve render() merged with them if a port is set (main worker process, once)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._receive, name="metrics-pipe", daemon=True)
+        self._thread.start()
+        if self.port:
+            threading.Thread(target=self._serve, args=(render,), name="metrics", daemon=True).start()
+
+    def _serve(self, render: Callable[[], str]):
+        loop = asyncio.new_event_loop()
+        server = MetricsServer(lambda: self.jobs.render(render()), host=self.host, port=self.port)
+        if loop.run_until_complete(server.start()):
+            loop.run_forever()
+        loop.close()
+
+    def _receive(self):
+        while True:
+            try:
+                source, text, final = self._pipe.get()
+            except (EOFError, OSError):
+                return
+            self.jobs.update(source, text, final)
+
+    def publish(self, text: str, final: bool = False):
+        """Send this job process's stats to the worker process"""
+        if self.remote:
+            self._pipe.put((str(os.getpid()), text, final))
+
+    async def publish_every(self, render: Callable[[], str]):
+        """Publish render() every `interval` seconds until cancelled, then once more as final"""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                self.publish(render())
+        finally:
+            self.publish(render(), final=True)
@@ -0,0 +1,117 @@
+"""
+Personality registry
+Built-in PERSONALITIES merged with an optional JSON file that is reloaded
+when it changes, so personalities can be edited without restarting workers
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_KEYS = ("name", "system_prompt")
+
+
+def personality_from_metadata(metadata: Optional[str]) -> Optional[str]:
+    """
+    Read a personality name from room or participant metadata.
+
+    Accepts either a JSON object with a "personality" key or a bare name.
+    """
+    if not metadata:
+        return None
+    metadata = metadata.strip()
+    if metadata.startswith("{"):
+        try:
+            value = json.loads(metadata).get("personality")
+        except (ValueError, AttributeError):
+            return None
+        return value.strip().lower() if isinstance(value, str) and value.strip() else None
+    return metadata.lower()
+
+
+class PersonalityRegistry:
+    """
+    Lookup table for personalities.
+
+    File entries override or extend the built-ins; missing fields are
+    filled from the built-in "default" entry. The file is re-checked at
+    most once per check_interval seconds (a single stat call) and a file
+    that fails to parse leaves the previous table in place.
+    """
+
+    def __init__(self, builtin: Dict[str, dict], path: Optional[str] = None, check_interval: float = 2.0):
+        self.builtin = builtin
+        self.path = path
+        self.check_interval = check_interval
+        self._table: Dict[str, dict] = dict(builtin)
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.reload_if_changed(force=True)
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Reload the file if its mtime changed. Returns True if reloaded."""
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            if self._mtime is not None:
+                logger.warning(f"⚠️ Personality file {self.path} disappeared, using built-ins")
+                self._table = dict(self.builtin)
+                self._mtime = None
+            return False
+        if mtime == self._mtime:
+            return False
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                loaded = json.load(f)
+            table = self._merge(loaded)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Could not load personalities from {self.path}: {e}")
+            self._mtime = mtime  # Don't retry until the file changes again
+            return False
+
+        self._table = table
+        self._mtime = mtime
+        logger.info(f"🎭 Loaded {len(table)} personalities from {self.path}")
+        return True
+
+    def _merge(self, loaded) -> Dict[str, dict]:
+        if not isinstance(loaded, dict):
+            raise ValueError("personality file must contain a JSON object")
+        base = self.builtin.get("default", {})
+        table = dict(self.builtin)
+        for key, entry in loaded.items():
+            if not isinstance(entry, dict):
+                raise ValueError(f"personality '{key}' must be an object")
+            merged = {**base, **self.builtin.get(key, {}), **entry}
+            missing = [k for k in REQUIRED_KEYS if not merged.get(k)]
+            if missing:
+                raise ValueError(f"personality '{key}' is missing {', '.join(missing)}")
+            table[key.lower()] = merged
+        return table
+
+    def names(self):
+        self.reload_if_changed()
+        return list(self._table)
+
+    def resolve(self, name: Optional[str], fallback: str = "default") -> Tuple[str, dict]:
+        """Return (name, config), falling back for unknown names"""
+        self.reload_if_changed()
+        if name and name in self._table:
+            return name, self._table[name]
+        if name:
+            logger.warning(f"⚠️ Unknown personality '{name}', using '{fallback}'")
+        if fallback not in self._table:
+            fallback = "default"
+        return fallback, self._table[fallback]
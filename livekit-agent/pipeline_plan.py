@@ -0,0 +1,81 @@
+"""
+Pipeline-mode planner
+Decides between a realtime speech-to-speech model and the cascaded
+STT -> LLM -> TTS loop, and which components each mode actually needs
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+REALTIME = "realtime"
+CASCADED = "cascaded"
+
+
+@dataclass(frozen=True)
+class PipelinePlan:
+    """Which components a session should build"""
+    mode: str
+    needs_stt: bool
+    needs_tts: bool
+    reason: str
+
+    @property
+    def realtime(self) -> bool:
+        return self.mode == REALTIME
+
+
+def plan_pipeline(
+    realtime_available: bool,
+    stt_available: bool,
+    tts_available: bool,
+    llm_available: bool,
+    preferred: Optional[str] = None,
+) -> PipelinePlan:
+    """
+    Pick the pipeline mode.
+
+    A realtime model handles speech in and out itself, so STT and TTS are
+    only built for the cascaded mode. `preferred` ("realtime", "cascaded"
+    or "auto"/None) is honoured when that mode can actually run.
+    """
+    preferred = (preferred or "auto").lower()
+    cascaded_ok = stt_available and llm_available and tts_available
+
+    if preferred == CASCADED and not cascaded_ok:
+        logger.warning("⚠️ Cascaded pipeline requested but STT, LLM or TTS is missing")
+    if preferred == REALTIME and not realtime_available:
+        logger.warning("⚠️ Realtime pipeline requested but no realtime model is available")
+
+    if realtime_available and (preferred != CASCADED or not cascaded_ok):
+        reason = "requested" if preferred == REALTIME else "realtime model available"
+        return PipelinePlan(REALTIME, needs_stt=False, needs_tts=False, reason=reason)
+
+    reason = "requested" if preferred == CASCADED else "no realtime model"
+    return PipelinePlan(CASCADED, needs_stt=True, needs_tts=True, reason=reason)
+
+
+def plan_for_keys(
+    openai_key: Optional[str],
+    gemini_key: Optional[str],
+    deepgram_key: Optional[str],
+    elevenlabs_key: Optional[str],
+    realtime_installed: bool,
+    fake: bool = False,
+    preferred: Optional[str] = None,
+) -> PipelinePlan:
+    """
+    plan_pipeline() for the configured API keys: Deepgram for STT, OpenAI
+    or Gemini for the LLM, OpenAI or ElevenLabs for TTS, and Gemini Live
+    (if its plugin is installed) as the realtime model. Fake providers
+    stand in for every cascaded component.
+    """
+    return plan_pipeline(
+        realtime_available=realtime_installed and bool(gemini_key) and not fake,
+        stt_available=bool(deepgram_key) or fake,
+        tts_available=bool(openai_key or elevenlabs_key) or fake,
+        llm_available=bool(openai_key or (gemini_key and realtime_installed)) or fake,
+        preferred=preferred,
+    )
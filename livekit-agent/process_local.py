@@ -0,0 +1,26 @@
+"""
+Process-local state
+The worker object is pickled into every job process. Counters, locks and
+caches on it are rebuilt from their constructor arguments there rather
+than copied from the main process
+"""
+
+from typing import Tuple
+
+
+class ProcessLocal:
+    """
+    Mixin for objects that are rebuilt, not copied, when pickled.
+
+    Only the attributes named in `_init_args` are pickled, and unpickling
+    passes them back to __init__, so each process starts with its own
+    empty counters and fresh locks.
+    """
+
+    _init_args: Tuple[str, ...] = ()
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self._init_args}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
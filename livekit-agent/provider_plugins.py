@@ -0,0 +1,123 @@
+"""
+Provider plugin registry
+Imports a LiveKit provider plugin only once a configured API key selects
+it, so a worker doesn't load every SDK it might use, and records what each
+import cost in time and memory
+"""
+
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Name used in the agent -> module providing it
+PLUGINS = {
+    "deepgram": "livekit.plugins.deepgram",
+    "openai": "livekit.plugins.openai",
+    "elevenlabs": "livekit.plugins.elevenlabs",
+    "google": "livekit.plugins.google",
+}
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process (0 where it can't be read)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0   # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # Peak, not current, off Linux
+
+
+@dataclass
+class PluginImport:
+    """What loading one plugin cost"""
+    name: str
+    module: str
+    seconds: float
+    rss_bytes: int
+    error: Optional[str] = None
+
+
+class PluginRegistry:
+    """
+    Provider plugins by name, imported on first use.
+
+    LiveKit plugins register themselves on import and must be imported on
+    the main thread, so the agent loads the ones its API keys select at
+    startup (load()); the worker's forkserver then preloads exactly those
+    into job processes. Plugins that are never selected are never imported.
+    """
+
+    def __init__(self, modules: Optional[Dict[str, str]] = None):
+        self.modules = dict(PLUGINS if modules is None else modules)
+        self.imports: List[PluginImport] = []
+        self._loaded: Dict[str, ModuleType] = {}
+
+    def available(self, name: str) -> bool:
+        """Whether the plugin is installed, without importing it"""
+        try:
+            return importlib.util.find_spec(self.modules[name]) is not None
+        except ImportError:
+            return False   # Parent package missing
+
+    def load(self, name: str) -> ModuleType:
+        """The plugin module, imported (and measured) the first time"""
+        module = self._loaded.get(name)
+        if module is not None:
+            return module
+        path = self.modules[name]
+        already = path in sys.modules
+        rss = rss_bytes()
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(path)
+        except ImportError as e:
+            self.imports.append(PluginImport(name, path, time.perf_counter() - started, 0, error=str(e)))
+            raise
+        if not already:
+            seconds = time.perf_counter() - started
+            self.imports.append(PluginImport(name, path, seconds, max(0, rss_bytes() - rss)))
+            logger.info(f"🔌 Loaded {name} plugin in {seconds * 1000:.0f}ms")
+        self._loaded[name] = module
+        return module
+
+    def load_all(self, names: List[str]) -> List[ModuleType]:
+        return [self.load(name) for name in names]
+
+    def loaded(self) -> List[str]:
+        return list(self._loaded)
+
+    def report(self) -> str:
+        """Import time and memory per plugin, skipped plugins included"""
+        lines = [f"{'plugin':12s} {'import':>9s} {'rss':>9s}  status"]
+        for item in self.imports:
+            status = f"failed: {item.error}" if item.error else "loaded"
+            lines.append(f"{item.name:12s} {item.seconds * 1000:7.0f}ms {item.rss_bytes / 2**20:7.1f}MB  {status}")
+        imported = {item.name for item in self.imports}
+        for name in self.modules:
+            if name in self._loaded and name not in imported:
+                # Selected, but something else had imported it first: nothing to measure
+                lines.append(f"{name:12s} {'-':>9s} {'-':>9s}  already imported")
+            elif name not in imported:
+                lines.append(f"{name:12s} {'-':>9s} {'-':>9s}  {'not selected' if self.available(name) else 'not installed'}")
+        total = sum(item.seconds for item in self.imports)
+        lines.append(f"{'total':12s} {total * 1000:7.0f}ms {sum(i.rss_bytes for i in self.imports) / 2**20:7.1f}MB  "
+                     f"process rss {rss_bytes() / 2**20:.1f}MB")
+        return "\n".join(lines)
+
+
+# Shared by the whole process: plugin modules are process-wide anyway
+plugins = PluginRegistry()
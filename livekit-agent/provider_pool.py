@@ -0,0 +1,280 @@
+"""
+Per-loop provider pool
+Builds STT/LLM/TTS clients once per event loop and shares one size-limited
+set of keep-alive HTTP connections between the sessions running on it
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionProviders:
+    """Provider handles given to one session"""
+    stt: Any
+    llm: Any
+    tts: Any
+    # (provider, voice, model) of the TTS - identifies cached audio
+    tts_profile: Optional[tuple] = None
+    # "realtime" (stt/tts are None) or "cascaded"
+    mode: str = "cascaded"
+    # Short provider description for metrics labels
+    label: str = "unknown"
+
+
+class SharedConnectionPool:
+    """
+    Size-limited HTTP connections shared by every provider on one event loop.
+
+    Deepgram and ElevenLabs use aiohttp, OpenAI uses httpx; both get one
+    client each so TLS sessions are reused across rooms.
+    """
+
+    def __init__(self, limit: int = 32, limit_per_host: int = 8, keepalive: float = 60.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive = keepalive
+        self._session = None
+        self._httpx = None
+        self._openai = None
+
+    def http_session(self):
+        """aiohttp session, created on first use from the pool's event loop"""
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def openai_client(self, api_key: str):
+        """Shared OpenAI SDK client backed by a limited httpx pool"""
+        if self._openai is None:
+            import httpx
+            import openai as openai_sdk
+
+            self._httpx = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.limit,
+                    max_keepalive_connections=self.limit_per_host,
+                    keepalive_expiry=self.keepalive,
+                ),
+                timeout=httpx.Timeout(30.0, connect=10.0),
+            )
+            self._openai = openai_sdk.AsyncClient(api_key=api_key, http_client=self._httpx)
+        return self._openai
+
+    async def warm(self, urls: Sequence[str]):
+        """Open connections (TCP + TLS) ahead of the first real request"""
+
+        async def touch(url: str):
+            try:
+                if self._httpx is not None and "openai.com" in url:
+                    await self._httpx.head(url, timeout=5.0)
+                else:
+                    import aiohttp
+
+                    timeout = aiohttp.ClientTimeout(total=5)
+                    async with self.http_session().head(url, timeout=timeout) as resp:
+                        await resp.release()
+            except Exception as e:
+                logger.debug(f"Connection warm-up failed for {url}: {e}")
+
+        await asyncio.gather(*(touch(url) for url in urls))
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._httpx is not None:
+            await self._httpx.aclose()
+        self._session = None
+        self._httpx = None
+        self._openai = None
+
+
+class _LoopProviders:
+    """Connections and providers built on one event loop"""
+
+    def __init__(self, connections: SharedConnectionPool):
+        self.connections = connections
+        self.providers: "OrderedDict[Hashable, SessionProviders]" = OrderedDict()
+        self.in_use: Dict[Hashable, int] = {}
+        self.sessions = 0
+        self.warm_task: Optional[asyncio.Task] = None
+
+    async def aclose(self):
+        if self.warm_task is not None:
+            self.warm_task.cancel()
+        for providers in self.providers.values():
+            await _close_providers(providers)
+        self.providers.clear()
+        await self.connections.aclose()
+
+
+async def _close_providers(providers: SessionProviders):
+    for provider in (providers.stt, providers.llm, providers.tts):
+        aclose = getattr(provider, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception as e:
+                logger.debug(f"Closing provider failed: {e}")
+
+
+class ProviderPool:
+    """
+    Provider clients shared by every session on an event loop.
+
+    Providers are cached per key - (personality, voice, temperature, ...) -
+    so one process can serve every personality without rebuilding clients
+    for each session. Least recently used entries with no active sessions
+    are evicted once more than max_entries are cached.
+
+    Provider objects are factories - each session opens its own streams
+    on them - so sharing them is safe. aiohttp sessions and httpx clients
+    are bound to the loop they were created on, so each loop gets its own
+    connection pool and provider cache. With JOB_EXECUTOR=thread every job
+    runs on its own loop; a loop's clients are closed when its last
+    session is released.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[SharedConnectionPool, Any], SessionProviders],
+        connections: Callable[[], SharedConnectionPool] = SharedConnectionPool,
+        warm_urls: Sequence[str] = (),
+        max_entries: int = 8,
+    ):
+        """
+        Args:
+            build: Builds a key's providers on a connection pool
+            connections: Makes the connection pool for a new event loop
+            warm_urls: Endpoints to open connections to when a loop is first used
+            max_entries: Provider sets cached per loop
+        """
+        self._build = build
+        self._connections = connections
+        self.warm_urls = list(warm_urls)
+        self.max_entries = max(1, max_entries)
+        # Only touched from each loop's own thread; dict updates are atomic
+        self._loops: Dict[asyncio.AbstractEventLoop, _LoopProviders] = {}
+
+    @property
+    def active_sessions(self) -> int:
+        return sum(entry.sessions for entry in list(self._loops.values()))
+
+    def prewarm(self, key: Hashable = None, spec: Any = None):
+        """
+        Synchronous prewarm hook for WorkerOptions.prewarm_fnc.
+
+        Runs before any job is dispatched to this process, with no event
+        loop running. The providers for `key` are built on a temporary loop
+        - importing SDK modules and loading models - and then closed, since
+        their connections can't be used from the job's loop.
+        """
+        try:
+            asyncio.get_running_loop()
+            return
+        except RuntimeError:
+            pass
+
+        start = time.perf_counter()
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._prewarm(key, spec))
+            logger.info(f"🔥 Providers prewarmed in {(time.perf_counter() - start) * 1000:.0f}ms")
+        except Exception as e:
+            logger.warning(f"⚠️ Prewarm failed, providers will be built on first job: {e}")
+        finally:
+            loop.close()
+
+    async def _prewarm(self, key, spec):
+        entry = _LoopProviders(self._connections())
+        try:
+            if key is not None:
+                entry.providers[key] = self._build(entry.connections, spec)
+        finally:
+            await entry.aclose()
+
+    def warm(self):
+        """Start opening connections for the running loop (call early in a job)"""
+        self._entry()
+
+    def _entry(self) -> _LoopProviders:
+        loop = asyncio.get_running_loop()
+        entry = self._loops.get(loop)
+        if entry is None:
+            entry = self._loops[loop] = _LoopProviders(self._connections())
+            if self.warm_urls:
+                entry.warm_task = loop.create_task(entry.connections.warm(self.warm_urls))
+        return entry
+
+    def _get_or_build(self, entry: _LoopProviders, key: Hashable, spec: Any) -> SessionProviders:
+        providers = entry.providers.get(key)
+        if providers is not None:
+            entry.providers.move_to_end(key)
+            return providers
+
+        start = time.perf_counter()
+        providers = self._build(entry.connections, spec)
+        entry.providers[key] = providers
+        logger.info(f"🧩 Built providers for {key} in {(time.perf_counter() - start) * 1000:.0f}ms")
+        self._evict(entry)
+        return providers
+
+    def _evict(self, entry: _LoopProviders, keep_newest: bool = True):
+        keys = list(entry.providers)
+        if keep_newest:
+            # The newest entry is the one being handed out
+            keys = keys[:-1]
+        for key in keys:
+            if len(entry.providers) <= self.max_entries:
+                break
+            if entry.in_use.get(key):
+                continue
+            providers = entry.providers.pop(key)
+            logger.info(f"♻️ Evicted providers for {key}")
+            asyncio.get_running_loop().create_task(_close_providers(providers))
+
+    async def acquire(self, key: Hashable = None, spec: Any = None) -> SessionProviders:
+        """Get provider handles for a new session"""
+        entry = self._entry()
+        providers = self._get_or_build(entry, key, spec)
+        entry.in_use[key] = entry.in_use.get(key, 0) + 1
+        entry.sessions += 1
+        return providers
+
+    async def release(self, key: Hashable = None):
+        """Return a session's handles; the loop's clients are closed with its last session"""
+        loop = asyncio.get_running_loop()
+        entry = self._loops.get(loop)
+        if entry is None:
+            return
+        count = entry.in_use.get(key, 0) - 1
+        if count > 0:
+            entry.in_use[key] = count
+        else:
+            entry.in_use.pop(key, None)
+        entry.sessions = max(0, entry.sessions - 1)
+        if entry.sessions == 0:
+            del self._loops[loop]
+            await entry.aclose()
+        else:
+            self._evict(entry, keep_newest=False)
+
+    @property
+    def cached_keys(self):
+        """Provider keys cached for the running loop"""
+        entry = self._loops.get(asyncio.get_running_loop())
+        return list(entry.providers) if entry is not None else []
@@ -0,0 +1,368 @@
+"""
+Runtime provider routing
+Tracks rolling latency and errors for every STT/LLM/TTS provider, trips a
+circuit breaker on repeated failures and picks, per request, which of the
+configured providers to try - so a session fails over mid-conversation
+instead of waiting on a degraded provider every turn
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from process_local import ProcessLocal
+from turn_metrics import quantile
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_EMPTY = object()   # A provider that answered with no output at all
+
+
+class ProviderHealth:
+    """
+    Rolling window of one provider's recent requests.
+
+    Keeps the last `window` outcomes no older than `max_age` seconds, so a
+    provider that was slow or failing is judged again on fresh requests
+    once the bad period ages out.
+    """
+
+    def __init__(self, window: int = 100, max_age: float = 120.0):
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, bool, Optional[float]]] = deque(maxlen=window)  # (at, ok, latency)
+
+    def record(self, now: float, ok: bool, latency: Optional[float] = None):
+        self._samples.append((now, ok, latency))
+
+    def _prune(self, now: float):
+        while self._samples and now - self._samples[0][0] > self.max_age:
+            self._samples.popleft()
+
+    def error_rate(self, now: float) -> float:
+        self._prune(now)
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, ok, _ in self._samples if not ok) / len(self._samples)
+
+    def latency(self, now: float, q: float = 0.95, min_samples: int = 10) -> Optional[float]:
+        """Quantile of time to first output, None until there are enough samples"""
+        self._prune(now)
+        latencies = [latency for _, ok, latency in self._samples if ok and latency is not None]
+        if len(latencies) < min_samples:
+            return None
+        return quantile(sorted(latencies), q)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failures` consecutive failures. After `cooldown`
+    seconds one probe request is let through (half-open): success closes
+    the breaker, failure opens it again for twice as long (up to
+    max_cooldown).
+    """
+
+    def __init__(self, failures: int = 3, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.failures = failures
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self._consecutive = 0
+        self._probing = False
+
+    @property
+    def retry_at(self) -> float:
+        return self.opened_at + self.cooldown
+
+    def available(self, now: float) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return now >= self.retry_at
+        return not self._probing
+
+    def started(self, now: float):
+        if self.state == OPEN and now >= self.retry_at:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            self._probing = True
+
+    def record(self, ok: bool, now: float):
+        self._probing = False
+        if ok:
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+            self._consecutive = 0
+            return
+        self._consecutive += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+        if self.state == HALF_OPEN or self._consecutive >= self.failures:
+            self.state = OPEN
+            self.opened_at = now
+
+    def cancelled(self):
+        # A cancelled probe proved nothing; let the next request probe
+        self._probing = False
+
+
+class ProviderRouter(ProcessLocal):
+    """
+    Health, breakers and counters for one kind of provider ("llm", "tts")
+    across every session in the process.
+
+    Providers are known by name ("openai", "elevenlabs", ...); callers pass
+    the names they can use in priority order. candidates() keeps that order
+    but skips providers whose breaker is open and moves providers whose
+    p95 time to first output is over `slow_after` seconds behind the rest
+    (every `probe_every`-th request still tries them first, so a provider
+    that recovered is noticed). If every breaker is open, the one closest
+    to retrying is still tried - a turn is never refused outright.
+    """
+
+    _init_args = ("kind", "slow_after", "failures", "cooldown", "window", "max_age", "probe_every")
+
+    def __init__(
+        self,
+        kind: str,
+        slow_after: float = 2.0,
+        failures: int = 3,
+        cooldown: float = 30.0,
+        window: int = 100,
+        max_age: float = 60.0,
+        probe_every: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.kind = kind
+        self.slow_after = slow_after
+        self.failures = failures
+        self.cooldown = cooldown
+        self.window = window
+        self.max_age = max_age
+        self.probe_every = probe_every
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._health: Dict[str, ProviderHealth] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.requests: Dict[Tuple[str, str], int] = {}   # (provider, outcome) -> count
+        self.failovers = 0
+        self.hedges = {"won": 0, "lost": 0}
+        self._picks = 0
+
+    def _entry(self, name: str) -> Tuple[ProviderHealth, CircuitBreaker]:
+        if name not in self._health:
+            self._health[name] = ProviderHealth(self.window, self.max_age)
+            self._breakers[name] = CircuitBreaker(self.failures, self.cooldown)
+        return self._health[name], self._breakers[name]
+
+    def candidates(self, names: Sequence[str]) -> List[str]:
+        """Providers to try for one request, best first"""
+        now = self._clock()
+        with self._lock:
+            usable = [name for name in names if self._entry(name)[1].available(now)]
+            if not usable and names:
+                usable = [min(names, key=lambda name: self._breakers[name].retry_at)]
+            self._picks += 1
+            if self._picks % self.probe_every == 0:
+                return usable
+            return sorted(usable, key=lambda name: self._slow(name, now))
+
+    def _slow(self, name: str, now: float) -> bool:
+        p95 = self._health[name].latency(now)
+        return p95 is not None and p95 > self.slow_after
+
+    def hedge_delay(self, name: str) -> float:
+        """How long to wait on `name` before starting a second provider: its p95"""
+        with self._lock:
+            p95 = self._entry(name)[0].latency(self._clock())
+        return self.slow_after if p95 is None else p95
+
+    def started(self, name: str) -> float:
+        now = self._clock()
+        with self._lock:
+            self._entry(name)[1].started(now)
+        return now
+
+    def record(self, name: str, ok: bool, started: Optional[float] = None):
+        """Outcome of a request; `started` (from started()) on success gives the first-output latency"""
+        now = self._clock()
+        latency = None if started is None or not ok else now - started
+        with self._lock:
+            health, breaker = self._entry(name)
+            was_open = breaker.state != CLOSED
+            health.record(now, ok, latency)
+            breaker.record(ok, now)
+            key = (name, "ok" if ok else "error")
+            self.requests[key] = self.requests.get(key, 0) + 1
+            state = breaker.state
+        if state == OPEN and not was_open:
+            logger.warning(f"⚡ {self.kind} provider {name} failing, circuit open for {breaker.cooldown:.0f}s")
+        elif state == CLOSED and was_open:
+            logger.info(f"✅ {self.kind} provider {name} recovered")
+
+    def cancelled(self, name: str, started: float):
+        """A request given up on (lost a hedge); its wait so far is a lower bound on its latency"""
+        now = self._clock()
+        with self._lock:
+            health, breaker = self._entry(name)
+            health.record(now, True, now - started)
+            breaker.cancelled()
+            key = (name, "cancelled")
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def count(self, failover: bool = False, hedge: Optional[str] = None):
+        with self._lock:
+            if failover:
+                self.failovers += 1
+            if hedge is not None:
+                self.hedges[hedge] += 1
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            return self._entry(name)[1].state
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        now = self._clock()
+        kind = self.kind
+        with self._lock:
+            lines = [
+                "# HELP voice_provider_requests_total Provider requests by outcome (cancelled: lost a hedge)",
+                "# TYPE voice_provider_requests_total counter",
+            ]
+            for (name, outcome), count in sorted(self.requests.items()):
+                lines.append(f'voice_provider_requests_total{{kind="{kind}",provider="{name}",outcome="{outcome}"}} {count}')
+            lines += [
+                "# TYPE voice_provider_failovers_total counter",
+                f'voice_provider_failovers_total{{kind="{kind}"}} {self.failovers}',
+                "# HELP voice_provider_hedges_total Hedged requests by whether the second provider answered first",
+                "# TYPE voice_provider_hedges_total counter",
+            ]
+            for outcome, count in self.hedges.items():
+                lines.append(f'voice_provider_hedges_total{{kind="{kind}",outcome="{outcome}"}} {count}')
+            lines += [
+                "# TYPE voice_provider_circuit_open gauge",
+                "# TYPE voice_provider_error_rate gauge",
+                "# TYPE voice_provider_first_output_p95_seconds gauge",
+            ]
+            for name in sorted(self._health):
+                health, breaker = self._health[name], self._breakers[name]
+                labels = f'kind="{kind}",provider="{name}"'
+                lines.append(f"voice_provider_circuit_open{{{labels}}} {int(breaker.state != CLOSED)}")
+                lines.append(f"voice_provider_error_rate{{{labels}}} {health.error_rate(now):.4f}")
+                p95 = health.latency(now)
+                if p95 is not None:
+                    lines.append(f"voice_provider_first_output_p95_seconds{{{labels}}} {p95:.4f}")
+            return "\n".join(lines) + "\n"
+
+
+async def _close(iterator):
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception as e:
+            logger.debug(f"Closing a provider stream failed: {e}")
+
+
+async def route(
+    router: ProviderRouter,
+    names: Sequence[str],
+    attempt: Callable[[str], AsyncIterator],
+    hedge: bool = False,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Output of the first provider to answer, as (provider name, item).
+
+    Providers are tried in router order; one that fails before its first
+    item is skipped for the next. With `hedge`, the next provider is also
+    started if the current one hasn't answered within its p95, and
+    whichever answers second is cancelled. Once an item has been yielded
+    the output is in use, so a later error is recorded and raised rather
+    than retried elsewhere.
+    """
+    queue = router.candidates(names)
+    running: Dict[asyncio.Task, Tuple[str, AsyncIterator, float]] = {}
+    winner = None
+    hedged_from = None
+    error: Optional[BaseException] = None
+
+    async def first(iterator):
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return _EMPTY
+
+    def start():
+        name = queue.pop(0)
+        iterator = attempt(name)
+        task = asyncio.create_task(first(iterator))
+        running[task] = (name, iterator, router.started(name))
+
+    try:
+        while winner is None:
+            if not running:
+                if not queue:
+                    raise error or RuntimeError(f"no {router.kind} provider available")
+                if error is not None:
+                    router.count(failover=True)
+                start()
+            leader = next(iter(running.values()))[0]
+            timeout = router.hedge_delay(leader) if hedge and queue and len(running) == 1 else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedged_from = leader
+                start()
+                continue
+            # Earliest-started first, so a tie goes to the preferred provider
+            for task in [task for task in running if task in done]:
+                name, iterator, started = running.pop(task)
+                try:
+                    item = task.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ {router.kind} provider {name} failed: {e}")
+                    router.record(name, False)
+                    error = e
+                    await _close(iterator)
+                    continue
+                if winner is None:
+                    router.record(name, True, started)
+                    winner = (name, iterator, item)
+                else:
+                    running[task] = (name, iterator, started)   # Cancelled below with the rest
+            if winner is not None and hedged_from is not None:
+                router.count(hedge="won" if winner[0] != hedged_from else "lost")
+
+        for task, (name, iterator, started) in running.items():
+            task.cancel()
+            router.cancelled(name, started)
+        await asyncio.gather(*running, return_exceptions=True)
+        for _, iterator, _ in running.values():
+            await _close(iterator)
+        running.clear()
+
+        name, iterator, item = winner
+        try:
+            if item is not _EMPTY:
+                yield name, item
+                async for item in iterator:
+                    yield name, item
+        except Exception:
+            router.record(name, False)
+            raise
+        finally:
+            await _close(iterator)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for _, iterator, _ in running.values():
+            await _close(iterator)
@@ -0,0 +1,156 @@
+"""
+LiveKit side of provider routing
+An LLM and a TTS that hold every configured provider of their kind and let
+a ProviderRouter pick one per request, so sessions fail over (and TTS can
+hedge) without being rebuilt
+"""
+
+import dataclasses
+from typing import Dict
+
+from livekit import rtc
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, llm, tts, utils
+
+from provider_router import ProviderRouter, route
+
+# The router fails over itself; neither the routed stream nor a single
+# provider should retry first
+_ROUTED_CONNECT_OPTIONS = APIConnectOptions(max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout)
+
+
+def _attempt_options(conn_options: APIConnectOptions) -> APIConnectOptions:
+    return dataclasses.replace(conn_options, max_retry=0)
+
+
+class RoutedLLM(llm.LLM):
+    def __init__(self, providers: Dict[str, llm.LLM], router: ProviderRouter):
+        super().__init__()
+        self.providers = providers   # Priority order
+        self.router = router
+
+    @property
+    def model(self) -> str:
+        return next(iter(self.providers.values())).model
+
+    @property
+    def provider(self) -> str:
+        return next(iter(self.providers.values())).provider
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools=None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        **kwargs,
+    ) -> "RoutedLLMStream":
+        return RoutedLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options, kwargs=kwargs)
+
+    async def aclose(self) -> None:
+        for provider in self.providers.values():
+            await provider.aclose()
+
+
+async def _chunks(stream: llm.LLMStream):
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await stream.aclose()
+
+
+class RoutedLLMStream(llm.LLMStream):
+    def __init__(self, routed: RoutedLLM, *, chat_ctx, tools, conn_options, kwargs):
+        super().__init__(routed, chat_ctx=chat_ctx, tools=tools, conn_options=_ROUTED_CONNECT_OPTIONS)
+        self._routed = routed
+        self._attempt_conn_options = _attempt_options(conn_options)
+        self._kwargs = kwargs
+
+    async def _run(self) -> None:
+        owner = self._routed
+
+        def attempt(name):
+            stream = owner.providers[name].chat(
+                chat_ctx=self._chat_ctx, tools=self._tools, conn_options=self._attempt_conn_options, **self._kwargs
+            )
+            return _chunks(stream)
+
+        async for _, chunk in route(owner.router, list(owner.providers), attempt):
+            self._event_ch.send_nowait(chunk)
+
+
+class RoutedTTS(tts.TTS):
+    """
+    Request/response TTS over several providers. Audio from a provider with
+    a different sample rate is resampled to the first provider's.
+    """
+
+    def __init__(self, providers: Dict[str, tts.TTS], router: ProviderRouter, hedge: bool = False):
+        primary = next(iter(providers.values()))
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=primary.sample_rate,
+            num_channels=primary.num_channels,
+        )
+        self.providers = providers   # Priority order
+        self.router = router
+        self.hedge = hedge
+
+    @property
+    def model(self) -> str:
+        return next(iter(self.providers.values())).model
+
+    @property
+    def provider(self) -> str:
+        return next(iter(self.providers.values())).provider
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "RoutedChunkedStream":
+        return RoutedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        for provider in self.providers.values():
+            provider.prewarm()
+
+    async def aclose(self) -> None:
+        for provider in self.providers.values():
+            await provider.aclose()
+
+
+class RoutedChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: RoutedTTS, input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=_ROUTED_CONNECT_OPTIONS)
+        self._routed = tts
+        self._attempt_conn_options = _attempt_options(conn_options)
+        self.served_by = None   # Provider that produced the audio, once known
+
+    async def _frames(self, name: str):
+        owner = self._routed
+        provider = owner.providers[name]
+        resampler = None
+        if provider.sample_rate != owner.sample_rate:
+            resampler = rtc.AudioResampler(provider.sample_rate, owner.sample_rate, num_channels=owner.num_channels)
+        async with provider.synthesize(self.input_text, conn_options=self._attempt_conn_options) as stream:
+            async for audio in stream:
+                if resampler is None:
+                    yield audio.frame
+                    continue
+                for frame in resampler.push(audio.frame):
+                    yield frame
+        if resampler is not None:
+            for frame in resampler.flush():
+                yield frame
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        owner = self._routed
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=owner.sample_rate,
+            num_channels=owner.num_channels,
+            mime_type="audio/pcm",
+        )
+        async for name, frame in route(owner.router, list(owner.providers), self._frames, hedge=owner.hedge):
+            self.served_by = name
+            output_emitter.push(frame.data.tobytes())
+        output_emitter.flush()
@@ -0,0 +1,86 @@
+"""
+Sentence-segmented streaming TTS
+Wraps a request/response TTS so the voice pipeline can stream text into it:
+text is cut into segments (tts_segmenter) and the next segment is
+synthesized while the current one plays
+"""
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, tts, utils
+
+from tts_segmenter import SentenceSegmenter, prefetch_audio, segment_stream
+
+# The wrapped TTS retries its own requests; the stream itself must not
+_STREAM_CONNECT_OPTIONS = APIConnectOptions(max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout)
+
+
+class SegmentedTTS(tts.TTS):
+    def __init__(
+        self, wrapped: tts.TTS, max_in_flight: int = 2, max_latency: float = 0.6, first_latency: float = 0.15
+    ):
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=True),
+            sample_rate=wrapped.sample_rate,
+            num_channels=wrapped.num_channels,
+        )
+        self.wrapped = wrapped
+        self.max_in_flight = max_in_flight
+        self.max_latency = max_latency
+        self.first_latency = first_latency
+
+    @property
+    def model(self) -> str:
+        return self.wrapped.model
+
+    @property
+    def provider(self) -> str:
+        return self.wrapped.provider
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.ChunkedStream:
+        # Whole phrases (e.g. the cached greeting) go straight to the provider
+        return self.wrapped.synthesize(text, conn_options=conn_options)
+
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "SegmentedSynthesizeStream":
+        return SegmentedSynthesizeStream(tts=self, conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        self.wrapped.prewarm()
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+class SegmentedSynthesizeStream(tts.SynthesizeStream):
+    def __init__(self, *, tts: SegmentedTTS, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, conn_options=_STREAM_CONNECT_OPTIONS)
+        self._segmented = tts
+        self._wrapped_conn_options = conn_options
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        owner = self._segmented
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=owner.sample_rate,
+            num_channels=owner.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id=utils.shortuuid())
+
+        async def text_input():
+            async for data in self._input_ch:
+                yield None if isinstance(data, self._FlushSentinel) else data
+
+        async def synthesize(text):
+            async with owner.wrapped.synthesize(text, conn_options=self._wrapped_conn_options) as stream:
+                async for audio in stream:
+                    yield audio.frame.data.tobytes()
+
+        segments = segment_stream(text_input(), SentenceSegmenter(), owner.max_latency, owner.first_latency)
+        async for _, audio in prefetch_audio(segments, synthesize, owner.max_in_flight):
+            async for data in audio:
+                output_emitter.push(data)
+            output_emitter.flush()
@@ -0,0 +1,400 @@
+"""
+Per-room voice session
+Everything that belongs to a single JobContext - the assistant, its event
+listeners and data publishers - lives here, so concurrent rooms in one
+worker process never share mutable state
+"""
+
+import asyncio
+import dataclasses
+import logging
+from typing import TYPE_CHECKING, Any, Optional
+
+from data_publisher import DataPublisher
+from endpointing import EndOfTurn
+from interruption import BargeIn
+from session_journal import (
+    AGENT_SPEECH, AGENT_STARTED_SPEAKING, AGENT_STOPPED_SPEAKING, EMOTION, SESSION_ENDED, SESSION_STARTED,
+    USER_SPEECH, USER_STARTED_SPEAKING, USER_STOPPED_SPEAKING, USER_TRANSCRIPT,
+)
+from speculation import Speculator
+from tag_parser import EmotionTagParser
+from turn_metrics import TurnTracer
+
+if TYPE_CHECKING:
+    # NumPy-backed; imported only when lip-sync is on
+    from lipsync import LipSyncStream
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceSession:
+    """
+    One conversation in one room.
+
+    The worker (VoiceAIAgent) owns process-wide resources: personality
+    config, provider pool, audio cache and load monitor. The session owns
+    the per-room assistant and everything that touches it.
+    """
+
+    def __init__(self, worker, ctx):
+        """
+        Args:
+            worker: The VoiceAIAgent that accepted this job
+            ctx: LiveKit JobContext for the room
+        """
+        self.worker = worker
+        self.ctx = ctx
+        # Chosen per room in start(); the worker default until then
+        self.personality = worker.personality
+        self.config = worker.config
+        self.room_name = ctx.room.name
+        # Session events go to the worker's journal (queued; written off the event loop)
+        self.journal = worker.journal.session(self.room_name)
+        self.assistant: Optional[Any] = None
+        self.providers = None
+        self.provider_key = None
+        self.tracer: Optional[TurnTracer] = None
+        self.speculator: Optional[Speculator] = None
+        self.lipsync: Optional["LipSyncStream"] = None
+        self.barge_in: Optional[BargeIn] = None
+        self.end_of_turn: Optional[EndOfTurn] = None
+        self.context = None   # ConversationContext when prompts are token-budgeted
+        self.recorder = None  # SessionRecorder when SESSION_RECORD_DIR is set
+        self.audio_lease = None   # This session's share of the worker's audio buffer budget
+        self._audio_taps: set = set()
+        # Emotion / speaking state / metrics to the client, one ordered stream per room
+        self.publisher = DataPublisher(
+            self._local_participant,
+            worker.data_stats,
+            binary=worker.data_binary,
+            max_queue=worker.data_queue_size,
+            on_sent=self._on_data_sent,
+        )
+        self._summary_task: Optional[asyncio.Task] = None
+        self._export_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self):
+        """Build the assistant, join the room and greet the user"""
+        logger.info(f"🚀 Agent starting in room: {self.room_name}")
+        self.worker.load_monitor.session_started()
+        self.worker.load_monitor.track_loop()
+        self.ctx.add_shutdown_callback(self.aclose)
+        # Buffered speech is capped per session by what the worker's budget can spare
+        self.audio_lease = self.worker.audio_budget.lease(self.room_name, self.ctx.job.id)
+        if self.audio_lease is None:
+            # Admitted while other jobs were starting, and their leases took what was left
+            logger.warning(f"⏸️ Audio buffer budget spent, leaving room {self.room_name}")
+            self.worker.end_job(self.ctx, "audio buffer budget spent")
+            return
+        # Job processes report their stats to the worker's /metrics
+        self._export_task = self.worker.export_job_metrics()
+        # Open provider connections on this job's loop while the room connects
+        self.worker.provider_pool.warm()
+
+        # Connect to room
+        await self.ctx.connect(**self.worker.connect_options)
+        logger.info(f"✅ Agent connected to room {self.room_name}")
+
+        # Personality comes from room metadata or participant attributes
+        self.personality, self.config = await self.worker.select_personality(self.ctx)
+
+        # Provider clients are cached per personality - usually just a handle
+        self.provider_key = self.worker.provider_key(self.personality, self.config)
+        self.providers = await self.worker.provider_pool.acquire(self.provider_key, self.config)
+        self.journal.emit(SESSION_STARTED, self.personality, self.providers.label)
+        self.tracer = TurnTracer(self.worker.metrics, self.personality, self.providers.label)
+        self.context = self.worker.conversation_context(self.providers, self.config)
+        # Opt-in trace of this session for offline replay (benchmarks/replay_session.py)
+        self.recorder = self.worker.open_recording(self)
+        if self.recorder is not None:
+            self._audio_taps = self.worker.record_input_audio(self.ctx, self.recorder)
+
+        providers = self.providers
+        if providers.tts is not None:
+            # Realtime models handle barge-in themselves; the cascaded loop pauses and cancels here
+            self.barge_in = BargeIn(
+                self._pause_playout,
+                self._resume_playout,
+                lambda: self.worker.interrupt_reply(self.assistant),
+                self.worker.interruption,
+                fast=self.worker.fast_interrupt,
+                min_words=self.worker.interrupt_min_words,
+                resume_after=self.worker.interrupt_resume_after,
+            )
+            if self.worker.lipsync_fps > 0:
+                # Mouth shapes for the avatar, computed from the audio this session speaks
+                from lipsync import LipSyncStream
+                self.lipsync = LipSyncStream(
+                    self._publish_visemes, frame_rate=self.worker.lipsync_fps, lease=self.audio_lease
+                )
+            # Every synthesized frame feeds lip-sync and the barge-in audio accounting
+            providers = dataclasses.replace(providers, tts=self.worker.tap_tts(providers.tts, self._on_tts_frame))
+
+        if self.providers.stt is not None:
+            # Per-utterance silence window from the transcript (realtime models detect turns themselves)
+            self.end_of_turn = EndOfTurn(self.worker.endpointer, self.worker.endpointing)
+
+        self.assistant = self.worker.create_assistant(
+            providers, self.config,
+            before_tts_cb=self._before_tts_cb,
+            before_llm_cb=self._before_llm_cb,
+            max_buffered_speech=self.audio_lease.speech_seconds,
+            turn_detection=self.end_of_turn,
+        )
+        if self.worker.speculation_window > 0 and self.providers.stt is not None:
+            self.speculator = Speculator(
+                lambda text: self.worker.speculative_reply(
+                    self.providers, self._budgeted(self.assistant.chat_ctx.copy()), text
+                ),
+                self.worker.speculation,
+                stable_window=self.worker.speculation_window,
+                min_words=self.worker.speculation_min_words,
+            )
+
+        # Setup event listeners
+        self.setup_event_listeners()
+
+        # Start the voice assistant
+        self.assistant.start(self.ctx.room)
+        logger.info("✅ Voice assistant started - ready for conversation!")
+
+        if self.worker.metrics_summary_interval > 0:
+            self._summary_task = asyncio.create_task(self._publish_metrics_summary())
+
+        # Initial greeting (optional) - served from the audio cache when warm
+        greeting = self.worker.greeting_text(self.config)
+        if self.providers.tts is None:
+            # Realtime model speaks for itself - there is no TTS to cache
+            await self.assistant.generate_reply(instructions=f"Greet the user by saying: {greeting}")
+        else:
+            await self.say_cached(greeting, allow_interruptions=True)
+
+    async def aclose(self):
+        """Release process-wide resources held by this session"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+        if self.speculator is not None:
+            self.speculator.aclose()
+        if self.lipsync is not None:
+            self.lipsync.aclose()
+        if self.barge_in is not None:
+            self.barge_in.aclose()
+        if self.context is not None:
+            self.context.aclose()
+        await self.publisher.aclose()
+        for task in self._audio_taps:
+            task.cancel()
+        if self.recorder is not None:
+            await self.recorder.aclose()
+        if self.audio_lease is not None:
+            self.audio_lease.release()
+        if self.providers is not None:
+            await self.worker.provider_pool.release(self.provider_key)
+        self.worker.load_monitor.session_ended()
+        self.journal.emit(SESSION_ENDED)
+        if self._export_task is not None:
+            # Sends the final figures on the way out
+            self._export_task.cancel()
+            await asyncio.gather(self._export_task, return_exceptions=True)
+
+    async def say_cached(self, text: str, allow_interruptions: bool = True):
+        """Speak a fixed phrase, streaming from the phrase cache when possible"""
+        audio = self.worker.cached_audio(text, self.providers)
+        if self.lipsync is not None:
+            audio = self._tapped(audio)
+        await self.assistant.say(text, audio=audio, allow_interruptions=allow_interruptions)
+
+    async def _tapped(self, frames):
+        async for frame in frames:
+            self._on_tts_frame(frame)
+            yield frame
+
+    def _on_tts_frame(self, frame):
+        if self.recorder is not None:
+            self.recorder.tts_audio(frame.samples_per_channel, frame.sample_rate)
+        if self.lipsync is not None:
+            self.lipsync.push(frame.data, frame.sample_rate, frame.num_channels)
+        self.barge_in.audio(frame.samples_per_channel / frame.sample_rate)
+
+    def _pause_playout(self) -> bool:
+        paused = self.worker.pause_playout(self.assistant)
+        if paused and self.lipsync is not None:
+            self.lipsync.pause()
+        return paused
+
+    def _resume_playout(self):
+        self.worker.resume_playout(self.assistant)
+        if self.lipsync is not None:
+            self.lipsync.resume()
+
+    def _on_data_sent(self, payload: bytes):
+        if self.recorder is not None:
+            self.recorder.data(payload)
+
+    def _publish_visemes(self, seq: int, offset_ms: int, levels: bytes):
+        self.publisher.publish("viseme", seq=seq, offset_ms=offset_ms, levels=levels)
+
+    def _local_participant(self):
+        """Where data messages go - None until the assistant has joined the room"""
+        if self.assistant is None or not self.assistant.room:
+            return None
+        return self.assistant.room.local_participant
+
+    async def _publish_metrics_summary(self):
+        """Periodically send this session's stage latencies over the data channel"""
+        while True:
+            await asyncio.sleep(self.worker.metrics_summary_interval)
+            if not self.tracer.turns:
+                continue
+            self.publisher.publish("metrics", turns=self.tracer.turns, stages=self.tracer.summary())
+
+    def publish_emotion_label(self, emotion: str):
+        """Queue an emotion for the client (only the latest unsent one is delivered)"""
+        self.publisher.publish("emotion", emotion=emotion, timestamp=asyncio.get_running_loop().time())
+
+    async def publish_emotion(self, text: str):
+        """Detect and publish emotion data to the room"""
+        emotion = self.worker.detect_emotion(text)
+        self.publish_emotion_label(emotion)
+        self.journal.emit(EMOTION, emotion, "text")
+
+    def _budgeted(self, chat_ctx):
+        """Trim a request's (copied) chat context to the session's token budget"""
+        if self.context is not None:
+            self.worker.apply_context_budget(chat_ctx, self.context)
+        return chat_ctx
+
+    def _before_llm_cb(self, agent, chat_ctx):
+        """
+        Trim the prompt to the token budget, then answer from the speculative
+        reply when it was made from the final transcript
+        """
+        if self.recorder is not None:
+            self.recorder.llm_request()
+        self._budgeted(chat_ctx)
+        if self.speculator is None:
+            return None
+        return self.worker.committed_llm_stream(self.providers, chat_ctx, self.speculator)
+
+    async def _before_tts_cb(self, agent, text_stream):
+        """
+        Callback to process text before TTS.
+        Used to strip emotion tags and publish them as data.
+        """
+        parser = EmotionTagParser()
+        tracer = self.tracer
+        recorder = self.recorder
+        first_chunk = True
+        first_yield = True
+        reply = None
+        if self.barge_in is not None:
+            # A confirmed barge-in closes this stream, and with it the LLM request
+            reply = self.barge_in.reply()
+            text_stream = self.barge_in.guard(reply, text_stream)
+
+        async for chunk in text_stream:
+            if recorder is not None:
+                recorder.llm_token(chunk)
+            if first_chunk:
+                tracer.mark("llm_first_token")
+                first_chunk = False
+            text, tags = parser.feed(chunk)
+
+            for emotion in tags:
+                self.journal.emit(EMOTION, emotion, "llm_tag")
+                self.publish_emotion_label(emotion)
+
+            # Text is released as soon as it can't be part of a tag
+            if text:
+                if first_yield:
+                    tracer.mark("tts_cb_first_yield")
+                    first_yield = False
+                if recorder is not None:
+                    recorder.tts_text(text)
+                yield text
+
+        if reply is not None and reply.cancelled.is_set():
+            return
+        # Yield anything held back (e.g. an unterminated "[")
+        remaining = parser.flush()
+        if remaining:
+            if first_yield:
+                tracer.mark("tts_cb_first_yield")
+            if recorder is not None:
+                recorder.tts_text(remaining)
+            yield remaining
+
+    def setup_event_listeners(self):
+        """Setup event listeners for this session's assistant"""
+        assistant = self.assistant
+        tracer = self.tracer
+        barge_in = self.barge_in
+        end_of_turn = self.end_of_turn
+        journal = self.journal
+        if self.recorder is not None:
+            self.recorder.listen(assistant)
+
+        @assistant.on("user_started_speaking")
+        def on_user_started_speaking():
+            journal.emit(USER_STARTED_SPEAKING)
+            if end_of_turn is not None:
+                end_of_turn.vad_start()
+            if barge_in is not None:
+                barge_in.vad_start()
+
+        @assistant.on("user_stopped_speaking")
+        def on_user_stopped_speaking():
+            tracer.mark("vad_end")
+            journal.emit(USER_STOPPED_SPEAKING)
+            if end_of_turn is not None:
+                end_of_turn.vad_end()
+            if barge_in is not None:
+                barge_in.vad_end()
+
+        @assistant.on("agent_started_speaking")
+        def on_agent_started_speaking():
+            tracer.mark("tts_first_audio")
+            journal.emit(AGENT_STARTED_SPEAKING)
+            if barge_in is not None:
+                barge_in.speaking_started()
+            self.publisher.publish("state", isSpeaking=True)
+
+        @assistant.on("agent_stopped_speaking")
+        def on_agent_stopped_speaking():
+            tracer.mark("playout_end")
+            journal.emit(AGENT_STOPPED_SPEAKING)
+            if self.lipsync is not None:
+                self.lipsync.end()
+            if barge_in is not None:
+                barge_in.speaking_stopped()
+            self.publisher.publish("state", isSpeaking=False)
+
+        # NOTE: We now handle emotion in _before_tts_cb, so we don't need to double-publish here
+        # unless it was missed. But simplicity is better.
+        @assistant.on("user_speech_committed")
+        def on_user_speech_committed(msg):
+            tracer.mark("stt_final")
+            journal.emit(USER_SPEECH, msg.content)
+
+        @assistant.on("user_input_transcribed")
+        def on_user_input_transcribed(ev):
+            journal.emit(USER_TRANSCRIPT, ev.transcript, ev.is_final)
+            if end_of_turn is not None:
+                end_of_turn.transcript(ev.transcript, ev.is_final)
+            if self.speculator is not None:
+                self.speculator.on_transcript(ev.transcript, ev.is_final)
+            if barge_in is not None:
+                barge_in.transcript(ev.transcript, ev.is_final)
+
+        @assistant.on("agent_speech_committed")
+        def on_agent_speech_committed(msg):
+            journal.emit(AGENT_SPEECH, msg.content)
+
+        @assistant.on("error")
+        def on_error(error: Exception):
+            logger.error(f"❌ Assistant error: {error}", exc_info=True)
@@ -0,0 +1,321 @@
+"""
+Session journal
+Typed session events (speech state, transcripts, emotions) written as JSON
+lines, plus the process's log lines, by one background thread. The event
+loop only checks the level, rate-limits high-frequency events and queues a
+tuple; formatting and the write to stdout happen off the loop, in batches,
+so a slow terminal or log shipper never stalls real-time audio
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, TextIO, Tuple
+
+OUTCOMES = ("written", "sampled", "dropped")
+
+
+class EventType(NamedTuple):
+    name: str
+    level: int
+    fields: Tuple[str, ...] = ()
+    sampled: bool = False     # High-frequency: rate-limited per session
+
+
+SESSION_STARTED = EventType("session_started", logging.INFO, ("personality", "providers"))
+SESSION_ENDED = EventType("session_ended", logging.INFO)
+USER_STARTED_SPEAKING = EventType("user_started_speaking", logging.INFO)
+USER_STOPPED_SPEAKING = EventType("user_stopped_speaking", logging.INFO)
+AGENT_STARTED_SPEAKING = EventType("agent_started_speaking", logging.INFO)
+AGENT_STOPPED_SPEAKING = EventType("agent_stopped_speaking", logging.INFO)
+USER_TRANSCRIPT = EventType("user_transcript", logging.DEBUG, ("text", "final"), sampled=True)
+USER_SPEECH = EventType("user_speech", logging.INFO, ("text",))
+AGENT_SPEECH = EventType("agent_speech", logging.INFO, ("text",))
+EMOTION = EventType("emotion", logging.INFO, ("emotion", "source"))
+
+EVENT_TYPES = {kind.name: kind for kind in (
+    SESSION_STARTED, SESSION_ENDED,
+    USER_STARTED_SPEAKING, USER_STOPPED_SPEAKING, AGENT_STARTED_SPEAKING, AGENT_STOPPED_SPEAKING,
+    USER_TRANSCRIPT, USER_SPEECH, AGENT_SPEECH, EMOTION,
+)}
+
+_STOP = object()
+
+
+def parse_level(name: str) -> int:
+    """Level number for a name like "INFO" (getLevelName returns "Level FOO" for unknown names)"""
+    level = logging.getLevelName(name.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level {name!r}")
+    return level
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Per-event level overrides from "user_speech=DEBUG,emotion=WARNING" """
+    levels = {}
+    for part in spec.split(","):
+        name, _, level = part.strip().partition("=")
+        if not name:
+            continue
+        if name not in EVENT_TYPES:
+            raise ValueError(f"Unknown journal event {name!r} (expected one of {', '.join(EVENT_TYPES)})")
+        try:
+            levels[name] = parse_level(level)
+        except ValueError:
+            raise ValueError(f"Unknown log level {level!r} for journal event {name!r}") from None
+    return levels
+
+
+class Journal:
+    """
+    Process-wide writer: a bounded queue drained by one thread.
+
+    put() never blocks - when the writer falls behind by max_queue items,
+    new items are dropped and counted, except WARNING and above, which the
+    caller writes itself rather than lose. The writer takes whatever is queued
+    (up to batch_size) and writes it with one write() and flush(). Log
+    records from JournalHandler share the queue, so journal events and log
+    lines stay in order.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        level: int = logging.INFO,
+        levels: Optional[Dict[str, int]] = None,
+        sample_per_second: float = 2.0,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+    ):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.configure(level, levels, sample_per_second, stream)
+        self.formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None   # Opened by open(), closed by close()
+        self.outcomes = {outcome: 0 for outcome in OUTCOMES}
+        self.batches = 0
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            # A forked job process gets its own queue and writer thread
+            os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.close)
+
+    def __reduce__(self):
+        # A job process writes through its own journal, configured by its import of agent.py
+        return _process_journal, ()
+
+    def _reset(self):
+        self._queue: queue.Queue = queue.Queue(self.max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+
+    def configure(
+        self,
+        level: int = logging.INFO,
+        levels: Optional[Dict[str, int]] = None,
+        sample_per_second: float = 2.0,
+        stream: Optional[TextIO] = None,
+    ):
+        """Set the threshold, per-event overrides, the sampled-event rate (0 = all) and the stream (None = stdout)"""
+        self.stream = stream
+        self.level = level
+        self.levels = dict(levels or {})
+        self.sample_per_second = sample_per_second
+        self._enabled = frozenset(
+            name for name, kind in EVENT_TYPES.items() if self.levels.get(name, kind.level) >= level
+        )
+
+    def open(self, path: str):
+        """Write to the file at `path` (appending) from now on; it is closed by close()"""
+        if self._file is not None and self._file.name == path:
+            return
+        stream = open(path, "a", encoding="utf-8")
+        with self._write_lock:
+            old, self._file, self.stream = self._file, stream, stream
+            if old is not None:
+                old.close()
+
+    def enabled(self, kind: EventType) -> bool:
+        return kind.name in self._enabled
+
+    def session(self, room: str) -> "SessionJournal":
+        return SessionJournal(self, room)
+
+    # Event-loop side
+
+    def put(self, item):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self._level(item) >= logging.WARNING:
+                # Out of order with what is queued, but never lost
+                try:
+                    self._write(self._render(item), 1)
+                    return
+                except Exception:
+                    pass
+            with self._lock:
+                self.outcomes["dropped"] += 1
+
+    def _level(self, item) -> int:
+        if isinstance(item, logging.LogRecord):
+            return item.levelno
+        kind = item[1]
+        return self.levels.get(kind.name, kind.level)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="session-journal", daemon=True)
+                self._thread.start()
+
+    def count(self, outcome: str):
+        with self._lock:
+            self.outcomes[outcome] += 1
+
+    # Writer thread
+
+    def _run(self):
+        get, get_nowait = self._queue.get, self._queue.get_nowait
+        while True:
+            batch = [get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                try:
+                    lines.append(self._render(item))
+                except Exception:
+                    pass   # An unformattable record shouldn't stop the writer
+            if lines:
+                self._write("".join(lines), len(lines))
+            if stop:
+                return
+
+    def _render(self, item) -> str:
+        if isinstance(item, logging.LogRecord):
+            return self.formatter.format(item) + "\n"
+        ts, kind, room, values, suppressed = item
+        level = logging.getLevelName(self.levels.get(kind.name, kind.level))
+        event = {"ts": round(ts, 3), "level": level, "room": room, "event": kind.name}
+        event.update(zip(kind.fields, values))
+        if suppressed:
+            event["suppressed"] = suppressed
+        return json.dumps(event, ensure_ascii=False) + "\n"
+
+    def _write(self, text: str, lines: int):
+        try:
+            with self._write_lock:
+                stream = self.stream if self.stream is not None else sys.stdout
+                stream.write(text)
+                stream.flush()
+        except (OSError, ValueError):
+            with self._lock:
+                self.outcomes["dropped"] += lines
+            return
+        with self._lock:
+            self.outcomes["written"] += lines
+            self.batches += 1
+
+    def close(self, timeout: float = 2.0):
+        """Write what is queued, stop the writer and close the file from open()"""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+                thread.join(timeout)
+            except queue.Full:
+                pass
+        if self._file is not None:
+            with self._write_lock:
+                self._file.close()
+                if self.stream is self._file:
+                    self.stream = None
+                self._file = None
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        with self._lock:
+            lines = [
+                "# HELP voice_journal_lines_total Journal events and log lines by outcome",
+                "# TYPE voice_journal_lines_total counter",
+            ]
+            lines += [f'voice_journal_lines_total{{outcome="{o}"}} {n}' for o, n in self.outcomes.items()]
+            lines += [
+                "# HELP voice_journal_batches_total Writes to the journal stream",
+                "# TYPE voice_journal_batches_total counter",
+                f"voice_journal_batches_total {self.batches}",
+                "# HELP voice_journal_queue_depth Lines waiting for the writer thread",
+                "# TYPE voice_journal_queue_depth gauge",
+                f"voice_journal_queue_depth {self._queue.qsize()}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class JournalHandler(logging.Handler):
+    """Routes log records through the journal's writer thread instead of writing in the caller"""
+
+    def __init__(self, journal: Journal, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.journal = journal
+
+    def emit(self, record: logging.LogRecord):
+        self.journal.put(record)
+
+
+class SessionJournal:
+    """One room's view of the journal; sampled events are rate-limited per session"""
+
+    __slots__ = ("journal", "room", "clock", "_buckets")
+
+    def __init__(self, journal: Journal, room: str, clock=time.time):
+        self.journal = journal
+        self.room = room
+        self.clock = clock
+        self._buckets: Dict[str, list] = {}   # event -> [tokens, last refill, suppressed]
+
+    def emit(self, kind: EventType, *values):
+        """Queue an event; values match kind.fields and are only formatted if written"""
+        journal = self.journal
+        if kind.name not in journal._enabled:
+            return
+        now = self.clock()
+        suppressed = 0
+        if kind.sampled and journal.sample_per_second > 0:
+            rate = journal.sample_per_second
+            burst = max(1.0, rate)
+            bucket = self._buckets.get(kind.name)
+            if bucket is None:
+                bucket = self._buckets[kind.name] = [burst, now, 0]
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                journal.count("sampled")
+                return
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        journal.put((now, kind, self.room, values, suppressed))
+
+
+# One journal per process; agent.py configures it from JOURNAL_* settings
+journal = Journal()
+
+
+def _process_journal() -> Journal:
+    return journal
@@ -0,0 +1,340 @@
+"""
+Session recording
+Captures what a session saw and did - inbound audio, assistant events,
+LLM token timing, text sent to TTS, TTS audio timing and data-channel
+messages - into a compact append-only file, so a slow production turn
+can be replayed offline (benchmarks/replay_session.py)
+
+File layout:
+    <name>.nzrec   header, then chunks: chunk header + records (zlib when smaller)
+    <name>.nzrec.idx   one fixed-size entry per chunk (offset, first t, records),
+                   read through mmap to seek by time without scanning the file
+Records are (t, kind, payload) with t in seconds since the session started.
+A crash loses at most the unflushed chunk; a missing or short index is
+rebuilt by scanning the chunks.
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NZREC\x00"
+VERSION = 1
+_FILE_HEADER = struct.Struct("<6sH")
+_CHUNK = struct.Struct("<4sBIIId")       # magic, flags, stored bytes, raw bytes, records, first t
+_CHUNK_MAGIC = b"NZCK"
+_COMPRESSED = 1
+_RECORD = struct.Struct("<dBI")          # t, kind, payload bytes
+_INDEX = struct.Struct("<QdI")           # chunk offset, first t, records
+_AUDIO = struct.Struct("<IH")            # sample rate, channels (PCM16 follows)
+_TTS_AUDIO = struct.Struct("<II")        # samples per channel, sample rate
+
+# Record kinds
+META = 0          # JSON: room, personality, providers, wall-clock start
+AUDIO_IN = 1      # Inbound user audio frame
+EVENT = 2         # JSON: assistant event name and its fields
+LLM_REQUEST = 3   # An LLM request was made (before_llm_cb)
+LLM_TOKEN = 4     # UTF-8 text chunk from the LLM, as _before_tts_cb received it
+TTS_TEXT = 5      # UTF-8 text _before_tts_cb released to TTS
+TTS_AUDIO = 6     # A synthesized frame: samples and sample rate
+DATA = 7          # Data-channel payload as sent
+KIND_NAMES = ("meta", "audio_in", "event", "llm_request", "llm_token", "tts_text", "tts_audio", "data")
+
+# Assistant events and the fields worth keeping from their argument
+EVENTS = {
+    "user_started_speaking": (),
+    "user_stopped_speaking": (),
+    "agent_started_speaking": (),
+    "agent_stopped_speaking": (),
+    "user_input_transcribed": ("transcript", "is_final"),
+    "user_speech_committed": ("content",),
+    "agent_speech_committed": ("content",),
+}
+
+_writer: Optional[ThreadPoolExecutor] = None
+_writer_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """One writer thread per process: chunks from every session, in submission order"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-recorder")
+        return _writer
+
+
+class Record(NamedTuple):
+    t: float
+    kind: int
+    payload: bytes
+
+    @property
+    def name(self) -> str:
+        return KIND_NAMES[self.kind]
+
+    def json(self) -> dict:
+        return json.loads(self.payload)
+
+    def text(self) -> str:
+        return self.payload.decode("utf-8")
+
+    def audio(self) -> tuple:
+        """(sample_rate, channels, pcm) of an AUDIO_IN record"""
+        rate, channels = _AUDIO.unpack_from(self.payload)
+        return rate, channels, self.payload[_AUDIO.size:]
+
+    def tts_audio(self) -> tuple:
+        """(samples per channel, sample rate) of a TTS_AUDIO record"""
+        return _TTS_AUDIO.unpack(self.payload)
+
+
+class SessionRecorder:
+    """
+    Appends one session's records to a recording file.
+
+    Recording calls only append to an in-memory chunk; full chunks (or
+    ones older than flush_interval) are compressed and written on the
+    process-wide writer thread, so the event loop never touches the disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        meta: dict,
+        audio: bool = True,
+        chunk_bytes: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = Path(path)
+        self.audio = audio
+        self.chunk_bytes = chunk_bytes
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.records = 0
+        self.bytes_written = 0
+        self._start = clock()
+        self._chunk = bytearray()
+        self._chunk_records = 0
+        self._chunk_t = 0.0
+        self._flushed_at = self._start
+        self._pending: Optional[Future] = None
+        self._closed = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._index = open(self.path.with_name(self.path.name + ".idx"), "wb")
+        self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        self._offset = _FILE_HEADER.size
+        self.record(META, json.dumps({"started": time.time(), **meta}).encode("utf-8"))
+
+    def record(self, kind: int, payload: bytes = b""):
+        if self._closed:
+            return
+        now = self.clock()
+        if not self._chunk_records:
+            self._chunk_t = now - self._start
+        self._chunk += _RECORD.pack(now - self._start, kind, len(payload))
+        self._chunk += payload
+        self._chunk_records += 1
+        self.records += 1
+        if len(self._chunk) >= self.chunk_bytes or now - self._flushed_at >= self.flush_interval:
+            self._flush(now)
+
+    # Typed helpers for the session's hooks
+
+    def event(self, name: str, **fields):
+        self.record(EVENT, json.dumps({"event": name, **fields}, separators=(",", ":")).encode("utf-8"))
+
+    def listen(self, emitter):
+        """Record the assistant events in EVENTS as they are emitted"""
+        for name, fields in EVENTS.items():
+            emitter.on(name)(self._listener(name, fields))
+
+    def _listener(self, name: str, fields: tuple):
+        def on_event(*args):
+            arg = args[0] if args else None
+            self.event(name, **{field: getattr(arg, field, None) for field in fields})
+        return on_event
+
+    def audio_in(self, pcm, sample_rate: int, channels: int):
+        if self.audio:
+            self.record(AUDIO_IN, _AUDIO.pack(sample_rate, channels) + bytes(pcm))
+
+    def llm_request(self):
+        self.record(LLM_REQUEST)
+
+    def llm_token(self, text: str):
+        self.record(LLM_TOKEN, text.encode("utf-8"))
+
+    def tts_text(self, text: str):
+        self.record(TTS_TEXT, text.encode("utf-8"))
+
+    def tts_audio(self, samples: int, sample_rate: int):
+        self.record(TTS_AUDIO, _TTS_AUDIO.pack(samples, sample_rate))
+
+    def data(self, payload: bytes):
+        self.record(DATA, bytes(payload))
+
+    # Writing
+
+    def _flush(self, now: float):
+        if not self._chunk_records:
+            return
+        chunk, records, first_t = bytes(self._chunk), self._chunk_records, self._chunk_t
+        self._chunk = bytearray()
+        self._chunk_records = 0
+        self._flushed_at = now
+        self._pending = _executor().submit(self._write_chunk, chunk, records, first_t)
+
+    def _write_chunk(self, raw: bytes, records: int, first_t: float):
+        stored, flags = zlib.compress(raw, 1), _COMPRESSED
+        if len(stored) >= len(raw):
+            stored, flags = raw, 0
+        try:
+            self._file.write(_CHUNK.pack(_CHUNK_MAGIC, flags, len(stored), len(raw), records, first_t))
+            self._file.write(stored)
+            self._file.flush()
+            # The index entry goes last: an indexed chunk is always complete on disk
+            self._index.write(_INDEX.pack(self._offset, first_t, records))
+            self._index.flush()
+        except OSError as e:
+            logger.warning(f"⚠️ Session recording {self.path.name} stopped: {e}")
+            self._closed = True
+            return
+        self._offset += _CHUNK.size + len(stored)
+        self.bytes_written = self._offset
+
+    def _close_files(self):
+        self._file.close()
+        self._index.close()
+
+    async def aclose(self):
+        """Write what is buffered and close the files (off the event loop)"""
+        if self._closed:
+            return
+        self._flush(self.clock())
+        self._closed = True
+        await asyncio.wrap_future(_executor().submit(self._close_files))
+        logger.info(f"📼 Recorded {self.records} records ({self.bytes_written / 1024:.0f} KiB) to {self.path.name}")
+
+
+class _ChunkIndex:
+    """Chunk index entries, from the mmapped .idx file or a scan of the chunks"""
+
+    def __init__(self, entries: Optional[List[tuple]] = None, buffer=None, count: int = 0):
+        self._entries = entries
+        self._buffer = buffer
+        self._count = len(entries) if entries is not None else count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> tuple:
+        if self._entries is not None:
+            return self._entries[i]
+        return _INDEX.unpack_from(self._buffer, i * _INDEX.size)
+
+
+class Recording:
+    """Reads a recording; records() seeks by time through the chunk index"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _FILE_HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path.name}: not a session recording (version {VERSION})")
+        self._index_file = None
+        self._index_map = None
+        self.index = self._open_index()
+        self.meta = next(self.records()).json() if len(self.index) else {}
+
+    def _open_index(self) -> _ChunkIndex:
+        index_path = self.path.with_name(self.path.name + ".idx")
+        if index_path.exists() and index_path.stat().st_size >= _INDEX.size:
+            self._index_file = open(index_path, "rb")
+            self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            count = len(self._index_map) // _INDEX.size
+            # Trust only entries whose chunk is wholly in the data file
+            while count:
+                offset = _INDEX.unpack_from(self._index_map, (count - 1) * _INDEX.size)[0]
+                if offset + _CHUNK.size <= len(self._data):
+                    stored = _CHUNK.unpack_from(self._data, offset)[2]
+                    if offset + _CHUNK.size + stored <= len(self._data):
+                        break
+                count -= 1
+            return _ChunkIndex(buffer=self._index_map, count=count)
+        return _ChunkIndex(entries=self._scan())
+
+    def _scan(self) -> List[tuple]:
+        entries, offset = [], _FILE_HEADER.size
+        while offset + _CHUNK.size <= len(self._data):
+            magic, _, stored, _, records, first_t = _CHUNK.unpack_from(self._data, offset)
+            if magic != _CHUNK_MAGIC or offset + _CHUNK.size + stored > len(self._data):
+                break   # Torn write at the end
+            entries.append((offset, first_t, records))
+            offset += _CHUNK.size + stored
+        return entries
+
+    def _chunk(self, i: int) -> Iterator[Record]:
+        offset = self.index[i][0]
+        _, flags, stored, _, records, _ = _CHUNK.unpack_from(self._data, offset)
+        body = self._data[offset + _CHUNK.size:offset + _CHUNK.size + stored]
+        if flags & _COMPRESSED:
+            body = zlib.decompress(body)
+        position = 0
+        for _ in range(records):
+            t, kind, length = _RECORD.unpack_from(body, position)
+            position += _RECORD.size
+            yield Record(t, kind, bytes(body[position:position + length]))
+            position += length
+
+    def records(self, start: float = 0.0, end: float = float("inf"), kinds=None) -> Iterator[Record]:
+        """Records with start <= t < end, in order"""
+        # First chunk starting at or after `start`; the one before it may hold `start` too.
+        # Chunks can share a first t, so the first of them, not the last, is where to begin
+        low, high = 0, len(self.index)
+        while low < high:
+            mid = (low + high) // 2
+            if self.index[mid][1] < start:
+                low = mid + 1
+            else:
+                high = mid
+        for i in range(max(0, low - 1), len(self.index)):
+            if self.index[i][1] >= end:
+                return
+            for record in self._chunk(i):
+                if record.t >= end:
+                    return
+                if record.t >= start and (kinds is None or record.kind in kinds):
+                    yield record
+
+    def __iter__(self) -> Iterator[Record]:
+        return self.records()
+
+    @property
+    def duration(self) -> float:
+        last = None
+        if len(self.index):
+            for last in self._chunk(len(self.index) - 1):
+                pass
+        return last.t if last is not None else 0.0
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_file.close()
@@ -0,0 +1,234 @@
+"""
+Speculative LLM generation
+Starts the LLM on an interim transcript once it has stopped changing, then
+either hands the buffered reply to the pipeline (the final transcript
+matched) or cancels it (it didn't)
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import AsyncIterator, Callable, List, Optional
+
+from process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+_SPACES = re.compile(r"\s+")
+
+OUTCOMES = ("hit", "miss", "abandoned")
+
+
+def normalize(text: str) -> str:
+    """Compare transcripts ignoring case, punctuation and spacing (finals add punctuation)"""
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+class SpeculationStats(ProcessLocal):
+    """
+    Process-wide speculation counters.
+
+    hit: the final transcript matched and the reply was reused.
+    miss: the final transcript differed; the reply was cancelled.
+    abandoned: the user kept talking and the interim changed first.
+
+    Every miss or abandoned speculation is an LLM request on top of the
+    turn's own: its prompt is billed in full, plus whatever output it
+    produced before it was cancelled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.outcomes = {outcome: 0 for outcome in OUTCOMES}
+        self.wasted_requests = 0
+        self.wasted_prompt_tokens = 0
+        self.wasted_tokens = 0
+        self.head_start = 0.0   # Seconds of generation done before the final transcript (hits)
+
+    def record(self, outcome: str, tokens: int = 0, head_start: float = 0.0, prompt_tokens: int = 0):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            if outcome == "hit":
+                self.head_start += head_start
+            else:
+                self.wasted_requests += 1
+                self.wasted_prompt_tokens += prompt_tokens
+                self.wasted_tokens += tokens
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of committed turns answered from a speculation"""
+        total = self.outcomes["hit"] + self.outcomes["miss"]
+        return self.outcomes["hit"] / total if total else 0.0
+
+    def request_multiplier(self, turns: int) -> float:
+        """LLM requests per committed turn, counting the speculations thrown away"""
+        return (turns + self.wasted_requests) / turns if turns else 0.0
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        with self._lock:
+            lines = [
+                "# HELP voice_speculation_total Speculative LLM generations by outcome",
+                "# TYPE voice_speculation_total counter",
+            ]
+            lines += [f'voice_speculation_total{{outcome="{o}"}} {n}' for o, n in self.outcomes.items()]
+            lines += [
+                "# HELP voice_speculation_wasted_requests_total LLM requests made by cancelled speculations",
+                "# TYPE voice_speculation_wasted_requests_total counter",
+                f"voice_speculation_wasted_requests_total {self.wasted_requests}",
+                "# HELP voice_speculation_wasted_prompt_tokens_total Prompt tokens sent by cancelled speculations",
+                "# TYPE voice_speculation_wasted_prompt_tokens_total counter",
+                f"voice_speculation_wasted_prompt_tokens_total {self.wasted_prompt_tokens}",
+                "# HELP voice_speculation_wasted_tokens_total Tokens generated by cancelled speculations",
+                "# TYPE voice_speculation_wasted_tokens_total counter",
+                f"voice_speculation_wasted_tokens_total {self.wasted_tokens}",
+                "# HELP voice_speculation_head_start_seconds_total Generation time gained by hits",
+                "# TYPE voice_speculation_head_start_seconds_total counter",
+                f"voice_speculation_head_start_seconds_total {self.head_start:.6f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class Speculation:
+    """One in-flight speculative reply and the tokens buffered so far"""
+
+    def __init__(self, text: str, started: float, prompt_tokens: int = 0):
+        self.text = text
+        self.started = started
+        self.prompt_tokens = prompt_tokens
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    async def _run(self, stream: AsyncIterator[str]):
+        try:
+            async for token in stream:
+                self.tokens.append(token)
+                self._changed.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._changed.set()
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def cancel(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+    async def replay(self) -> AsyncIterator[str]:
+        """Buffered tokens first, then the rest as the model produces them"""
+        sent = 0
+        try:
+            while True:
+                while sent < len(self.tokens):
+                    yield self.tokens[sent]
+                    sent += 1
+                if self.done:
+                    break
+                self._changed.clear()
+                await self._changed.wait()
+            if self.error is not None:
+                raise self.error
+        finally:
+            # Pipeline stopped reading (e.g. the user interrupted) - stop generating
+            self.cancel()
+
+
+class Speculator:
+    """
+    Per-session speculation state machine.
+
+    Feed it every transcript event. When an interim has been unchanged for
+    `stable_window` seconds, `start(text)` is called to open an LLM stream
+    (an async iterator of text, with a `prompt_tokens` attribute if the
+    prompt size is known). `commit(final_text)` returns the running
+    Speculation if it was made from the same words, else cancels it.
+    """
+
+    def __init__(
+        self,
+        start: Callable[[str], AsyncIterator[str]],
+        stats: SpeculationStats,
+        stable_window: float = 0.25,
+        min_words: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.start = start
+        self.stats = stats
+        self.stable_window = stable_window
+        self.min_words = min_words
+        self.clock = clock
+        self._interim = ""
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._pending: Optional[Speculation] = None
+
+    def on_transcript(self, text: str, is_final: bool):
+        """Transcript event from STT (interim or final)"""
+        if is_final:
+            # The pipeline commits the turn next (see commit); nothing new to start
+            self._cancel_timer()
+            return
+        words = normalize(text)
+        if words == self._interim:
+            return
+        self._interim = words
+        self._cancel_timer()
+        if self._pending is not None and self._pending.text != words:
+            self._drop("abandoned")
+        if len(words.split()) >= self.min_words:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.stable_window, self._speculate, text, words)
+
+    def _speculate(self, text: str, words: str):
+        self._timer = None
+        if self._pending is not None:
+            return
+        try:
+            stream = self.start(text)
+        except Exception as e:
+            logger.debug(f"Speculation not started: {e}")
+            return
+        speculation = Speculation(words, self.clock(), getattr(stream, "prompt_tokens", 0))
+        speculation.task = asyncio.create_task(speculation._run(stream))
+        self._pending = speculation
+        logger.debug(f"🔮 Speculating on: {text!r}")
+
+    def commit(self, final_text: str) -> Optional[Speculation]:
+        """Claim the speculation for this turn if it used the final words"""
+        self._cancel_timer()
+        self._interim = ""
+        speculation, self._pending = self._pending, None
+        if speculation is None:
+            return None
+        if speculation.text == normalize(final_text) and speculation.error is None:
+            self.stats.record("hit", head_start=self.clock() - speculation.started)
+            return speculation
+        speculation.cancel()
+        self.stats.record("miss", tokens=len(speculation.tokens), prompt_tokens=speculation.prompt_tokens)
+        return None
+
+    def _drop(self, outcome: str):
+        speculation, self._pending = self._pending, None
+        speculation.cancel()
+        self.stats.record(outcome, tokens=len(speculation.tokens), prompt_tokens=speculation.prompt_tokens)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def aclose(self):
+        self._cancel_timer()
+        if self._pending is not None:
+            self._drop("abandoned")
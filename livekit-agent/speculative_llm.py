@@ -0,0 +1,66 @@
+"""
+LiveKit side of speculative generation
+Opens the speculative chat request and hands a committed Speculation back
+to the voice pipeline as a regular LLMStream
+"""
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, llm, utils
+
+from context_budget import count_tokens
+from llm_context import turns_from_chat_ctx
+from speculation import Speculation
+
+
+def last_user_text(chat_ctx: llm.ChatContext) -> str:
+    """Text of the user message the pipeline is about to answer"""
+    for item in reversed(chat_ctx.items):
+        if getattr(item, "role", None) == "user":
+            return item.text_content or ""
+    return ""
+
+
+async def _text_chunks(stream: llm.LLMStream):
+    try:
+        async for chunk in stream:
+            if chunk.delta and chunk.delta.content:
+                yield chunk.delta.content
+    finally:
+        # Closing the generator (cancelled speculation) closes the HTTP stream
+        await stream.aclose()
+
+
+class SpeculativeReply:
+    """Text chunks of a speculative request, and the size of the prompt it sent"""
+
+    def __init__(self, stream: llm.LLMStream, prompt_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self._chunks = _text_chunks(stream)
+
+    def __aiter__(self):
+        return self._chunks
+
+    async def aclose(self):
+        await self._chunks.aclose()
+
+
+def speculative_stream(model: llm.LLM, chat_ctx: llm.ChatContext, text: str) -> SpeculativeReply:
+    """Reply to `text` as if it were the committed user turn"""
+    chat_ctx = chat_ctx.copy()
+    chat_ctx.add_message(role="user", content=text)
+    prompt_tokens = sum(count_tokens(turn.text) for turn in turns_from_chat_ctx(chat_ctx))
+    return SpeculativeReply(model.chat(chat_ctx=chat_ctx), prompt_tokens)
+
+
+class CommittedLLMStream(llm.LLMStream):
+    """Replays a speculative reply, then follows it live until it finishes"""
+
+    def __init__(self, model: llm.LLM, *, chat_ctx: llm.ChatContext, speculation: Speculation):
+        super().__init__(model, chat_ctx=chat_ctx, tools=[], conn_options=DEFAULT_API_CONNECT_OPTIONS)
+        self._speculation = speculation
+
+    async def _run(self) -> None:
+        request_id = utils.shortuuid()
+        async for token in self._speculation.replay():
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", content=token))
+            )
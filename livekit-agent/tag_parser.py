@@ -0,0 +1,163 @@
+"""
+Streaming emotion-tag parser
+Strips [emotion] tags from LLM text streams one character at a time
+"""
+
+import re
+from typing import Iterable, List, Tuple
+
+# Longest tag we accept; anything longer is treated as literal text
+MAX_TAG_LENGTH = 32
+
+# Tags the personality prompts ask for, plus the frontend's emotion labels.
+# Mid-reply, anything else in brackets ("[1,2]", "[citation needed]") is spoken as written.
+EMOTIONS = frozenset((
+    "neutral", "happy", "sad", "excited", "concerned", "playful", "thoughtful",
+    "angry", "stressed", "calm", "love",
+))
+
+# Some prompts let the model pick its own emotion word ("[surprised]"); a single-word
+# tag that opens the reply is taken as one even when it isn't in the vocabulary
+_LEADING_TAG = re.compile(r"[a-z][a-z_-]*")
+
+_TEXT = 0      # Passing text through
+_LEADING = 1   # Start of reply, only whitespace seen so far
+_TAG = 2       # Inside [ ... ]
+
+
+class EmotionTagParser:
+    """
+    Incremental parser for [emotion] tags in a streamed reply.
+
+    Each character is inspected exactly once. Text is released as soon as it
+    is known not to be part of a tag, so an untagged reply reaches TTS on its
+    first chunk. Tags from the emotion vocabulary are removed and reported
+    wherever they appear, and so is any single-word tag that opens the
+    reply; any other bracketed text, including nested brackets, passes
+    through unchanged.
+    """
+
+    def __init__(self, max_tag_length: int = MAX_TAG_LENGTH, emotions: Iterable[str] = EMOTIONS):
+        self.max_tag_length = max_tag_length
+        self.emotions = frozenset(emotions)
+        self.reset()
+
+    def reset(self):
+        """Prepare the parser for a new reply"""
+        self._state = _LEADING
+        self._pending = []      # Characters held back (leading whitespace or open tag)
+        self._tag_start = 0     # Index in _pending where the open tag begins
+        self._last_char = ""    # Last character released to the caller
+        self._skip_space = False
+
+    def feed(self, chunk: str) -> Tuple[str, List[str]]:
+        """
+        Consume a chunk of streamed text.
+
+        Returns:
+            (text to speak now, list of lowercased tags found in this chunk)
+        """
+        # Most chunks are plain mid-reply text - hand them straight back
+        if self._state == _TEXT and not self._skip_space and "[" not in chunk:
+            if chunk:
+                self._last_char = chunk[-1]
+            return chunk, []
+
+        out = []
+        tags = []
+        pending = self._pending
+        i = 0
+        n = len(chunk)
+
+        while i < n:
+            state = self._state
+
+            # Fast path: plain text is released in bulk up to the next "["
+            if state == _TEXT and not self._skip_space:
+                j = chunk.find("[", i)
+                if j == -1:
+                    j = n
+                if j > i:
+                    out.append(chunk[i:j])
+                    self._last_char = chunk[j - 1]
+                    i = j
+                    continue
+
+            ch = chunk[i]
+            i += 1
+
+            if state == _TAG:
+                if ch == "]":
+                    tag = "".join(pending[self._tag_start + 1:]).strip().lower()
+                    leading = not self._last_char and _LEADING_TAG.fullmatch(tag)
+                    if tag not in self.emotions and not leading:
+                        # Bracketed text that isn't an emotion - speak it as written
+                        pending.append(ch)
+                        self._release(pending, out)
+                        self._state = _TEXT
+                        continue
+                    tags.append(tag)
+                    # Whatever was held before the tag (leading whitespace) is dropped
+                    # at the start of a reply, otherwise it was already released
+                    pending.clear()
+                    self._state = _LEADING if not self._last_char else _TEXT
+                    self._skip_space = True
+                elif ch == "\n" or len(pending) - self._tag_start > self.max_tag_length:
+                    # Not a tag after all - release what we held as literal text
+                    self._release(pending, out)
+                    self._state = _TEXT
+                    self._emit(ch, out)
+                else:
+                    # A second "[" stays in the held text: "[[happy]" is not a tag
+                    pending.append(ch)
+                continue
+
+            if ch == "[":
+                if state == _TEXT:
+                    pending.clear()
+                self._tag_start = len(pending)
+                pending.append(ch)
+                self._state = _TAG
+                continue
+
+            if ch.isspace():
+                if state == _LEADING:
+                    pending.append(ch)
+                    continue
+                if self._skip_space and (not self._last_char or self._last_char.isspace()):
+                    continue
+                self._skip_space = False
+                self._emit(ch, out)
+                continue
+
+            # First printable non-tag character - everything from here streams
+            if state == _LEADING:
+                pending.clear()
+                self._state = _TEXT
+            self._skip_space = False
+            self._emit(ch, out)
+
+        return "".join(out), tags
+
+    def flush(self) -> str:
+        """Release anything still held back at the end of the stream"""
+        text = ""
+        if self._state == _TAG:
+            out = []
+            self._release(self._pending, out)
+            text = "".join(out)
+        self._pending.clear()
+        self._state = _TEXT if self._last_char else _LEADING
+        return text
+
+    def _emit(self, ch: str, out: list):
+        out.append(ch)
+        self._last_char = ch
+
+    def _release(self, pending: list, out: list):
+        """Release held characters as literal text, dropping leading whitespace"""
+        start = self._tag_start if not self._last_char else 0
+        for ch in pending[start:]:
+            self._emit(ch, out)
+        pending.clear()
+        self._tag_start = 0
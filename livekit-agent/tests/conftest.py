@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the agent's modules the way agent.py does, from livekit-agent/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
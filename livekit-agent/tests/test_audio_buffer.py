@@ -0,0 +1,112 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from audio_buffer import SPEECH_BYTES_PER_SECOND, AudioBudget, AudioRing
+
+SECOND = SPEECH_BYTES_PER_SECOND
+
+
+def test_leases_clamp_then_refuse_past_the_budget():
+    budget = AudioBudget(70 * SECOND, session_seconds=30, min_seconds=10)
+    first, second = budget.lease("a", "job-a"), budget.lease("b", "job-b")
+    assert first.speech_bytes == second.speech_bytes == 30 * SECOND
+    third = budget.lease("c", "job-c")
+    assert third.speech_bytes == 10 * SECOND and budget.clamped == 1
+    assert budget.used == budget.total_bytes
+    # Never more than the budget: no lease below the floor
+    assert budget.lease("d", "job-d") is None
+    assert not budget.can_admit()
+    assert budget.used == budget.total_bytes
+    assert budget.rejected == 2
+
+
+def test_buffers_count_against_the_lease_until_released():
+    budget = AudioBudget(100 * SECOND, session_seconds=30, min_seconds=10)
+    lease = budget.lease("a", "job-a")
+    lease.set("lipsync", 4096)
+    lease.set("lipsync", 1024)
+    assert lease.nbytes == 30 * SECOND + 1024
+    assert budget.used == lease.nbytes
+    assert budget.sessions() == {"a": lease.nbytes}
+    lease.release()
+    lease.release()
+    assert budget.used == 0 and budget.sessions() == {}
+    assert budget.can_admit()
+
+
+def lease_in_job(budget, leased, done):
+    lease = budget.lease("job", "job-1")
+    leased.set()
+    done.wait(30)
+    lease.release()
+
+
+def test_job_process_leases_draw_on_the_worker_budget():
+    ctx = multiprocessing.get_context("spawn")
+    budget = AudioBudget(35 * SECOND, session_seconds=30, min_seconds=10)
+    leased, done = ctx.Event(), ctx.Event()
+    job = ctx.Process(target=lease_in_job, args=(budget, leased, done))
+    job.start()
+    try:
+        assert leased.wait(30)
+        assert budget.used == 30 * SECOND
+        assert not budget.can_admit()
+        assert budget.lease("main", "job-2") is None
+    finally:
+        done.set()
+        job.join(30)
+    assert budget.used == 0
+    assert budget.can_admit()
+
+
+def lease_and_hang(budget, leased):
+    budget.lease("job", "job-1").set("lipsync", 1024)
+    leased.set()
+    while True:
+        time.sleep(1)
+
+
+def test_killed_job_lease_is_reclaimed_once_the_job_is_gone():
+    ctx = multiprocessing.get_context("spawn")
+    budget = AudioBudget(35 * SECOND, session_seconds=30, min_seconds=10)
+    running = {"job-1"}
+    budget.track_jobs(lambda: running)
+    leased = ctx.Event()
+    job = ctx.Process(target=lease_and_hang, args=(budget, leased))
+    job.start()
+    assert leased.wait(30)
+    job.kill()
+    job.join(30)
+    # Still a running job as far as the worker knows: its lease stays
+    assert not budget.can_admit()
+    assert budget.used == 30 * SECOND + 1024
+    running.clear()
+    assert budget.can_admit()
+    assert budget.used == 0 and budget.reclaimed == 1
+    assert "voice_audio_buffer_reclaimed_total 1" in budget.render()
+
+
+def test_release_after_reclaim_does_not_free_twice():
+    budget = AudioBudget(100 * SECOND, session_seconds=30, min_seconds=10)
+    stale = budget.lease("a", "job-a")
+    assert budget.reclaim(["job-b"]) == 30 * SECOND
+    fresh = budget.lease("b", "job-b")
+    assert fresh.slot == stale.slot
+    stale.set("lipsync", 4096)
+    stale.release()
+    assert budget.used == fresh.nbytes == 30 * SECOND
+    assert budget.sessions() == {"b": fresh.nbytes}
+    assert budget.reclaim(["job-b"]) == 0
+
+
+def test_ring_overwrites_oldest_and_converts():
+    ring = AudioRing(4)
+    ring.write(np.array([1, 2, 3], dtype=np.int16), scale=0.5)
+    ring.write(np.array([4, 5], dtype=np.int16))
+    assert ring.dropped == 1
+    out = np.zeros(4, dtype=np.float32)
+    assert ring.read_into(out)
+    assert out.tolist() == [1.0, 1.5, 4.0, 5.0]
+    assert not ring.read_into(out)
@@ -0,0 +1,93 @@
+import os
+import time
+
+from audio_cache import STALE_TMP_SECONDS, AudioCache, cache_key
+
+
+def pcm(samples, value=1):
+    return value.to_bytes(2, "little", signed=True) * samples
+
+
+def store(cache, key, samples=160, sample_rate=16000):
+    writer = cache.writer(key, sample_rate, 1)
+    writer.append(pcm(samples))
+    writer.commit()
+
+
+def test_round_trip_in_fixed_frames(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1 << 20)
+    store(cache, "greeting", samples=700)
+    frames = list(cache.frames("greeting", frame_ms=20))
+    assert [f.samples_per_channel for f in frames] == [320, 320, 60]
+    assert b"".join(f.data for f in frames) == pcm(700)
+    assert frames[0].sample_rate == 16000 and frames[0].num_channels == 1
+
+
+def test_miss_returns_none(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1 << 20)
+    assert cache.frames("missing") is None
+    assert "missing" not in cache
+
+
+def test_empty_and_truncated_entries_are_deleted_on_lookup(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1 << 20)
+    (tmp_path / "empty.pcm").write_bytes(b"")
+    store(cache, "short", samples=100)
+    path = tmp_path / "short.pcm"
+    path.write_bytes(path.read_bytes()[:-10])
+    (tmp_path / "garbage.pcm").write_bytes(b"x" * 64)
+
+    for key in ("empty", "short", "garbage"):
+        assert cache.frames(key) is None
+        assert not (tmp_path / f"{key}.pcm").exists()
+
+
+def test_entries_from_another_process_are_visible(tmp_path):
+    writer_process = AudioCache(tmp_path, max_bytes=1 << 20)
+    reader_process = AudioCache(tmp_path, max_bytes=1 << 20)
+    store(writer_process, "greeting")
+    assert "greeting" in reader_process
+    assert reader_process.frames("greeting") is not None
+
+
+def test_eviction_counts_every_process_entries(tmp_path):
+    entry = 16 + 160 * 2
+    a = AudioCache(tmp_path, max_bytes=entry * 2)
+    b = AudioCache(tmp_path, max_bytes=entry * 2)
+    store(a, "one")
+    store(a, "two")
+    past = time.time() - 100
+    os.utime(tmp_path / "one.pcm", (past, past))
+    store(b, "three")
+    assert "one" not in b and "two" in b and "three" in b
+    assert a.total_bytes == b.total_bytes == entry * 2
+
+
+def test_hit_refreshes_recency(tmp_path):
+    entry = 16 + 160 * 2
+    cache = AudioCache(tmp_path, max_bytes=entry * 2)
+    store(cache, "one")
+    store(cache, "two")
+    for i, key in enumerate(("two", "one")):
+        past = time.time() - 100 + i
+        os.utime(tmp_path / f"{key}.pcm", (past, past))
+    list(cache.frames("two"))
+    store(cache, "three")
+    assert "one" not in cache and "two" in cache
+
+
+def test_stale_temp_files_are_swept_at_startup(tmp_path):
+    stale = tmp_path / "abc.tmp"
+    fresh = tmp_path / "def.tmp"
+    stale.write_bytes(b"partial")
+    fresh.write_bytes(b"partial")
+    past = time.time() - STALE_TMP_SECONDS - 5
+    os.utime(stale, (past, past))
+    AudioCache(tmp_path, max_bytes=1 << 20)
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_cache_key_depends_on_voice_and_text():
+    assert cache_key("openai", "nova", "tts-1", "Hi") == cache_key("openai", "nova", "tts-1", " Hi ")
+    assert cache_key("openai", "nova", "tts-1", "Hi") != cache_key("openai", "onyx", "tts-1", "Hi")
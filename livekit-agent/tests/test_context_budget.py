@@ -0,0 +1,87 @@
+import asyncio
+
+from context_budget import (
+    MESSAGE_OVERHEAD, ContextBudget, ContextStats, ConversationContext, Turn, count_tokens, truncate_tokens,
+)
+
+
+def history(turns, words=20):
+    items = [Turn("sys", "system", "You are helpful.")]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        items.append(Turn(f"t{i}", role, " ".join(["word"] * words)))
+    return items
+
+
+def turn_tokens(words=20):
+    return count_tokens(" ".join(["word"] * words)) + MESSAGE_OVERHEAD
+
+
+def test_token_estimates():
+    assert count_tokens("") == 0
+    assert count_tokens("Hello, world!") == 6     # Hell o , worl d !
+    assert truncate_tokens("one two three four", 2) == "one two"
+    assert truncate_tokens("short", 10) == "short"
+
+
+def test_budget_scales_with_personality():
+    budget = ContextBudget.for_personality({"context_tokens": 1600}, 3000)
+    assert (budget.max_tokens, budget.summary_tokens, budget.overflow_tokens) == (1600, 200, 400)
+    assert ContextBudget.for_personality({}, 3000).max_tokens == 3000
+
+
+def test_everything_fits_under_the_budget():
+    async def run():
+        context = ConversationContext(ContextBudget(max_tokens=3000), summarize=None)
+        return context.select(history(6))
+
+    pinned, summary, recent = asyncio.run(run())
+    assert [t.id for t in pinned] == ["sys"]
+    assert summary == "" and len(recent) == 6
+
+
+def test_evicted_turns_ride_along_until_summarized():
+    calls = []
+
+    async def summarize(previous, turns, max_tokens):
+        calls.append([t.id for t in turns])
+        return "They talked about words."
+
+    async def run():
+        stats = ContextStats()
+        budget = ContextBudget(max_tokens=5 * turn_tokens(), min_recent=2, summarize_after=1, overflow_tokens=2 * turn_tokens())
+        context = ConversationContext(budget, summarize, stats)
+        items = history(10)
+        _, summary, before = context.select(items)
+        await asyncio.sleep(0)   # The background summary runs
+        _, after_summary, after = context.select(items)
+        return summary, before, after_summary, after, stats
+
+    summary, before, after_summary, after, stats = asyncio.run(run())
+    # Before the summary lands, the overflow keeps older turns in the prompt
+    assert summary == "" and len(before) == 6
+    assert calls == [[f"t{i}" for i in range(6)]]
+    assert after_summary == "They talked about words."
+    # Once summarized, those turns leave the prompt
+    assert [t.id for t in after] == ["t6", "t7", "t8", "t9"]
+    assert stats.summaries == 1 and stats.prompts == 2
+    assert stats.prompt_tokens < stats.history_tokens
+
+
+def test_failed_summary_is_counted_and_not_retried_at_once():
+    async def summarize(previous, turns, max_tokens):
+        raise RuntimeError("LLM down")
+
+    async def run():
+        stats = ContextStats()
+        budget = ContextBudget(max_tokens=3 * turn_tokens(), min_recent=2, summarize_after=1, overflow_tokens=0)
+        context = ConversationContext(budget, summarize, stats)
+        context.select(history(10))
+        await asyncio.sleep(0)
+        context.select(history(10))
+        await asyncio.sleep(0)
+        return context, stats
+
+    context, stats = asyncio.run(run())
+    assert stats.summary_failures == 1
+    assert context.summary == ""
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from data_publisher import (
+    EMOTION_CODES, WIRE_VERSION, DataPublisher, PublisherStats, decode, encode_binary, encode_json,
+)
+
+
+@pytest.mark.parametrize("kind, fields", [
+    ("state", {"isSpeaking": True}),
+    ("emotion", {"emotion": "happy", "timestamp": 1767268800.25}),
+    ("viseme", {"seq": 7, "offset_ms": 1234, "levels": bytes([10, 200, 0, 30, 40, 255])}),
+])
+def test_binary_round_trip(kind, fields):
+    payload = encode_binary(kind, fields)
+    assert payload[0] == WIRE_VERSION
+    assert decode(payload) == {"type": kind, **fields}
+
+
+def test_json_round_trip_and_fallbacks():
+    payload = encode_json("metrics", {"ttft": 0.4})
+    assert decode(payload) == {"type": "metrics", "ttft": 0.4}
+    # No binary layout: unknown emotion, or metrics
+    assert encode_binary("emotion", {"emotion": "bewildered"}) is None
+    assert encode_binary("metrics", {"ttft": 0.4}) is None
+    assert len(encode_binary("state", {"isSpeaking": False})) == 3
+    assert len(encode_binary("viseme", {"seq": 0, "offset_ms": 0, "levels": b"\0" * 6})) == 14
+
+
+def test_decode_rejects_unknown_frames():
+    with pytest.raises(ValueError):
+        decode(bytes([WIRE_VERSION + 1, 1, 0]))
+    with pytest.raises(ValueError):
+        decode(bytes([WIRE_VERSION, 99]))
+    assert EMOTION_CODES[0] == "neutral"
+
+
+class Participant:
+    def __init__(self):
+        self.sent = []
+        self.gate = asyncio.Event()
+
+    async def publish_data(self, payload, reliable=True):
+        await self.gate.wait()
+        self.sent.append((decode(payload), reliable))
+
+
+def test_coalescing_and_drops_while_sends_are_blocked():
+    async def run():
+        participant = Participant()
+        stats = PublisherStats()
+        publisher = DataPublisher(lambda: participant, stats, binary=True, max_queue=2, max_in_flight=1)
+        publisher.publish("state", isSpeaking=True)
+        await asyncio.sleep(0)   # The first send is in flight, blocked on the gate
+        publisher.publish("state", isSpeaking=False)
+        publisher.publish("state", isSpeaking=True)   # Replaces the queued one
+        publisher.publish("metrics", ttft=0.4)
+        publisher.publish("emotion", emotion="sad", timestamp=1.0)   # Queue full: the lossy metrics goes
+        participant.gate.set()
+        await publisher.aclose()
+        return participant.sent, stats
+
+    sent, stats = asyncio.run(run())
+    assert [message for message, _ in sent] == [
+        {"type": "state", "isSpeaking": True},
+        {"type": "state", "isSpeaking": True},
+        {"type": "emotion", "emotion": "sad", "timestamp": 1.0},
+    ]
+    assert stats.messages[("state", "coalesced")] == 1
+    assert stats.messages[("metrics", "dropped")] == 1
+    assert stats.messages[("state", "sent")] == 2
+    assert stats.queue_depth == 0
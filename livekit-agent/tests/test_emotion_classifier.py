@@ -0,0 +1,88 @@
+import pytest
+
+from emotion_classifier import NEUTRAL, EmotionClassifier, classifier
+
+# Hand-labelled, including substring traps ("badge", "downtown") the old keyword scan got wrong
+CORPUS = [
+    # Plain cases
+    ("I'm so happy to hear from you!", "happy"),
+    ("That's awesome news, congrats!", "happy"),
+    ("Haha, you're hilarious.", "happy"),
+    ("I feel really sad today.", "sad"),
+    ("I'm sorry that happened to you.", "sad"),
+    ("It was a terrible day at work.", "sad"),
+    ("I'm so angry right now.", "angry"),
+    ("This is stupid and I hate it.", "angry"),
+    ("I'm really stressed about the deadline.", "stressed"),
+    ("I'm nervous about tomorrow's interview.", "stressed"),
+    ("Just relax, everything is fine.", "calm"),
+    ("I'm feeling calm and chill tonight.", "calm"),
+    ("I miss you so much, babe.", "love"),
+    ("Sending you a big hug, honey.", "love"),
+    ("Please be careful on the road.", "concerned"),
+    ("Are you okay? You sound tired.", "concerned"),
+    ("Hmm, that's an interesting question.", "thoughtful"),
+    ("Let's see, maybe we could try something else.", "thoughtful"),
+    ("The meeting is at three o'clock.", "neutral"),
+    ("Tell me about your weekend.", "neutral"),
+    # Substring traps for the old scan
+    ("Check out my new badge from the conference.", "neutral"),
+    ("We walked downtown to the market.", "neutral"),
+    ("Good evening, madam.", "neutral"),
+    ("That was the finest meal I've had.", "neutral"),
+    ("The shipment includes a safety manual.", "neutral"),
+    ("I'm reading a book about whales.", "neutral"),
+    ("Saddle up, we're riding at noon.", "neutral"),
+    ("The chilly breeze came through the window.", "neutral"),
+    # Inflections and phrases
+    ("I've been so worried about you.", "concerned"),
+    ("I'm feeling relaxed after the spa.", "calm"),
+    ("I was thinking we could go hiking.", "thoughtful"),
+    ("She hugged me and I loved it.", "love"),
+    ("I'm so frustrated and annoyed with this.", "angry"),
+    # Several emotions - the strongest one wins
+    ("I'm stressed, anxious and worried, but the view was great.", "stressed"),
+    ("I love you, babe, and I adore you, darling.", "love"),
+    ("That's stupid, I hate it, I'm furious - but okay.", "angry"),
+]
+
+
+@pytest.mark.parametrize("text, expected", CORPUS)
+def test_classify(text, expected):
+    assert classifier.classify(text) == expected
+
+
+def test_classify_batch_matches_classify():
+    texts = [text for text, _ in CORPUS]
+    assert classifier.classify_batch(texts) == [expected for _, expected in CORPUS]
+    assert classifier.classify_batch([]) == []
+
+
+def test_phrase_claims_its_words():
+    # "worried about" is concern; "worried" alone is stress
+    assert classifier.scores("I'm worried about you") == {"concerned": 1}
+    assert classifier.classify("I'm worried") == "stressed"
+
+
+def test_ties_go_to_the_earlier_emotion():
+    table = EmotionClassifier({"first": ["alpha"], "second": ["beta"]})
+    assert table.classify("beta alpha") == "first"
+    assert table.classify("nothing here") == NEUTRAL
+
+
+def test_rolling_mood_smooths_over_the_window():
+    turns = [
+        "I'm so happy, this is awesome!",
+        "The meeting is at three o'clock.",
+        "I feel sad.",
+        "I'm sad and it was a terrible day.",
+        "Tell me about your weekend.",
+        "Tell me more.",
+        "See you then.",
+    ]
+    assert classifier.classify_batch(turns) == ["happy", "neutral", "sad", "sad", "neutral", "neutral", "neutral"]
+    assert list(classifier.rolling(turns, window=3)) == [
+        "happy", "happy", "happy", "sad", "sad", "sad", "neutral",
+    ]
+    # A window of one is the per-turn label
+    assert list(classifier.rolling(turns, window=1)) == classifier.classify_batch(turns)
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from endpointing import (
+    AdaptiveEndpointer, EndOfTurn, EndpointingStats, FixedEndpointer, Features, create_endpointer, features,
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", Features(0, False, False, False, False)),
+    ("What time is it", Features(4, False, True, False, False)),
+    ("I went to the store and", Features(6, False, False, True, False)),
+    ("I wish I could.", Features(4, True, False, False, False)),
+    ("so I was thinking...", Features(4, False, False, True, False)),
+    ("Yes", Features(1, False, False, False, True)),
+    ("Is it the", Features(3, False, False, True, False)),
+])
+def test_features(text, expected):
+    assert features(text) == expected
+
+
+@pytest.mark.parametrize("text, window", [
+    ("I went to the store and", 1.5),
+    ("Where are you?", 0.25),
+    ("thank you", 0.25),
+    ("That is all.", 0.375),
+    ("I like cats", 0.5),
+    ("", 0.5),
+])
+def test_adaptive_windows(text, window):
+    assert AdaptiveEndpointer().silence(text) == window
+
+
+def test_decisions_relative_to_default():
+    endpointer = AdaptiveEndpointer()
+    assert endpointer.decision(0.25) == "early"
+    assert endpointer.decision(0.5) == "default"
+    assert endpointer.decision(1.5) == "extended"
+    fixed = FixedEndpointer(default=0.8)
+    assert (fixed.min_silence, fixed.max_silence, fixed.silence("and")) == (0.8, 0.8, 0.8)
+
+
+def test_create_endpointer_by_name_or_path():
+    assert isinstance(create_endpointer("adaptive", default=0.6), AdaptiveEndpointer)
+    assert create_endpointer("endpointing:FixedEndpointer", default=0.7).default == 0.7
+    with pytest.raises(ValueError):
+        create_endpointer("psychic")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_end_of_turn_waits_from_end_of_speech_and_counts_resumes():
+    clock = Clock()
+    stats = EndpointingStats()
+    turn = EndOfTurn(AdaptiveEndpointer(), stats, clock=clock)
+    turn.vad_start()
+    turn.transcript("Where are you?")
+    turn.vad_end()   # Speech ended min_silence (0.25 s) ago: a question needs no more
+    assert asyncio.run(turn.predict_end_of_turn(None)) == 1.0
+    assert stats.decisions["early"] == 1
+    clock.now += 0.5
+    turn.vad_start()
+    assert stats.resumed == 1
+    clock.now += 5
+    turn.vad_end()
+    turn.vad_start()
+    assert stats.resumed == 1
@@ -0,0 +1,182 @@
+import asyncio
+
+import pytest
+
+from interruption import BargeIn, InterruptionStats
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class Output:
+    def __init__(self, can_pause=True):
+        self.can_pause = can_pause
+        self.calls = []
+
+    def pause(self):
+        self.calls.append("pause")
+        return self.can_pause
+
+    def resume(self):
+        self.calls.append("resume")
+
+    def interrupt(self):
+        self.calls.append("interrupt")
+
+
+def barge_in(fast=True, can_pause=True, resume_after=0.8):
+    clock, out, stats = Clock(), Output(can_pause), InterruptionStats()
+    machine = BargeIn(out.pause, out.resume, out.interrupt, stats, fast=fast, resume_after=resume_after, clock=clock)
+    return machine, clock, out, stats
+
+
+def test_onset_pauses_and_transcript_commits():
+    machine, clock, out, stats = barge_in()
+    reply = machine.reply()
+    machine.audio(3.0)
+    machine.speaking_started()
+    clock.now += 1.0
+    machine.vad_start()
+    assert out.calls == ["pause"]
+    machine.transcript("wait")
+    assert not reply.cancelled.is_set()
+    clock.now += 0.3
+    machine.transcript("wait stop", is_final=True)
+    assert reply.cancelled.is_set()
+    assert out.calls == ["pause", "interrupt"]
+    clock.now += 0.2
+    machine.speaking_stopped()
+    assert stats.outcomes == {"interrupted": 1, "resumed": 0}
+    # Paused at the onset: silent immediately, and the 2s not yet played were wasted
+    assert stats.silenced == 1 and stats.silence_seconds == 0.0
+    assert stats.wasted_audio == pytest.approx(2.0)
+
+
+def test_without_pause_silence_is_measured_to_playout_stop():
+    machine, clock, out, stats = barge_in(can_pause=False)
+    machine.reply()
+    machine.speaking_started()
+    machine.vad_start()
+    clock.now += 0.4
+    machine.transcript("hold on")
+    clock.now += 0.1
+    machine.speaking_stopped()
+    assert stats.outcomes["interrupted"] == 1
+    assert stats.silence_seconds == pytest.approx(0.5)
+
+
+def test_commit_while_thinking_cancels_the_llm():
+    machine, clock, out, stats = barge_in()
+    reply = machine.reply()
+    machine.vad_start()
+    # Nothing was playing, so nothing to pause
+    assert out.calls == []
+    machine.transcript("never mind")
+    assert reply.cancelled.is_set()
+    assert out.calls == ["interrupt"]
+    assert stats.outcomes["interrupted"] == 1 and stats.silence_seconds == 0.0
+
+
+def test_false_alarm_resumes_playout():
+    async def run():
+        machine, clock, out, stats = barge_in(resume_after=0.01)
+        reply = machine.reply()
+        machine.speaking_started()
+        machine.vad_start()
+        machine.transcript("mm")
+        machine.vad_end()
+        await asyncio.sleep(0.05)
+        assert out.calls == ["pause", "resume"]
+        assert not reply.cancelled.is_set()
+        assert stats.outcomes == {"interrupted": 0, "resumed": 1}
+        assert stats.silenced == 0
+        # The next onset starts a new barge-in
+        machine.vad_start()
+        assert out.calls == ["pause", "resume", "pause"]
+
+    asyncio.run(run())
+
+
+def test_speech_resuming_before_the_timer_keeps_the_pause():
+    async def run():
+        machine, clock, out, stats = barge_in(resume_after=0.02)
+        machine.reply()
+        machine.speaking_started()
+        machine.vad_start()
+        machine.vad_end()
+        machine.vad_start()
+        await asyncio.sleep(0.05)
+        assert out.calls == ["pause"]
+        assert stats.outcomes["resumed"] == 0
+        machine.aclose()
+
+    asyncio.run(run())
+
+
+def test_onset_while_idle_is_ignored():
+    machine, clock, out, stats = barge_in()
+    machine.vad_start()
+    machine.transcript("hello there")
+    assert out.calls == []
+    assert stats.outcomes == {"interrupted": 0, "resumed": 0}
+
+
+def test_measure_only_leaves_the_interruption_to_the_framework():
+    machine, clock, out, stats = barge_in(fast=False)
+    reply = machine.reply()
+    machine.speaking_started()
+    machine.vad_start()
+    machine.transcript("stop please")
+    assert out.calls == [] and not reply.cancelled.is_set()
+    clock.now += 0.7
+    machine.speaking_stopped()
+    assert stats.outcomes["interrupted"] == 1
+    assert stats.silence_seconds == pytest.approx(0.7)
+
+
+def test_guard_counts_tokens_after_the_onset_and_closes_on_cancel():
+    closed = []
+
+    async def llm():
+        try:
+            for chunk in ("Hello there,", " how are", " you today?", " Fine."):
+                yield chunk
+                await asyncio.sleep(0)
+        finally:
+            closed.append(True)
+
+    async def run():
+        machine, clock, out, stats = barge_in()
+        reply = machine.reply()
+        received = []
+        async for chunk in machine.guard(reply, llm()):
+            received.append(chunk)
+            if len(received) == 1:
+                machine.vad_start()
+            elif len(received) == 3:
+                machine.transcript("wait no")
+        return received, reply, stats
+
+    received, reply, stats = asyncio.run(run())
+    assert received == ["Hello there,", " how are", " you today?"]
+    assert closed == [True]
+    # " how are" and " you today?" arrived after the onset: 2 + 4 tokens
+    assert stats.wasted_tokens == 6 and reply.tokens == 0
+
+
+def test_render():
+    stats = InterruptionStats()
+    stats.record("interrupted", 0.05, tokens=4, audio=1.5)
+    stats.record("resumed")
+    text = stats.render()
+    assert 'voice_interruptions_total{outcome="interrupted"} 1' in text
+    assert 'voice_interruptions_total{outcome="resumed"} 1' in text
+    assert 'voice_interrupt_to_silence_seconds_bucket{le="+Inf"} 1' in text
+    assert "voice_interrupt_wasted_tokens_total 4" in text
+    assert "voice_interrupt_wasted_audio_seconds_total 1.500" in text
+    assert stats.quantiles()[0.5] == pytest.approx(0.05)
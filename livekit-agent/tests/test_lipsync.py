@@ -0,0 +1,106 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from audio_buffer import AudioBudget
+from lipsync import VISEMES, LipSyncStream, VisemeAnalyzer, quantize
+
+RATE = 24000
+
+
+def tone(seconds, *freqs, amplitude=0.5, rate=RATE):
+    t = np.arange(int(seconds * rate)) / rate
+    wave = sum(np.sin(2 * np.pi * f * t) for f in freqs) / len(freqs)
+    return (wave * amplitude * 32767).astype(np.int16).tobytes()
+
+
+def test_silence_is_a_closed_mouth():
+    analyzer = VisemeAnalyzer(RATE, frame_rate=30)
+    rows = analyzer.push(b"\0\0" * RATE)
+    assert rows.shape == (30, 1 + len(VISEMES))
+    assert not rows.any()
+
+
+def test_voiced_audio_opens_the_mouth():
+    analyzer = VisemeAnalyzer(RATE, frame_rate=30)
+    # Roughly an "a": formants near 800 and 1200 Hz
+    rows = analyzer.push(tone(0.5, 800, 1200))
+    assert len(rows) == 15
+    level, weights = rows[:, 0], rows[:, 1:]
+    # About -12 dBFS RMS on a -60 dB scale
+    assert (level > 0.75).all() and (level <= 1.0).all()
+    np.testing.assert_allclose(weights.sum(axis=1), level, rtol=1e-4)
+    assert (weights.argmax(axis=1) == VISEMES.index("aa")).all()
+    # Louder speech opens it further
+    quiet = VisemeAnalyzer(RATE, frame_rate=30).push(tone(0.5, 800, 1200, amplitude=0.01))
+    assert (quiet[:, 0] < level).all()
+
+
+def test_partial_frames_carry_over_between_pushes():
+    analyzer = VisemeAnalyzer(RATE, frame_rate=30)
+    audio = tone(0.1, 300, 2300)
+    assert len(analyzer.push(audio[:1000])) == 0
+    assert len(analyzer.push(audio[1000:])) == 3
+    # Stereo is mixed down before analysis
+    stereo = np.repeat(np.frombuffer(audio, dtype=np.int16), 2).tobytes()
+    np.testing.assert_allclose(
+        VisemeAnalyzer(RATE, frame_rate=30).push(stereo, num_channels=2),
+        VisemeAnalyzer(RATE, frame_rate=30).push(audio),
+        atol=1e-5,
+    )
+    analyzer.push(audio[:1000])
+    analyzer.reset()
+    assert len(analyzer.push(audio[:1000])) == 0
+
+
+def test_quantize_bounds():
+    rows = np.array([[-0.5, 0.0, 0.5, 1.0, 1.5, 0.999]], dtype=np.float32)
+    out = quantize(rows)
+    assert out.dtype == np.uint8
+    assert out.tolist() == [[0, 0, 128, 255, 255, 255]]
+
+
+def test_stream_releases_frames_at_the_frame_rate():
+    sent = []
+
+    async def run():
+        stream = LipSyncStream(lambda seq, offset_ms, levels: sent.append((seq, offset_ms, levels)), frame_rate=50, lead=0)
+        # A second of audio, delivered all at once (faster than realtime)
+        stream.push(tone(1.0, 500, 900, rate=16000), 16000)
+        await asyncio.sleep(0.2)
+        early = stream.frames_sent
+        stream.end()
+        await asyncio.sleep(0.05)
+        stream.aclose()
+        return early
+
+    early = asyncio.run(run())
+    # About 0.2s worth at 50 frames a second, not the whole second
+    assert 8 <= early <= 13
+    assert len(sent) == early
+    offsets = [offset_ms for _, offset_ms, _ in sent]
+    assert offsets == [20 * i for i in range(len(sent))]
+    assert all(seq == 1 and len(levels) == 1 + len(VISEMES) for seq, _, levels in sent)
+
+
+def test_stream_accounts_its_buffers_against_the_lease():
+    budget = AudioBudget(10 * 2**20, session_seconds=1, min_seconds=1)
+    lease = budget.lease("room", "job-1")
+
+    async def run():
+        stream = LipSyncStream(lambda *args: None, lease=lease)
+        stream.push(tone(0.1, 500), RATE)
+        nbytes = stream._analyzer.nbytes
+        stream.aclose()
+        return nbytes
+
+    nbytes = asyncio.run(run())
+    assert lease.buffers == {"lipsync": nbytes}
+    assert budget.used == lease.speech_bytes + nbytes
+
+
+@pytest.mark.parametrize("frame_rate", [15, 30, 60])
+def test_frame_count_follows_the_frame_rate(frame_rate):
+    rows = VisemeAnalyzer(RATE, frame_rate=frame_rate).push(tone(1.0, 500))
+    assert len(rows) == frame_rate
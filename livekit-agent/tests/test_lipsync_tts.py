@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from livekit import rtc
+from livekit.agents import tts
+
+from lipsync_tts import FrameTapTTS
+
+
+class FakeStream:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.pushed = []
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    def push_text(self, text):
+        self.pushed.append(text)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.frames:
+            raise StopAsyncIteration
+        frame = self.frames.pop(0)
+        return tts.SynthesizedAudio(frame=frame, request_id="r")
+
+
+def frame(samples=480):
+    return rtc.AudioFrame(b"\0\0" * samples, sample_rate=24000, num_channels=1, samples_per_channel=samples)
+
+
+def test_frame_tap_passes_the_wrapped_stream_through():
+    frames = [frame(), frame(240)]
+    stream = FakeStream(frames)
+    wrapped = SimpleNamespace(
+        capabilities=tts.TTSCapabilities(streaming=True), sample_rate=24000, num_channels=1,
+        stream=lambda conn_options: stream,
+    )
+    seen = []
+    tap = FrameTapTTS(wrapped, seen.append)
+
+    async def run():
+        async with tap.stream() as tapped:
+            tapped.push_text("hello")
+            return [audio.frame async for audio in tapped]
+
+    out = asyncio.run(run())
+    assert out == frames
+    assert seen == frames
+    assert stream.pushed == ["hello"]
+    assert stream.closed
@@ -0,0 +1,77 @@
+import pickle
+
+import pytest
+
+import load_monitor
+from load_monitor import LoadMonitor
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = LoadMonitor(max_sessions=2, memory_limit=0)
+    monkeypatch.setattr(monitor, "cpu_load", lambda: 0.0)
+    return monitor
+
+
+def test_admits_up_to_max_sessions_counting_pending_jobs(monitor):
+    running = []
+    monitor.count_jobs(lambda: running)
+    assert monitor.admit("a")
+    assert monitor.admit("b")
+    # Neither has started yet, but both count
+    assert not monitor.admit("c")
+
+    running.append("a")
+    assert monitor.active_sessions == 2
+    assert not monitor.admit("c")
+
+    running.remove("a")
+    assert monitor.active_sessions == 1
+    assert monitor.admit("c")
+
+
+def test_accepted_jobs_expire_if_never_assigned(monitor, monkeypatch):
+    monitor.count_jobs(lambda: [])
+    assert monitor.admit("a")
+    assert monitor.admit("b")
+    now = load_monitor.time.monotonic()
+    monkeypatch.setattr(load_monitor.time, "monotonic", lambda: now + load_monitor.ACCEPT_WINDOW + 1)
+    assert monitor.active_sessions == 0
+    assert monitor.admit("c")
+
+
+def test_without_job_counts_sessions_are_process_local(monitor):
+    monitor.session_started()
+    assert monitor.admit("a")
+    monitor.session_started()
+    assert not monitor.admit("b")
+
+
+def test_memory_scaled_to_threshold(monkeypatch):
+    class Memory:
+        percent = 90.0
+
+    class FakePsutil:
+        @staticmethod
+        def virtual_memory():
+            return Memory
+
+    monkeypatch.setattr(load_monitor, "psutil", FakePsutil)
+    monitor = LoadMonitor(threshold=0.75, memory_limit=0.9)
+    assert monitor.memory_load() == pytest.approx(0.75)
+
+
+def test_job_source_stays_in_the_main_process(monitor):
+    monitor.count_jobs(lambda: ["a"])
+    copy = pickle.loads(pickle.dumps(monitor))
+    assert copy.active_sessions == 0
+
+
+def test_job_process_lag_counts_in_the_main_process(monitor):
+    reported = [0.0]
+    monitor.count_lag(lambda: reported[0])
+    assert monitor.load(0) == 0.0
+    reported[0] = monitor.lag_budget
+    assert monitor.loop_lag == monitor.lag_budget
+    assert monitor.load(0) == 1.0
+    assert pickle.loads(pickle.dumps(monitor)).loop_lag == 0.0
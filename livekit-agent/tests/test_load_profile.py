@@ -0,0 +1,141 @@
+import asyncio
+import os
+
+import pytest
+from livekit.agents import llm
+
+from fake_providers import FakeLLM, FakeTTS
+from load_profile import Distribution, FakeProviderProfile
+
+
+def draws(profile, stream="llm:0"):
+    rng = profile.rng(stream)
+    return (
+        profile.stt_final.sample(rng),
+        profile.llm_ttft.sample(rng),
+        profile.utterance(rng),
+        profile.reply_tokens(rng),
+    )
+
+
+def test_same_seed_same_timings_and_text():
+    assert draws(FakeProviderProfile(seed=7)) == draws(FakeProviderProfile(seed=7))
+    assert draws(FakeProviderProfile(seed=7)) != draws(FakeProviderProfile(seed=8))
+    # Streams are independent of each other
+    assert draws(FakeProviderProfile(seed=7), "llm:1") != draws(FakeProviderProfile(seed=7), "llm:0")
+
+
+def test_reply_is_tagged_and_within_the_word_range():
+    profile = FakeProviderProfile(reply_words=(12, 12))
+    text = "".join(profile.reply_tokens(profile.rng("x")))
+    tag, _, reply = text.partition(" ")
+    assert tag.startswith("[") and tag.endswith("]")
+    assert len(reply.split()) == 12
+
+
+def test_distribution_is_clipped_at_the_floor():
+    profile = FakeProviderProfile()
+    rng = profile.rng("x")
+    assert all(Distribution(10, 50, 5).sample(rng) >= 0.005 for _ in range(200))
+    assert Distribution(120).sample(rng) == 0.12
+
+
+def fast_profile(seed):
+    return FakeProviderProfile(
+        seed=seed,
+        llm_ttft=Distribution(1),
+        llm_tokens_per_sec=10000,
+        tts_first_audio=Distribution(1),
+        tts_realtime_factor=1000,
+    )
+
+
+async def reply_text(profile, replies=2):
+    fake = FakeLLM(profile)
+    texts = []
+    for _ in range(replies):
+        chunks = []
+        async with fake.chat(chat_ctx=llm.ChatContext.empty()) as stream:
+            async for chunk in stream:
+                chunks.append(chunk.delta.content)
+        texts.append("".join(chunks))
+    return texts
+
+
+def test_fake_llm_replays_the_same_replies():
+    first = asyncio.run(reply_text(fast_profile(3)))
+    assert first == asyncio.run(reply_text(fast_profile(3)))
+    assert first != asyncio.run(reply_text(fast_profile(4)))
+    # Each request draws from its own stream
+    assert first[0] != first[1]
+
+
+def test_fake_tts_audio_matches_the_speaking_rate():
+    async def synthesize():
+        fake = FakeTTS(fast_profile(0))
+        seconds = 0.0
+        async with fake.synthesize("one two three four five six seven eight nine") as stream:
+            async for audio in stream:
+                seconds += audio.frame.duration
+        return seconds
+
+    assert asyncio.run(synthesize()) == pytest.approx(9 / 2.7, abs=0.02)
+
+
+def test_from_env_defaults(monkeypatch):
+    for var in [var for var in os.environ if var.startswith("FAKE_")]:
+        monkeypatch.delenv(var)
+    assert FakeProviderProfile.from_env() == FakeProviderProfile()
+
+
+def test_from_env_parses_every_variable(monkeypatch):
+    env = {
+        "FAKE_STT_FINAL_MS": "100",
+        "FAKE_LLM_TTFT_MS": "300,20",
+        "FAKE_TTS_FIRST_AUDIO_MS": "150,30,60",
+        "FAKE_LLM_TOKENS_PER_SEC": "80",
+        "FAKE_LLM_PREFILL_MS_PER_1K_TOKENS": "25.5",
+        "FAKE_TTS_REALTIME_FACTOR": "2",
+        "FAKE_WORDS_PER_SECOND": "3",
+        "FAKE_USER_WORDS": "5",
+        "FAKE_REPLY_WORDS": "10,20",
+        "FAKE_SEED": "42",
+    }
+    for var, value in env.items():
+        monkeypatch.setenv(var, value)
+    profile = FakeProviderProfile.from_env()
+    assert profile.stt_final == Distribution(100)
+    assert profile.llm_ttft == Distribution(300, 20)
+    assert profile.tts_first_audio == Distribution(150, 30, 60)
+    assert profile.llm_tokens_per_sec == 80
+    assert profile.llm_prefill_ms_per_1k_tokens == 25.5
+    assert profile.tts_realtime_factor == 2
+    assert profile.words_per_second == 3
+    assert profile.user_words == (5, 5)
+    assert profile.reply_words == (10, 20)
+    assert profile.seed == 42
+
+
+def test_from_env_prefix(monkeypatch):
+    monkeypatch.setenv("LOAD_SEED", "9")
+    assert FakeProviderProfile.from_env(prefix="LOAD_").seed == 9
+
+
+@pytest.mark.parametrize("var, value", [
+    ("FAKE_STT_FINAL_MS", "fast"),
+    ("FAKE_LLM_TTFT_MS", "300,20,10,5"),
+    ("FAKE_TTS_FIRST_AUDIO_MS", "-50"),
+    ("FAKE_TTS_FIRST_AUDIO_MS", ","),
+    ("FAKE_LLM_TOKENS_PER_SEC", "0"),
+    ("FAKE_TTS_REALTIME_FACTOR", "x"),
+    ("FAKE_WORDS_PER_SECOND", "-1"),
+    ("FAKE_LLM_PREFILL_MS_PER_1K_TOKENS", "-2"),
+    ("FAKE_USER_WORDS", "14,4"),
+    ("FAKE_REPLY_WORDS", "ten"),
+    ("FAKE_REPLY_WORDS", "0,5"),
+    ("FAKE_SEED", "1.5"),
+])
+def test_from_env_rejects_invalid_values(monkeypatch, var, value):
+    monkeypatch.setenv(var, value)
+    with pytest.raises(ValueError, match=var):
+        FakeProviderProfile.from_env()
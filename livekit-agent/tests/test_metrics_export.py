@@ -0,0 +1,123 @@
+import multiprocessing
+import socket
+import time
+import urllib.request
+
+from metrics_export import MetricsAggregator, MetricsExporter
+
+JOB = """# TYPE voice_turns_total counter
+voice_turns_total{personality="default"} 3
+# TYPE voice_audio_buffer_bytes gauge
+voice_audio_buffer_bytes 100
+# TYPE voice_worker_load gauge
+voice_worker_load 0.5
+# TYPE voice_endpoint_silence_seconds summary
+voice_endpoint_silence_seconds{quantile="0.5"} 0.4
+voice_endpoint_silence_seconds_count 2
+"""
+
+
+def parse(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_merges_by_metric_type():
+    metrics = MetricsAggregator()
+    metrics.update("a", JOB)
+    metrics.update("b", JOB.replace(" 3\n", " 4\n").replace("0.4", "0.9").replace("0.5\n", "0.2\n"))
+    merged = parse(metrics.render())
+    assert merged['voice_turns_total{personality="default"}'] == "7"
+    assert merged["voice_audio_buffer_bytes"] == "200"
+    assert merged["voice_worker_load"] == "0.5"
+    assert merged['voice_endpoint_silence_seconds{quantile="0.5"}'] == "0.9"
+    assert merged["voice_endpoint_silence_seconds_count"] == "4"
+
+
+def test_type_line_once_per_family():
+    metrics = MetricsAggregator()
+    metrics.update("a", JOB)
+    text = metrics.render('# TYPE voice_turns_total counter\nvoice_turns_total{personality="gf"} 1\n')
+    assert text.count("# TYPE voice_turns_total") == 1
+    lines = text.splitlines()
+    family = lines.index("# TYPE voice_turns_total counter")
+    assert lines[family + 1].startswith("voice_turns_total") and lines[family + 2].startswith("voice_turns_total")
+
+
+def test_finished_jobs_keep_counters_and_drop_gauges():
+    metrics = MetricsAggregator()
+    metrics.update("a", JOB, final=True)
+    metrics.update("b", JOB)
+    merged = parse(metrics.render())
+    assert merged['voice_turns_total{personality="default"}'] == "6"
+    assert merged["voice_audio_buffer_bytes"] == "100"
+
+
+def test_silent_jobs_are_retired():
+    now = [0.0]
+    metrics = MetricsAggregator(stale_after=10, clock=lambda: now[0])
+    metrics.update("a", JOB)
+    now[0] = 11
+    merged = parse(metrics.render())
+    assert merged['voice_turns_total{personality="default"}'] == "3"
+    assert "voice_audio_buffer_bytes" not in merged
+
+
+def test_gauge_is_the_worst_live_source():
+    now = [0.0]
+    metrics = MetricsAggregator(stale_after=10, clock=lambda: now[0])
+    assert metrics.gauge("voice_worker_load") == 0.0
+    metrics.update("a", JOB)
+    metrics.update("b", JOB.replace("0.5\n", "0.8\n"))
+    assert metrics.gauge("voice_worker_load") == 0.8
+    metrics.update("b", JOB, final=True)
+    assert metrics.gauge("voice_worker_load") == 0.5
+    now[0] = 11.0
+    assert metrics.gauge("voice_worker_load") == 0.0
+
+
+def publish_from_job(exporter):
+    exporter.publish(JOB, final=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_job_process_stats_reach_the_worker_endpoint():
+    exporter = MetricsExporter(port=free_port())
+    assert not exporter.remote
+    exporter.start(lambda: "# TYPE voice_turns_total counter\nvoice_turns_total{personality=\"default\"} 1\n")
+    job = multiprocessing.get_context("spawn").Process(target=publish_from_job, args=(exporter,))
+    job.start()
+    job.join(30)
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics", timeout=5) as resp:
+                merged = parse(resp.read().decode())
+        except OSError:   # Server thread still starting
+            merged = {}
+        if merged.get('voice_turns_total{personality="default"}') == "4" or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert merged['voice_turns_total{personality="default"}'] == "4"
+
+
+def publish_lag_from_job(exporter):
+    exporter.publish("# TYPE voice_event_loop_lag_seconds gauge\nvoice_event_loop_lag_seconds 0.25\n")
+
+
+def test_job_process_lag_reaches_the_worker_without_an_endpoint():
+    exporter = MetricsExporter(port=0)
+    exporter.start(lambda: "")
+    job = multiprocessing.get_context("spawn").Process(target=publish_lag_from_job, args=(exporter,))
+    job.start()
+    job.join(30)
+
+    deadline = time.monotonic() + 10
+    while exporter.jobs.gauge("voice_event_loop_lag_seconds") == 0.0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert exporter.jobs.gauge("voice_event_loop_lag_seconds") == 0.25
@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from personality_config import PersonalityRegistry, personality_from_metadata
+
+BUILTIN = {
+    "default": {"name": "Nizhal", "system_prompt": "You are Nizhal.", "voice": "alloy"},
+    "gf": {"name": "Ammu", "system_prompt": "You are Ammu.", "voice": "nova"},
+}
+
+
+@pytest.mark.parametrize("metadata, expected", [
+    ('{"personality": "GF"}', "gf"),
+    ('  {"personality": " bf ", "user": "x"}  ', "bf"),
+    ("Jarvis", "jarvis"),
+    # Unknown names pass through; the registry decides the fallback
+    ('{"personality": "pirate"}', "pirate"),
+    (None, None),
+    ("", None),
+    ('{"user": "x"}', None),
+    ('{"personality": ""}', None),
+    ('{"personality": 3}', None),
+    ('{"personality": "gf"', None),
+    ('{}', None),
+])
+def test_personality_from_metadata(metadata, expected):
+    assert personality_from_metadata(metadata) == expected
+
+
+def write(path, table, mtime):
+    path.write_text(json.dumps(table), encoding="utf-8")
+    # Explicit mtimes: writes within the filesystem's timestamp granularity would look unchanged
+    os.utime(path, (mtime, mtime))
+
+
+def test_without_file_uses_builtins():
+    registry = PersonalityRegistry(BUILTIN)
+    assert registry.names() == ["default", "gf"]
+    assert registry.resolve("gf") == ("gf", BUILTIN["gf"])
+    assert not registry.reload_if_changed(force=True)
+
+
+def test_file_entries_merge_over_builtins(tmp_path):
+    path = tmp_path / "personalities.json"
+    write(path, {"gf": {"voice": "shimmer"}, "Pirate": {"name": "Jack", "system_prompt": "Arr."}}, 1000)
+    registry = PersonalityRegistry(BUILTIN, str(path))
+    assert registry.names() == ["default", "gf", "pirate"]
+    # Overrides keep the built-in's other fields
+    assert registry.resolve("gf")[1] == {"name": "Ammu", "system_prompt": "You are Ammu.", "voice": "shimmer"}
+    # New entries are filled from the default
+    assert registry.resolve("pirate")[1] == {"name": "Jack", "system_prompt": "Arr.", "voice": "alloy"}
+
+
+def test_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "personalities.json"
+    write(path, {"pirate": {"name": "Jack", "system_prompt": "Arr."}}, 1000)
+    registry = PersonalityRegistry(BUILTIN, str(path), check_interval=0)
+    assert not registry.reload_if_changed()
+    write(path, {"robot": {"name": "R2", "system_prompt": "Beep."}}, 2000)
+    assert registry.reload_if_changed()
+    assert "pirate" not in registry.names() and "robot" in registry.names()
+    # Removing the file falls back to the built-ins
+    path.unlink()
+    assert registry.names() == ["default", "gf"]
+
+
+def test_checks_the_file_at_most_once_per_interval(tmp_path):
+    path = tmp_path / "personalities.json"
+    write(path, {}, 1000)
+    registry = PersonalityRegistry(BUILTIN, str(path), check_interval=3600)
+    write(path, {"robot": {"name": "R2", "system_prompt": "Beep."}}, 2000)
+    assert "robot" not in registry.names()
+    assert registry.reload_if_changed(force=True)
+    assert "robot" in registry.names()
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    "[]",
+    '{"robot": "R2"}',
+    '{"robot": {"name": "R2", "system_prompt": ""}}',
+])
+def test_bad_file_keeps_the_previous_table(tmp_path, content):
+    path = tmp_path / "personalities.json"
+    write(path, {"pirate": {"name": "Jack", "system_prompt": "Arr."}}, 1000)
+    registry = PersonalityRegistry(BUILTIN, str(path), check_interval=0)
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (2000, 2000))
+    assert not registry.reload_if_changed()
+    assert registry.names() == ["default", "gf", "pirate"]
+    # Not retried until the file changes again
+    assert not registry.reload_if_changed()
+
+
+def test_bad_file_at_start_leaves_builtins(tmp_path):
+    path = tmp_path / "personalities.json"
+    path.write_text("{not json", encoding="utf-8")
+    registry = PersonalityRegistry(BUILTIN, str(path))
+    assert registry.names() == ["default", "gf"]
+
+
+def test_unknown_names_fall_back():
+    registry = PersonalityRegistry(BUILTIN)
+    assert registry.resolve("pirate") == ("default", BUILTIN["default"])
+    assert registry.resolve(None, fallback="gf") == ("gf", BUILTIN["gf"])
+    assert registry.resolve("pirate", fallback="gf") == ("gf", BUILTIN["gf"])
+    # A fallback that doesn't exist either ends at the default
+    assert registry.resolve("pirate", fallback="robot") == ("default", BUILTIN["default"])
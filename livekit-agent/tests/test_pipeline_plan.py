@@ -0,0 +1,72 @@
+import itertools
+
+import pytest
+
+from pipeline_plan import CASCADED, REALTIME, plan_for_keys, plan_pipeline
+
+PREFERENCES = (None, "auto", "realtime", "cascaded", "CASCADED")
+
+
+@pytest.mark.parametrize("realtime, stt, tts, llm", list(itertools.product((False, True), repeat=4)))
+@pytest.mark.parametrize("preferred", PREFERENCES)
+def test_every_combination(realtime, stt, tts, llm, preferred):
+    plan = plan_pipeline(realtime, stt, tts, llm, preferred)
+    cascaded_ok = stt and tts and llm
+    wants_cascaded = (preferred or "").lower() == CASCADED
+    # Realtime whenever it can run, unless cascaded was asked for and can run too
+    expected = REALTIME if realtime and not (wants_cascaded and cascaded_ok) else CASCADED
+    assert plan.mode == expected
+    assert plan.realtime == (expected == REALTIME)
+    # Realtime models do their own speech in and out
+    assert plan.needs_stt == plan.needs_tts == (expected == CASCADED)
+
+
+@pytest.mark.parametrize("args, preferred, mode, reason", [
+    ((True, True, True, True), None, REALTIME, "realtime model available"),
+    ((True, True, True, True), "realtime", REALTIME, "requested"),
+    ((True, True, True, True), "cascaded", CASCADED, "requested"),
+    ((False, True, True, True), None, CASCADED, "no realtime model"),
+    # Requested modes that can't run fall back to the other one
+    ((True, False, True, True), "cascaded", REALTIME, "realtime model available"),
+    ((False, True, True, True), "realtime", CASCADED, "no realtime model"),
+])
+def test_reasons_and_fallback(args, preferred, mode, reason):
+    plan = plan_pipeline(*args, preferred=preferred)
+    assert (plan.mode, plan.reason) == (mode, reason)
+
+
+def test_unavailable_preference_is_logged(caplog):
+    plan_pipeline(False, True, True, True, preferred="realtime")
+    plan_pipeline(True, False, True, True, preferred="cascaded")
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("Realtime pipeline requested" in m for m in messages)
+    assert any("Cascaded pipeline requested" in m for m in messages)
+
+
+@pytest.mark.parametrize("keys, installed, fake, mode", [
+    # openai, gemini, deepgram, elevenlabs
+    (("sk", "g", "dg", None), True, False, REALTIME),
+    ((None, "g", None, None), True, False, REALTIME),
+    # Gemini key without the realtime plugin: no realtime model, and no LLM either
+    ((None, "g", "dg", "el"), False, False, CASCADED),
+    (("sk", None, "dg", None), True, False, CASCADED),
+    ((None, None, "dg", "el"), True, False, CASCADED),
+    # Fake providers never plan a realtime session
+    ((None, "g", None, None), True, True, CASCADED),
+    ((None, None, None, None), False, True, CASCADED),
+])
+def test_plan_for_keys(keys, installed, fake, mode):
+    assert plan_for_keys(*keys, realtime_installed=installed, fake=fake).mode == mode
+
+
+def test_plan_for_keys_components():
+    # An LLM from Gemini needs the realtime plugin installed
+    plan = plan_for_keys(None, "g", "dg", "el", realtime_installed=True, preferred="cascaded")
+    assert plan.mode == CASCADED and plan.reason == "requested"
+    # No TTS key: cascaded can't run, so a cascaded request falls back to realtime
+    plan = plan_for_keys(None, "g", "dg", None, realtime_installed=True, preferred="cascaded")
+    assert plan.mode == REALTIME
+    # STT alone is not a pipeline: cascaded is planned, but with pieces missing
+    plan = plan_for_keys(None, None, "dg", None, realtime_installed=False)
+    assert (plan.mode, plan.reason) == (CASCADED, "no realtime model")
+    assert plan.needs_stt and plan.needs_tts
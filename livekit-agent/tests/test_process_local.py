@@ -0,0 +1,24 @@
+import pickle
+
+from interruption import InterruptionStats
+from load_monitor import LoadMonitor
+from provider_router import ProviderRouter
+
+
+def test_counters_start_fresh_in_a_new_process():
+    monitor = LoadMonitor(max_sessions=3, threshold=0.5)
+    monitor.session_started()
+    copy = pickle.loads(pickle.dumps(monitor))
+    assert copy.active_sessions == 0
+    assert (copy.max_sessions, copy.threshold) == (3, 0.5)
+
+
+def test_constructor_arguments_survive():
+    router = ProviderRouter("tts", failures=5, cooldown=10.0, window=7)
+    router.record("a", ok=False)
+    copy = pickle.loads(pickle.dumps(router))
+    assert (copy.kind, copy.failures, copy.cooldown, copy.window) == ("tts", 5, 10.0, 7)
+    assert copy.requests == {}
+
+    stats = pickle.loads(pickle.dumps(InterruptionStats(window=16)))
+    assert stats.window == 16
@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+from provider_plugins import PluginRegistry
+
+
+@pytest.fixture
+def stubs(tmp_path, monkeypatch):
+    """A stub plugin package: voicestub.fast imports fine, voicestub.broken raises"""
+    package = tmp_path / "voicestub"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "fast.py").write_text("IMPORTS = []\nIMPORTS.append(1)\n")
+    (package / "broken.py").write_text("import voicestub_missing_dependency\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield PluginRegistry({
+        "fast": "voicestub.fast",
+        "broken": "voicestub.broken",
+        "idle": "voicestub.fast",
+        "absent": "voicestub.absent",
+        "orphan": "voicestub_absent_package.plugin",
+    })
+    for name in [name for name in sys.modules if name.startswith("voicestub")]:
+        del sys.modules[name]
+
+
+def test_plugins_are_imported_on_first_use(stubs):
+    assert "voicestub.fast" not in sys.modules
+    assert stubs.available("fast") and stubs.available("idle")
+    # Checking availability doesn't import anything
+    assert "voicestub.fast" not in sys.modules
+
+    module = stubs.load("fast")
+    assert sys.modules["voicestub.fast"] is module
+    assert stubs.load("fast") is module
+    assert module.IMPORTS == [1]
+    assert stubs.loaded() == ["fast"]
+    assert [(item.name, item.module, item.error) for item in stubs.imports] == [("fast", "voicestub.fast", None)]
+    assert stubs.imports[0].seconds >= 0 and stubs.imports[0].rss_bytes >= 0
+
+
+def test_already_imported_modules_are_reused_unmeasured(stubs):
+    module = stubs.load("fast")
+    # Another name for a module something else imported first
+    assert stubs.load("idle") is module
+    assert stubs.loaded() == ["fast", "idle"]
+    assert [item.name for item in stubs.imports] == ["fast"]
+
+
+def test_failed_imports_are_recorded(stubs):
+    with pytest.raises(ImportError):
+        stubs.load("broken")
+    assert stubs.loaded() == []
+    (failure,) = stubs.imports
+    assert failure.name == "broken" and "voicestub_missing_dependency" in failure.error
+    with pytest.raises(ImportError):
+        stubs.load_all(["fast", "absent"])
+    assert stubs.loaded() == ["fast"]
+    assert [item.name for item in stubs.imports] == ["broken", "fast", "absent"]
+
+
+def test_missing_parent_package_is_not_available(stubs):
+    assert not stubs.available("absent")
+    assert not stubs.available("orphan")
+
+
+def test_report(stubs):
+    stubs.load("fast")
+    stubs.load("idle")
+    with pytest.raises(ImportError):
+        stubs.load("broken")
+    rows = {line.split()[0]: line for line in stubs.report().splitlines()}
+    assert rows["plugin"].split() == ["plugin", "import", "rss", "status"]
+    assert rows["fast"].endswith("loaded")
+    assert rows["idle"].endswith("already imported")
+    assert "failed: No module named 'voicestub_missing_dependency'" in rows["broken"]
+    assert rows["absent"].endswith("not installed")
+    assert rows["orphan"].endswith("not installed")
+    assert "process rss" in rows["total"]
+
+
+def test_report_lists_unselected_plugins(stubs):
+    report = stubs.report()
+    assert "fast" in report and report.count("not selected") == 3
+    assert report.count("not installed") == 2
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+
+from provider_pool import ProviderPool, SessionProviders
+
+
+class Closing:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+class CountingConnections:
+    made = []
+
+    def __init__(self):
+        self.closed = False
+        CountingConnections.made.append(self)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    CountingConnections.made = []
+    built = []
+
+    def build(connections, spec):
+        providers = SessionProviders(stt=Closing(), llm=Closing(), tts=Closing())
+        built.append((connections, providers))
+        return providers
+
+    return ProviderPool(build, CountingConnections, **kwargs), built
+
+
+def test_sessions_on_one_loop_share_providers_and_connections():
+    pool, built = make_pool()
+
+    async def run():
+        first = await pool.acquire("a")
+        second = await pool.acquire("a")
+        assert first is second
+        assert pool.active_sessions == 2
+        await pool.release("a")
+        assert not CountingConnections.made[0].closed
+        await pool.release("a")
+
+    asyncio.run(run())
+    assert len(built) == 1
+    assert pool.active_sessions == 0
+    # The last session on the loop closes its clients
+    assert CountingConnections.made[0].closed
+    assert built[0][1].tts.closed
+
+
+def test_each_loop_gets_its_own_clients():
+    pool, built = make_pool()
+    seen = []
+
+    async def job(done: threading.Event):
+        providers = await pool.acquire("a")
+        seen.append(providers)
+        done.wait(5)
+        await pool.release("a")
+
+    release = threading.Event()
+    threads = [threading.Thread(target=asyncio.run, args=(job(release),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    while len(seen) < 2:
+        threading.Event().wait(0.01)
+    assert pool.active_sessions == 2
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert seen[0] is not seen[1]
+    assert built[0][0] is not built[1][0]
+    assert all(connections.closed for connections in CountingConnections.made)
+    assert pool.active_sessions == 0
+
+
+def test_prewarm_closes_what_it_built():
+    pool, built = make_pool()
+    pool.prewarm("a", None)
+    assert len(built) == 1
+    assert CountingConnections.made[0].closed
+    assert built[0][1].llm.closed
+
+
+def test_idle_entries_evicted_past_max_entries():
+    pool, built = make_pool(max_entries=1)
+
+    async def run():
+        await pool.acquire("a")
+        await pool.acquire("b")
+        # "a" is in use, so both stay cached
+        assert pool.cached_keys == ["a", "b"]
+        await pool.release("b")
+        assert pool.cached_keys == ["a"]
+        await asyncio.sleep(0)
+        assert built[1][1].stt.closed
+        await pool.release("a")
+
+    asyncio.run(run())
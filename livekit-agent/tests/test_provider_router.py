@@ -0,0 +1,87 @@
+from provider_router import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderRouter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failures=3, cooldown=10)
+    breaker.record(False, 0)
+    breaker.record(False, 0)
+    breaker.record(True, 0)
+    breaker.record(False, 1)
+    breaker.record(False, 1)
+    assert breaker.state == CLOSED
+    breaker.record(False, 1)
+    assert breaker.state == OPEN
+    assert not breaker.available(5)
+    assert breaker.available(11)
+
+
+def test_breaker_half_open_allows_one_probe():
+    breaker = CircuitBreaker(failures=1, cooldown=10)
+    breaker.record(False, 0)
+    breaker.started(10)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.available(10)
+    breaker.record(True, 11)
+    assert breaker.state == CLOSED
+    assert breaker.available(11)
+
+
+def test_failed_probe_doubles_cooldown_up_to_max():
+    breaker = CircuitBreaker(failures=1, cooldown=10, max_cooldown=30)
+    breaker.record(False, 0)
+    breaker.started(10)
+    breaker.record(False, 10)
+    assert breaker.state == OPEN and breaker.cooldown == 20
+    assert breaker.retry_at == 30
+    breaker.started(30)
+    breaker.record(False, 30)
+    assert breaker.cooldown == 30
+
+
+def test_cancelled_probe_lets_the_next_request_probe():
+    breaker = CircuitBreaker(failures=1, cooldown=10)
+    breaker.record(False, 0)
+    breaker.started(10)
+    breaker.cancelled()
+    assert breaker.available(10)
+
+
+def test_router_skips_open_providers():
+    clock = Clock()
+    router = ProviderRouter("tts", failures=2, cooldown=30, clock=clock)
+    for _ in range(2):
+        router.record("openai", ok=False)
+    assert router.state("openai") == OPEN
+    assert router.candidates(["openai", "elevenlabs"]) == ["elevenlabs"]
+    clock.now = 31
+    assert router.candidates(["openai", "elevenlabs"]) == ["openai", "elevenlabs"]
+
+
+def test_router_never_refuses_a_turn():
+    clock = Clock()
+    router = ProviderRouter("tts", failures=1, cooldown=30, clock=clock)
+    router.record("openai", ok=False)
+    clock.now = 5
+    router.record("elevenlabs", ok=False)
+    # Both open: the one closest to retrying is still tried
+    assert router.candidates(["openai", "elevenlabs"]) == ["openai"]
+
+
+def test_router_moves_slow_providers_behind():
+    clock = Clock()
+    router = ProviderRouter("tts", slow_after=1.0, probe_every=1000, clock=clock)
+    for _ in range(10):
+        started = router.started("openai")
+        clock.now += 2.0
+        router.record("openai", ok=True, started=started)
+    assert router.candidates(["openai", "elevenlabs"]) == ["elevenlabs", "openai"]
+    assert router.hedge_delay("openai") == 2.0
+    assert router.hedge_delay("elevenlabs") == 1.0
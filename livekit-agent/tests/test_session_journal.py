@@ -0,0 +1,62 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from session_journal import USER_SPEECH, USER_TRANSCRIPT, Journal, parse_level, parse_levels
+
+
+def record(level, message):
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+def lines(stream):
+    return stream.getvalue().splitlines()
+
+
+def test_unknown_levels_are_rejected():
+    assert parse_level("warning") == logging.WARNING
+    with pytest.raises(ValueError):
+        parse_level("LOUD")
+    assert parse_levels("user_speech=DEBUG") == {"user_speech": logging.DEBUG}
+    with pytest.raises(ValueError):
+        parse_levels("user_speech=LOUD")
+    with pytest.raises(ValueError):
+        parse_levels("nothing=INFO")
+
+
+def test_events_below_the_level_are_skipped():
+    stream = io.StringIO()
+    journal = Journal(stream=stream, levels={"user_speech": logging.DEBUG})
+    session = journal.session("room")
+    session.emit(USER_SPEECH, "hidden")
+    session.emit(USER_TRANSCRIPT, "also hidden", False)
+    journal.put(record(logging.INFO, "shown"))
+    journal.close()
+    assert len(lines(stream)) == 1 and lines(stream)[0].endswith("shown")
+
+
+def test_full_queue_drops_info_but_writes_warnings():
+    stream = io.StringIO()
+    journal = Journal(stream=stream, max_queue=1)
+    journal._thread = threading.Thread(target=lambda: None)   # Never started: the queue stays full
+    journal.put(record(logging.INFO, "queued"))
+    journal.put(record(logging.INFO, "dropped"))
+    journal.put(record(logging.WARNING, "kept"))
+    assert journal.outcomes["dropped"] == 1
+    assert journal.outcomes["written"] == 1
+    assert lines(stream)[0].endswith("kept")
+
+
+def test_file_opens_on_request_and_closes_at_close(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal()
+    assert not path.exists()
+    journal.open(str(path))
+    journal.session("room").emit(USER_SPEECH, "hello")
+    journal.close()
+    assert journal.stream is None
+    event = json.loads(path.read_text().splitlines()[0])
+    assert (event["room"], event["event"], event["text"]) == ("room", "user_speech", "hello")
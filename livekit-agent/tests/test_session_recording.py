@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from session_recording import (
+    AUDIO_IN, DATA, EVENT, LLM_TOKEN, META, TTS_AUDIO, TTS_TEXT, Recording, SessionRecorder,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def record_session(path, chunk_bytes=64):
+    clock = Clock()
+    recorder = SessionRecorder(path, {"room": "r1"}, chunk_bytes=chunk_bytes, clock=clock)
+    for i in range(20):
+        clock.now = i * 0.1
+        recorder.llm_token(f"token {i} ")
+        if i % 5 == 0:
+            recorder.audio_in(b"\x01\x00" * 160, 16000, 1)
+            recorder.tts_text("Hello there.")
+            recorder.tts_audio(480, 24000)
+            recorder.data(b"\x00payload")
+            recorder.event("user_started_speaking")
+    asyncio.run(recorder.aclose())
+    return recorder
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "s.nzrec"
+    recorder = record_session(path)
+    recording = Recording(path)
+    try:
+        records = list(recording)
+        assert len(records) == recorder.records
+        assert len(recording.index) > 1
+        assert records[0].kind == META and recording.meta["room"] == "r1"
+        tokens = [record.text() for record in records if record.kind == LLM_TOKEN]
+        assert tokens == [f"token {i} " for i in range(20)]
+        kinds = {record.kind for record in records}
+        assert {AUDIO_IN, EVENT, TTS_TEXT, TTS_AUDIO, DATA} <= kinds
+        audio = next(record for record in records if record.kind == AUDIO_IN)
+        assert audio.audio()[:2] == (16000, 1)
+        assert next(record for record in records if record.kind == TTS_AUDIO).tts_audio() == (480, 24000)
+        assert recording.duration == pytest.approx(1.9)
+    finally:
+        recording.close()
+
+
+def test_records_seek_by_time(tmp_path):
+    path = tmp_path / "s.nzrec"
+    record_session(path)
+    recording = Recording(path)
+    try:
+        window = [record.text() for record in recording.records(0.5, 1.0, kinds={LLM_TOKEN})]
+        assert window == [f"token {i} " for i in range(5, 10)]
+    finally:
+        recording.close()
+
+
+@pytest.mark.parametrize("keep_index", [True, False])
+def test_torn_tail_is_ignored(tmp_path, keep_index):
+    path = tmp_path / "s.nzrec"
+    record_session(path)
+    whole = Recording(path)
+    chunks, last = len(whole.index), whole.index[len(whole.index) - 1]
+    complete = sum(record.kind == LLM_TOKEN for record in whole.records(0, last[1]))
+    whole.close()
+
+    # A crash in the middle of writing the last chunk
+    size = path.stat().st_size
+    with open(path, "r+b") as f:
+        f.truncate(size - 3)
+    index = path.with_name(path.name + ".idx")
+    if not keep_index:
+        index.unlink()
+
+    torn = Recording(path)
+    try:
+        assert len(torn.index) == chunks - 1
+        tokens = [record for record in torn if record.kind == LLM_TOKEN]
+        assert len(tokens) == complete
+    finally:
+        torn.close()
@@ -0,0 +1,70 @@
+import asyncio
+
+from speculation import SpeculationStats, Speculator, normalize
+
+
+class Reply:
+    def __init__(self, tokens, prompt_tokens):
+        self.prompt_tokens = prompt_tokens
+        self._tokens = tokens
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for token in self._tokens:
+            await asyncio.sleep(0)
+            yield token
+
+    async def aclose(self):
+        pass
+
+
+def test_normalize_ignores_case_and_punctuation():
+    assert normalize("What's  the Weather?") == normalize("what's the weather")
+
+
+def test_abandoned_and_missed_speculations_count_requests_and_prompt_tokens():
+    stats = SpeculationStats()
+    started = []
+
+    def start(text):
+        started.append(text)
+        return Reply(["a", "b"], prompt_tokens=100)
+
+    async def run():
+        speculator = Speculator(start, stats, stable_window=0.01)
+        speculator.on_transcript("tell me", False)
+        await asyncio.sleep(0.05)
+        # The user kept talking: the first speculation is abandoned
+        speculator.on_transcript("tell me a joke", False)
+        await asyncio.sleep(0.05)
+        # The final differs from the second speculation: a miss
+        assert speculator.commit("Tell me a story.") is None
+        speculator.on_transcript("what time is it", False)
+        await asyncio.sleep(0.05)
+        assert speculator.commit("What time is it?") is not None
+
+    asyncio.run(run())
+    assert len(started) == 3
+    assert stats.outcomes == {"hit": 1, "miss": 1, "abandoned": 1}
+    assert stats.wasted_requests == 2
+    assert stats.wasted_prompt_tokens == 200
+    assert stats.request_multiplier(2) == 2.0
+    text = stats.render()
+    assert "voice_speculation_wasted_requests_total 2" in text
+    assert "voice_speculation_wasted_prompt_tokens_total 200" in text
+
+
+def test_streams_without_a_prompt_size_count_zero():
+    stats = SpeculationStats()
+
+    async def run():
+        speculator = Speculator(lambda text: Reply(["x"], 0).__aiter__(), stats, stable_window=0.01)
+        speculator.on_transcript("hello there", False)
+        await asyncio.sleep(0.05)
+        speculator.aclose()
+
+    asyncio.run(run())
+    assert stats.wasted_requests == 1
+    assert stats.wasted_prompt_tokens == 0
@@ -0,0 +1,83 @@
+import pytest
+
+from tag_parser import EmotionTagParser
+
+
+def parse(chunks):
+    parser = EmotionTagParser()
+    text, tags = [], []
+    for chunk in chunks:
+        out, found = parser.feed(chunk)
+        text.append(out)
+        tags += found
+    text.append(parser.flush())
+    return "".join(text), tags
+
+
+def chars(text):
+    return list(text)
+
+
+@pytest.mark.parametrize("split", [lambda s: [s], chars], ids=["whole", "per-char"])
+@pytest.mark.parametrize("reply, text, tags", [
+    ("[happy] Hello!", "Hello!", ["happy"]),
+    ("  [Excited]  Oh really?", "Oh really?", ["excited"]),
+    ("I think so. [concerned] Be careful.", "I think so. Be careful.", ["concerned"]),
+    ("[thoughtful] Hmm. [playful] Want a hint?", "Hmm. Want a hint?", ["thoughtful", "playful"]),
+    ("No tags at all.", "No tags at all.", []),
+])
+def test_emotion_tags_are_stripped_and_reported(split, reply, text, tags):
+    assert parse(split(reply)) == (text, tags)
+
+
+@pytest.mark.parametrize("split", [lambda s: [s], chars], ids=["whole", "per-char"])
+@pytest.mark.parametrize("reply", [
+    "Price is [1,2] ok",
+    "[[happy] hi",
+    "See [citation needed] there.",
+    "[] empty",
+    "an open [bracket at the end",
+    "[" + "x" * 40 + "] too long",
+    "[happy\n] newline",
+])
+def test_other_brackets_pass_through_unchanged(split, reply):
+    assert parse(split(reply)) == (reply, [])
+
+
+def test_leading_whitespace_before_literal_brackets_is_dropped():
+    assert parse(["  [1,2] ok"]) == ("[1,2] ok", [])
+
+
+def test_untagged_reply_is_released_on_first_chunk():
+    parser = EmotionTagParser()
+    assert parser.feed("Sure, ") == ("Sure, ", [])
+
+
+def test_open_tag_is_held_until_decided():
+    parser = EmotionTagParser()
+    assert parser.feed("[hap") == ("", [])
+    assert parser.feed("py] Hi") == ("Hi", ["happy"])
+
+
+def test_custom_vocabulary():
+    parser = EmotionTagParser(emotions={"smug"})
+    assert parser.feed("[smug] ok [happy] fine") == ("ok [happy] fine", ["smug"])
+
+
+@pytest.mark.parametrize("split", [lambda s: [s], chars], ids=["whole", "per-char"])
+@pytest.mark.parametrize("reply, text, tags", [
+    ("[surprised] Wow!", "Wow!", ["surprised"]),
+    ("  [Lovey-Dovey] Hi there", "Hi there", ["lovey-dovey"]),
+    ("[happy] [surprised] Oh!", "Oh!", ["happy", "surprised"]),
+])
+def test_any_single_word_tag_opening_a_reply_is_stripped(split, reply, text, tags):
+    assert parse(split(reply)) == (text, tags)
+
+
+@pytest.mark.parametrize("reply", [
+    "Well [surprised] that is new.",
+    "[not one word] hi",
+    "[x2] hi",
+])
+def test_unknown_tags_elsewhere_are_spoken(reply):
+    assert parse([reply]) == (reply, [])
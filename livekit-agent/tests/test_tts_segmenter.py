@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from tts_segmenter import SentenceSegmenter, prefetch_audio, segment_stream
+
+
+@pytest.mark.parametrize("text, segments", [
+    ("Hello there. How are you? ", ["Hello there.", "How are you?"]),
+    ("Dr. Smith is in. ", ["Dr. Smith is in."]),
+    ("It costs 3.5 dollars. ", ["It costs 3.5 dollars."]),
+    ("Well then, that is true. ", ["Well then,", "that is true."]),
+])
+def test_sentence_boundaries(text, segments):
+    segmenter = SentenceSegmenter()
+    out = []
+    for char in text:
+        out += segmenter.feed(char)
+    if segmenter.flush():
+        out.append(segmenter.flush())
+    assert out == segments
+
+
+async def timed(chunks):
+    for delay, text in chunks:
+        await asyncio.sleep(delay)
+        yield text
+
+
+def test_first_segment_waits_only_first_latency():
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        chunks = timed([(0, "one two three four"), (0.5, " five.")])
+        stream = segment_stream(chunks, SentenceSegmenter(eager_first=False), max_latency=1.0, first_latency=0.05)
+        first = await stream.__anext__()
+        elapsed = loop.time() - start
+        rest = [segment async for segment in stream]
+        return first, elapsed, rest
+
+    first, elapsed, rest = asyncio.run(run())
+    assert first == "one two three"
+    assert elapsed < 0.3
+    assert rest == ["four five."]
+
+
+def test_prefetch_slot_held_until_segment_consumed():
+    started = []
+
+    async def synthesize(text):
+        started.append(text)
+        yield text
+
+    async def segments():
+        for text in ("a", "b", "c", "d"):
+            yield text
+
+    async def run():
+        stream = prefetch_audio(segments(), synthesize, max_in_flight=2)
+        text, audio = await stream.__anext__()
+        await asyncio.sleep(0.05)
+        # "a" is synthesized but not played: only one more segment may start
+        assert started == ["a", "b"]
+        assert [chunk async for chunk in audio] == ["a"]
+        await asyncio.sleep(0.05)
+        assert started == ["a", "b", "c"]
+        rest = []
+        async for text, audio in stream:
+            rest += [chunk async for chunk in audio]
+        return rest
+
+    assert asyncio.run(run()) == ["b", "c", "d"]
@@ -0,0 +1,260 @@
+"""
+Streaming TTS segmentation
+Cuts the LLM's text stream into sentence/clause segments for TTS and
+synthesizes the next segment while the current one is still playing
+"""
+
+import asyncio
+import re
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional, Tuple
+
+# Words that end in "." without ending the sentence
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc", "eg", "ie",
+    "am", "pm", "no", "approx", "dept", "inc", "ltd", "co", "corp", "jan", "feb",
+    "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "us", "uk",
+})
+
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*(?=\s)|\n+")
+_CLAUSE_END = re.compile(r"[,;:—–](?=\s)")
+
+_FLUSH = None  # Marker in the text stream: speak whatever is buffered
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence splitter.
+
+    feed() returns the segments completed by a chunk. A sentence only ends
+    at terminal punctuation followed by whitespace, so "3.5" or a trailing
+    "Dr." at the end of a chunk are held until the next chunk decides.
+    Segments shorter than `min_chars` are merged into the next one; text
+    longer than `clause_chars` without a sentence end is cut at a clause
+    boundary, and at `max_chars` at the last space. The first segment of a
+    reply may also end at a clause boundary, to start audio sooner.
+    """
+
+    def __init__(
+        self, min_chars: int = 8, clause_chars: int = 120, max_chars: int = 300, eager_first: bool = True
+    ):
+        self.min_chars = min_chars
+        self.clause_chars = clause_chars
+        self.max_chars = max_chars
+        self.eager_first = eager_first
+        self._first = True
+        self._buffer = ""
+        self._scan = 0   # Everything before this offset has no usable boundary
+
+    @property
+    def pending(self) -> str:
+        return self._buffer
+
+    @property
+    def first(self) -> bool:
+        """Nothing of the current reply has been released yet"""
+        return self._first
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._sentence_cut()
+            if cut is None and self._first and self.eager_first:
+                match = _CLAUSE_END.search(self._buffer, self.min_chars)
+                cut = match.end() if match else None
+            if cut is None and len(self._buffer) > self.clause_chars:
+                cut = self._clause_cut() or self._space_cut(self.max_chars)
+            if cut is None:
+                return segments
+            segment = self._take(cut)
+            if segment:
+                segments.append(segment)
+
+    def _sentence_cut(self) -> Optional[int]:
+        for match in _SENTENCE_END.finditer(self._buffer, self._scan):
+            end = match.end()
+            if end < self.min_chars:
+                continue
+            if match.group().startswith(".") and self._is_abbreviation(match.start()):
+                continue
+            return end
+        # Keep a few chars back: a boundary may need the next chunk's space
+        self._scan = max(0, len(self._buffer) - 4)
+        return None
+
+    def _is_abbreviation(self, dot: int) -> bool:
+        start = max(self._buffer.rfind(" ", 0, dot), self._buffer.rfind("\n", 0, dot)) + 1
+        word = self._buffer[start:dot].lstrip("\"'([").replace(".", "").lower()
+        # Initials ("J. R. R.") and known abbreviations
+        return word.isalpha() and (len(word) == 1 or word in ABBREVIATIONS)
+
+    def _clause_cut(self) -> Optional[int]:
+        cut = None
+        for match in _CLAUSE_END.finditer(self._buffer, self.min_chars):
+            if match.end() > self.max_chars:
+                break
+            cut = match.end()
+        return cut
+
+    def _space_cut(self, limit: int) -> Optional[int]:
+        if len(self._buffer) < limit:
+            return None
+        space = self._buffer.rfind(" ", self.min_chars, limit)
+        return space if space > 0 else limit
+
+    def _take(self, cut: int) -> str:
+        segment, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        self._scan = 0
+        segment = segment.strip()
+        if segment:
+            self._first = False
+        return segment
+
+    def cut_for_latency(self) -> Optional[str]:
+        """Release a partial segment at the last clause or word boundary"""
+        cut = self._clause_cut()
+        if cut is None:
+            space = self._buffer.rfind(" ")
+            cut = space if space >= self.min_chars else None
+        if cut is None:
+            return None
+        return self._take(cut) or None
+
+    def flush(self) -> Optional[str]:
+        segment = self._take(len(self._buffer))
+        self._first = True   # Next text is a new reply
+        return segment or None
+
+
+async def segment_stream(
+    chunks: AsyncIterable[Optional[str]],
+    segmenter: SentenceSegmenter,
+    max_latency: float = 0.6,
+    first_latency: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    Segments from a text stream (None in the stream = flush).
+
+    If text has been waiting `max_latency` seconds without a boundary, a
+    partial segment is released so TTS is never starved by a long sentence.
+    The first segment of a reply waits at most `first_latency` (defaults to
+    max_latency): nothing is playing yet, so every wait is heard as
+    first-audio latency, while later segments are hidden by prefetch.
+    """
+    if first_latency is None:
+        first_latency = max_latency
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def read():
+        try:
+            async for chunk in chunks:
+                inbox.put_nowait(chunk)
+        finally:
+            inbox.put_nowait(done)
+
+    reader = asyncio.create_task(read())
+    waiting_since = None
+    try:
+        while True:
+            timeout = None
+            if waiting_since is not None:
+                latency = first_latency if segmenter.first else max_latency
+                timeout = max(0.0, waiting_since + latency - loop.time())
+            try:
+                chunk = await asyncio.wait_for(inbox.get(), timeout)
+            except asyncio.TimeoutError:
+                segment = segmenter.cut_for_latency()
+                waiting_since = loop.time() if segmenter.pending.strip() else None
+                if segment:
+                    yield segment
+                continue
+
+            if chunk is done:
+                break
+            if chunk is _FLUSH:
+                segment = segmenter.flush()
+                waiting_since = None
+                if segment:
+                    yield segment
+                continue
+            for segment in segmenter.feed(chunk):
+                waiting_since = None
+                yield segment
+            if waiting_since is None and segmenter.pending.strip():
+                waiting_since = loop.time()
+
+        segment = segmenter.flush()
+        if segment:
+            yield segment
+        await reader  # Re-raise input errors
+    finally:
+        reader.cancel()
+
+
+async def prefetch_audio(
+    segments: AsyncIterable[str],
+    synthesize: Callable[[str], AsyncIterator],
+    max_in_flight: int = 2,
+) -> AsyncIterator[Tuple[str, AsyncIterator]]:
+    """
+    Synthesize segments ahead of playout, yielding them in order.
+
+    Up to `max_in_flight` segments are held at once, so segment N+1 is
+    being synthesized while segment N is still being played. A segment
+    holds its slot until its audio has been consumed, not just synthesized,
+    so buffered audio never runs more than max_in_flight segments ahead.
+    Each item is (segment text, async iterator of that segment's audio chunks).
+    """
+    slots = asyncio.Semaphore(max_in_flight)
+    ordered: asyncio.Queue = asyncio.Queue()
+    end = object()
+    fills = set()
+
+    async def fill(text, buffer):
+        try:
+            async for chunk in synthesize(text):
+                buffer.put_nowait(chunk)
+        except Exception as e:
+            buffer.put_nowait(e)
+        finally:
+            buffer.put_nowait(end)
+
+    async def schedule():
+        try:
+            async for text in segments:
+                await slots.acquire()
+                buffer: asyncio.Queue = asyncio.Queue()
+                task = asyncio.create_task(fill(text, buffer))
+                fills.add(task)
+                task.add_done_callback(fills.discard)
+                ordered.put_nowait((text, buffer))
+        finally:
+            ordered.put_nowait(end)
+
+    async def drain(buffer):
+        try:
+            while True:
+                item = await buffer.get()
+                if item is end:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            slots.release()
+
+    scheduler = asyncio.create_task(schedule())
+    try:
+        while True:
+            entry = await ordered.get()
+            if entry is end:
+                break
+            yield entry[0], drain(entry[1])
+        await scheduler  # Re-raise segmenter/input errors
+    finally:
+        scheduler.cancel()
+        for task in list(fills):
+            task.cancel()
+        await asyncio.gather(scheduler, *fills, return_exceptions=True)
@@ -0,0 +1,242 @@
+"""
+Per-turn latency tracing
+Timestamps each stage of a voice turn, aggregates the gaps into histograms
+labelled by personality and provider, and serves them in Prometheus format
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from process_local import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+# Marks recorded during a turn, in the order they normally happen
+STAGES = (
+    "vad_end",             # User stopped speaking (VAD)
+    "stt_final",           # Final transcript committed
+    "llm_first_token",     # First LLM text reached _before_tts_cb
+    "tts_cb_first_yield",  # _before_tts_cb released its first text
+    "tts_first_audio",     # First synthesized audio frame played out
+    "playout_end",         # Agent finished speaking
+)
+
+# (segment name, from mark, to mark) - what the histograms measure
+SEGMENTS = (
+    ("stt", "vad_end", "stt_final"),
+    ("llm", "stt_final", "llm_first_token"),
+    ("text", "llm_first_token", "tts_cb_first_yield"),
+    ("tts", "tts_cb_first_yield", "tts_first_audio"),
+    ("playout", "tts_first_audio", "playout_end"),
+    ("response", "vad_end", "tts_first_audio"),
+)
+
+BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def quantile(ordered, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1) + 0.5))]
+
+
+class _Series:
+    """Histogram buckets plus a sliding window of samples for quantiles"""
+
+    __slots__ = ("buckets", "count", "total", "window")
+
+    def __init__(self, window: int):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.window = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.window.append(seconds)
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.window)
+        return {q: quantile(ordered, q) for q in QUANTILES}
+
+
+class LatencyMetrics(ProcessLocal):
+    """
+    Process-wide per-stage latency histograms.
+
+    Series are keyed by (segment, personality, provider). Thread-safe so
+    sessions on different job threads can share one registry.
+    """
+
+    _init_args = ("window",)
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self.turns = 0
+
+    def observe(self, segment: str, personality: str, provider: str, seconds: float):
+        key = (segment, personality, provider)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.window)
+            series.observe(seconds)
+
+    def turn_completed(self):
+        with self._lock:
+            self.turns += 1
+
+    def quantiles(self, segment: str, personality: str, provider: str) -> Dict[float, float]:
+        with self._lock:
+            series = self._series.get((segment, personality, provider))
+            return series.quantiles() if series else {}
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        lines = [
+            "# HELP voice_turn_stage_seconds Latency of each voice-turn stage",
+            "# TYPE voice_turn_stage_seconds histogram",
+        ]
+        summary = [
+            "# HELP voice_turn_stage_quantile_seconds Recent per-stage latency quantiles",
+            "# TYPE voice_turn_stage_quantile_seconds summary",
+        ]
+        with self._lock:
+            items = sorted(self._series.items())
+            for (segment, personality, provider), series in items:
+                labels = f'stage="{segment}",personality="{personality}",provider="{provider}"'
+                for bound, count in zip(BUCKETS, series.buckets):
+                    lines.append(f'voice_turn_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'voice_turn_stage_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+                lines.append(f"voice_turn_stage_seconds_sum{{{labels}}} {series.total:.6f}")
+                lines.append(f"voice_turn_stage_seconds_count{{{labels}}} {series.count}")
+                for q, value in series.quantiles().items():
+                    summary.append(f'voice_turn_stage_quantile_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+                summary.append(f"voice_turn_stage_quantile_seconds_sum{{{labels}}} {series.total:.6f}")
+                summary.append(f"voice_turn_stage_quantile_seconds_count{{{labels}}} {series.count}")
+            lines += summary
+            lines += [
+                "# HELP voice_turns_total Completed voice turns",
+                "# TYPE voice_turns_total counter",
+                f"voice_turns_total {self.turns}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class TurnTracer:
+    """
+    Collects stage marks for one session's turns.
+
+    A turn starts at vad_end and is recorded at playout_end. Each stage is
+    marked once per turn; stages that never happen (e.g. STT in realtime
+    mode) are simply left out of the histograms.
+    """
+
+    def __init__(
+        self,
+        metrics: LatencyMetrics,
+        personality: str,
+        provider: str,
+        clock: Callable[[], float] = time.monotonic,
+        window: int = 64,
+    ):
+        self.metrics = metrics
+        self.personality = personality
+        self.provider = provider
+        self.clock = clock
+        self.turns = 0
+        self._marks: Dict[str, float] = {}
+        self._recent: Dict[str, deque] = {name: deque(maxlen=window) for name, _, _ in SEGMENTS}
+
+    def mark(self, stage: str, at: Optional[float] = None):
+        """Record a stage timestamp (first occurrence per turn wins)"""
+        now = self.clock() if at is None else at
+        if stage == "vad_end":
+            self._marks = {"vad_end": now}
+            return
+        if stage in self._marks:
+            return
+        self._marks[stage] = now
+        if stage == "playout_end":
+            self._finish()
+
+    def _finish(self):
+        marks = self._marks
+        self._marks = {}
+        if "vad_end" not in marks:
+            # Agent spoke without a user turn (e.g. the greeting)
+            return
+        for name, start, end in SEGMENTS:
+            if start in marks and end in marks:
+                seconds = max(0.0, marks[end] - marks[start])
+                self.metrics.observe(name, self.personality, self.provider, seconds)
+                self._recent[name].append(seconds)
+        self.metrics.turn_completed()
+        self.turns += 1
+
+    def summary(self) -> dict:
+        """Recent per-stage p50/p95/p99 in milliseconds for this session"""
+        result = {}
+        for name, samples in self._recent.items():
+            if samples:
+                ordered = sorted(samples)
+                result[name] = {f"p{int(q * 100)}": round(quantile(ordered, q) * 1000, 1) for q in QUANTILES}
+        return result
+
+
+class MetricsServer:
+    """Minimal HTTP endpoint serving /metrics from the running event loop"""
+
+    def __init__(self, render: Callable[[], str], host: str = "127.0.0.1", port: int = 9464):
+        self.render = render
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self) -> bool:
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            logger.warning(f"⚠️ Metrics endpoint not started on {self.host}:{self.port}: {e}")
+            return False
+        logger.info(f"📈 Metrics at http://{self.host}:{self.port}/metrics")
+        return True
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+            path = request.split(b" ", 2)[1] if request.count(b" ") >= 2 else b"/"
+            if path.split(b"?")[0] == b"/metrics":
+                body = self.render().encode("utf-8")
+                status = b"200 OK"
+            else:
+                body = b"not found\n"
+                status = b"404 Not Found"
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def aclose(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
@@ -10,6 +10,45 @@ import {
     createLocalAudioTrack,
 } from 'livekit-client';
 
+// Binary data frames from the agent (livekit-agent/data_publisher.py):
+// [version, code, ...body]; JSON payloads start with "{" instead
+const DATA_WIRE_VERSION = 1;
+const VISEMES = ['aa', 'ih', 'ou', 'ee', 'oh'];
+const EMOTION_CODES = [
+    'neutral', 'happy', 'sad', 'angry', 'stressed', 'calm', 'love',
+    'concerned', 'thoughtful', 'excited', 'playful',
+];
+
+function decodeAgentData(payload) {
+    if (payload[0] === 0x7b) {
+        return JSON.parse(new TextDecoder().decode(payload));
+    }
+    if (payload[0] !== DATA_WIRE_VERSION) {
+        throw new Error(`Unsupported data frame version ${payload[0]}`);
+    }
+    const view = new DataView(payload.buffer, payload.byteOffset, payload.byteLength);
+    switch (payload[1]) {
+        case 1:
+            return { type: 'state', isSpeaking: payload[2] !== 0 };
+        case 2:
+            return { type: 'emotion', emotion: EMOTION_CODES[payload[2]], timestamp: view.getFloat64(3, true) };
+        case 4: {
+            // Level and aa/ih/ou/ee/oh weights (0-255), offsetMs = playout time in the utterance
+            const weights = {};
+            VISEMES.forEach((name, i) => { weights[name] = payload[9 + i] / 255; });
+            return {
+                type: 'viseme',
+                seq: view.getUint16(2, true),
+                offsetMs: view.getUint32(4, true),
+                level: payload[8] / 255,
+                weights,
+            };
+        }
+        default:
+            throw new Error(`Unknown data frame code ${payload[1]}`);
+    }
+}
+
 export class LiveKitVoiceService {
     constructor() {
         this.room = null;
@@ -25,6 +64,7 @@ export class LiveKitVoiceService {
         this.onSpeakingChanged = null;
         this.onAgentSpeaking = null;
         this.onEmotion = null;
+        this.onVisemes = null;  // Server lip-sync frames (agent LIPSYNC_FPS > 0)
         this.onError = null;
 
         console.log('[LiveKitVoice] Service initialized');
@@ -165,9 +205,15 @@ export class LiveKitVoiceService {
         // Data received (Emotion / State)
         this.room.on(RoomEvent.DataReceived, (payload, participant, kind, topic) => {
             try {
-                const decoder = new TextDecoder();
-                const strData = decoder.decode(payload);
-                const data = JSON.parse(strData);
+                const data = decodeAgentData(payload);
+
+                if (data.type === 'viseme') {
+                    // ~30 per second - not logged
+                    if (this.onVisemes) {
+                        this.onVisemes(data);
+                    }
+                    return;
+                }
 
                 console.log('[LiveKitVoice] Data received:', data);
 